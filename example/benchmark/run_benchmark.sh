@@ -0,0 +1,8 @@
+set -ex
+
+SCRIPT_REAL_PATH=$(readlink -f "${BASH_SOURCE[0]}")
+SCRIPT_DIR=$(dirname "$SCRIPT_REAL_PATH")
+
+ros2 run robo_orchard_data_ros2 mcap_benchmark \
+    $SCRIPT_DIR/benchmark_cfg.json \
+    --output ${1:-benchmark_result.json}
@@ -21,14 +21,17 @@ from typing import Tuple
 
 import streamlit as st
 
+from robo_orchard_recorder_app.catalog import EpisodeCatalog
 from robo_orchard_recorder_app.components import (
     CollectingState,
     ControlComponent,
     FoxgloveIFrameComponent,
     SideBarComponent,
+    StatisticsComponent,
     TaskConfigComponent,
 )
 from robo_orchard_recorder_app.config import LaunchCfg, TaskCfg
+from robo_orchard_recorder_app.trash import EpisodeTrash
 from robo_orchard_recorder_app.utils import start_process, time_str_now
 
 
@@ -63,6 +66,58 @@ def file_server() -> str:
         raise
 
 
+@st.cache_resource
+def episode_catalog(db_path: str, workspace: str) -> EpisodeCatalog:
+    """Opens the episode catalog shared by all sessions.
+
+    The catalog is synced with the workspace once per app process.
+
+    Args:
+        db_path (str): The SQLite database file.
+        workspace (str): The working directory of the recordings.
+
+    Returns:
+        EpisodeCatalog: The catalog.
+    """
+    catalog = EpisodeCatalog(db_path)
+    catalog.sync(workspace)
+    return catalog
+
+
+@st.cache_resource
+def episode_trash(
+    workspace: str,
+    retention_sec: float,
+    quota_gb: float | None,
+    low_watermark_gb: float,
+    _catalog: EpisodeCatalog,
+) -> EpisodeTrash:
+    """Opens the trash shared by all sessions and starts purging it.
+
+    Args:
+        workspace (str): The working directory of the recordings.
+        retention_sec (float): Seconds a deleted episode is kept.
+        quota_gb (float | None): Maximum size of the episodes and the
+            trash, or None for no quota.
+        low_watermark_gb (float): Minimum free space of the workspace
+            disk.
+        _catalog (EpisodeCatalog): The episode catalog.
+
+    Returns:
+        EpisodeTrash: The trash.
+    """
+    trash = EpisodeTrash(
+        trash_dir=os.path.join(workspace, ".trash"),
+        workspace=workspace,
+        retention_sec=retention_sec,
+        quota_bytes=None if quota_gb is None else int(quota_gb * 1e9),
+        low_watermark_bytes=int(low_watermark_gb * 1e9),
+        catalog=_catalog,
+    )
+    trash.start()
+    return trash
+
+
 @st.cache_resource
 def get_app_start_timestr() -> str:
     return time_str_now()
@@ -152,17 +207,37 @@ def _st_init():
     else:
         file_server_uri = st.session_state.launch_cfg.file_server_uri
 
+    catalog = episode_catalog(
+        os.path.join(launch_cfg.app_cache_directory, "episodes.db"),
+        launch_cfg.workspace,
+    )
+    trash = episode_trash(
+        launch_cfg.workspace,
+        launch_cfg.trash_retention_sec,
+        launch_cfg.disk_quota_gb,
+        launch_cfg.disk_low_watermark_gb,
+        catalog,
+    )
+
     st.session_state.task_config_panel = TaskConfigComponent(key="task_cfg")
     st.session_state.control_panel = ControlComponent(
         task_cfg_key="task_cfg",
         collecting_state_key="collecting_state",
         app_cache_directory=launch_cfg.app_cache_directory,
         data_record_config_file=st.session_state.launch_cfg.data_record_config_file,
+        catalog=catalog,
+        trash=trash,
     )
     st.session_state.side_bar_panel = SideBarComponent(
         collecting_state_key="collecting_state",
         foxglove_cfg=st.session_state.launch_cfg.foxglove,
         file_server_host=file_server_uri,
+        catalog=catalog,
+        trash=trash,
+        workspace=launch_cfg.workspace,
+    )
+    st.session_state.statistics_panel = StatisticsComponent(
+        catalog=catalog, short_episode_sec=launch_cfg.short_episode_sec
     )
     st.session_state.foxglove_panel = FoxgloveIFrameComponent(
         cfg=st.session_state.launch_cfg.foxglove
@@ -195,6 +270,7 @@ def main_page():
 
     with left_col:
         st.session_state.foxglove_panel()
+        st.session_state.statistics_panel()
 
     with right_col:
         st.session_state.control_panel()
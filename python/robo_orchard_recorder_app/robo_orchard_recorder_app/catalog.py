@@ -0,0 +1,606 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+import pydantic
+
+from robo_orchard_recorder_app.utils import find_mcap_files
+
+__all__ = [
+    "EpisodeRecord",
+    "EpisodeStats",
+    "EpisodeCatalog",
+    "read_episode_record",
+]
+
+EpisodeStatus = Literal[
+    "recording", "finalizing", "failed", "unvalidated", "valid", "invalid"
+]
+
+
+class EpisodeRecord(pydantic.BaseModel):
+    """An episode in the catalog."""
+
+    uri: str
+    """Episode directory, which is the key of the catalog."""
+
+    name: str
+    """Base name of the episode directory."""
+
+    session: str = ""
+    """Session time of the app which recorded the episode."""
+
+    user_name: str = ""
+    """Name of the user who collected the episode."""
+
+    task_name: str = ""
+    """Name of the task."""
+
+    instruction: str = ""
+    """Instruction of the task."""
+
+    create_time: float = 0.0
+    """Time when the recording started, in seconds since the epoch."""
+
+    status: EpisodeStatus = "unvalidated"
+    """Status of the episode."""
+
+    size_bytes: int | None = None
+    """Total size of the MCAP files."""
+
+    duration_sec: float | None = None
+    """Log time span of the episode, known after validation."""
+
+    message_count: int | None = None
+    """Number of messages, known after validation."""
+
+    topic_counts: Dict[str, int] = pydantic.Field(default_factory=dict)
+    """Number of messages per topic, known after validation."""
+
+    errors: List[str] = pydantic.Field(default_factory=list)
+    """Finalization or validation errors."""
+
+
+class EpisodeStats(pydantic.BaseModel):
+    """Aggregated statistics of a group of episodes.
+
+    The fields which the episodes are not grouped by are None.
+    """
+
+    user_name: str | None = None
+    """Name of the user who collected the episodes."""
+
+    task_name: str | None = None
+    """Name of the task."""
+
+    status: EpisodeStatus | None = None
+    """Status of the episodes."""
+
+    episodes: int = 0
+    """Number of episodes."""
+
+    duration_sec: float = 0.0
+    """Total duration of the validated episodes."""
+
+    size_bytes: int = 0
+    """Total size of the MCAP files."""
+
+    @property
+    def hours(self) -> float:
+        return self.duration_sec / 3600
+
+
+StatsGroup = Literal["user_name", "task_name", "status"]
+
+
+def _parse_create_time(uri: str) -> float:
+    name = os.path.basename(os.path.normpath(uri))
+    try:
+        return datetime.strptime(
+            name.removeprefix("episode_"), "%Y_%m_%d-%H_%M_%S"
+        ).timestamp()
+    except ValueError:
+        return os.path.getmtime(uri) if os.path.exists(uri) else time.time()
+
+
+def _get_mtime(uri: str) -> float:
+    # the meta file may be rewritten in place, which leaves the mtime of
+    # the directory unchanged
+    mtimes = [0.0]
+    for path in (uri, os.path.join(uri, "episode_meta.json")):
+        try:
+            mtimes.append(os.path.getmtime(path))
+        except OSError:
+            pass
+    return max(mtimes)
+
+
+def read_episode_record(uri: str, **fields: Any) -> EpisodeRecord:
+    """Reads the catalog entry of an episode from its files.
+
+    The collecting config and the validation report are read from
+    `episode_meta.json`. The session, user and task default to the
+    `<workspace>/<session>/data/<user>/<task>/<episode>` layout of the
+    app.
+
+    Args:
+        uri (str): The episode directory.
+        **fields: Fields overriding the ones read from the files.
+
+    Returns:
+        EpisodeRecord: The entry.
+    """
+    uri = os.path.normpath(uri)
+    parts = uri.split(os.sep)
+    record: Dict[str, Any] = {"uri": uri, "name": parts[-1]}
+    if len(parts) >= 5 and parts[-4] == "data":
+        record.update(
+            session=parts[-5], user_name=parts[-3], task_name=parts[-2]
+        )
+    record["create_time"] = _parse_create_time(uri)
+
+    meta: Dict[str, Any] = dict()
+    meta_file = os.path.join(uri, "episode_meta.json")
+    if os.path.exists(meta_file):
+        try:
+            with open(meta_file, "r") as fr:
+                meta = json.load(fr)
+        except (OSError, ValueError):
+            meta = dict()
+    for key in ("user_name", "task_name", "instruction"):
+        if meta.get(key):
+            record[key] = meta[key]
+
+    if os.path.exists(os.path.join(uri, "__RECORDING__")):
+        record["status"] = "recording"
+    validation = meta.get("validation")
+    if validation is not None:
+        topics = validation.get("topics", {})
+        starts = [
+            t["start_time_ns"]
+            for t in topics.values()
+            if t["start_time_ns"] is not None
+        ]
+        ends = [
+            t["end_time_ns"]
+            for t in topics.values()
+            if t["end_time_ns"] is not None
+        ]
+        record.update(
+            duration_sec=(max(ends) - min(starts)) * 1e-9 if starts else 0.0,
+            message_count=sum(t["message_count"] for t in topics.values()),
+            topic_counts={
+                topic: t["message_count"] for topic, t in topics.items()
+            },
+            errors=validation.get("errors", []),
+        )
+        record.setdefault(
+            "status", "valid" if validation.get("valid") else "invalid"
+        )
+    if os.path.isdir(uri):
+        record["size_bytes"] = sum(
+            os.path.getsize(f)
+            for f in find_mcap_files(uri)
+            if os.path.exists(f)
+        )
+    record.update(fields)
+    return EpisodeRecord.model_validate(record)
+
+
+class EpisodeCatalog:
+    """Persistent catalog of the recorded episodes, backed by SQLite.
+
+    The catalog is updated incrementally by the recording and the
+    finalization of the episodes, and reconciled with the disk by
+    :meth:`sync`. Pages are read with keyset pagination on the indexed
+    `(create_time, uri)` order, so the cost of a page does not depend on
+    its position or on the size of the catalog.
+
+    The statistics per user, task and status are kept in a separate
+    table, updated by triggers whenever an episode is added, changed or
+    removed, so :meth:`stats` only reads a few rows per task.
+
+    This class is thread-safe.
+    """
+
+    SCHEMA_VERSION = 1
+
+    _COLUMNS = (
+        "uri",
+        "name",
+        "session",
+        "user_name",
+        "task_name",
+        "instruction",
+        "create_time",
+        "status",
+        "size_bytes",
+        "duration_sec",
+        "message_count",
+        "topic_counts",
+        "errors",
+    )
+    _JSON_COLUMNS = ("topic_counts", "errors")
+
+    def __init__(self, db_path: str):
+        """Constructor.
+
+        Args:
+            db_path (str): The SQLite database file, created if missing.
+        """
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS episodes (
+                    uri TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    session TEXT NOT NULL,
+                    user_name TEXT NOT NULL,
+                    task_name TEXT NOT NULL,
+                    instruction TEXT NOT NULL,
+                    create_time REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    size_bytes INTEGER,
+                    duration_sec REAL,
+                    message_count INTEGER,
+                    topic_counts TEXT NOT NULL,
+                    errors TEXT NOT NULL,
+                    update_time REAL NOT NULL
+                )
+                """
+            )
+            for name, columns in (
+                ("by_time", "create_time, uri"),
+                ("by_user_task", "user_name, task_name, create_time, uri"),
+                ("by_status", "status, create_time, uri"),
+            ):
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS episodes_{name} "
+                    f"ON episodes ({columns})"
+                )
+            self._create_stats()
+            self._conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+    def _create_stats(self):
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS episode_stats (
+                user_name TEXT NOT NULL,
+                task_name TEXT NOT NULL,
+                status TEXT NOT NULL,
+                episodes INTEGER NOT NULL,
+                duration_sec REAL NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                PRIMARY KEY (user_name, task_name, status)
+            )
+            """
+        )
+        add = """
+            INSERT INTO episode_stats VALUES (
+                NEW.user_name, NEW.task_name, NEW.status, 1,
+                COALESCE(NEW.duration_sec, 0), COALESCE(NEW.size_bytes, 0)
+            )
+            ON CONFLICT (user_name, task_name, status) DO UPDATE SET
+                episodes = episodes + 1,
+                duration_sec = duration_sec + excluded.duration_sec,
+                size_bytes = size_bytes + excluded.size_bytes;
+        """
+        sub = """
+            UPDATE episode_stats SET
+                episodes = episodes - 1,
+                duration_sec = duration_sec - COALESCE(OLD.duration_sec, 0),
+                size_bytes = size_bytes - COALESCE(OLD.size_bytes, 0)
+            WHERE user_name = OLD.user_name
+                AND task_name = OLD.task_name
+                AND status = OLD.status;
+            DELETE FROM episode_stats WHERE episodes <= 0;
+        """
+        for event, body in (
+            ("INSERT", add),
+            ("UPDATE", sub + add),
+            ("DELETE", sub),
+        ):
+            self._conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS episode_stats_{event.lower()} "
+                f"AFTER {event} ON episodes BEGIN {body} END"
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def upsert(self, record: EpisodeRecord):
+        """Adds or replaces an episode."""
+        values = record.model_dump()
+        for key in self._JSON_COLUMNS:
+            values[key] = json.dumps(values[key])
+        values["update_time"] = time.time()
+        columns = self._COLUMNS + ("update_time",)
+        # an upsert rather than a replace, which would bypass the update
+        # trigger of the statistics
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO episodes ({}) VALUES ({}) "
+                "ON CONFLICT (uri) DO UPDATE SET {}".format(
+                    ", ".join(columns),
+                    ", ".join(f":{c}" for c in columns),
+                    ", ".join(f"{c} = excluded.{c}" for c in columns[1:]),
+                ),
+                values,
+            )
+
+    def update_from_disk(self, uri: str, **fields: Any) -> EpisodeRecord:
+        """Reads an episode from its files and upserts it.
+
+        Args:
+            uri (str): The episode directory.
+            **fields: Fields overriding the ones read from the files.
+
+        Returns:
+            EpisodeRecord: The upserted entry.
+        """
+        record = read_episode_record(uri, **fields)
+        self.upsert(record)
+        return record
+
+    def remove(self, uri: str):
+        """Removes an episode from the catalog."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM episodes WHERE uri = ?", (os.path.normpath(uri),)
+            )
+
+    def get(self, uri: str) -> Optional[EpisodeRecord]:
+        """Gets an episode by its directory."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT {} FROM episodes WHERE uri = ?".format(
+                    ", ".join(self._COLUMNS)
+                ),
+                (os.path.normpath(uri),),
+            ).fetchone()
+        return None if row is None else self._to_record(row)
+
+    def _to_record(self, row: Tuple) -> EpisodeRecord:
+        values = dict(zip(self._COLUMNS, row, strict=True))
+        for key in self._JSON_COLUMNS:
+            values[key] = json.loads(values[key])
+        return EpisodeRecord.model_validate(values)
+
+    @staticmethod
+    def _where(
+        user_name: Optional[str] = None,
+        task_name: Optional[str] = None,
+        status: Optional[str | Sequence[str]] = None,
+        search: Optional[str] = None,
+        max_duration_sec: Optional[float] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        for column, value in (
+            ("user_name", user_name),
+            ("task_name", task_name),
+        ):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if status:
+            statuses = [status] if isinstance(status, str) else list(status)
+            clauses.append(
+                "status IN ({})".format(", ".join("?" for _ in statuses))
+            )
+            params += statuses
+        if search:
+            clauses.append("name LIKE ?")
+            params.append(f"%{search}%")
+        if max_duration_sec is not None:
+            clauses.append("duration_sec < ?")
+            params.append(max_duration_sec)
+        return clauses, params
+
+    def query(
+        self,
+        user_name: Optional[str] = None,
+        task_name: Optional[str] = None,
+        status: Optional[str | Sequence[str]] = None,
+        search: Optional[str] = None,
+        max_duration_sec: Optional[float] = None,
+        after: Optional[Tuple[float, str]] = None,
+        limit: int = 20,
+    ) -> List[EpisodeRecord]:
+        """Gets a page of episodes of all sessions, the latest first.
+
+        Args:
+            user_name (Optional[str]): Filter by user. Defaults to None.
+            task_name (Optional[str]): Filter by task. Defaults to None.
+            status (Optional[str | Sequence[str]]): Filter by one or more
+                statuses. Defaults to None.
+            search (Optional[str]): Filter by a substring of the episode
+                name. Defaults to None.
+            max_duration_sec (Optional[float]): Filter the validated
+                episodes shorter than this. Defaults to None.
+            after (Optional[Tuple[float, str]]): The `(create_time, uri)`
+                of the last episode of the previous page. Defaults to
+                None, which gets the first page.
+            limit (int): The page size. Defaults to 20.
+
+        Returns:
+            List[EpisodeRecord]: The episodes of the page.
+        """
+        clauses, params = self._where(
+            user_name, task_name, status, search, max_duration_sec
+        )
+        if after is not None:
+            clauses.append("(create_time, uri) < (?, ?)")
+            params += list(after)
+        sql = "SELECT {} FROM episodes".format(", ".join(self._COLUMNS))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY create_time DESC, uri DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, params + [limit]).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def count(
+        self,
+        user_name: Optional[str] = None,
+        task_name: Optional[str] = None,
+        status: Optional[str | Sequence[str]] = None,
+        search: Optional[str] = None,
+        max_duration_sec: Optional[float] = None,
+    ) -> int:
+        """Counts the episodes matching the filters of :meth:`query`."""
+        clauses, params = self._where(
+            user_name, task_name, status, search, max_duration_sec
+        )
+        sql = "SELECT COUNT(*) FROM episodes"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def stats(
+        self,
+        group_by: Sequence[StatsGroup] = ("task_name",),
+        user_name: Optional[str] = None,
+        task_name: Optional[str] = None,
+        status: Optional[str | Sequence[str]] = None,
+    ) -> List[EpisodeStats]:
+        """Gets the statistics of the episodes of all sessions.
+
+        For example, `stats(["task_name"])` gets the hours per task and
+        `stats(["user_name"])` the episodes per collector.
+
+        Args:
+            group_by (Sequence[StatsGroup]): The columns to group the
+                episodes by. Defaults to `("task_name",)`. An empty
+                sequence gets the totals.
+            user_name (Optional[str]): Filter by user. Defaults to None.
+            task_name (Optional[str]): Filter by task. Defaults to None.
+            status (Optional[str | Sequence[str]]): Filter by one or more
+                statuses. Defaults to None.
+
+        Returns:
+            List[EpisodeStats]: The statistics of each group, ordered by
+                the group columns. Without groups, a single item with the
+                totals.
+        """
+        group_by = list(group_by)
+        for column in group_by:
+            if column not in ("user_name", "task_name", "status"):
+                raise ValueError(f"Unsupported column: {column}")
+        clauses, params = self._where(user_name, task_name, status)
+        sql = "SELECT {} FROM episode_stats".format(
+            ", ".join(
+                group_by
+                + [
+                    "TOTAL(episodes)",
+                    "TOTAL(duration_sec)",
+                    "TOTAL(size_bytes)",
+                ]
+            )
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if group_by:
+            sql += " GROUP BY {0} ORDER BY {0}".format(", ".join(group_by))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            EpisodeStats.model_validate(
+                dict(
+                    zip(
+                        group_by + ["episodes", "duration_sec", "size_bytes"],
+                        row,
+                        strict=True,
+                    )
+                )
+            )
+            for row in rows
+        ]
+
+    def distinct(self, column: Literal["user_name", "task_name"]) -> List[str]:
+        """Gets the distinct users or tasks, for the filter options."""
+        if column not in ("user_name", "task_name"):
+            raise ValueError(f"Unsupported column: {column}")
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT {column} FROM episodes ORDER BY {column}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def sync(self, workspace: str) -> Tuple[int, int, int]:
+        """Reconciles the catalog with the episodes on disk.
+
+        Episodes recorded by other app instances are added, and the
+        episodes removed from disk are dropped. Known episodes are read
+        again if they were left recording or finalizing, e.g. by a
+        restart of the app, or if they changed on disk since their last
+        update.
+
+        Args:
+            workspace (str): The workspace of the app, laid out as
+                `<workspace>/<session>/data/<user>/<task>/<episode>`.
+
+        Returns:
+            Tuple[int, int, int]: The number of added, updated and removed
+            episodes.
+        """
+        on_disk = {
+            os.path.normpath(uri)
+            for uri in glob.glob(
+                os.path.join(workspace, "*", "data", "*", "*", "*")
+            )
+            if os.path.isdir(uri)
+        }
+        root = os.path.normpath(workspace) + os.sep
+        with self._lock:
+            known = {
+                uri: (status, update_time)
+                for uri, status, update_time in self._conn.execute(
+                    "SELECT uri, status, update_time FROM episodes"
+                )
+                if uri.startswith(root)
+            }
+        added = on_disk - set(known)
+        removed = set(known) - on_disk
+        updated = {
+            uri
+            for uri in on_disk & set(known)
+            if known[uri][0] in ("recording", "finalizing")
+            or _get_mtime(uri) > known[uri][1]
+        }
+        for uri in sorted(added | updated):
+            self.update_from_disk(uri)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM episodes WHERE uri = ?",
+                [(uri,) for uri in removed],
+            )
+        return len(added), len(updated), len(removed)
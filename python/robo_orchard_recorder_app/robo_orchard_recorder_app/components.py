@@ -19,20 +19,31 @@ import json
 import os
 import subprocess
 from abc import ABCMeta, abstractmethod
-from typing import Literal
+from typing import List, Literal
 
 import polling2
 import pydantic
 import streamlit as st
 from streamlit.components.v1 import iframe
 
+from robo_orchard_recorder_app.catalog import (
+    EpisodeCatalog,
+    EpisodeRecord,
+    EpisodeStats,
+)
 from robo_orchard_recorder_app.config import FoxgloveCfg, LaunchCfg, TaskCfg
+from robo_orchard_recorder_app.finalizer import EpisodeFinalizer, FinalizeJob
+from robo_orchard_recorder_app.recorder_client import RecorderClient
+from robo_orchard_recorder_app.trash import EpisodeTrash, TrashEntry
 from robo_orchard_recorder_app.utils import (
+    check_episode,
     check_process,
-    remove_path,
+    find_mcap_files,
+    index_episode,
     start_process,
     stop_process,
     time_str_now,
+    validate_episode,
 )
 
 
@@ -225,6 +236,8 @@ class ControlComponent(ComponentBase):
         launch_cfg_key: str = "launch_cfg",
         task_cfg_key: str = "task_cfg",
         collecting_state_key: str = "collecting_state",
+        catalog: EpisodeCatalog | None = None,
+        trash: EpisodeTrash | None = None,
     ):
         """Constuctor.
 
@@ -233,12 +246,23 @@ class ControlComponent(ComponentBase):
             app_cache_directory (str): Directory for application cache
             task_cfg_key (str): Session state key for task config
             collecting_state_key (str): Session state key for collecting state
+            catalog (EpisodeCatalog | None): Catalog updated with the
+                recorded episodes
+            trash (EpisodeTrash | None): Trash checking the disk space
+                before recording
         """
         self.data_record_config_file = data_record_config_file
+        # the finalizer waits for the sidecar index built by the recorder
+        self.sidecar_index = True
+        if data_record_config_file:
+            with open(data_record_config_file, "r") as fr:
+                self.sidecar_index = json.load(fr).get("sidecar_index", True)
         self.app_cache_directory = app_cache_directory
         self._launch_cfg_key = launch_cfg_key
         self._task_cfg_key = task_cfg_key
         self._collecting_state_key = collecting_state_key
+        self.catalog = catalog
+        self.trash = trash
         self._temp_cfg = {
             "user_name": "",
             "task_name": "",
@@ -250,6 +274,11 @@ class ControlComponent(ComponentBase):
             "instruction": "",
         }
         self._recorder_process: subprocess.Popen | None = None
+        # daemon mode only
+        self._recorder_client: RecorderClient | None = None
+        self._episode_open: bool = False
+        self._daemon_close_job: FinalizeJob | None = None
+        self._finalizer = EpisodeFinalizer()
 
     @property
     def launch_cfg(self) -> LaunchCfg:
@@ -409,13 +438,128 @@ class ControlComponent(ComponentBase):
 
             st.rerun()
 
+    @property
+    def is_daemon(self) -> bool:
+        return self.launch_cfg.recorder_mode == "daemon"
+
+    def _is_recording(self) -> bool:
+        if self.is_daemon:
+            return self._episode_open
+        return self._recorder_process is not None
+
+    def _get_recorder_command(self, *params: str) -> str:
+        if self.data_record_config_file:
+            params = (
+                f'config_file:="{self.data_record_config_file}"',
+                *params,
+            )
+        return """
+        set -ex
+        ros2 run robo_orchard_data_ros2 mcap_recorder \\
+            --ros-args {}
+        """.format(" ".join(f"-p {param}" for param in params))
+
+    def _launch_daemon(self) -> RecorderClient:
+        """Launches the recorder daemon, unless it is running already.
+
+        The output of the daemon is written into a log file in the app
+        cache directory, because a pipe would fill up and block the
+        long-lived recorder.
+
+        Returns:
+            RecorderClient: The client of the running daemon.
+
+        Raises:
+            TimeoutError: If the daemon does not serve its services in
+                time.
+        """
+        if (
+            self._recorder_process is not None
+            and self._recorder_process.poll() is None
+            and self._recorder_client is not None
+        ):
+            return self._recorder_client
+        if self._recorder_process is not None:
+            stop_process(self._recorder_process)
+        if self._recorder_client is None:
+            self._recorder_client = RecorderClient(
+                recorder_node_name=self.launch_cfg.recorder_node_name,
+                timeout=self.launch_cfg.recorder_service_timeout,
+            )
+        log_directory = os.path.join(self.app_cache_directory, "recorder")
+        os.makedirs(log_directory, exist_ok=True)
+        with open(
+            os.path.join(log_directory, f"mcap_recorder_{time_str_now()}.log"),
+            "w",
+        ) as fw:
+            self._recorder_process = start_process(
+                self._get_recorder_command("daemon:=true"),
+                shell=True,
+                executable="/bin/bash",
+                min_live_time=0,
+                redirect=False,
+                stdout=fw,
+                stderr=subprocess.STDOUT,
+            )
+        if not self._recorder_client.wait_for_service(
+            timeout=self.launch_cfg.recorder_service_timeout
+        ):
+            raise TimeoutError(
+                "Recorder daemon {} is not available. Please check its log "
+                "in {}".format(
+                    self.launch_cfg.recorder_node_name, log_directory
+                )
+            )
+        return self._recorder_client
+
+    def _stop_daemon_episode(self):
+        """Closes the episode of the daemon.
+
+        If the call fails, the daemon may still be recording, so the
+        episode state is read back from it, which lets the user stop the
+        episode again.
+        """
+        try:
+            self._recorder_client.stop_episode()  # type: ignore
+        except Exception:
+            try:
+                status = self._recorder_client.status()  # type: ignore
+                self._episode_open = bool(status.get("episode_open", True))
+            except Exception:
+                self._episode_open = True
+            raise
+
+    def _on_finalized(self, job: FinalizeJob):
+        if self.catalog is None:
+            return
+        fields = {}
+        # an invalid episode gets its status from the validation report
+        if job.failed and job.status.get("validate") != "failed":
+            fields = {"status": "failed", "errors": [job.error]}
+        self.catalog.update_from_disk(job.uri, **fields)
+
+    @staticmethod
+    def _write_episode_meta(uri: str, meta: dict):
+        if os.path.exists(uri):
+            with open(os.path.join(uri, "episode_meta.json"), "w") as fw:
+                json.dump(meta, fw, indent=4)
+
     def _record_panel(self):
         def _start_impl(log_msg_place_holder):
-            if self._recorder_process is not None:
+            if self._is_recording():
                 log_msg_place_holder.markdown(
                     ":red[An episode is recorded, please decide to save or not first!]"  # noqa: E501
                 )
 
+            if self.trash is not None:
+                try:
+                    self.trash.check_space()
+                except RuntimeError as e:
+                    log_msg_place_holder.error(
+                        f"Failed to start recording! {e}"
+                    )
+                    return
+
             time_str = time_str_now()
             data_uri = os.path.join(
                 self.collecting_state.data_root,
@@ -429,26 +573,39 @@ class ControlComponent(ComponentBase):
                 f"Start recording data to: :green[{data_uri}] and logs to: :green[{log_uri}]"  # noqa: E501
             )
 
-            if self.data_record_config_file:
-                command = f"""
-                set -ex
-                ros2 run robo_orchard_data_ros2 mcap_recorder \
-                    --ros-args \
-                    -p config_file:="{self.data_record_config_file}" \
-                    -p uri:="{data_uri}"
-                """
+            if self.is_daemon:
+                # the daemon accepts the next episode once the previous
+                # one is closed
+                if self._daemon_close_job is not None:
+                    self._daemon_close_job.wait_for_step(
+                        "close",
+                        timeout=self.launch_cfg.recorder_service_timeout,
+                    )
+                    if self._is_recording():
+                        log_msg_place_holder.error(
+                            "Failed to close the previous episode! Please "
+                            "stop it again."
+                        )
+                        return
+                try:
+                    self._launch_daemon().start_episode(data_uri)
+                except Exception as e:
+                    log_msg_place_holder.error(
+                        f"Failed to start recording! Error msgs:\n{e}\n"
+                    )
+                    return
+                self._episode_open = True
             else:
-                command = f"""
-                set -ex
-                ros2 run robo_orchard_data_ros2 mcap_recorder \
-                    --ros-args \
-                    -p uri:="{data_uri}"
-                """
-            self._recorder_process = start_process(
-                command, shell=True, executable="/bin/bash", min_live_time=0
-            )
+                self._recorder_process = start_process(
+                    self._get_recorder_command(f'uri:="{data_uri}"'),
+                    shell=True,
+                    executable="/bin/bash",
+                    min_live_time=0,
+                )
             self.collecting_state.current_data_uri = data_uri
             self.collecting_state.current_log_uri = log_uri
+            if self.catalog is not None:
+                self.catalog.update_from_disk(data_uri, status="recording")
 
         def _check_is_recording():
             recording_flag = os.path.join(
@@ -457,32 +614,66 @@ class ControlComponent(ComponentBase):
             return os.path.exists(recording_flag)
 
         def _stop_impl(log_msg_place_holder):
-            if self._recorder_process is None:
+            if not self._is_recording():
                 log_msg_place_holder.markdown(
                     ":red[Please start recording first]"
                 )
                 return
 
-            stop_process(self._recorder_process)
+            data_uri = self.collecting_state.current_data_uri
+            if self.is_daemon:
+                close = self._stop_daemon_episode
+                self._episode_open = False
+            else:
+                close = functools.partial(stop_process, self._recorder_process)
+                self._recorder_process = None
+            steps = [
+                ("close", close),
+                (
+                    "meta",
+                    functools.partial(
+                        self._write_episode_meta, data_uri, dict(self.cfg)
+                    ),
+                ),
+                ("check", functools.partial(check_episode, data_uri)),
+            ]
+            if self.sidecar_index:
+                steps.append(
+                    (
+                        "index",
+                        functools.partial(
+                            index_episode,
+                            data_uri,
+                            self.launch_cfg.index_timeout_sec,
+                        ),
+                    )
+                )
+            if self.launch_cfg.validate_episodes:
+                steps.append(
+                    (
+                        "validate",
+                        functools.partial(
+                            validate_episode,
+                            data_uri,
+                            self.data_record_config_file,
+                            self.launch_cfg.validation_workers,
+                        ),
+                    )
+                )
+            if self.catalog is not None:
+                self.catalog.update_from_disk(data_uri, status="finalizing")
+            job = self._finalizer.submit(
+                data_uri, steps, on_done=self._on_finalized
+            )
+            if self.is_daemon:
+                self._daemon_close_job = job
             self.collecting_state.episode_counter.add()
             log_msg_place_holder.markdown(
-                "Save {}-th episode to :green[{}]".format(
+                "Finalizing {}-th episode :green[{}] in background".format(
                     self.collecting_state.episode_counter.current(),
-                    self.collecting_state.current_data_uri,
+                    data_uri,
                 )
             )
-            # write data meta
-            if os.path.exists(self.collecting_state.current_data_uri):
-                with open(
-                    os.path.join(
-                        self.collecting_state.current_data_uri,
-                        "episode_meta.json",
-                    ),
-                    "w",
-                ) as fw:
-                    json.dump(self.cfg, fw, indent=4)
-            self._recorder_process = None
-            log_msg_place_holder.markdown(":green[Recorder stopped]")
 
         if self.collecting_state.is_configured:
             log_msg_place_holder = st.empty()
@@ -494,9 +685,13 @@ class ControlComponent(ComponentBase):
                     "Start",
                     on_click=_start_impl,
                     args=(log_msg_place_holder,),
-                    disabled=self._recorder_process is not None,
+                    disabled=self._is_recording(),
                 ):
-                    if self._recorder_process is not None:
+                    # the daemon has started recording in the callback
+                    if (
+                        not self.is_daemon
+                        and self._recorder_process is not None
+                    ):
                         with st.spinner(
                             "Starting, please wait...", show_time=True
                         ):
@@ -525,9 +720,57 @@ class ControlComponent(ComponentBase):
                     "Stop",
                     on_click=_stop_impl,
                     args=(log_msg_place_holder,),
-                    disabled=self._recorder_process is None,
+                    disabled=not self._is_recording(),
                 )
 
+    @st.fragment(run_every=1.0)
+    def _finalize_panel(self):
+        jobs = self._finalizer.get_jobs()
+        if not jobs:
+            return
+        with st.expander(
+            ":hourglass: Finalizing {} episodes".format(
+                self._finalizer.num_pending
+            ),
+            expanded=True,
+        ):
+            for job in reversed(jobs):
+                name = os.path.basename(job.uri)
+                if job.failed:
+                    st.error(f"{name}: {job.error}")
+                elif job.done:
+                    st.progress(1.0, text=f"{name}: :green[finalized]")
+                else:
+                    st.progress(
+                        job.progress,
+                        text="{}: {}".format(
+                            name, job.current_step or "pending"
+                        ),
+                    )
+            st.button(
+                "Clear finished",
+                on_click=self._finalizer.clear_finished,
+                disabled=self._finalizer.num_pending == len(jobs),
+            )
+
+    @st.fragment(run_every=5.0)
+    def _disk_panel(self):
+        free_bytes = self.trash.free_bytes()  # type: ignore
+        used_bytes = self.trash.used_bytes()  # type: ignore
+        text = f"Disk: {free_bytes / 1e9:.1f} GB free"
+        if used_bytes is not None:
+            text += f", episodes and trash use {used_bytes / 1e9:.1f} GB"
+        st.caption(text)
+        if free_bytes < self.trash.low_watermark_bytes:  # type: ignore
+            st.warning(
+                "The workspace disk is almost full, please free some space!"
+            )
+        elif (
+            self.trash.quota_bytes is not None  # type: ignore
+            and used_bytes >= self.trash.quota_bytes  # type: ignore
+        ):
+            st.warning("The disk quota is exceeded, please delete episodes!")
+
     def __call__(self):
         """Renders the control panel UI."""
         self._show_panel()
@@ -536,15 +779,31 @@ class ControlComponent(ComponentBase):
         self._input_panel("instruction")
         self._confirm_panel()
         self._record_panel()
+        self._finalize_panel()
+        if self.trash is not None:
+            self._disk_panel()
 
 
 class SideBarComponent(ComponentBase):
     """Sidebar component for managing recorded files."""
 
+    PAGE_SIZE = 20
+    STATUS_ICONS = {
+        "recording": "🔴",
+        "finalizing": "⏳",
+        "failed": "❌",
+        "unvalidated": "⚪",
+        "valid": "✅",
+        "invalid": "⚠️",
+    }
+
     def __init__(
         self,
         foxglove_cfg: FoxgloveCfg,
         file_server_host: str,
+        catalog: EpisodeCatalog,
+        trash: EpisodeTrash,
+        workspace: str,
         collecting_state_key: str = "collecting_state",
     ):
         """Constructor.
@@ -552,67 +811,215 @@ class SideBarComponent(ComponentBase):
         Args:
             foxglove_cfg (FoxgloveCfg): Foxglove configuration
             file_server_host (str): File server host address
+            catalog (EpisodeCatalog): Catalog of the recorded episodes
+            trash (EpisodeTrash): Trash of the deleted episodes
+            workspace (str): Working directory, synced into the catalog
             collecting_state_key (str): Session state key for collecting state
         """
         self.foxglove_cfg: FoxgloveCfg = foxglove_cfg
         self.file_server_host: str = file_server_host
+        self.catalog = catalog
+        self.trash = trash
+        self.workspace = workspace
         self._collecting_state_key = collecting_state_key
         self._selected_uri: str | None = None
         self._delete_flags = dict()
+        # the keyset of the last episode of each previous page
+        self._page_cursors: list[tuple[float, str] | None] = [None]
+        self._filters: dict | None = None
 
     @property
     def collecting_state(self) -> CollectingState:
         return st.session_state[self._collecting_state_key]
 
-    def _delete_callback(self, uri: str):
+    def _is_current(self, record: EpisodeRecord) -> bool:
+        return (
+            record.session == self.collecting_state.session_time_str
+            and record.user_name == self.collecting_state.user_name
+            and record.task_name == self.collecting_state.task_name
+        )
+
+    def _delete_callback(self, record: EpisodeRecord):
+        uri = record.uri
         if self._delete_flags.get(uri, False):
             st.markdown(f":red[Already tried deleting {uri}]")
         try:
-            with st.spinner("Deleting"):
-                remove_path(uri)
+            self.trash.move(uri)
+            self.catalog.remove(uri)
             self._delete_flags[uri] = True
-            self.collecting_state.episode_counter.sub()
+            if self._is_current(record):
+                self.collecting_state.episode_counter.sub()
             self._selected_uri = None  # reset selected state
+            st.toast(f"Moved {record.name} to trash.")
         except FileNotFoundError:
             st.error(f"Cannot found recording uri: {uri}")
+        except OSError as e:
+            st.error(f"Failed to move {uri} to trash: {e}")
+
+    def _restore_callback(self, entry: TrashEntry):
+        try:
+            uri = self.trash.restore(entry.name)
+        except KeyError:
+            st.error(f"{entry.name} has been purged")
+            return
+        except FileExistsError as e:
+            st.error(str(e))
+            return
+        record = self.catalog.update_from_disk(uri)
+        self._delete_flags.pop(uri, None)
+        if self._is_current(record):
+            self.collecting_state.episode_counter.add()
+        st.toast(f"Restored {record.name}.")
+
+    def _sync_callback(self):
+        added, updated, removed = self.catalog.sync(self.workspace)
+        st.toast(
+            f"Catalog synced: {added} added, {updated} updated, "
+            f"{removed} removed."
+        )
+        self._page_cursors = [None]
+
+    def _filter_panel(self) -> dict:
+        only_current = st.checkbox(
+            "Current user and task",
+            value=self.collecting_state.is_configured,
+            key="sidebar_only_current",
+        )
+        status = st.selectbox(
+            "Status",
+            options=["all", *self.STATUS_ICONS],
+            key="sidebar_status",
+        )
+        search = st.text_input("Search", key="sidebar_search")
+        filters = {
+            "user_name": (
+                self.collecting_state.user_name if only_current else None
+            ),
+            "task_name": (
+                self.collecting_state.task_name if only_current else None
+            ),
+            "status": None if status == "all" else status,
+            "search": search or None,
+        }
+        if filters != self._filters:
+            self._filters = filters
+            self._page_cursors = [None]
+        return filters
+
+    def _episode_panel(self, record: EpisodeRecord):
+        label = "{} {}".format(
+            self.STATUS_ICONS.get(record.status, ""), record.name
+        )
+        if st.button(label, key=f"episode_{record.uri}"):
+            if self._selected_uri == record.uri:
+                self._selected_uri = None
+            else:
+                self._selected_uri = record.uri
+
+        if self._selected_uri != record.uri:
+            return
+        details = [f"{record.user_name}/{record.task_name}"]
+        if record.size_bytes is not None:
+            details.append(f"{record.size_bytes / 1e6:.1f} MB")
+        if record.duration_sec is not None:
+            details.append(f"{record.duration_sec:.1f} s")
+        if record.topic_counts:
+            details.append(f"{len(record.topic_counts)} topics")
+        st.caption(" | ".join(details))
+        for error in record.errors:
+            st.caption(f":red[{error}]")
+
+        mcap_files = find_mcap_files(record.uri)
+        mcap_file = (
+            mcap_files[0]
+            if mcap_files
+            else os.path.join(record.uri, f"{record.name}_0.mcap")
+        )
+
+        left_col, right_col = st.columns(2)
+        with left_col:
+            st.link_button(
+                "Visualize",
+                url=self.foxglove_cfg.get_remote_file_url(
+                    remote_file="{}/{}".format(
+                        self.file_server_host,
+                        os.path.abspath(mcap_file),
+                    )
+                ),
+            )
+        with right_col:
+            st.button(
+                "Delete",
+                key=f"delete_{record.uri}",
+                on_click=self._delete_callback,
+                args=(record,),
+            )
 
     @st.fragment
     def _sidebar_panel(self):
-        for idx, uri in enumerate(
-            sorted(os.listdir(self.collecting_state.data_root))
-        ):
+        filters = self._filter_panel()
+        # one more episode tells whether there is a next page
+        records = self.catalog.query(
+            **filters, after=self._page_cursors[-1], limit=self.PAGE_SIZE + 1
+        )
+        has_next = len(records) > self.PAGE_SIZE
+        records = records[: self.PAGE_SIZE]
+
+        for record in records:
             with st.container():
-                if st.button(uri):
-                    if self._selected_uri == uri:
-                        self._selected_uri = None
-                    else:
-                        self._selected_uri = uri
-
-                if self._selected_uri == uri:
-                    data_uri = os.path.join(
-                        self.collecting_state.data_root, uri
+                self._episode_panel(record)
+
+        prev_col, page_col, next_col = st.columns(3)
+        with prev_col:
+            st.button(
+                "Prev",
+                key="sidebar_prev",
+                disabled=len(self._page_cursors) == 1,
+                on_click=self._page_cursors.pop,
+            )
+        with page_col:
+            st.markdown(f"Page {len(self._page_cursors)}")
+        with next_col:
+            st.button(
+                "Next",
+                key="sidebar_next",
+                disabled=not has_next,
+                on_click=self._page_cursors.append,
+                args=(
+                    (records[-1].create_time, records[-1].uri)
+                    if records
+                    else None,
+                ),
+            )
+        st.button("Sync with disk", on_click=self._sync_callback)
+        # in the same fragment, which deletes and restores episodes
+        self._trash_panel()
+
+    def _trash_panel(self):
+        entries = self.trash.entries()
+        with st.expander(
+            "🗑️ Trash: {} episodes, {:.1f} GB".format(
+                len(entries), self.trash.size_bytes / 1e9
+            )
+        ):
+            for entry in entries[: self.PAGE_SIZE]:
+                left_col, right_col = st.columns([0.7, 0.3])
+                with left_col:
+                    st.markdown(os.path.basename(entry.uri))
+                with right_col:
+                    st.button(
+                        "Restore",
+                        key=f"restore_{entry.name}",
+                        on_click=self._restore_callback,
+                        args=(entry,),
                     )
-
-                    left_col, right_col = st.columns(2)
-                    with left_col:
-                        st.link_button(
-                            "Visualize",
-                            url=self.foxglove_cfg.get_remote_file_url(
-                                remote_file="{}/{}".format(
-                                    self.file_server_host,
-                                    os.path.abspath(
-                                        os.path.join(data_uri, f"{uri}_0.mcap")
-                                    ),
-                                )
-                            ),
-                        )
-                    with right_col:
-                        st.button(
-                            "Delete",
-                            key=f"delete_{idx}",
-                            on_click=self._delete_callback,
-                            args=(data_uri,),
-                        )
+            st.button(
+                "Empty trash",
+                key="trash_empty",
+                on_click=self.trash.request_purge,
+                kwargs={"purge_all": True},
+                disabled=not entries,
+            )
 
     def __call__(self):
         """Renders the sidebar UI."""
@@ -621,15 +1028,119 @@ class SideBarComponent(ComponentBase):
         st.sidebar.markdown(f"User: {self.collecting_state.user_name}")
         st.sidebar.markdown(f"Task: {self.collecting_state.task_name}")
 
-        if not self.collecting_state.is_configured or not os.path.exists(
-            self.collecting_state.data_root
-        ):
-            return
-
         with st.sidebar:
             self._sidebar_panel()
 
 
+class StatisticsComponent(ComponentBase):
+    """Statistics of the episodes of all sessions."""
+
+    FAILED_STATUSES = ("failed", "invalid")
+
+    def __init__(
+        self,
+        catalog: EpisodeCatalog,
+        short_episode_sec: float = 5.0,
+        max_listed_episodes: int = 50,
+    ):
+        """Constructor.
+
+        Args:
+            catalog (EpisodeCatalog): Catalog of the recorded episodes
+            short_episode_sec (float): Validated episodes shorter than
+                this are listed as short
+            max_listed_episodes (int): Maximum number of failed or short
+                episodes listed
+        """
+        self.catalog = catalog
+        self.short_episode_sec = short_episode_sec
+        self.max_listed_episodes = max_listed_episodes
+
+    @staticmethod
+    def _stats_table(stats: List[EpisodeStats], column: str) -> List[dict]:
+        return [
+            {
+                column: getattr(item, column),
+                "episodes": item.episodes,
+                "hours": round(item.hours, 2),
+                "size (GB)": round(item.size_bytes / 1e9, 2),
+            }
+            for item in stats
+        ]
+
+    @staticmethod
+    def _episode_table(records: List[EpisodeRecord]) -> List[dict]:
+        return [
+            {
+                "episode": record.name,
+                "session": record.session,
+                "user": record.user_name,
+                "task": record.task_name,
+                "status": record.status,
+                "duration (s)": record.duration_sec,
+                "errors": "; ".join(record.errors),
+            }
+            for record in records
+        ]
+
+    @st.fragment
+    def _statistics_panel(self):
+        (total,) = self.catalog.stats(group_by=[])
+        (failed,) = self.catalog.stats(
+            group_by=[], status=self.FAILED_STATUSES
+        )
+        cols = st.columns(4)
+        cols[0].metric("Episodes", total.episodes)
+        cols[1].metric("Hours", f"{total.hours:.2f}")
+        cols[2].metric("Size (GB)", f"{total.size_bytes / 1e9:.2f}")
+        cols[3].metric("Failed", failed.episodes)
+
+        left_col, right_col = st.columns(2)
+        with left_col:
+            st.markdown("**Hours per task**")
+            st.dataframe(
+                self._stats_table(
+                    self.catalog.stats(group_by=["task_name"]), "task_name"
+                ),
+                hide_index=True,
+            )
+        with right_col:
+            st.markdown("**Episodes per collector**")
+            st.dataframe(
+                self._stats_table(
+                    self.catalog.stats(group_by=["user_name"]), "user_name"
+                ),
+                hide_index=True,
+            )
+
+        st.markdown("**Failed episodes**")
+        st.dataframe(
+            self._episode_table(
+                self.catalog.query(
+                    status=self.FAILED_STATUSES,
+                    limit=self.max_listed_episodes,
+                )
+            ),
+            hide_index=True,
+        )
+        st.markdown(f"**Episodes shorter than {self.short_episode_sec} s**")
+        st.dataframe(
+            self._episode_table(
+                self.catalog.query(
+                    max_duration_sec=self.short_episode_sec,
+                    limit=self.max_listed_episodes,
+                )
+            ),
+            hide_index=True,
+        )
+        st.button("Refresh", key="statistics_refresh")
+
+    def __call__(self):
+        """Renders the statistics panel."""
+        with st.expander("📊 Statistics"):
+            self._statistics_panel()
+
+
 class FoxgloveIFrameComponent(ComponentBase):
     """Component for displaying Foxglove."""
 
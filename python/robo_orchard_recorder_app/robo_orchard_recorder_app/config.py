@@ -110,6 +110,48 @@ class LaunchCfg(pydantic.BaseModel):
     data_record_config_file: str = ""
     """Path to data recording configuration file."""
 
+    recorder_mode: Literal["process", "daemon"] = "process"
+    """How the recorder is run. `process` launches a recorder for each
+    episode. `daemon` launches a single recorder which keeps its
+    subscriptions across episodes, and opens and closes the episodes
+    through its services."""
+
+    recorder_node_name: str = "/mcap_recorder"
+    """Fully qualified name of the recorder node in `daemon` mode."""
+
+    recorder_service_timeout: float = 60.0
+    """Timeout in seconds of the recorder services in `daemon` mode."""
+
+    validate_episodes: bool = True
+    """Whether to validate the recorded episodes with `mcap_validate` in
+    the background, checking the frame rate monitors of the recorder
+    config. The report is written into `episode_meta.json`."""
+
+    validation_workers: int = pydantic.Field(default=2, ge=1)
+    """Number of worker processes validating the files of an episode."""
+
+    index_timeout_sec: float = pydantic.Field(default=60.0, ge=0)
+    """Seconds to wait for the recorder to build the sidecar time index of
+    an episode, before building it with `mcap_index`. No index is waited
+    for if `sidecar_index` is disabled in the recorder config."""
+
+    short_episode_sec: float = pydantic.Field(default=5.0, ge=0)
+    """Validated episodes shorter than this are listed as short in the
+    statistics panel."""
+
+    trash_retention_sec: float = pydantic.Field(default=86400.0, ge=0)
+    """Deleted episodes are moved into `<workspace>/.trash`, where they can
+    be restored until they are purged after this many seconds."""
+
+    disk_quota_gb: float | None = pydantic.Field(default=None, gt=0)
+    """Maximum size of the episodes and the trash in the workspace. The
+    trash is purged early to stay under it, and recording is refused
+    when it is exceeded. None for no quota."""
+
+    disk_low_watermark_gb: float = pydantic.Field(default=10.0, ge=0)
+    """Minimum free space of the workspace disk. The trash is purged early
+    to keep it, and recording is refused below it."""
+
 
 class TaskCfg(pydantic.BaseModel):
     """Configuration for task settings."""
@@ -0,0 +1,192 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Literal, Optional, Tuple
+
+__all__ = ["FinalizeJob", "EpisodeFinalizer"]
+
+StepStatus = Literal["pending", "running", "done", "failed", "skipped"]
+
+
+class FinalizeJob:
+    """The finalization of a recorded episode.
+
+    The steps of a job run in order. If a step fails, the remaining
+    steps are skipped.
+
+    Attributes:
+        uri (str): The episode directory.
+        steps (List[str]): The names of the steps.
+        status (Dict[str, StepStatus]): The status of each step.
+        error (str | None): The error of the failed step.
+        submit_time (float): The time when the job was submitted.
+        finish_time (float | None): The time when the job finished.
+    """
+
+    def __init__(self, uri: str, steps: List[str]):
+        self.uri = uri
+        self.steps = steps
+        self.status: Dict[str, StepStatus] = {
+            step: "pending" for step in steps
+        }
+        self.error: str | None = None
+        self.submit_time = time.time()
+        self.finish_time: float | None = None
+        self._step_events = {step: threading.Event() for step in steps}
+
+    @property
+    def done(self) -> bool:
+        return self.finish_time is not None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    @property
+    def current_step(self) -> str | None:
+        """Gets the running step, or None if no step is running."""
+        for step in self.steps:
+            if self.status[step] == "running":
+                return step
+        return None
+
+    @property
+    def progress(self) -> float:
+        """Gets the fraction of the finished steps, in [0, 1]."""
+        if not self.steps:
+            return 1.0
+        return sum(
+            self._step_events[step].is_set() for step in self.steps
+        ) / len(self.steps)
+
+    def wait_for_step(self, step: str, timeout: float | None = None) -> bool:
+        """Waits until a step has finished, failed or been skipped.
+
+        Args:
+            step (str): The name of the step.
+            timeout (float | None): Timeout in seconds. Defaults to None,
+                which waits forever.
+
+        Returns:
+            bool: True if the step has finished successfully.
+        """
+        self._step_events[step].wait(timeout)
+        return self.status[step] == "done"
+
+    def _set_status(self, step: str, status: StepStatus):
+        self.status[step] = status
+        if status not in ("pending", "running"):
+            self._step_events[step].set()
+
+
+class EpisodeFinalizer:
+    """Finalizes recorded episodes in background threads.
+
+    The episodes are finalized in parallel by a thread pool, so that the
+    next episode can be recorded while the previous ones are being
+    closed. This class is thread-safe.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        """Constructor.
+
+        Args:
+            max_workers (int): The number of episodes finalized in
+                parallel. Defaults to 2.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="episode_finalizer"
+        )
+        self._lock = threading.Lock()
+        self._jobs: List[FinalizeJob] = []
+
+    def submit(
+        self,
+        uri: str,
+        steps: List[Tuple[str, Callable[[], None]]],
+        on_done: Optional[Callable[[FinalizeJob], None]] = None,
+    ) -> FinalizeJob:
+        """Hands an episode over to the finalizer.
+
+        Args:
+            uri (str): The episode directory.
+            steps (List[Tuple[str, Callable[[], None]]]): The named steps
+                to run in order.
+            on_done (Optional[Callable[[FinalizeJob], None]]): Called in
+                the worker thread once the job has finished, even if a
+                step failed. Defaults to None.
+
+        Returns:
+            FinalizeJob: The job tracking the progress of the steps.
+        """
+        job = FinalizeJob(uri, [name for name, _ in steps])
+        with self._lock:
+            self._jobs.append(job)
+        self._executor.submit(self._run, job, steps, on_done)
+        return job
+
+    def _run(
+        self,
+        job: FinalizeJob,
+        steps: List[Tuple[str, Callable[[], None]]],
+        on_done: Optional[Callable[[FinalizeJob], None]],
+    ):
+        for name, fn in steps:
+            if job.failed:
+                job._set_status(name, "skipped")
+                continue
+            job._set_status(name, "running")
+            try:
+                fn()
+            except Exception as e:
+                job.error = f"{name}: {e}"
+                job._set_status(name, "failed")
+            else:
+                job._set_status(name, "done")
+        if on_done is not None:
+            try:
+                on_done(job)
+            except Exception as e:
+                job.error = job.error or f"on_done: {e}"
+        job.finish_time = time.time()
+
+    def get_jobs(self) -> List[FinalizeJob]:
+        """Gets the jobs in submission order."""
+        with self._lock:
+            return list(self._jobs)
+
+    @property
+    def num_pending(self) -> int:
+        """Gets the number of unfinished jobs."""
+        with self._lock:
+            return sum(not job.done for job in self._jobs)
+
+    def clear_finished(self):
+        """Forgets the finished jobs."""
+        with self._lock:
+            self._jobs = [job for job in self._jobs if not job.done]
+
+    def shutdown(self, wait: bool = True):
+        """Stops accepting jobs.
+
+        Args:
+            wait (bool): Whether to wait for the pending jobs. Defaults
+                to True.
+        """
+        self._executor.shutdown(wait=wait)
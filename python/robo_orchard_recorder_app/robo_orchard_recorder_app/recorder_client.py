@@ -0,0 +1,188 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import json
+import threading
+import time
+
+__all__ = ["RecorderClient"]
+
+
+class RecorderClient:
+    """Client of the services of a recorder running as a daemon.
+
+    The client owns a private ROS context, so that it does not interfere
+    with other ROS users of the app process. ROS is imported lazily,
+    because it is only available in a sourced ROS environment.
+
+    Calls are serialized, because Streamlit runs the script of each
+    session in its own thread.
+    """
+
+    TRIGGER_SERVICES = (
+        "start_episode",
+        "stop_episode",
+        "pause",
+        "resume",
+        "status",
+    )
+
+    def __init__(
+        self,
+        recorder_node_name: str = "/mcap_recorder",
+        timeout: float = 60.0,
+    ):
+        """Constructor.
+
+        Args:
+            recorder_node_name (str): Fully qualified name of the
+                recorder node. Defaults to "/mcap_recorder".
+            timeout (float): Timeout in seconds of a service call.
+                Defaults to 60.
+        """
+        import rclpy
+        from rcl_interfaces.srv import SetParameters
+        from rclpy.executors import SingleThreadedExecutor
+        from std_srvs.srv import Trigger
+
+        self.recorder_node_name = recorder_node_name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._context = rclpy.Context()
+        rclpy.init(context=self._context)
+        self._node = rclpy.create_node(
+            "robo_orchard_recorder_app_client", context=self._context
+        )
+        self._executor = SingleThreadedExecutor(context=self._context)
+        self._executor.add_node(self._node)
+        self._trigger_clients = {
+            name: self._node.create_client(
+                Trigger, f"{recorder_node_name}/{name}"
+            )
+            for name in self.TRIGGER_SERVICES
+        }
+        self._set_parameters_client = self._node.create_client(
+            SetParameters, f"{recorder_node_name}/set_parameters"
+        )
+
+    def wait_for_service(self, timeout: float) -> bool:
+        """Waits until the recorder serves its services.
+
+        Args:
+            timeout (float): Timeout in seconds.
+
+        Returns:
+            bool: True if all services are available.
+        """
+        deadline = time.monotonic() + timeout
+        for client in (
+            self._set_parameters_client,
+            *self._trigger_clients.values(),
+        ):
+            if not client.wait_for_service(
+                timeout_sec=max(deadline - time.monotonic(), 0.0)
+            ):
+                return False
+        return True
+
+    def _call(self, client, request):
+        with self._lock:
+            future = client.call_async(request)
+            self._executor.spin_until_future_complete(
+                future, timeout_sec=self.timeout
+            )
+        if not future.done():
+            future.cancel()
+            raise TimeoutError(
+                f"Service {client.srv_name} timed out after {self.timeout} s"
+            )
+        return future.result()
+
+    def set_uri(self, uri: str):
+        """Sets the output bag path of the next episode.
+
+        Args:
+            uri (str): The output bag path.
+
+        Raises:
+            RuntimeError: If the recorder rejects the parameter.
+        """
+        from rcl_interfaces.msg import Parameter, ParameterType, ParameterValue
+        from rcl_interfaces.srv import SetParameters
+
+        request = SetParameters.Request()
+        request.parameters = [
+            Parameter(
+                name="uri",
+                value=ParameterValue(
+                    type=ParameterType.PARAMETER_STRING, string_value=uri
+                ),
+            )
+        ]
+        result = self._call(self._set_parameters_client, request).results[0]
+        if not result.successful:
+            raise RuntimeError(f"Failed to set uri: {result.reason}")
+
+    def trigger(self, name: str) -> dict:
+        """Calls a trigger service of the recorder.
+
+        Args:
+            name (str): The name of the service, like "status".
+
+        Returns:
+            dict: The status of the recorder after the call.
+
+        Raises:
+            RuntimeError: If the recorder rejects the call.
+        """
+        from std_srvs.srv import Trigger
+
+        response = self._call(self._trigger_clients[name], Trigger.Request())
+        if not response.success:
+            raise RuntimeError(response.message)
+        return json.loads(response.message)
+
+    def start_episode(self, uri: str) -> dict:
+        """Opens an episode at `uri` and starts recording into it.
+
+        Args:
+            uri (str): The output bag path, which must not exist.
+
+        Returns:
+            dict: The status of the recorder.
+        """
+        self.set_uri(uri)
+        return self.trigger("start_episode")
+
+    def stop_episode(self) -> dict:
+        """Closes the current episode, keeping the recorder armed.
+
+        Returns:
+            dict: The status of the recorder.
+        """
+        return self.trigger("stop_episode")
+
+    def status(self) -> dict:
+        """Gets the status of the recorder."""
+        return self.trigger("status")
+
+    def close(self):
+        """Destroys the node and shuts down the private context."""
+        import rclpy
+
+        self._executor.shutdown()
+        self._node.destroy_node()
+        rclpy.shutdown(context=self._context)
@@ -0,0 +1,416 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import pydantic
+
+from robo_orchard_recorder_app.catalog import EpisodeCatalog
+from robo_orchard_recorder_app.utils import get_group_uris, remove_path
+
+__all__ = ["TrashEntry", "EpisodeTrash"]
+
+logger = logging.getLogger(__name__)
+
+
+class TrashEntry(pydantic.BaseModel):
+    """An episode in the trash."""
+
+    name: str
+    """Name of the entry directory in the trash."""
+
+    uri: str
+    """Original episode directory."""
+
+    paths: Dict[str, str]
+    """Original path of each trashed path."""
+
+    delete_time: float
+    """Time when the episode was deleted, in seconds since the epoch."""
+
+    size_bytes: int
+    """Total size of the trashed files."""
+
+
+def _get_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    size = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                size += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return size
+
+
+class EpisodeTrash:
+    """Trash of the deleted episodes, purged in background.
+
+    Deleting an episode only renames its directories, which is instant,
+    and can be undone by :meth:`restore`. A background thread purges
+    the entries older than the retention in bulk. It also purges the
+    oldest entries early when the disk runs out of space, that is when
+    the free space of the workspace disk falls below the low watermark,
+    or the size of the episodes and the trash exceeds the quota.
+
+    The episode directory is moved into the trash directory, which must
+    be on the same disk as the workspace. The bag directories of writer
+    groups on other disks are renamed in place to hidden siblings.
+
+    This class is thread-safe.
+    """
+
+    ENTRY_FILE = "trash.json"
+
+    def __init__(
+        self,
+        trash_dir: str,
+        workspace: str,
+        retention_sec: float = 86400.0,
+        quota_bytes: Optional[int] = None,
+        low_watermark_bytes: int = 0,
+        catalog: Optional[EpisodeCatalog] = None,
+        purge_interval: float = 60.0,
+    ):
+        """Constructor.
+
+        Args:
+            trash_dir (str): The trash directory, created if missing.
+            workspace (str): The working directory of the recordings.
+            retention_sec (float): Seconds an entry is kept before being
+                purged. Defaults to one day.
+            quota_bytes (Optional[int]): Maximum size of the episodes and
+                the trash. Defaults to None, which means no quota. The
+                size of the episodes is read from `catalog`.
+            low_watermark_bytes (int): Minimum free space of the
+                workspace disk. Defaults to 0.
+            catalog (Optional[EpisodeCatalog]): Catalog of the episodes,
+                required by the quota. Defaults to None.
+            purge_interval (float): Seconds between two purges of the
+                background thread. Defaults to 60.
+        """
+        if quota_bytes is not None and catalog is None:
+            raise ValueError("A catalog is required by the disk quota")
+        self.trash_dir = trash_dir
+        self.workspace = workspace
+        self.retention_sec = retention_sec
+        self.quota_bytes = quota_bytes
+        self.low_watermark_bytes = low_watermark_bytes
+        self.catalog = catalog
+        self.purge_interval = purge_interval
+        os.makedirs(trash_dir, exist_ok=True)
+        os.makedirs(workspace, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, TrashEntry] = dict()
+        for name in os.listdir(trash_dir):
+            entry_file = os.path.join(trash_dir, name, self.ENTRY_FILE)
+            if os.path.exists(entry_file):
+                with open(entry_file, "r") as fr:
+                    entry = TrashEntry.model_validate_json(fr.read())
+                self._entries[entry.name] = entry
+        self._wakeup = threading.Event()
+        self._purge_all = False
+        # the requests are numbered, so that a caller can wait for the
+        # first purge started after its request
+        self._purged = threading.Condition()
+        self._requested_purges = 0
+        self._done_purges = 0
+        self._stopped = threading.Event()
+        self._worker: threading.Thread | None = None
+
+    def start(self):
+        """Starts the background thread purging the trash."""
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(
+            target=self._run, name="episode_trash", daemon=True
+        )
+        self._worker.start()
+
+    def stop(self):
+        """Stops the background thread."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        # nothing is purged anymore, release the waiting requests
+        with self._purged:
+            self._done_purges = self._requested_purges
+            self._purged.notify_all()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.purge_interval)
+            self._wakeup.clear()
+            purge_all, self._purge_all = self._purge_all, False
+            with self._purged:
+                requested = self._requested_purges
+            try:
+                self.purge(purge_all)
+            except Exception:
+                # keep purging, the failed entries are retried next time
+                logger.exception("Failed to purge the episode trash")
+            with self._purged:
+                self._done_purges = requested
+                self._purged.notify_all()
+
+    def entries(self) -> List[TrashEntry]:
+        """Gets the entries, the latest deleted first."""
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=lambda e: e.delete_time, reverse=True)
+
+    @property
+    def size_bytes(self) -> int:
+        """Gets the total size of the entries."""
+        with self._lock:
+            return sum(e.size_bytes for e in self._entries.values())
+
+    def move(self, uri: str) -> TrashEntry:
+        """Moves an episode into the trash.
+
+        Args:
+            uri (str): The episode directory.
+
+        Returns:
+            TrashEntry: The entry of the episode.
+
+        Raises:
+            FileNotFoundError: If the episode directory does not exist.
+            OSError: If the episode cannot be moved. The moved paths are
+                moved back.
+        """
+        uri = os.path.normpath(uri)
+        if not os.path.isdir(uri):
+            raise FileNotFoundError(f"Cannot find episode: {uri}")
+        episode_name = os.path.basename(uri)
+        name = "{}_{}".format(episode_name, uuid.uuid4().hex[:8])
+        entry_dir = os.path.join(self.trash_dir, name)
+        os.makedirs(entry_dir)
+
+        group_uris = [
+            group_uri
+            for group_uri in get_group_uris(uri)[1:]
+            if not group_uri.startswith(uri + os.sep)
+            and os.path.exists(group_uri)
+        ]
+        sources = [uri] + group_uris
+        size_bytes = sum(_get_size(src) for src in sources)
+        paths = {os.path.join(entry_dir, episode_name): uri}
+        for group_uri in group_uris:
+            parent, base = os.path.split(group_uri)
+            paths[os.path.join(parent, f".trash_{name}_{base}")] = group_uri
+        entry = TrashEntry(
+            name=name,
+            uri=uri,
+            paths=paths,
+            delete_time=time.time(),
+            size_bytes=size_bytes,
+        )
+        moved = []
+        try:
+            # written first, so that a crash leaves a restorable entry
+            with open(os.path.join(entry_dir, self.ENTRY_FILE), "w") as fw:
+                fw.write(entry.model_dump_json(indent=4))
+            for dst, src in paths.items():
+                os.rename(src, dst)
+                moved.append((dst, src))
+        except OSError:
+            self._undo_move(entry, moved)
+            raise
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def _undo_move(self, entry: TrashEntry, moved: List[Tuple[str, str]]):
+        """Moves back the paths of a failed move, then drops the entry.
+
+        If a path cannot be moved back, the entry is kept with the paths
+        left in the trash instead, so that they can still be restored.
+        """
+        while moved:
+            dst, src = moved[-1]
+            try:
+                os.rename(dst, src)
+            except OSError:
+                logger.exception("Failed to move %s back to %s", dst, src)
+                entry = entry.model_copy(update={"paths": dict(moved)})
+                with self._lock:
+                    self._entries[entry.name] = entry
+                entry_file = os.path.join(
+                    self.trash_dir, entry.name, self.ENTRY_FILE
+                )
+                with open(entry_file, "w") as fw:
+                    fw.write(entry.model_dump_json(indent=4))
+                return
+            moved.pop()
+        remove_path(os.path.join(self.trash_dir, entry.name))
+
+    def restore(self, name: str) -> str:
+        """Moves an episode out of the trash.
+
+        Args:
+            name (str): The name of the entry.
+
+        Returns:
+            str: The restored episode directory.
+
+        Raises:
+            KeyError: If the entry has been purged.
+            FileExistsError: If the episode directory exists again.
+        """
+        with self._lock:
+            entry = self._entries.pop(name)
+        try:
+            for src in entry.paths.values():
+                if os.path.exists(src):
+                    raise FileExistsError(f"Episode exists: {src}")
+            for dst, src in entry.paths.items():
+                os.makedirs(os.path.dirname(src), exist_ok=True)
+                os.rename(dst, src)
+        except Exception:
+            with self._lock:
+                self._entries[name] = entry
+            raise
+        remove_path(os.path.join(self.trash_dir, name))
+        return entry.uri
+
+    def _remove(self, entry: TrashEntry):
+        for dst in entry.paths:
+            remove_path(dst)
+        remove_path(os.path.join(self.trash_dir, entry.name))
+
+    def free_bytes(self) -> int:
+        """Gets the free space of the workspace disk."""
+        return shutil.disk_usage(self.workspace).free
+
+    def used_bytes(self) -> Optional[int]:
+        """Gets the size of the episodes and the trash.
+
+        Returns:
+            Optional[int]: The size, or None without a catalog.
+        """
+        if self.catalog is None:
+            return None
+        (total,) = self.catalog.stats(group_by=[])
+        return total.size_bytes + self.size_bytes
+
+    def _bytes_to_free(self) -> int:
+        need = self.low_watermark_bytes - self.free_bytes()
+        if self.quota_bytes is not None:
+            need = max(need, self.used_bytes() - self.quota_bytes)
+        return max(need, 0)
+
+    def purge(self, purge_all: bool = False) -> int:
+        """Purges the expired entries.
+
+        The oldest entries are purged early if short of space.
+
+        Args:
+            purge_all (bool): Whether to purge all entries. Defaults to
+                False.
+
+        Returns:
+            int: The number of purged entries.
+        """
+        deadline = time.time() - self.retention_sec
+        need = self._bytes_to_free()
+        purged = []
+        for entry in reversed(self.entries()):
+            if purge_all or entry.delete_time < deadline or need > 0:
+                purged.append(entry)
+                need -= entry.size_bytes
+        # forgotten first, so that the entries can not be restored while
+        # being removed
+        with self._lock:
+            for entry in purged:
+                self._entries.pop(entry.name, None)
+        for entry in purged:
+            self._remove(entry)
+        return len(purged)
+
+    def request_purge(
+        self, purge_all: bool = False, timeout: Optional[float] = 0
+    ) -> bool:
+        """Wakes up the background thread to purge now.
+
+        Args:
+            purge_all (bool): Whether to purge all entries. Defaults to
+                False.
+            timeout (Optional[float]): Seconds to wait for the purge to
+                complete. Defaults to 0, which does not wait. None waits
+                forever.
+
+        Returns:
+            bool: True if the purge has completed.
+        """
+        with self._purged:
+            self._requested_purges += 1
+            request = self._requested_purges
+        self._purge_all = self._purge_all or purge_all
+        self._wakeup.set()
+        with self._purged:
+            return self._purged.wait_for(
+                lambda: self._done_purges >= request, timeout
+            )
+
+    def check_space(self, timeout: float = 5.0):
+        """Checks that there is space for recording.
+
+        If short of space, the background thread is asked to purge the
+        trash, and the check waits for it.
+
+        Args:
+            timeout (float): Seconds to wait for the purge. Defaults to 5.
+
+        Raises:
+            RuntimeError: If the purge does not complete in time, if the
+                free space of the workspace disk is below the low
+                watermark, or the quota is exceeded, even after purging
+                the trash.
+        """
+        if self._bytes_to_free() > 0 and not self.request_purge(
+            timeout=timeout
+        ):
+            raise RuntimeError(
+                "The trash is being purged to free space, retry later"
+            )
+        free_bytes = self.free_bytes()
+        if free_bytes < self.low_watermark_bytes:
+            raise RuntimeError(
+                "Only {:.1f} GB is free on the workspace disk, "
+                "below the low watermark of {:.1f} GB".format(
+                    free_bytes / 1e9, self.low_watermark_bytes / 1e9
+                )
+            )
+        if self.quota_bytes is not None:
+            used_bytes = self.used_bytes()
+            if used_bytes >= self.quota_bytes:
+                raise RuntimeError(
+                    "The episodes use {:.1f} GB, over the quota of "
+                    "{:.1f} GB".format(
+                        used_bytes / 1e9, self.quota_bytes / 1e9
+                    )
+                )
@@ -15,8 +15,11 @@
 # permissions and limitations under the License.
 
 import atexit
+import glob
+import json
 import os
 import subprocess
+import time
 from datetime import datetime
 
 import psutil
@@ -54,6 +57,196 @@ def remove_path(path: str) -> None:
         os.remove(path)
 
 
+def get_group_uris(uri: str) -> list[str]:
+    """Gets the bag directories of the writer groups of an episode.
+
+    Args:
+        uri (str): The episode directory written by the recorder.
+
+    Returns:
+        list[str]: The episode directory, followed by the bag directories
+        of the other writer groups listed in `episode_manifest.json`,
+        which may be outside of the episode directory.
+    """
+    uris = [os.path.normpath(uri)]
+    manifest_file = os.path.join(uri, "episode_manifest.json")
+    if not os.path.exists(manifest_file):
+        return uris
+    with open(manifest_file, "r") as fr:
+        manifest = json.load(fr)
+    for group in manifest.get("groups", []):
+        group_uri = os.path.normpath(os.path.join(uri, group["uri"]))
+        if group_uri not in uris:
+            uris.append(group_uri)
+    return uris
+
+
+def _find_bag_files(uri: str, excludes: list[str]) -> list[str]:
+    manifest_file = os.path.join(uri, "splits.json")
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r") as fr:
+            manifest = json.load(fr)
+        return [
+            os.path.join(uri, f)
+            for split in manifest["splits"]
+            for f in split["files"]
+        ]
+    return sorted(
+        f
+        for f in glob.glob(os.path.join(uri, "**", "*.mcap"), recursive=True)
+        if not any(f.startswith(exclude + os.sep) for exclude in excludes)
+    )
+
+
+def find_mcap_files(uri: str) -> list[str]:
+    """Finds the MCAP files of a recorded episode.
+
+    Args:
+        uri (str): The episode directory written by the recorder.
+
+    Returns:
+        list[str]: The MCAP files in recording order, group by group. If
+        a bag is split, the order of its `splits.json` manifest is used.
+    """
+    group_uris = get_group_uris(uri)
+    files = []
+    for group_uri in group_uris:
+        files += _find_bag_files(
+            group_uri,
+            excludes=[
+                other
+                for other in group_uris
+                if other.startswith(group_uri + os.sep)
+            ],
+        )
+    return files
+
+
+def check_episode(uri: str) -> None:
+    """Checks that an episode has been closed cleanly by the recorder.
+
+    Args:
+        uri (str): The episode directory written by the recorder.
+
+    Raises:
+        FileNotFoundError: If the episode directory does not exist.
+        RuntimeError: If the recording flag is left, the writer groups
+            are not closed, or no MCAP file has been written.
+    """
+    if not os.path.isdir(uri):
+        raise FileNotFoundError(f"Cannot find episode: {uri}")
+    if os.path.exists(os.path.join(uri, "__RECORDING__")):
+        raise RuntimeError(
+            "Recording flag is left, please run mcap_recover on the episode"
+        )
+    manifest_file = os.path.join(uri, "episode_manifest.json")
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r") as fr:
+            if not json.load(fr).get("finished", False):
+                raise RuntimeError("Writer groups are not closed")
+    if not find_mcap_files(uri):
+        raise RuntimeError("No MCAP file is recorded")
+
+
+def validate_episode(
+    uri: str, record_config_file: str = "", num_workers: int = 2
+) -> dict:
+    """Validates an episode with the `mcap_validate` tool of the recorder.
+
+    The MCAP files are streamed by worker processes, and the report is
+    written into `episode_meta.json` under the `validation` key.
+
+    Args:
+        uri (str): The episode directory written by the recorder.
+        record_config_file (str): The recorder config file, whose frame
+            rate monitors give the thresholds. Defaults to "".
+        num_workers (int): The number of worker processes. Defaults to 2.
+
+    Returns:
+        dict: The validation report.
+
+    Raises:
+        RuntimeError: If the episode is invalid, or the validation failed.
+    """
+    command = [
+        "ros2",
+        "run",
+        "robo_orchard_data_ros2",
+        "mcap_validate",
+        uri,
+        "--workers",
+        str(num_workers),
+    ]
+    if record_config_file:
+        command += ["--config", record_config_file]
+    result = subprocess.run(command, capture_output=True)
+    if result.returncode not in (0, 2):
+        raise RuntimeError(
+            "Failed to validate {}:\n{}".format(
+                uri, result.stderr.decode("utf-8")
+            )
+        )
+    with open(os.path.join(uri, "episode_meta.json"), "r") as fr:
+        report = json.load(fr)["validation"]
+    if not report["valid"]:
+        raise RuntimeError("; ".join(report["errors"]))
+    return report
+
+
+def _is_indexed(mcap_path: str) -> bool:
+    # the same check as `build_index` of the recorder, which rebuilds the
+    # index if the file changed
+    manifest_file = os.path.join(mcap_path + ".index", "index.json")
+    try:
+        with open(manifest_file, "r") as fr:
+            manifest = json.load(fr)
+        stat = os.stat(mcap_path)
+    except (OSError, ValueError):
+        return False
+    return (
+        manifest.get("mcap_size") == stat.st_size
+        and manifest.get("mcap_mtime_ns") == stat.st_mtime_ns
+    )
+
+
+def index_episode(uri: str, timeout: float = 60.0) -> None:
+    """Waits for the sidecar time index of an episode.
+
+    The recorder builds the index (`<file>.mcap.index`) of every MCAP file
+    in the background after closing an episode. The files still missing
+    an up-to-date index after `timeout` are indexed with the `mcap_index`
+    tool of the recorder.
+
+    Args:
+        uri (str): The episode directory written by the recorder.
+        timeout (float): Seconds to wait for the recorder. Defaults to 60.
+
+    Raises:
+        RuntimeError: If the files cannot be indexed.
+    """
+    deadline = time.monotonic() + timeout
+    pending = find_mcap_files(uri)
+    while True:
+        pending = [f for f in pending if not _is_indexed(f)]
+        if not pending or time.monotonic() >= deadline:
+            break
+        time.sleep(0.5)
+    if not pending:
+        return
+    result = subprocess.run(
+        ["ros2", "run", "robo_orchard_data_ros2", "mcap_index", *pending],
+        capture_output=True,
+    )
+    failed = [f for f in pending if not _is_indexed(f)]
+    if result.returncode != 0 or failed:
+        raise RuntimeError(
+            "Failed to index {}:\n{}".format(
+                ", ".join(failed) or uri,
+                (result.stdout + result.stderr).decode("utf-8"),
+            )
+        )
+
+
 def check_process(process: subprocess.Popen, min_live_time: float = 5):
     """Checks if a process is running successfully for a minimum time.
 
@@ -0,0 +1,166 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from typing import ClassVar, Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+from robo_orchard_data_ros2.mcap.config import QosProfile, RecordConfig
+
+__all__ = [
+    "SyntheticTopicConfig",
+    "SyntheticPublisherConfig",
+    "BenchmarkVariant",
+    "BenchmarkConfig",
+]
+
+
+class SyntheticTopicConfig(BaseModel):
+    """A group of synthetic topics publishing the same kind of message.
+
+    Every message type carries a `std_msgs/Header` as its first field, so
+    that the publish time can be read back from the recorded bytes.
+
+    Attributes:
+        name (str): The topic name. If `count > 1`, the topics are named
+            `{name}_0`, `{name}_1`, ...
+        kind (Literal["image", "compressed_image", "joint_state"]): The
+            message kind. `"image"` publishes `sensor_msgs/msg/Image` of
+            `width * height * channels` bytes, `"compressed_image"`
+            publishes `sensor_msgs/msg/CompressedImage` of `size_bytes`
+            bytes, and `"joint_state"` publishes `sensor_msgs/msg/JointState`
+            of `num_joints` joints.
+        rate_hz (float): The publishing rate of each topic.
+        count (int): The number of topics in the group. Defaults to 1.
+        width (int): The image width. Defaults to 640.
+        height (int): The image height. Defaults to 480.
+        channels (int): The number of image channels, 1 (`mono8`) or
+            3 (`rgb8`). Defaults to 3.
+        size_bytes (int): The payload size of compressed images.
+            Defaults to 100KB.
+        num_joints (int): The number of joints. Defaults to 7.
+        qos_profile (QosProfile): The publisher QoS profile.
+            Defaults to `QosProfile()`.
+    """
+
+    MSG_TYPES: ClassVar[Dict[str, str]] = {
+        "image": "sensor_msgs/msg/Image",
+        "compressed_image": "sensor_msgs/msg/CompressedImage",
+        "joint_state": "sensor_msgs/msg/JointState",
+    }
+
+    name: str
+    kind: Literal["image", "compressed_image", "joint_state"]
+    rate_hz: float = Field(gt=0)
+    count: int = Field(default=1, ge=1)
+    width: int = 640
+    height: int = 480
+    channels: Literal[1, 3] = 3
+    size_bytes: int = 100 * 1024
+    num_joints: int = 7
+    qos_profile: QosProfile = QosProfile()
+
+    @property
+    def msg_type(self) -> str:
+        return self.MSG_TYPES[self.kind]
+
+    @property
+    def topics(self) -> List[str]:
+        if self.count == 1:
+            return [self.name]
+        return [f"{self.name}_{i}" for i in range(self.count)]
+
+
+class SyntheticPublisherConfig(BaseModel):
+    """Configuration of the synthetic publisher node.
+
+    Attributes:
+        topics (List[SyntheticTopicConfig]): The topic groups. Defaults to
+            two 30 Hz VGA cameras and a 500 Hz joint state topic.
+        duration_sec (float): How long to publish, in seconds.
+            Defaults to 10.0.
+        start_delay_sec (float): The delay between creating the publishers
+            and the first message, which lets subscribers match.
+            Defaults to 2.0.
+    """
+
+    topics: List[SyntheticTopicConfig] = Field(
+        default_factory=lambda: [
+            SyntheticTopicConfig(
+                name="/camera/image_raw", kind="image", rate_hz=30, count=2
+            ),
+            SyntheticTopicConfig(
+                name="/joint_states", kind="joint_state", rate_hz=500
+            ),
+        ]
+    )
+    duration_sec: float = 10.0
+    start_delay_sec: float = 2.0
+
+    @property
+    def topic_types(self) -> Dict[str, str]:
+        """The mapping of all synthetic topics to their message types."""
+        return {
+            topic: group.msg_type
+            for group in self.topics
+            for topic in group.topics
+        }
+
+
+class BenchmarkVariant(BaseModel):
+    """A recorder configuration under test.
+
+    Attributes:
+        name (str): The variant name used in the report.
+        record_config (RecordConfig): The recorder configuration. If
+            `include_patterns` is not set, only the synthetic topics are
+            recorded. Latencies are only meaningful with the default
+            `"recorder_clock"` stamp type, because the log time is then the
+            receive time. Defaults to `RecordConfig()`.
+    """
+
+    name: str
+    record_config: RecordConfig = RecordConfig()
+
+
+class BenchmarkConfig(BaseModel):
+    """Configuration of the recorder benchmark.
+
+    Attributes:
+        publisher (SyntheticPublisherConfig): The synthetic load.
+        variants (List[BenchmarkVariant]): The recorder configurations to
+            compare. Defaults to a single default configuration.
+        warmup_sec (float): The time given to the recorder to start before
+            the publisher is launched. Defaults to 3.0.
+        drain_timeout_sec (float): The time given to the recorder to flush
+            and close the bag after it is interrupted. Defaults to 60.0.
+        sample_period_sec (float): The period of CPU and RSS sampling.
+            Defaults to 0.5.
+        output_dir (str | None): The directory of the recorded bags. Defaults
+            to None, which uses a temporary directory.
+        keep_bags (bool): If `False`, the recorded bags are removed after
+            being analyzed. Defaults to `False`.
+    """
+
+    publisher: SyntheticPublisherConfig = SyntheticPublisherConfig()
+    variants: List[BenchmarkVariant] = Field(
+        default_factory=lambda: [BenchmarkVariant(name="default")]
+    )
+    warmup_sec: float = 3.0
+    drain_timeout_sec: float = 60.0
+    sample_period_sec: float = 0.5
+    output_dir: str | None = None
+    keep_bags: bool = False
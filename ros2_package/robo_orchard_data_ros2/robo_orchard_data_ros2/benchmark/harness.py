@@ -0,0 +1,433 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import psutil
+import rosbag2_py
+
+from robo_orchard_data_ros2.benchmark.config import (
+    BenchmarkConfig,
+    BenchmarkVariant,
+)
+from robo_orchard_data_ros2.mcap.cdr import read_stamp_ns
+
+__all__ = ["ProcessSampler", "read_bag_stats", "run_variant", "run"]
+
+
+LATENCY_PERCENTILES = (50, 90, 99, 99.9)
+RECORDER_MODULE = "robo_orchard_data_ros2.mcap.node"
+PUBLISHER_MODULE = "robo_orchard_data_ros2.benchmark.publisher"
+
+
+class ProcessSampler:
+    """Samples the CPU usage and the RSS of a process and its children."""
+
+    def __init__(self, pid: int):
+        self.process = psutil.Process(pid)
+        self.cpu_percent: List[float] = []
+        self.rss_bytes: List[int] = []
+        self._procs: Dict[int, psutil.Process] = dict()
+
+    def sample(self):
+        try:
+            procs = [self.process] + self.process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        cpu = 0.0
+        rss = 0
+        for proc in procs:
+            # cpu_percent compares against the previous call on the same
+            # Process object, so the objects are kept between samples.
+            proc = self._procs.setdefault(proc.pid, proc)
+            try:
+                cpu += proc.cpu_percent(interval=None)
+                rss += proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+        self.cpu_percent.append(cpu)
+        self.rss_bytes.append(rss)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        # the first sample of cpu_percent is always 0
+        cpu = self.cpu_percent[1:]
+        return {
+            "cpu_percent_mean": float(np.mean(cpu)) if cpu else None,
+            "cpu_percent_max": float(np.max(cpu)) if cpu else None,
+            "rss_mb_peak": (
+                max(self.rss_bytes) / 1e6 if self.rss_bytes else None
+            ),
+        }
+
+
+def read_bag_stats(
+    uri: str, topics: List[str], start_time_ns: Optional[int] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Reads the recorded synthetic messages back from a bag.
+
+    Args:
+        uri (str): The bag directory, which may hold split bags.
+        topics (List[str]): The synthetic topics.
+        start_time_ns (Optional[int]): Messages stamped before this time
+            are ignored.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per topic, the message count, the
+        serialized bytes, the first and last log times, and the latencies
+        from the header stamp to the log time in nanoseconds.
+    """
+    stats = {
+        topic: {
+            "count": 0,
+            "bytes": 0,
+            "first_log_time_ns": None,
+            "last_log_time_ns": None,
+            "latency_ns": [],
+        }
+        for topic in topics
+    }
+    files = sorted(
+        glob.glob(os.path.join(uri, "**", "*.mcap"), recursive=True)
+    )
+    for file in files:
+        reader = rosbag2_py.SequentialReader()
+        reader.open(
+            rosbag2_py.StorageOptions(uri=file, storage_id="mcap"),
+            rosbag2_py.ConverterOptions(
+                input_serialization_format="cdr",
+                output_serialization_format="cdr",
+            ),
+        )
+        reader.set_filter(rosbag2_py.StorageFilter(topics=topics))
+        while reader.has_next():
+            topic, data, log_time = reader.read_next()
+            stamp = read_stamp_ns(data)
+            if start_time_ns is not None and stamp < start_time_ns:
+                continue
+            topic_stats = stats[topic]
+            topic_stats["count"] += 1
+            topic_stats["bytes"] += len(data)
+            topic_stats["latency_ns"].append(log_time - stamp)
+            if (
+                topic_stats["first_log_time_ns"] is None
+                or log_time < topic_stats["first_log_time_ns"]
+            ):
+                topic_stats["first_log_time_ns"] = log_time
+            if (
+                topic_stats["last_log_time_ns"] is None
+                or log_time > topic_stats["last_log_time_ns"]
+            ):
+                topic_stats["last_log_time_ns"] = log_time
+        del reader
+    return stats
+
+
+def _latency_summary(latency_ns: List[int]) -> Dict[str, Optional[float]]:
+    if not latency_ns:
+        return {f"p{p}": None for p in LATENCY_PERCENTILES} | {"max": None}
+    latency_ms = np.asarray(latency_ns, dtype=np.float64) * 1e-6
+    summary = {
+        f"p{p}": float(v)
+        for p, v in zip(
+            LATENCY_PERCENTILES,
+            np.percentile(latency_ms, LATENCY_PERCENTILES),
+            strict=True,
+        )
+    }
+    summary["max"] = float(latency_ms.max())
+    return summary
+
+
+def _summarize(
+    published: Dict[str, int],
+    bag_stats: Dict[str, Dict[str, Any]],
+    duration_sec: float,
+) -> Dict[str, Any]:
+    topics = dict()
+    all_latency = []
+    for topic, num_published in published.items():
+        topic_stats = bag_stats[topic]
+        num_recorded = topic_stats["count"]
+        all_latency.extend(topic_stats["latency_ns"])
+        topics[topic] = {
+            "published": num_published,
+            "recorded": num_recorded,
+            "drop_rate": (
+                1 - num_recorded / num_published if num_published else 0.0
+            ),
+            "latency_ms": _latency_summary(topic_stats["latency_ns"]),
+        }
+    num_published = sum(published.values())
+    num_recorded = sum(stats["count"] for stats in bag_stats.values())
+    num_bytes = sum(stats["bytes"] for stats in bag_stats.values())
+    return {
+        "published": num_published,
+        "recorded": num_recorded,
+        "drop_rate": (
+            1 - num_recorded / num_published if num_published else 0.0
+        ),
+        "throughput_msgs_per_sec": num_recorded / duration_sec,
+        "throughput_mb_per_sec": num_bytes / 1e6 / duration_sec,
+        "latency_ms": _latency_summary(all_latency),
+        "topics": topics,
+    }
+
+
+def _ros_args(**params) -> List[str]:
+    args = ["--ros-args"]
+    for key, value in params.items():
+        args.extend(["-p", f"{key}:={value}"])
+    return args
+
+
+def run_variant(
+    config: BenchmarkConfig, variant: BenchmarkVariant, work_dir: str
+) -> Dict[str, Any]:
+    """Runs the recorder with one configuration against the publisher.
+
+    The recorder subscribes to the synthetic topics from the discovery
+    manifest at startup, so that no message is lost to discovery, and it
+    is interrupted once the publisher has finished.
+
+    Args:
+        config (BenchmarkConfig): The benchmark configuration.
+        variant (BenchmarkVariant): The recorder configuration under test.
+        work_dir (str): The directory of the configurations and the bag.
+
+    Returns:
+        Dict[str, Any]: The benchmark results of the variant.
+    """
+    topic_types = config.publisher.topic_types
+    record_config = variant.record_config.model_copy(deep=True)
+    if record_config.include_patterns is None:
+        record_config.include_patterns = list(topic_types)
+    record_config.discovery.topic_types = {
+        **topic_types,
+        **record_config.discovery.topic_types,
+    }
+
+    variant_dir = os.path.join(work_dir, variant.name)
+    os.makedirs(variant_dir, exist_ok=True)
+    record_config_file = os.path.join(variant_dir, "record_config.json")
+    with open(record_config_file, "w") as fw:
+        fw.write(record_config.model_dump_json(indent=4))
+    publisher_config_file = os.path.join(variant_dir, "publisher_config.json")
+    with open(publisher_config_file, "w") as fw:
+        fw.write(config.publisher.model_dump_json(indent=4))
+    stats_file = os.path.join(variant_dir, "publisher_stats.json")
+    uri = os.path.join(variant_dir, "bag")
+
+    recorder = subprocess.Popen(
+        [sys.executable, "-m", RECORDER_MODULE]
+        + _ros_args(config_file=record_config_file, uri=uri),
+        stdout=open(os.path.join(variant_dir, "recorder.log"), "w"),
+        stderr=subprocess.STDOUT,
+    )
+    publisher = None
+    sampler = ProcessSampler(recorder.pid)
+    try:
+        time.sleep(config.warmup_sec)
+        if recorder.poll() is not None:
+            raise RuntimeError(
+                "Recorder exited with code {}, see {}".format(
+                    recorder.returncode,
+                    os.path.join(variant_dir, "recorder.log"),
+                )
+            )
+        publisher = subprocess.Popen(
+            [sys.executable, "-m", PUBLISHER_MODULE]
+            + _ros_args(
+                config_file=publisher_config_file, stats_file=stats_file
+            ),
+            stdout=open(os.path.join(variant_dir, "publisher.log"), "w"),
+            stderr=subprocess.STDOUT,
+        )
+        while publisher.poll() is None:
+            sampler.sample()
+            time.sleep(config.sample_period_sec)
+        if publisher.returncode != 0:
+            raise RuntimeError(
+                "Publisher exited with code {}, see {}".format(
+                    publisher.returncode,
+                    os.path.join(variant_dir, "publisher.log"),
+                )
+            )
+
+        recorder.send_signal(signal.SIGINT)
+        finalize_start = time.monotonic()
+        while recorder.poll() is None:
+            if time.monotonic() - finalize_start > config.drain_timeout_sec:
+                raise RuntimeError(
+                    "Recorder did not finish within {} seconds".format(
+                        config.drain_timeout_sec
+                    )
+                )
+            sampler.sample()
+            time.sleep(config.sample_period_sec)
+        finalize_sec = time.monotonic() - finalize_start
+    finally:
+        for proc in (publisher, recorder):
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+    with open(stats_file, "r") as fr:
+        publisher_stats = json.load(fr)
+    duration_sec = (
+        publisher_stats["end_time_ns"] - publisher_stats["start_time_ns"]
+    ) * 1e-9
+    bag_stats = read_bag_stats(
+        uri, list(topic_types), publisher_stats["start_time_ns"]
+    )
+    file_bytes = sum(
+        os.path.getsize(f)
+        for f in glob.glob(os.path.join(uri, "**", "*.mcap"), recursive=True)
+    )
+    result = {
+        "variant": variant.name,
+        "duration_sec": duration_sec,
+        "finalize_sec": finalize_sec,
+        "file_mb": file_bytes / 1e6,
+        **_summarize(publisher_stats["published"], bag_stats, duration_sec),
+        **sampler.summary(),
+    }
+    if not config.keep_bags:
+        shutil.rmtree(uri, ignore_errors=True)
+    return result
+
+
+def run(config: BenchmarkConfig) -> Dict[str, Any]:
+    """Runs all variants of the benchmark one after another.
+
+    Args:
+        config (BenchmarkConfig): The benchmark configuration.
+
+    Returns:
+        Dict[str, Any]: The benchmark configuration and the results of each
+        variant.
+    """
+    names = [variant.name for variant in config.variants]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Variant names should be unique, but got {names}")
+
+    if config.output_dir is None:
+        work_dir = tempfile.mkdtemp(prefix="mcap_benchmark_")
+    else:
+        work_dir = config.output_dir
+        os.makedirs(work_dir, exist_ok=True)
+
+    results = []
+    for variant in config.variants:
+        print(f"Running variant {variant.name} ...", file=sys.stderr)
+        try:
+            result = run_variant(config, variant, work_dir)
+        except Exception as e:
+            result = {"variant": variant.name, "error": str(e)}
+        results.append(result)
+        print(_format_result(result), file=sys.stderr)
+
+    if config.output_dir is None and not config.keep_bags:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "config": config.model_dump(mode="json"),
+        "host": {
+            "cpu_count": psutil.cpu_count(),
+            "memory_mb": psutil.virtual_memory().total / 1e6,
+        },
+        "results": results,
+    }
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return "[{}] failed: {}".format(result["variant"], result["error"])
+    return (
+        "[{}] {:.0f} msgs/s, {:.2f} MB/s, drop rate {:.2%}, latency p50 "
+        "{} ms / p99 {} ms, CPU {} %, peak RSS {} MB".format(
+            result["variant"],
+            result["throughput_msgs_per_sec"],
+            result["throughput_mb_per_sec"],
+            result["drop_rate"],
+            _fmt(result["latency_ms"]["p50"]),
+            _fmt(result["latency_ms"]["p99"]),
+            _fmt(result["cpu_percent_mean"]),
+            _fmt(result["rss_mb_peak"]),
+        )
+    )
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.2f}"
+
+
+def main(args=None):
+    """Benchmarks `mcap_recorder` against the synthetic publisher.
+
+    The result is a json document with, for each variant, the sustained
+    throughput, the drop rate, the latency percentiles from publishing to
+    the recorder callback, and the CPU and RSS of the recorder.
+
+    Example:
+        ros2 run robo_orchard_data_ros2 mcap_benchmark bench.json \\
+            --output result.json
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "config",
+        type=str,
+        nargs="?",
+        default=None,
+        help="BenchmarkConfig json file. Uses the default if not given.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Output json file. Prints to stdout if not given.",
+    )
+    cli_args = parser.parse_args(args)
+
+    if cli_args.config is None:
+        config = BenchmarkConfig()
+    else:
+        with open(cli_args.config, "r") as fr:
+            config = BenchmarkConfig.model_validate_json(fr.read())
+
+    report = run(config)
+    if cli_args.output is None:
+        print(json.dumps(report, indent=4))
+    else:
+        with open(cli_args.output, "w") as fw:
+            json.dump(report, fw, indent=4)
+
+    failed = [r["variant"] for r in report["results"] if "error" in r]
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import functools
+import json
+import os
+import time
+
+import rclpy
+from rclpy.node import Node, ParameterDescriptor
+from rclpy.qos import QoSProfile
+from sensor_msgs.msg import CompressedImage, Image, JointState
+
+from robo_orchard_data_ros2.benchmark.config import (
+    SyntheticPublisherConfig,
+    SyntheticTopicConfig,
+)
+
+__all__ = ["SyntheticPublisher"]
+
+
+def make_message(group: SyntheticTopicConfig):
+    """Creates the message template of a synthetic topic group.
+
+    Args:
+        group (SyntheticTopicConfig): The topic group.
+
+    Returns:
+        The message, of which only the header stamp changes between
+        publications.
+    """
+    if group.kind == "image":
+        msg = Image()
+        msg.height = group.height
+        msg.width = group.width
+        msg.encoding = "rgb8" if group.channels == 3 else "mono8"
+        msg.step = group.width * group.channels
+        msg.data = os.urandom(msg.step * group.height)
+    elif group.kind == "compressed_image":
+        msg = CompressedImage()
+        msg.format = "jpeg"
+        msg.data = os.urandom(group.size_bytes)
+    elif group.kind == "joint_state":
+        msg = JointState()
+        msg.name = [f"joint_{i}" for i in range(group.num_joints)]
+        msg.position = [0.0] * group.num_joints
+        msg.velocity = [0.0] * group.num_joints
+        msg.effort = [0.0] * group.num_joints
+    else:
+        raise ValueError(f"Unknown message kind {group.kind}")
+    msg.header.frame_id = group.name
+    return msg
+
+
+class SyntheticPublisher(Node):
+    """Publishes synthetic sensor data at fixed rates.
+
+    The header stamp of every message is set to the publish time, so that
+    the delivery latency can be computed from a recorded bag. When
+    publishing ends, the number of published messages per topic is written
+    to the json file given by the `stats_file` parameter.
+    """
+
+    def __init__(self):
+        super().__init__("synthetic_publisher")
+        self._initialize()
+        self.published = {topic: 0 for topic in self.config.topic_types}
+        self.start_time_ns: int | None = None
+        self.end_time_ns: int | None = None
+        self.done = False
+        self._publishers = dict()
+        self._timers = []
+
+        for group in self.config.topics:
+            qos = QoSProfile(
+                depth=group.qos_profile.depth,
+                reliability=group.qos_profile.reliability,
+                durability=group.qos_profile.durability,
+                history=group.qos_profile.history,
+            )
+            msg = make_message(group)
+            for topic in group.topics:
+                self._publishers[topic] = self.create_publisher(
+                    type(msg), topic, qos
+                )
+                timer = self.create_timer(
+                    1.0 / group.rate_hz,
+                    functools.partial(self._publish, topic, msg),
+                )
+                # started after the delay
+                timer.cancel()
+                self._timers.append(timer)
+        self._start_timer = self.create_timer(
+            self.config.start_delay_sec, self._start
+        )
+
+    def _start(self):
+        self.destroy_timer(self._start_timer)
+        self.get_logger().info(
+            "Start publishing {} topics for {:.1f} seconds".format(
+                len(self._publishers), self.config.duration_sec
+            )
+        )
+        self.start_time_ns = self.get_clock().now().nanoseconds
+        for timer in self._timers:
+            timer.reset()
+        self._stop_timer = self.create_timer(
+            self.config.duration_sec, self._stop
+        )
+
+    def _stop(self):
+        self.destroy_timer(self._stop_timer)
+        for timer in self._timers:
+            timer.cancel()
+        self.end_time_ns = self.get_clock().now().nanoseconds
+        self.done = True
+        self.get_logger().info(
+            "Published {} messages".format(sum(self.published.values()))
+        )
+
+    def _publish(self, topic: str, msg):
+        msg.header.stamp = self.get_clock().now().to_msg()
+        self._publishers[topic].publish(msg)
+        self.published[topic] += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "published": self.published,
+        }
+
+    def _initialize(self):
+        self.declare_parameter(
+            "config_file",
+            "",
+            descriptor=ParameterDescriptor(description="Config path"),
+        )
+        self.declare_parameter(
+            "stats_file",
+            "",
+            descriptor=ParameterDescriptor(
+                description="Output json file of the publishing statistics"
+            ),
+        )
+        config_file: str = (
+            self.get_parameter("config_file")
+            .get_parameter_value()
+            .string_value
+        )
+        self.stats_file: str = (
+            self.get_parameter("stats_file").get_parameter_value().string_value
+        )
+        if config_file == "":
+            self.config = SyntheticPublisherConfig()
+        elif os.path.exists(config_file):
+            with open(config_file, "r") as handle:
+                self.config = SyntheticPublisherConfig.model_validate_json(
+                    handle.read()
+                )
+        else:
+            raise FileNotFoundError(
+                "config file {} does not exists!".format(config_file)
+            )
+
+
+def main(args=None):
+    rclpy.init(args=args)
+    node = SyntheticPublisher()
+    try:
+        while rclpy.ok() and not node.done:
+            rclpy.spin_once(node, timeout_sec=0.1)
+        # give the last messages time to be delivered
+        time.sleep(0.5)
+    finally:
+        if node.stats_file != "":
+            with open(node.stats_file, "w") as fw:
+                json.dump(node.get_stats(), fw, indent=4)
+        node.destroy_node()
+        rclpy.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import glob
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import rosbag2_py
+
+from robo_orchard_data_ros2.mcap.config import SplitConfig, StorageConfig
+from robo_orchard_data_ros2.mcap.static import (
+    StaticMessage,
+    StaticMessageCache,
+)
+
+__all__ = ["SplitInfo", "BagWriter"]
+
+
+class SplitInfo:
+    """Bookkeeping of one output bag.
+
+    Attributes:
+        index (int): The index of the split.
+        uri (str): The bag directory of the split.
+        start_time_ns (int | None): The minimum log time in the split.
+        end_time_ns (int | None): The maximum log time in the split.
+        message_count (int): The number of written messages.
+        size_bytes (int): The serialized size of written messages.
+    """
+
+    def __init__(self, index: int, uri: str):
+        self.index = index
+        self.uri = uri
+        self.start_time_ns: int | None = None
+        self.end_time_ns: int | None = None
+        self.message_count = 0
+        self.size_bytes = 0
+
+    @property
+    def duration_ns(self) -> int:
+        if self.start_time_ns is None or self.end_time_ns is None:
+            return 0
+        return self.end_time_ns - self.start_time_ns
+
+    def update(self, timestamp: int, size: int, update_range: bool = True):
+        if update_range:
+            if self.start_time_ns is None or timestamp < self.start_time_ns:
+                self.start_time_ns = timestamp
+            if self.end_time_ns is None or timestamp > self.end_time_ns:
+                self.end_time_ns = timestamp
+        self.message_count += 1
+        self.size_bytes += size
+
+    def to_dict(self, root: str) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "uri": os.path.relpath(self.uri, root),
+            "files": sorted(
+                os.path.relpath(f, root)
+                for f in glob.glob(os.path.join(self.uri, "*.mcap"))
+            ),
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "message_count": self.message_count,
+            "size_bytes": self.size_bytes,
+        }
+
+
+class BagWriter:
+    """MCAP bag writer with automatic splitting.
+
+    Without splitting, a single `rosbag2_py.SequentialWriter` is opened at
+    `uri`, which keeps the layout of a plain rosbag2 bag. With splitting,
+    `uri` becomes an episode directory holding one bag directory per split
+    (`part_0000`, `part_0001`, ...) and a manifest file listing the splits
+    with their time ranges, so that readers can open only the slice they
+    need.
+
+    The messages of static topics are kept in a
+    :class:`StaticMessageCache` and written again at the head of every
+    split, so that each split can be read on its own.
+
+    This class is not thread-safe.
+    """
+
+    MANIFEST_FILE = "splits.json"
+
+    def __init__(
+        self,
+        uri: str,
+        split: Optional[SplitConfig] = None,
+        static_topics: Optional[Set[str]] = None,
+        static_cache: Optional[StaticMessageCache] = None,
+        marker_topic: Optional[str] = None,
+        storage: Optional[StorageConfig] = None,
+        **storage_kwargs,
+    ):
+        """Constructor.
+
+        Args:
+            uri (str): The output path, which is a directory.
+            split (Optional[SplitConfig]): The split configuration. Defaults
+                to None, which means no splitting.
+            static_topics (Optional[Set[str]]): The writting topic names of
+                static topics, which are re-emitted in every split.
+            static_cache (Optional[StaticMessageCache]): The cache of
+                static messages, which may be shared with producers
+                buffering messages before recording starts. Defaults to
+                None, which creates an unlimited cache.
+            marker_topic (Optional[str]): The writting topic name of
+                `SplitConfig.episode_marker_topic`, after renaming.
+            storage (Optional[StorageConfig]): The MCAP compression and
+                chunking configuration. Defaults to None, which keeps the
+                defaults of the storage plugin.
+            **storage_kwargs: Additional keyword arguments passed to
+                `rosbag2_py.StorageOptions`.
+        """
+        self.uri = uri
+        self.split_cfg = SplitConfig() if split is None else split
+        self.static_topics = set() if static_topics is None else static_topics
+        self.static_cache = (
+            StaticMessageCache() if static_cache is None else static_cache
+        )
+        self.marker_topic = marker_topic
+        self.storage = StorageConfig() if storage is None else storage
+        self.storage_kwargs = storage_kwargs
+        self._storage_config_uri = self._dump_storage_config()
+        if self._storage_config_uri is not None:
+            self.storage_kwargs["storage_config_uri"] = (
+                self._storage_config_uri
+            )
+        self._first_write_time: Optional[float] = None
+        self._close_time: Optional[float] = None
+        self.splits: List[SplitInfo] = []
+        self._topics: Dict[str, rosbag2_py.TopicMetadata] = dict()
+        self._writer: Optional[rosbag2_py.SequentialWriter] = None
+        self._num_replayed = 0
+        self._written_static = set()
+
+        if self.split_cfg.enabled:
+            os.makedirs(self.uri, exist_ok=True)
+        self._open()
+
+    def _dump_storage_config(self) -> Optional[str]:
+        """Writes the MCAP writer options into a temporary YAML file.
+
+        The file cannot be placed in `uri`, because rosbag2 requires the
+        bag directory not to exist when it is opened.
+
+        Returns:
+            Optional[str]: The file path, or None if nothing is configured.
+        """
+        options = self.storage.to_writer_options()
+        if not options:
+            return None
+        lines = []
+        for key, value in options.items():
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            lines.append(f"{key}: {value}\n")
+        with tempfile.NamedTemporaryFile(
+            "w", prefix="mcap_storage_", suffix=".yaml", delete=False
+        ) as fw:
+            fw.writelines(lines)
+        return fw.name
+
+    @property
+    def current(self) -> SplitInfo:
+        """The split currently written."""
+        return self.splits[-1]
+
+    def _open(self):
+        index = len(self.splits)
+        if self.split_cfg.enabled:
+            uri = os.path.join(self.uri, f"part_{index:04d}")
+        else:
+            uri = self.uri
+        writer = rosbag2_py.SequentialWriter()
+        writer.open(
+            rosbag2_py.StorageOptions(
+                uri=uri, storage_id="mcap", **self.storage_kwargs
+            ),
+            rosbag2_py.ConverterOptions(
+                input_serialization_format="cdr",
+                output_serialization_format="cdr",
+            ),
+        )
+        for metadata in self._topics.values():
+            writer.create_topic(metadata)
+        self._writer = writer
+        self.splits.append(SplitInfo(index=index, uri=uri))
+        self._written_static = set()
+        self._num_replayed = len(self.sync_static())
+
+    def sync_static(self) -> List[StaticMessage]:
+        """Writes the cached static messages missing in the current split.
+
+        Re-emitted static messages keep their original timestamps, which
+        are excluded from the time range of the split. Messages of topics
+        not registered yet are left for a later call, e.g. when the cache
+        outlives the bag in daemon mode.
+
+        Returns:
+            List[StaticMessage]: The written messages.
+        """
+        written = []
+        for key, msg in self.static_cache.items():
+            if key in self._written_static or msg.topic not in self._topics:
+                continue
+            if self._first_write_time is None:
+                self._first_write_time = time.monotonic()
+            self._writer.write(msg.topic, msg.data, msg.timestamp)
+            self.current.update(
+                msg.timestamp, len(msg.data), update_range=False
+            )
+            self._written_static.add(key)
+            written.append(msg)
+        return written
+
+    def _close_writer(self):
+        if self._writer is None:
+            return
+        close = getattr(self._writer, "close", None)
+        if close is not None:
+            close()
+        # The destructor of the writer handles the file closing on
+        # distributions without `close`.
+        self._writer = None
+
+    def _should_split(self, topic: str, timestamp: int) -> bool:
+        if not self.split_cfg.enabled:
+            return False
+        if self.current.message_count <= self._num_replayed:
+            # empty, or only re-emitted static messages so far
+            return False
+        if self.marker_topic is not None and topic == self.marker_topic:
+            return True
+        if (
+            self.split_cfg.max_file_size is not None
+            and self.current.size_bytes >= self.split_cfg.max_file_size
+        ):
+            return True
+        if (
+            self.split_cfg.max_duration_sec is not None
+            and self.current.start_time_ns is not None
+            and timestamp - self.current.start_time_ns
+            >= self.split_cfg.max_duration_sec * 1e9
+        ):
+            return True
+        return False
+
+    def _write(self, topic: str, data: bytes, timestamp: int):
+        if self._first_write_time is None:
+            self._first_write_time = time.monotonic()
+        self._writer.write(topic, data, timestamp)
+        self.current.update(timestamp, len(data))
+
+    def split(self):
+        """Closes the current split and opens a new one."""
+        self._close_writer()
+        self.write_manifest()
+        self._open()
+
+    def create_topic(self, metadata: rosbag2_py.TopicMetadata):
+        """Registers a topic in the current and the following splits.
+
+        Args:
+            metadata (rosbag2_py.TopicMetadata): The topic metadata.
+        """
+        self._topics[metadata.name] = metadata
+        self._writer.create_topic(metadata)
+
+    def write(self, topic: str, data: bytes, timestamp: int):
+        """Writes a serialized message, splitting the bag if needed.
+
+        Args:
+            topic (str): The writting topic name.
+            data (bytes): The serialized message.
+            timestamp (int): The log time in nanoseconds.
+        """
+        if self._should_split(topic, timestamp):
+            self.split()
+        if topic in self.static_topics:
+            key = self.static_cache.add(topic, data, timestamp)
+            if key is not None:
+                self._written_static.add(key)
+        self._write(topic, data, timestamp)
+
+    def fsync(self):
+        """Flushes the files of the current split to the disk.
+
+        This only forces the data already written by the storage plugin,
+        and may be called from another thread than the writer.
+        """
+        for path in glob.glob(os.path.join(self.current.uri, "*.mcap")):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def write_manifest(self):
+        """Writes the split manifest when splitting is enabled."""
+        if not self.split_cfg.enabled:
+            return
+        manifest = {
+            "splits": [split.to_dict(self.uri) for split in self.splits],
+        }
+        manifest_file = os.path.join(self.uri, self.MANIFEST_FILE)
+        tmp_file = manifest_file + ".tmp"
+        with open(tmp_file, "w") as fw:
+            json.dump(manifest, fw, indent=4)
+        os.replace(tmp_file, manifest_file)
+
+    def close(self):
+        """Closes the current split and writes the manifest."""
+        self._close_writer()
+        self._close_time = time.monotonic()
+        self.write_manifest()
+        if self._storage_config_uri is not None and os.path.exists(
+            self._storage_config_uri
+        ):
+            os.remove(self._storage_config_uri)
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Gets the write throughput and the file size of the recording.
+
+        The throughput is measured from the first write to the closing of
+        the bag, including the time spent flushing the rosbag2 cache.
+
+        Returns:
+            Dict[str, Any]: The storage preset, the serialized and on-disk
+            sizes in bytes, the compression ratio, the wall time in seconds
+            and the write throughput in bytes per second.
+        """
+        serialized_bytes = sum(split.size_bytes for split in self.splits)
+        file_bytes = sum(
+            os.path.getsize(f)
+            for split in self.splits
+            for f in glob.glob(os.path.join(split.uri, "*.mcap"))
+        )
+        if self._first_write_time is None:
+            wall_time = 0.0
+        else:
+            end_time = (
+                time.monotonic()
+                if self._close_time is None
+                else self._close_time
+            )
+            wall_time = end_time - self._first_write_time
+        return {
+            "storage": self.storage.name,
+            "serialized_bytes": serialized_bytes,
+            "file_bytes": file_bytes,
+            "compression_ratio": (
+                serialized_bytes / file_bytes if file_bytes > 0 else 0.0
+            ),
+            "wall_time_sec": wall_time,
+            "throughput_bytes_per_sec": (
+                serialized_bytes / wall_time if wall_time > 0 else 0.0
+            ),
+        }
@@ -0,0 +1,92 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import struct
+from typing import Optional
+
+__all__ = [
+    "CDR_HEADER_SIZE",
+    "HEADER_TYPE_NAMES",
+    "find_header_field",
+    "get_header_stamp_offset",
+    "read_stamp_ns",
+]
+
+CDR_HEADER_SIZE = 4
+"""Size of the encapsulation header that prefixes every CDR buffer."""
+
+HEADER_TYPE_NAMES = ("std_msgs/Header", "std_msgs/msg/Header")
+"""Type names of `std_msgs/Header` reported by rosidl message classes."""
+
+_STAMP_LE = struct.Struct("<iI")
+_STAMP_BE = struct.Struct(">iI")
+
+
+def find_header_field(msg_class: type) -> Optional[int]:
+    """Finds the position of the `header` field of a message class.
+
+    Args:
+        msg_class (type): The rosidl generated message class.
+
+    Returns:
+        Optional[int]: The index of the `header` field among the message
+        fields, or None if the message has no `std_msgs/Header` header.
+    """
+    get_fields = getattr(msg_class, "get_fields_and_field_types", None)
+    if get_fields is None:
+        return None
+    for idx, (name, type_name) in enumerate(get_fields().items()):
+        if name == "header" and type_name in HEADER_TYPE_NAMES:
+            return idx
+    return None
+
+
+def get_header_stamp_offset(msg_class: type) -> Optional[int]:
+    """Gets the byte offset of `header.stamp` in a serialized message.
+
+    The offset is only fixed when `header` is the first field, because
+    `builtin_interfaces/Time` is the first member of `std_msgs/Header`
+    and the CDR alignment restarts after the encapsulation header.
+
+    Args:
+        msg_class (type): The rosidl generated message class.
+
+    Returns:
+        Optional[int]: The offset of `header.stamp.sec`, or None if the
+        stamp cannot be located without deserialization.
+    """
+    if find_header_field(msg_class) == 0:
+        return CDR_HEADER_SIZE
+    return None
+
+
+def read_stamp_ns(data: bytes, offset: int = CDR_HEADER_SIZE) -> int:
+    """Reads a `builtin_interfaces/Time` from a serialized CDR buffer.
+
+    Args:
+        data (bytes): The serialized message, including the encapsulation
+            header.
+        offset (int): The offset of the `sec` field. Defaults to
+            `CDR_HEADER_SIZE`.
+
+    Returns:
+        int: The timestamp in nanoseconds.
+    """
+    # The second byte of the encapsulation header is 0x01 for
+    # little-endian CDR and 0x00 for big-endian CDR.
+    codec = _STAMP_LE if data[1] & 0x01 else _STAMP_BE
+    sec, nanosec = codec.unpack_from(data, offset)
+    return sec * 1_000_000_000 + nanosec
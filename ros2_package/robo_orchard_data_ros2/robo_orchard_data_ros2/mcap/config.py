@@ -14,15 +14,45 @@
 # implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
-from typing import List, Literal, Mapping, Optional, Set
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Set,
+)
 
 from pydantic import BaseModel, Field
-from rclpy.qos import DurabilityPolicy, HistoryPolicy, ReliabilityPolicy
+
+try:
+    from robo_orchard_data_ros2.codec.image.codec import (
+        JpegCodecConfig,
+        PngCodecConfig,
+    )
+
+    ImageCodecConfig = JpegCodecConfig | PngCodecConfig
+except ImportError:
+    # the image codecs require OpenCV and ROS 2, which the offline tools
+    # like mcap_validate do not. The codec config is kept as parsed.
+    ImageCodecConfig = Dict[str, Any]
 
 __all__ = [
     "QosProfile",
     "FrameRateMonitor",
+    "ThrottleConfig",
     "TopicSpec",
+    "ExecutorConfig",
+    "SplitConfig",
+    "StorageConfig",
+    "DiscoveryConfig",
+    "MetricsConfig",
+    "MemoryConfig",
+    "CrashSafetyConfig",
+    "PrerollConfig",
+    "WriterGroupConfig",
     "RecordConfig",
 ]
 
@@ -48,10 +78,12 @@ class QosProfile(BaseModel):
             last `depth` messages are retained.
     """
 
+    # the values of the rclpy.qos enums, so that the config is read
+    # without ROS 2
     depth: int = 10
-    reliability: int = ReliabilityPolicy.RELIABLE
-    durability: int = DurabilityPolicy.VOLATILE
-    history: int = HistoryPolicy.KEEP_LAST
+    reliability: int = 1  # ReliabilityPolicy.RELIABLE
+    durability: int = 2  # DurabilityPolicy.VOLATILE
+    history: int = 1  # HistoryPolicy.KEEP_LAST
 
 
 class FrameRateMonitor(BaseModel):
@@ -72,11 +104,49 @@ class FrameRateMonitor(BaseModel):
             rate calculation. Larger values smooth outliers but increase
             latency in detecting rate changes. Default=10000 (the same sa
             ros2 topic hz tools).
+        max_jitter_ms (float | None): Maximum permitted standard deviation
+            of the inter-arrival intervals (ms). Default=None (unchecked).
+        max_gap_ms (float | None): Maximum permitted interval between two
+            consecutive frames (ms). Default=None (unchecked).
     """
 
     min_hz: float = 0
     max_hz: float = 10e9
-    window_size: int = 10000
+    window_size: int = Field(default=10000, ge=2)
+    max_jitter_ms: float | None = None
+    max_gap_ms: float | None = None
+
+
+class ThrottleConfig(BaseModel):
+    """Rate limiting and decimation of a topic.
+
+    The filters are applied in the subscription callback before any
+    serialization, in the order change-only, keep every N-th, maximum
+    rate.
+
+    Attributes:
+        max_hz (float | None): The maximum recording rate, in Hz, measured
+            with the receive time. Defaults to `None` (unlimited).
+        keep_every_n (int | None): Keep only every N-th message.
+            Defaults to `None` (keep all).
+        change_only (bool): If `True`, a message is only recorded when its
+            content differs from the last recorded one. It requires the
+            deserialized message, so it disables the raw subscription of
+            the topic. Defaults to `False`.
+        change_tolerance (float): The maximum absolute difference of the
+            numeric values for two messages to be considered equal.
+            Defaults to 0.0.
+        change_fields (List[str] | None): Dotted paths of the fields to
+            compare, e.g. `["position", "velocity", "effort"]` for joint
+            states. Defaults to `None`, which compares all fields except
+            `header`.
+    """
+
+    max_hz: float | None = Field(default=None, gt=0)
+    keep_every_n: int | None = Field(default=None, ge=1)
+    change_only: bool = False
+    change_tolerance: float = Field(default=0.0, ge=0)
+    change_fields: List[str] | None = None
 
 
 class TopicSpec(BaseModel):
@@ -96,6 +166,31 @@ class TopicSpec(BaseModel):
         rename_topic (str | None): Rename to target topic. Defaults to `None`.
         frame_rate_monitor (FrameRateMonitor): The frame rate monitor.
             Defaults to `None`.
+        queue_full_action (Literal["block", "drop_first", "drop_last"]):
+            Action to take when the writer queue is full (i.e., reaches
+            `RecordConfig.writer_queue_size`). Defaults to "block".
+            Options are:
+            - "block": Block the subscription callback until a writer
+              thread frees a slot.
+            - "drop_first": Discard the oldest queued message of this
+              topic.
+            - "drop_last": Discard the newest message (the one being added).
+        priority (int): The priority of the topic for the memory governor.
+            With the `"drop_low_priority"` policy, topics below the highest
+            priority are dropped first. Defaults to 0.
+        expected_message_size (int | None): The typical serialized message
+            size in bytes. It is used for the memory accounting of
+            deserialized messages until their actual size is measured, and
+            for the peak memory forecast. Defaults to `None`.
+        throttle (ThrottleConfig | None): The rate limiting and decimation
+            of the topic. Defaults to `None`, which records all messages.
+        codec (JpegCodecConfig | PngCodecConfig | None): If set, raw
+            `sensor_msgs/msg/Image` messages are encoded by the encoder
+            threads of the recorder and written as
+            `sensor_msgs/msg/CompressedImage`, which replaces a separate
+            `image_encoder` node and its extra DDS hops. The topic is
+            written as `<topic>/compressed` unless `rename_topic` is set.
+            Defaults to `None`.
     """
 
     stamp_type: Literal["recorder_clock", "msg_header_stamp"] = (
@@ -104,6 +199,377 @@ class TopicSpec(BaseModel):
     qos_profile: QosProfile = QosProfile()
     rename_topic: str | None = None
     frame_rate_monitor: FrameRateMonitor | None = None
+    queue_full_action: Literal["block", "drop_first", "drop_last"] = "block"
+    priority: int = 0
+    expected_message_size: int | None = None
+    throttle: ThrottleConfig | None = None
+    codec: ImageCodecConfig | None = None
+
+
+class ExecutorConfig(BaseModel):
+    """Configuration of the executor spinning the recorder node.
+
+    Attributes:
+        type (Literal["single_threaded", "multi_threaded"]): The executor
+            type. `"single_threaded"` services all callbacks in one thread,
+            `"multi_threaded"` uses a `rclpy.executors.MultiThreadedExecutor`.
+            Defaults to `"single_threaded"`.
+        num_threads (int | None): The number of threads of the
+            multi-threaded executor. Defaults to `None`, which means the
+            number of CPU cores.
+        callback_groups (Mapping[str, List[str]]): A mapping of group names
+            to regex patterns or topics. Topics of the same group share a
+            mutually exclusive callback group, e.g. all joint state topics
+            can be serviced by one thread while each camera gets its own.
+            Topics not matching any group get a dedicated callback group.
+            Timers always run in their own callback group. Defaults to an
+            empty mapping.
+    """
+
+    type: Literal["single_threaded", "multi_threaded"] = "single_threaded"
+    num_threads: int | None = None
+    callback_groups: Mapping[str, List[str]] = dict()
+
+
+class SplitConfig(BaseModel):
+    """Configuration of automatic bag splitting.
+
+    When any option is set, the output uri becomes an episode directory
+    containing one bag per split and a `splits.json` manifest listing the
+    splits with their time ranges. Static topics are re-emitted at the head
+    of every split.
+
+    Attributes:
+        max_file_size (int | None): Split when the serialized size of the
+            messages written in the current split reaches this value, in
+            bytes. Defaults to `None` (no size limit).
+        max_duration_sec (float | None): Split when the log time span of
+            the current split reaches this value, in seconds. Defaults to
+            `None` (no duration limit).
+        episode_marker_topic (str | None): Split when a message of this
+            topic arrives, which then starts the new split. The name is the
+            source topic name before renaming. Defaults to `None`.
+    """
+
+    max_file_size: int | None = None
+    max_duration_sec: float | None = None
+    episode_marker_topic: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self.max_file_size is not None
+            or self.max_duration_sec is not None
+            or self.episode_marker_topic is not None
+        )
+
+
+class StorageConfig(BaseModel):
+    """Configuration of the MCAP chunk compression and chunk sizing.
+
+    Named presets bundle the common trade-offs between CPU usage and disk
+    bandwidth. The explicit options override the preset values.
+
+    Presets are:
+    - "fastest_write": No compression, 4 MiB chunks. Lowest CPU usage.
+    - "balanced": Zstd with the fastest level, 4 MiB chunks.
+    - "smallest": Zstd with the slow level, 8 MiB chunks. Smallest files.
+
+    Note:
+        MCAP compresses whole chunks, which mix all topics. A chunk is
+        stored uncompressed when compression does not reduce its size
+        (unless `force_compression` is set), so chunks dominated by
+        already-JPEG'd images do not pay for decompression on read. Use
+        writer groups to write images to a separate uncompressed file.
+
+    Attributes:
+        preset (Literal["fastest_write", "balanced", "smallest"] | None):
+            The named preset. Defaults to `None`, which keeps the defaults
+            of the rosbag2 MCAP storage plugin.
+        compression (Literal["none", "lz4", "zstd"] | None): The chunk
+            compression. Defaults to `None` (use the preset value).
+        compression_level (Literal["fastest", "fast", "default", "slow",
+            "slowest"] | None): The compression level. Defaults to `None`
+            (use the preset value).
+        chunk_size (int | None): The target uncompressed chunk size in
+            bytes. Defaults to `None` (use the preset value).
+        force_compression (bool): Compress chunks even when compression
+            does not reduce their size. Defaults to `False`.
+    """
+
+    preset: Literal["fastest_write", "balanced", "smallest"] | None = None
+    compression: Literal["none", "lz4", "zstd"] | None = None
+    compression_level: (
+        Literal["fastest", "fast", "default", "slow", "slowest"] | None
+    ) = None
+    chunk_size: int | None = None
+    force_compression: bool = False
+
+    PRESETS: ClassVar[Dict[str, Dict[str, Any]]] = {
+        "fastest_write": {
+            "compression": "none",
+            "chunk_size": 4 * 1024 * 1024,
+        },
+        "balanced": {
+            "compression": "zstd",
+            "compression_level": "fastest",
+            "chunk_size": 4 * 1024 * 1024,
+        },
+        "smallest": {
+            "compression": "zstd",
+            "compression_level": "slow",
+            "chunk_size": 8 * 1024 * 1024,
+        },
+    }
+
+    @property
+    def name(self) -> str:
+        """A short description used in logs."""
+        if self.preset is None and not self.to_writer_options():
+            return "default"
+        return self.preset or "custom"
+
+    def to_writer_options(self) -> Dict[str, Any]:
+        """Gets the options of the rosbag2 MCAP storage plugin.
+
+        Returns:
+            Dict[str, Any]: The `McapWriterOptions` fields, which can be
+            written into the YAML file passed as `storage_config_uri`.
+            Empty if nothing is configured.
+        """
+        values = dict(self.PRESETS.get(self.preset, {}))
+        for key in ("compression", "compression_level", "chunk_size"):
+            value = getattr(self, key)
+            if value is not None:
+                values[key] = value
+
+        options = dict()
+        if "compression" in values:
+            options["compression"] = {
+                "none": "None",
+                "lz4": "Lz4",
+                "zstd": "Zstd",
+            }[values["compression"]]
+        if "compression_level" in values:
+            options["compressionLevel"] = values["compression_level"].title()
+        if "chunk_size" in values:
+            options["chunkSize"] = values["chunk_size"]
+        if self.force_compression:
+            options["forceCompression"] = True
+        return options
+
+
+class DiscoveryConfig(BaseModel):
+    """Configuration of the topic discovery.
+
+    Attributes:
+        fallback_period_sec (float): The period of the fallback graph scan,
+            in seconds. Defaults to 5.0.
+        settle_time_sec (float): How long the graph is rescanned after a
+            graph-change event, in seconds. Defaults to 2.0.
+        min_scan_interval_sec (float): The minimum interval between two
+            scans triggered by graph-change events, in seconds.
+            Defaults to 0.5.
+        topic_types (Mapping[str, str]): A precompiled mapping of topics to
+            message types (e.g., `{"/tf": "tf2_msgs/msg/TFMessage"}`). These
+            topics are subscribed at startup without querying the graph.
+            Defaults to an empty mapping.
+        manifest_file (str | None): A json file of the same mapping, e.g.
+            dumped by `ros2 run robo_orchard_data_ros2 mcap_topic_manifest`.
+            Entries of `topic_types` take precedence. Defaults to `None`.
+    """
+
+    fallback_period_sec: float = 5.0
+    settle_time_sec: float = 2.0
+    min_scan_interval_sec: float = 0.5
+    topic_types: Mapping[str, str] = dict()
+    manifest_file: str | None = None
+
+
+class MetricsConfig(BaseModel):
+    """Configuration of the live recorder metrics.
+
+    Per-topic counters of received, written and dropped messages, written
+    bytes and receive-to-write latency histograms are always kept. This
+    configuration decides how they are exported.
+
+    Attributes:
+        period_sec (float): The period of the diagnostics publication, in
+            seconds. Rates are averaged over this period. Defaults to 1.0.
+        diagnostics_topic (str | None): The topic of the
+            `diagnostic_msgs/msg/DiagnosticArray` messages. Defaults to
+            `"~/diagnostics"`, private to the recorder, which never
+            records its own topics. `None` disables the publication.
+        http_host (str): The address of the HTTP endpoint.
+            Defaults to `"127.0.0.1"`.
+        http_port (int | None): The port of the HTTP endpoint serving
+            `/metrics` in the Prometheus text format. 0 picks a free port.
+            Defaults to `None`, which disables the endpoint.
+        latency_buckets_sec (List[float]): The upper bounds of the latency
+            histogram buckets, in seconds.
+        starving_timeout_sec (float): A topic which has received messages
+            is reported as stale if nothing arrives for this long.
+            Defaults to 1.0.
+    """
+
+    period_sec: float = Field(default=1.0, gt=0)
+    diagnostics_topic: str | None = "~/diagnostics"
+    http_host: str = "127.0.0.1"
+    http_port: int | None = None
+    latency_buckets_sec: List[float] = Field(
+        default_factory=lambda: [
+            0.0005,
+            0.001,
+            0.0025,
+            0.005,
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1.0,
+            2.5,
+        ]
+    )
+    starving_timeout_sec: float = 1.0
+
+
+class MemoryConfig(BaseModel):
+    """Configuration of the memory governor.
+
+    The governor accounts the bytes of all in-flight messages, from the
+    subscription callback until they are handed over to rosbag2, whose
+    own cache is bounded by `RecordConfig.max_cache_size`.
+
+    Attributes:
+        max_bytes (int | None): The byte budget of in-flight messages.
+            Defaults to `None`, which means unlimited.
+        policy (Literal["block", "drop_low_priority", "spill"]): Action
+            to take when the budget is exceeded. Defaults to "block".
+            Options are:
+            - "block": Block the subscription callback until the writers
+              free enough memory.
+            - "drop_low_priority": Drop messages of topics below the
+              highest `TopicSpec.priority` once the usage exceeds
+              `low_priority_watermark`, and block the others.
+            - "spill": Move serialized messages to an append-only
+              temporary file, read back by the writers.
+        low_priority_watermark (float): The fraction of the budget above
+            which low priority messages are dropped. Defaults to 0.8.
+        spill_dir (str | None): The directory of the spill file. Defaults
+            to `None`, which uses the system temporary directory. It should
+            be on a different disk than the output for the spill to help.
+    """
+
+    max_bytes: int | None = None
+    policy: Literal["block", "drop_low_priority", "spill"] = "block"
+    low_priority_watermark: float = Field(default=0.8, gt=0, le=1)
+    spill_dir: str | None = None
+
+
+class CrashSafetyConfig(BaseModel):
+    """Configuration bounding the data lost when the recorder is killed.
+
+    A killed recorder leaves the MCAP file without its summary, which
+    `ros2 run robo_orchard_data_ros2 mcap_recover` rebuilds from the
+    complete records on disk. The messages still buffered in the process
+    are lost: the rosbag2 cache and the open MCAP chunk.
+
+    Attributes:
+        max_unflushed_bytes (int | None): The maximum bytes buffered in
+            the process before reaching the file. Half of it bounds the
+            rosbag2 cache (`RecordConfig.max_cache_size`) and the other
+            half the MCAP chunk size, so that at a data rate of R bytes per
+            second at most `max_unflushed_bytes / R` seconds are lost.
+            Smaller chunks cost compression ratio and index size.
+            Defaults to `None`, which keeps the configured sizes.
+        fsync_period_sec (float | None): The period of `fsync` on the
+            output files, in seconds, which bounds the loss on power
+            failure or kernel crash as well. Defaults to `None` (no fsync,
+            the OS page cache survives a killed process).
+    """
+
+    max_unflushed_bytes: int | None = Field(default=None, gt=0)
+    fsync_period_sec: float | None = Field(default=None, gt=0)
+
+    # the default chunk size of the MCAP writer
+    DEFAULT_CHUNK_SIZE: ClassVar[int] = 768 * 1024
+
+    def get_storage(self, storage: StorageConfig) -> StorageConfig:
+        """Bounds the MCAP chunk size of a storage configuration."""
+        if self.max_unflushed_bytes is None:
+            return storage
+        chunk_size = storage.to_writer_options().get(
+            "chunkSize", self.DEFAULT_CHUNK_SIZE
+        )
+        return storage.model_copy(
+            update={
+                "chunk_size": min(chunk_size, self.max_unflushed_bytes // 2)
+            }
+        )
+
+    def get_max_cache_size(self, max_cache_size: int) -> int:
+        """Bounds the rosbag2 cache size."""
+        if self.max_unflushed_bytes is None:
+            return max_cache_size
+        return min(max_cache_size, self.max_unflushed_bytes // 2)
+
+
+class PrerollConfig(BaseModel):
+    """Configuration of the pre-roll ring buffer.
+
+    While the recorder is armed, the messages of all subscribed topics
+    are kept in an in-memory ring. On start, the ring is written first,
+    so that the recording begins with the seconds before the start
+    request instead of the latency of the request.
+
+    Attributes:
+        duration_sec (float | None): The length of the ring, in seconds of
+            receive time. Defaults to `None`, which disables the pre-roll.
+        max_bytes (int): The byte budget of the ring. The oldest messages
+            are evicted first. Deserialized messages are accounted with the
+            serialized size of the first message of their topic. Defaults
+            to `256MB`.
+    """
+
+    duration_sec: float | None = Field(default=None, gt=0)
+    max_bytes: int = Field(default=256 * 1024 * 1024, gt=0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.duration_sec is not None
+
+
+class WriterGroupConfig(BaseModel):
+    """Configuration of a writer group.
+
+    The topics of a writer group are written by their own writer threads
+    into their own bag, which can be placed on another disk to spread the
+    write bandwidth of high-rate streams. All groups share the log time
+    clock of the recorder and are tied together by the episode manifest.
+
+    Attributes:
+        topics (List[str]): Topic names or regex patterns of the source
+            topics written by the group. A topic matching several groups
+            belongs to the first one.
+        uri_root (str | None): The directory holding the bag of the group,
+            e.g. the mount point of another disk. The bag is written to
+            `<uri_root>/<episode>/<group>`, where `<episode>` is the base
+            name of the recorder uri. Defaults to `None`, which writes the
+            bag to `<uri>/<group>`.
+        storage (StorageConfig | None): The MCAP compression and chunking
+            configuration of the group. Defaults to `None`, which uses
+            `RecordConfig.storage`.
+        num_writer_threads (int | None): The number of writer threads of
+            the group. Defaults to `None`, which uses
+            `RecordConfig.num_writer_threads`.
+    """
+
+    topics: List[str]
+    uri_root: str | None = None
+    storage: StorageConfig | None = None
+    num_writer_threads: int | None = Field(default=None, ge=1)
 
 
 class RecordConfig(BaseModel):
@@ -123,7 +589,11 @@ class RecordConfig(BaseModel):
         exclude_patterns (Optional[List[str]]): A list of regex patterns or topics
             specifying which topics should be excluded.
         no_discovery (bool): If `True`, disables automatic topic
-            discovery. Defaults to `False`.
+            discovery. The topics of the discovery manifest are subscribed
+            at startup, or the graph is scanned once if there is no
+            manifest. Defaults to `False`.
+        discovery (DiscoveryConfig): The topic discovery configuration.
+            Defaults to `DiscoveryConfig()`.
         max_cache_size (int): The maximum cache size for recorded
             messages, in bytes. Defaults to `256MB (256 * 1024 * 1024)`.
         wait_for_topics (Set[str]): A set of topic names to wait for before starting the recording process.
@@ -143,6 +613,11 @@ class RecordConfig(BaseModel):
                 (e.g., topics with `Transient Local` durability like `/tf_static`).
                 Defaults to an empty list. These topics are typically recorded with special
                 handling to ensure their data is preserved even if received before recording starts.
+                Their messages are cached as serialized bytes, deduplicated by content, and
+                written into every output file.
+        static_cache_max_bytes (int): The byte budget of the static message cache. When
+            exceeded, the oldest static messages are evicted. Defaults to `16MB`. A value
+            of 0 means unlimited.
         max_timestamp_difference_ns: (int | None): The maximum allowed difference between consecutive message timestamps, in nanoseconds. Defaults to None.
             This parameter defines the threshold for detecting and handling
             timestamp anomalies in incoming messages. If the absolute difference
@@ -153,6 +628,65 @@ class RecordConfig(BaseModel):
             A value of `None` indicates that no timestamp gap check should be performed,
             effectively disabling this feature.  If a value is provided, it should
             be a non-negative integer.
+        reorder_window_ns (int | None): If set, messages are held for this
+            window of log time and written in timestamp order, so that MCAP
+            chunks cover disjoint time ranges and time-range reads touch
+            fewer chunks (e.g., `100_000_000` for 100 ms). Messages arriving
+            behind the window are counted as late and written anyway.
+            When `memory.max_bytes` blocks the subscription callbacks, the
+            held messages are written out early to free the budget.
+            Defaults to None, which writes messages in arrival order.
+        writer_queue_size (int): The maximum number of messages waiting in
+            the hand-off queue between subscription callbacks and writer
+            threads. Defaults to 1024. A value of 0 means unlimited. The
+            action taken when the queue is full is decided by
+            `TopicSpec.queue_full_action`.
+        num_writer_threads (int): The number of writer threads which
+            serialize messages and write them to disk. The messages of a
+            topic are written one at a time, in order. Defaults to 1.
+        num_encoder_threads (int): The number of threads encoding the
+            images of topics with `TopicSpec.codec`. Different topics are
+            encoded in parallel, while the frames of a topic are encoded
+            one at a time, so that they are written in order. The encoder
+            queue is bounded by `writer_queue_size` as well. Defaults
+            to 2.
+        raw_subscription (bool): If `True`, subscribes with serialized CDR
+            buffers and writes them straight through, which skips the
+            deserialize/re-serialize round trip. When `stamp_type` is
+            `"msg_header_stamp"`, the stamp is read from the buffer if
+            `header` is the first message field, otherwise the topic
+            falls back to a deserializing subscription. Defaults to `False`.
+        executor (ExecutorConfig): The executor configuration. Defaults to
+            `ExecutorConfig()`.
+        auto_start (bool): If `True`, recording starts as soon as all
+            `wait_for_topics` are available. Otherwise the recorder stays
+            armed until the `~/start` service is called. Defaults to `True`.
+        split (SplitConfig): The bag splitting configuration. Defaults to
+            `SplitConfig()`, which disables splitting.
+        storage (StorageConfig): The MCAP compression and chunking
+            configuration. Defaults to `StorageConfig()`.
+        metrics (MetricsConfig): The live metrics configuration. Defaults
+            to `MetricsConfig()`.
+        memory (MemoryConfig): The memory governor configuration. Defaults
+            to `MemoryConfig()`.
+        crash_safety (CrashSafetyConfig): The bound of the data lost when
+            the recorder is killed. Defaults to `CrashSafetyConfig()`.
+        sidecar_index (bool): If `True`, a sidecar time index
+            (`<file>.mcap.index`) is built in background for every MCAP
+            file when an episode is closed, which tools can memory map to
+            seek by topic and log time. It reads the message indexes of the
+            MCAP summary only. Defaults to `True`.
+        writer_groups (Mapping[str, WriterGroupConfig]): Writer groups by
+            name, each writing its topics into its own bag in parallel.
+            The topics of no group are written to `uri` as usual, and the
+            bags of the groups are listed with their splits in
+            `<uri>/episode_manifest.json`. Static topics are written into
+            every group, `split` applies to each group on its own, and
+            the episode marker only splits the group it belongs to.
+            Defaults to an empty mapping (a single bag).
+        preroll (PrerollConfig): The pre-roll ring buffer, which is
+            useful with `auto_start=False`. Defaults to `PrerollConfig()`,
+            which disables it.
     """  # noqa
 
     topic_spec: Mapping[str, TopicSpec] = dict()
@@ -160,7 +694,24 @@ class RecordConfig(BaseModel):
     include_patterns: Optional[List[str]] = None
     exclude_patterns: Optional[List[str]] = None
     no_discovery: bool = False
+    discovery: DiscoveryConfig = DiscoveryConfig()
     max_cache_size: int = 256 * 1024 * 1024  # 256mb
     wait_for_topics: Set[str] = Field(default_factory=lambda: set())
     static_topics: List[str] = Field(default_factory=lambda: [])
+    static_cache_max_bytes: int = 16 * 1024 * 1024  # 16mb
     max_timestamp_difference_ns: int | None = None
+    reorder_window_ns: int | None = Field(default=None, ge=0)
+    writer_queue_size: int = 1024
+    num_writer_threads: int = 1
+    num_encoder_threads: int = Field(default=2, ge=1)
+    raw_subscription: bool = False
+    executor: ExecutorConfig = ExecutorConfig()
+    auto_start: bool = True
+    split: SplitConfig = SplitConfig()
+    storage: StorageConfig = StorageConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    memory: MemoryConfig = MemoryConfig()
+    crash_safety: CrashSafetyConfig = CrashSafetyConfig()
+    sidecar_index: bool = True
+    writer_groups: Mapping[str, WriterGroupConfig] = dict()
+    preroll: PrerollConfig = PrerollConfig()
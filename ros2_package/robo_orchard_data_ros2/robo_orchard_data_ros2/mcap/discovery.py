@@ -0,0 +1,217 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import argparse
+import functools
+import importlib
+import json
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import rclpy
+from rcl_interfaces.msg import ParameterEvent
+from rclpy.callback_groups import CallbackGroup
+from rclpy.node import Node
+from rclpy.qos import qos_profile_parameter_events
+
+from robo_orchard_data_ros2.mcap.config import DiscoveryConfig
+
+__all__ = [
+    "get_message_class",
+    "load_topic_manifest",
+    "TopicDiscovery",
+]
+
+
+@functools.lru_cache(maxsize=None)
+def get_message_class(msg_type: str) -> type:
+    """Imports a message class, with a process-wide cache.
+
+    Args:
+        msg_type (str): The ROS 2 message type (e.g.,
+            "std_msgs/msg/String").
+
+    Returns:
+        type: The message class.
+
+    Raises:
+        ImportError: If the module cannot be imported.
+        AttributeError: If the module has no such message.
+        ValueError: If the message type is malformed.
+    """
+    module_name, class_name = msg_type.rsplit("/", 1)
+    module = importlib.import_module(".".join(module_name.split("/")))
+    return getattr(module, class_name)
+
+
+def load_topic_manifest(config: DiscoveryConfig) -> Dict[str, str]:
+    """Loads the precompiled topic to type mapping.
+
+    Args:
+        config (DiscoveryConfig): The discovery configuration.
+
+    Returns:
+        Dict[str, str]: The mapping of `config.manifest_file` updated with
+        `config.topic_types`.
+
+    Raises:
+        FileNotFoundError: If the manifest file does not exist.
+    """
+    topic_types = dict()
+    if config.manifest_file is not None:
+        if not os.path.exists(config.manifest_file):
+            raise FileNotFoundError(
+                "topic manifest {} does not exists!".format(
+                    config.manifest_file
+                )
+            )
+        with open(config.manifest_file, "r") as fr:
+            topic_types.update(json.load(fr))
+    topic_types.update(config.topic_types)
+    return topic_types
+
+
+class TopicDiscovery:
+    """Incremental topic discovery driven by graph changes.
+
+    rclpy does not expose the graph guard condition, so node start-ups
+    observed on `/parameter_events` are used as graph-change events: every
+    node announces its parameters when it starts, shortly before it
+    creates its publishers. After such an event the graph is scanned a
+    few times during `settle_time_sec`. A slow fallback scan catches
+    publishers created later by existing nodes, or by nodes without
+    parameter events.
+
+    Each scan only reports the topics which have not been seen before.
+    """
+
+    POLL_PERIOD = 0.25
+
+    def __init__(
+        self,
+        node: Node,
+        callback: Callable[[List[Tuple[str, str]]], None],
+        config: Optional[DiscoveryConfig] = None,
+        callback_group: Optional[CallbackGroup] = None,
+    ):
+        """Constructor.
+
+        Args:
+            node (Node): The node used to query the graph.
+            callback (Callable[[List[Tuple[str, str]]], None]): Called with
+                the new `(topic, msg_type)` pairs.
+            config (Optional[DiscoveryConfig]): The discovery
+                configuration. Defaults to `DiscoveryConfig()`.
+            callback_group (Optional[CallbackGroup]): The callback group of
+                the timer and the `/parameter_events` subscription.
+        """
+        self.node = node
+        self.callback = callback
+        self.config = DiscoveryConfig() if config is None else config
+        self.known_topics = set()
+        self.scan_count = 0
+        self._dirty_until = 0.0
+        self._last_scan = 0.0
+        self._sub = node.create_subscription(
+            ParameterEvent,
+            "/parameter_events",
+            self._on_parameter_event,
+            qos_profile_parameter_events,
+            callback_group=callback_group,
+        )
+        self._timer = node.create_timer(
+            self.POLL_PERIOD, self._on_timer, callback_group=callback_group
+        )
+
+    def _on_parameter_event(self, msg: ParameterEvent):
+        if msg.new_parameters:
+            self.notify()
+
+    def notify(self):
+        """Marks the graph as changed."""
+        self._dirty_until = time.monotonic() + self.config.settle_time_sec
+
+    def _on_timer(self):
+        now = time.monotonic()
+        since_last_scan = now - self._last_scan
+        if now <= self._dirty_until:
+            if since_last_scan < self.config.min_scan_interval_sec:
+                return
+        elif since_last_scan < self.config.fallback_period_sec:
+            return
+        self.scan()
+
+    def add_known_topics(self, topics):
+        """Marks topics as known, e.g. topics subscribed from a manifest."""
+        self.known_topics.update(topics)
+
+    def scan(self):
+        """Queries the graph and reports the new topics."""
+        self._last_scan = time.monotonic()
+        self.scan_count += 1
+        new_topics = []
+        for topic, msg_types in self.node.get_topic_names_and_types():
+            if topic in self.known_topics:
+                continue
+            self.known_topics.add(topic)
+            new_topics.append((topic, msg_types[0]))
+        if new_topics:
+            self.callback(new_topics)
+
+    def destroy(self):
+        self.node.destroy_timer(self._timer)
+        self.node.destroy_subscription(self._sub)
+
+
+def main(args=None):
+    """Dumps the current topic to type mapping into a manifest file.
+
+    The manifest can be used as `DiscoveryConfig.manifest_file`, so that
+    the recorder subscribes to all topics at startup without querying the
+    graph.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output", type=str, help="output json file")
+    parser.add_argument(
+        "--wait",
+        type=float,
+        default=3.0,
+        help="Seconds to wait for discovery before dumping.",
+    )
+    cli_args, ros_args = parser.parse_known_args(args)
+
+    rclpy.init(args=ros_args)
+    node = Node("mcap_topic_manifest")
+    try:
+        end_time = time.monotonic() + cli_args.wait
+        while time.monotonic() < end_time:
+            rclpy.spin_once(node, timeout_sec=0.1)
+        topic_types = {
+            topic: msg_types[0]
+            for topic, msg_types in node.get_topic_names_and_types()
+        }
+    finally:
+        node.destroy_node()
+        rclpy.shutdown()
+
+    with open(cli_args.output, "w") as fw:
+        json.dump(topic_types, fw, indent=4, sort_keys=True)
+    print(f"Dump {len(topic_types)} topics to {cli_args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,665 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import enum
+import struct
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Tuple
+
+__all__ = [
+    "MAGIC",
+    "RECORD_PREFIX_SIZE",
+    "Opcode",
+    "McapFormatError",
+    "RecordHeader",
+    "Schema",
+    "Channel",
+    "Message",
+    "Chunk",
+    "MessageIndex",
+    "ChunkIndex",
+    "Attachment",
+    "AttachmentIndex",
+    "Metadata",
+    "MetadataIndex",
+    "Statistics",
+    "SummaryOffset",
+    "Footer",
+    "DataEnd",
+    "read_record_headers",
+    "iter_chunk_records",
+    "encode_record",
+    "decompress",
+]
+
+# A minimal streaming codec of the MCAP records needed by the recorder
+# tools, see https://mcap.dev/spec. Records are walked without loading
+# the file, so that truncated recordings can be scanned and repaired.
+
+MAGIC = b"\x89MCAP0\r\n"
+RECORD_PREFIX_SIZE = 9  # opcode (u8) + content length (u64)
+
+
+class Opcode(enum.IntEnum):
+    HEADER = 0x01
+    FOOTER = 0x02
+    SCHEMA = 0x03
+    CHANNEL = 0x04
+    MESSAGE = 0x05
+    CHUNK = 0x06
+    MESSAGE_INDEX = 0x07
+    CHUNK_INDEX = 0x08
+    ATTACHMENT = 0x09
+    ATTACHMENT_INDEX = 0x0A
+    STATISTICS = 0x0B
+    METADATA = 0x0C
+    METADATA_INDEX = 0x0D
+    SUMMARY_OFFSET = 0x0E
+    DATA_END = 0x0F
+
+
+class McapFormatError(Exception):
+    """Exception raised for truncated or malformed MCAP content."""
+
+    pass
+
+
+class _Reader:
+    """Little-endian cursor over a record content."""
+
+    def __init__(self, data: bytes | memoryview, offset: int = 0):
+        self.data = memoryview(data)
+        self.offset = offset
+
+    def _unpack(self, fmt: str, size: int):
+        if self.offset + size > len(self.data):
+            raise McapFormatError("record content is truncated")
+        value = struct.unpack_from(fmt, self.data, self.offset)[0]
+        self.offset += size
+        return value
+
+    def u8(self) -> int:
+        return self._unpack("<B", 1)
+
+    def u16(self) -> int:
+        return self._unpack("<H", 2)
+
+    def u32(self) -> int:
+        return self._unpack("<I", 4)
+
+    def u64(self) -> int:
+        return self._unpack("<Q", 8)
+
+    def raw(self, size: int) -> memoryview:
+        if self.offset + size > len(self.data):
+            raise McapFormatError("record content is truncated")
+        value = self.data[self.offset : self.offset + size]
+        self.offset += size
+        return value
+
+    def string(self) -> str:
+        return str(self.raw(self.u32()), "utf-8")
+
+    def string_map(self) -> Dict[str, str]:
+        end = self.u32() + self.offset
+        ret = dict()
+        while self.offset < end:
+            key = self.string()
+            ret[key] = self.string()
+        return ret
+
+    def rest(self) -> memoryview:
+        return self.raw(len(self.data) - self.offset)
+
+
+class _Writer:
+    """Little-endian builder of a record content."""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def u8(self, value: int) -> "_Writer":
+        self.parts.append(struct.pack("<B", value))
+        return self
+
+    def u16(self, value: int) -> "_Writer":
+        self.parts.append(struct.pack("<H", value))
+        return self
+
+    def u32(self, value: int) -> "_Writer":
+        self.parts.append(struct.pack("<I", value))
+        return self
+
+    def u64(self, value: int) -> "_Writer":
+        self.parts.append(struct.pack("<Q", value))
+        return self
+
+    def raw(self, value: bytes) -> "_Writer":
+        self.parts.append(bytes(value))
+        return self
+
+    def string(self, value: str) -> "_Writer":
+        data = value.encode("utf-8")
+        return self.u32(len(data)).raw(data)
+
+    def string_map(self, value: Dict[str, str]) -> "_Writer":
+        entries = _Writer()
+        for key, item in value.items():
+            entries.string(key).string(item)
+        data = entries.build()
+        return self.u32(len(data)).raw(data)
+
+    def build(self) -> bytes:
+        return b"".join(self.parts)
+
+
+class RecordHeader(NamedTuple):
+    """Location of a record in a file.
+
+    Attributes:
+        offset (int): The offset of the opcode in the file.
+        opcode (int): The record opcode.
+        length (int): The length of the record content.
+    """
+
+    offset: int
+    opcode: int
+    length: int
+
+    @property
+    def content_offset(self) -> int:
+        return self.offset + RECORD_PREFIX_SIZE
+
+    @property
+    def end(self) -> int:
+        """The offset following the record."""
+        return self.offset + RECORD_PREFIX_SIZE + self.length
+
+
+class Schema(NamedTuple):
+    id: int
+    name: str
+    encoding: str
+    data: bytes
+
+    OPCODE = Opcode.SCHEMA
+
+    @classmethod
+    def parse(cls, content) -> "Schema":
+        reader = _Reader(content)
+        return cls(
+            id=reader.u16(),
+            name=reader.string(),
+            encoding=reader.string(),
+            data=bytes(reader.raw(reader.u32())),
+        )
+
+    def encode(self) -> bytes:
+        return (
+            _Writer()
+            .u16(self.id)
+            .string(self.name)
+            .string(self.encoding)
+            .u32(len(self.data))
+            .raw(self.data)
+            .build()
+        )
+
+
+class Channel(NamedTuple):
+    id: int
+    schema_id: int
+    topic: str
+    message_encoding: str
+    metadata: Dict[str, str]
+
+    OPCODE = Opcode.CHANNEL
+
+    @classmethod
+    def parse(cls, content) -> "Channel":
+        reader = _Reader(content)
+        return cls(
+            id=reader.u16(),
+            schema_id=reader.u16(),
+            topic=reader.string(),
+            message_encoding=reader.string(),
+            metadata=reader.string_map(),
+        )
+
+    def encode(self) -> bytes:
+        return (
+            _Writer()
+            .u16(self.id)
+            .u16(self.schema_id)
+            .string(self.topic)
+            .string(self.message_encoding)
+            .string_map(self.metadata)
+            .build()
+        )
+
+
+class Message(NamedTuple):
+    channel_id: int
+    sequence: int
+    log_time: int
+    publish_time: int
+    data: memoryview
+
+    OPCODE = Opcode.MESSAGE
+
+    @classmethod
+    def parse(cls, content) -> "Message":
+        reader = _Reader(content)
+        return cls(
+            channel_id=reader.u16(),
+            sequence=reader.u32(),
+            log_time=reader.u64(),
+            publish_time=reader.u64(),
+            data=reader.rest(),
+        )
+
+
+class Chunk(NamedTuple):
+    message_start_time: int
+    message_end_time: int
+    uncompressed_size: int
+    uncompressed_crc: int
+    compression: str
+    records: memoryview
+
+    OPCODE = Opcode.CHUNK
+
+    @classmethod
+    def parse(cls, content) -> "Chunk":
+        reader = _Reader(content)
+        return cls(
+            message_start_time=reader.u64(),
+            message_end_time=reader.u64(),
+            uncompressed_size=reader.u64(),
+            uncompressed_crc=reader.u32(),
+            compression=reader.string(),
+            records=reader.raw(reader.u64()),
+        )
+
+    def decompress(self) -> bytes:
+        """Decompresses and checks the records of the chunk.
+
+        Raises:
+            McapFormatError: If the records cannot be decompressed or do
+                not match the CRC.
+        """
+        try:
+            data = decompress(
+                self.compression, self.records, self.uncompressed_size
+            )
+        except (McapFormatError, ImportError):
+            raise
+        except Exception as e:
+            raise McapFormatError(f"cannot decompress chunk: {e}") from e
+        if len(data) != self.uncompressed_size:
+            raise McapFormatError("chunk size mismatch")
+        if self.uncompressed_crc != 0 and (
+            zlib.crc32(data) != self.uncompressed_crc
+        ):
+            raise McapFormatError("chunk CRC mismatch")
+        return data
+
+
+class MessageIndex(NamedTuple):
+    channel_id: int
+    records: List[Tuple[int, int]]
+
+    OPCODE = Opcode.MESSAGE_INDEX
+
+    @classmethod
+    def parse(cls, content) -> "MessageIndex":
+        reader = _Reader(content)
+        channel_id = reader.u16()
+        end = reader.u32() + reader.offset
+        records = []
+        while reader.offset < end:
+            records.append((reader.u64(), reader.u64()))
+        return cls(channel_id=channel_id, records=records)
+
+    def encode(self) -> bytes:
+        records = _Writer()
+        for log_time, offset in self.records:
+            records.u64(log_time).u64(offset)
+        records = records.build()
+        return (
+            _Writer()
+            .u16(self.channel_id)
+            .u32(len(records))
+            .raw(records)
+            .build()
+        )
+
+
+class ChunkIndex(NamedTuple):
+    message_start_time: int
+    message_end_time: int
+    chunk_start_offset: int
+    chunk_length: int
+    message_index_offsets: Dict[int, int]
+    message_index_length: int
+    compression: str
+    compressed_size: int
+    uncompressed_size: int
+
+    OPCODE = Opcode.CHUNK_INDEX
+
+    @classmethod
+    def parse(cls, content) -> "ChunkIndex":
+        reader = _Reader(content)
+        start, end = reader.u64(), reader.u64()
+        chunk_start_offset, chunk_length = reader.u64(), reader.u64()
+        offsets_end = reader.u32() + reader.offset
+        offsets = dict()
+        while reader.offset < offsets_end:
+            channel_id = reader.u16()
+            offsets[channel_id] = reader.u64()
+        return cls(
+            message_start_time=start,
+            message_end_time=end,
+            chunk_start_offset=chunk_start_offset,
+            chunk_length=chunk_length,
+            message_index_offsets=offsets,
+            message_index_length=reader.u64(),
+            compression=reader.string(),
+            compressed_size=reader.u64(),
+            uncompressed_size=reader.u64(),
+        )
+
+    def encode(self) -> bytes:
+        offsets = _Writer()
+        for channel_id, offset in sorted(self.message_index_offsets.items()):
+            offsets.u16(channel_id).u64(offset)
+        offsets = offsets.build()
+        return (
+            _Writer()
+            .u64(self.message_start_time)
+            .u64(self.message_end_time)
+            .u64(self.chunk_start_offset)
+            .u64(self.chunk_length)
+            .u32(len(offsets))
+            .raw(offsets)
+            .u64(self.message_index_length)
+            .string(self.compression)
+            .u64(self.compressed_size)
+            .u64(self.uncompressed_size)
+            .build()
+        )
+
+
+class Attachment(NamedTuple):
+    log_time: int
+    create_time: int
+    name: str
+    media_type: str
+    data_size: int
+
+    OPCODE = Opcode.ATTACHMENT
+
+    @classmethod
+    def parse(cls, content) -> "Attachment":
+        reader = _Reader(content)
+        log_time, create_time = reader.u64(), reader.u64()
+        name, media_type = reader.string(), reader.string()
+        data_size = reader.u64()
+        reader.raw(data_size)
+        reader.u32()  # crc
+        return cls(log_time, create_time, name, media_type, data_size)
+
+
+class AttachmentIndex(NamedTuple):
+    offset: int
+    length: int
+    log_time: int
+    create_time: int
+    data_size: int
+    name: str
+    media_type: str
+
+    OPCODE = Opcode.ATTACHMENT_INDEX
+
+    def encode(self) -> bytes:
+        return (
+            _Writer()
+            .u64(self.offset)
+            .u64(self.length)
+            .u64(self.log_time)
+            .u64(self.create_time)
+            .u64(self.data_size)
+            .string(self.name)
+            .string(self.media_type)
+            .build()
+        )
+
+
+class Metadata(NamedTuple):
+    name: str
+    metadata: Dict[str, str]
+
+    OPCODE = Opcode.METADATA
+
+    @classmethod
+    def parse(cls, content) -> "Metadata":
+        reader = _Reader(content)
+        return cls(name=reader.string(), metadata=reader.string_map())
+
+
+class MetadataIndex(NamedTuple):
+    offset: int
+    length: int
+    name: str
+
+    OPCODE = Opcode.METADATA_INDEX
+
+    def encode(self) -> bytes:
+        return (
+            _Writer()
+            .u64(self.offset)
+            .u64(self.length)
+            .string(self.name)
+            .build()
+        )
+
+
+class Statistics(NamedTuple):
+    message_count: int
+    schema_count: int
+    channel_count: int
+    attachment_count: int
+    metadata_count: int
+    chunk_count: int
+    message_start_time: int
+    message_end_time: int
+    channel_message_counts: Dict[int, int]
+
+    OPCODE = Opcode.STATISTICS
+
+    def encode(self) -> bytes:
+        counts = _Writer()
+        for channel_id, count in sorted(self.channel_message_counts.items()):
+            counts.u16(channel_id).u64(count)
+        counts = counts.build()
+        return (
+            _Writer()
+            .u64(self.message_count)
+            .u16(self.schema_count)
+            .u32(self.channel_count)
+            .u32(self.attachment_count)
+            .u32(self.metadata_count)
+            .u32(self.chunk_count)
+            .u64(self.message_start_time)
+            .u64(self.message_end_time)
+            .u32(len(counts))
+            .raw(counts)
+            .build()
+        )
+
+
+class SummaryOffset(NamedTuple):
+    group_opcode: int
+    group_start: int
+    group_length: int
+
+    OPCODE = Opcode.SUMMARY_OFFSET
+
+    def encode(self) -> bytes:
+        return (
+            _Writer()
+            .u8(self.group_opcode)
+            .u64(self.group_start)
+            .u64(self.group_length)
+            .build()
+        )
+
+
+class Footer(NamedTuple):
+    summary_start: int
+    summary_offset_start: int
+    summary_crc: int
+
+    OPCODE = Opcode.FOOTER
+
+    @classmethod
+    def parse(cls, content) -> "Footer":
+        reader = _Reader(content)
+        return cls(reader.u64(), reader.u64(), reader.u32())
+
+    def encode(self) -> bytes:
+        return (
+            _Writer()
+            .u64(self.summary_start)
+            .u64(self.summary_offset_start)
+            .u32(self.summary_crc)
+            .build()
+        )
+
+
+class DataEnd(NamedTuple):
+    data_section_crc: int
+
+    OPCODE = Opcode.DATA_END
+
+    def encode(self) -> bytes:
+        return _Writer().u32(self.data_section_crc).build()
+
+
+def encode_record(record) -> bytes:
+    """Encodes a record with its opcode and length prefix."""
+    content = record.encode()
+    return struct.pack("<BQ", record.OPCODE, len(content)) + content
+
+
+def read_record_headers(
+    fp: BinaryIO, file_size: int, offset: int = len(MAGIC)
+) -> Iterator[RecordHeader]:
+    """Walks the records of a file without reading their content.
+
+    The walk stops silently at the first record which does not fit in the
+    file, so that truncated files can be scanned up to their last complete
+    record. The caller may read the content of a yielded record from
+    `RecordHeader.content_offset` before resuming the walk.
+
+    Args:
+        fp (BinaryIO): The file, opened in binary mode.
+        file_size (int): The size of the file.
+        offset (int): The offset of the first record. Defaults to the end
+            of the leading magic.
+
+    Yields:
+        RecordHeader: The complete records, in file order.
+    """
+    while offset + RECORD_PREFIX_SIZE <= file_size:
+        fp.seek(offset)
+        prefix = fp.read(RECORD_PREFIX_SIZE)
+        if len(prefix) < RECORD_PREFIX_SIZE:
+            return
+        opcode, length = struct.unpack("<BQ", prefix)
+        header = RecordHeader(offset, opcode, length)
+        if header.end > file_size:
+            return
+        yield header
+        offset = header.end
+
+
+def iter_chunk_records(
+    data: bytes,
+) -> Iterator[Tuple[int, int, memoryview]]:
+    """Iterates over the records of decompressed chunk data.
+
+    Args:
+        data (bytes): The decompressed records of a chunk.
+
+    Yields:
+        Tuple[int, int, memoryview]: The offset of each record in the
+        uncompressed data, its opcode and its content.
+
+    Raises:
+        McapFormatError: If a record overruns the chunk.
+    """
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        if offset + RECORD_PREFIX_SIZE > len(view):
+            raise McapFormatError("chunk record is truncated")
+        opcode, length = struct.unpack_from("<BQ", view, offset)
+        start = offset + RECORD_PREFIX_SIZE
+        if start + length > len(view):
+            raise McapFormatError("chunk record is truncated")
+        yield offset, opcode, view[start : start + length]
+        offset = start + length
+
+
+def decompress(
+    compression: str, data: bytes | memoryview, uncompressed_size: int
+) -> bytes:
+    """Decompresses the records of a chunk.
+
+    The `zstandard` and `lz4` packages are only required for chunks
+    compressed with them.
+
+    Args:
+        compression (str): The chunk compression, "", "zstd" or "lz4".
+        data (bytes | memoryview): The compressed records.
+        uncompressed_size (int): The expected size.
+
+    Returns:
+        bytes: The uncompressed records.
+    """
+    if compression == "":
+        return bytes(data)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "Reading zstd chunks requires `pip install zstandard`"
+            ) from e
+        return zstandard.ZstdDecompressor().decompress(
+            bytes(data), max_output_size=uncompressed_size
+        )
+    if compression == "lz4":
+        try:
+            import lz4.frame
+        except ImportError as e:
+            raise ImportError(
+                "Reading lz4 chunks requires `pip install lz4`"
+            ) from e
+        return lz4.frame.decompress(bytes(data))
+    raise McapFormatError(f"unsupported chunk compression: {compression}")
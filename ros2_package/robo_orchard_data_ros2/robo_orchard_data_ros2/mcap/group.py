@@ -0,0 +1,192 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from robo_orchard_data_ros2.mcap.bag import BagWriter
+from robo_orchard_data_ros2.mcap.recovery import EPISODE_MANIFEST_FILE
+from robo_orchard_data_ros2.mcap.reorder import ReorderBuffer
+from robo_orchard_data_ros2.mcap.writer import WriteRequest, WriterStage
+
+__all__ = [
+    "DEFAULT_GROUP",
+    "WriterGroup",
+    "get_group_uri",
+    "write_episode_manifest",
+]
+
+DEFAULT_GROUP = "default"
+
+
+def get_group_uri(uri: str, name: str, uri_root: Optional[str]) -> str:
+    """Gets the bag directory of a writer group.
+
+    Args:
+        uri (str): The output uri of the recorder.
+        name (str): The name of the group.
+        uri_root (Optional[str]): The root directory of the group, or
+            None to nest the group in `uri`.
+
+    Returns:
+        str: `<uri>/<name>`, or `<uri_root>/<episode>/<name>` where
+        `<episode>` is the base name of `uri`.
+    """
+    if uri_root is None:
+        return os.path.join(uri, name)
+    episode = os.path.basename(os.path.normpath(uri))
+    return os.path.join(uri_root, episode, name)
+
+
+class WriterGroup:
+    """A bag of the recorder with its own writer threads.
+
+    Each group serializes the writes into its bag with its own lock and
+    reorder buffer, so that groups on different disks are written in
+    parallel.
+
+    Attributes:
+        name (str): The name of the group.
+        bag_writer (BagWriter): The bag writer of the group.
+        lock (threading.Lock): Serializes the writes into the bag.
+        reorder_buffer (ReorderBuffer | None): The reorder buffer of the
+            group, if `RecordConfig.reorder_window_ns` is set.
+        stage (WriterStage): The writer threads of the group.
+        topics (List[str]): The writting topic names of the group.
+        message_count (int): The number of messages written into the bag,
+            updated under `lock`.
+        message_counts (Dict[str, int]): The number of messages written
+            into the bag per topic, updated under `lock`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        bag_writer: BagWriter,
+        write_fn: Callable[["WriterGroup", WriteRequest], None],
+        num_threads: int = 1,
+        max_queue_size: int = 0,
+        reorder_window_ns: Optional[int] = None,
+        on_error: Optional[Callable[[WriteRequest, Exception], None]] = None,
+        on_drop: Optional[Callable[[WriteRequest], None]] = None,
+    ):
+        """Constructor.
+
+        Args:
+            name (str): The name of the group.
+            bag_writer (BagWriter): The bag writer of the group.
+            write_fn (Callable[[WriterGroup, WriteRequest], None]): The
+                function writing a message, called with the group.
+            num_threads (int): The number of writer threads. Defaults to 1.
+            max_queue_size (int): The maximum size of the hand-off queue.
+                Defaults to 0 (unlimited queue size).
+            reorder_window_ns (Optional[int]): The reorder window. Defaults
+                to None, which writes messages in arrival order.
+            on_error (Optional[Callable[[WriteRequest, Exception], None]]):
+                Called when `write_fn` raises.
+            on_drop (Optional[Callable[[WriteRequest], None]]): Called with
+                queued messages discarded to make room for newer ones.
+        """
+        self.name = name
+        self.bag_writer = bag_writer
+        self.lock = threading.Lock()
+        self.reorder_buffer = (
+            None
+            if reorder_window_ns is None
+            else ReorderBuffer(reorder_window_ns)
+        )
+        self.topics: List[str] = []
+        self.message_count = 0
+        self.message_counts: Dict[str, int] = defaultdict(int)
+        self.stage = WriterStage(
+            fn=functools.partial(write_fn, self),
+            num_threads=num_threads,
+            max_queue_size=max_queue_size,
+            on_error=on_error,
+            on_drop=on_drop,
+            name=("mcap_writer" if name == DEFAULT_GROUP else f"mcap_{name}"),
+            keep_topic_order=True,
+        )
+
+    @property
+    def uri(self) -> str:
+        return self.bag_writer.uri
+
+    def to_dict(self, root: str) -> Dict[str, Any]:
+        """Describes the group for the episode manifest.
+
+        Args:
+            root (str): The output uri of the recorder. The uri of the
+                group is relative to it if nested, otherwise absolute.
+
+        Returns:
+            Dict[str, Any]: The name, uri, topics, storage preset, message
+            count and splits of the group.
+        """
+        rel_uri = os.path.relpath(self.uri, root)
+        if rel_uri.startswith(os.pardir):
+            rel_uri = os.path.abspath(self.uri)
+        return {
+            "name": self.name,
+            "uri": rel_uri,
+            "topics": sorted(self.topics),
+            "storage": self.bag_writer.storage.name,
+            "message_count": sum(
+                split.message_count for split in self.bag_writer.splits
+            ),
+            "splits": [
+                split.to_dict(self.uri) for split in self.bag_writer.splits
+            ],
+        }
+
+
+def write_episode_manifest(
+    uri: str,
+    groups: List[WriterGroup],
+    start_time_ns: Optional[int] = None,
+    end_time_ns: Optional[int] = None,
+    finished: bool = False,
+):
+    """Writes the manifest tying the bags of the writer groups together.
+
+    The log times of all groups are stamped by the same recorder clock,
+    so that their messages can be merged by log time.
+
+    Args:
+        uri (str): The output uri of the recorder.
+        groups (List[WriterGroup]): The writer groups.
+        start_time_ns (Optional[int]): The minimum log time of the episode.
+        end_time_ns (Optional[int]): The maximum log time of the episode.
+        finished (bool): Whether all bags have been closed.
+    """
+    manifest = {
+        "version": 1,
+        "finished": finished,
+        "update_time": time.time(),
+        "start_time_ns": start_time_ns,
+        "end_time_ns": end_time_ns,
+        "groups": [group.to_dict(uri) for group in groups],
+    }
+    manifest_file = os.path.join(uri, EPISODE_MANIFEST_FILE)
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w") as fw:
+        json.dump(manifest, fw, indent=4)
+    os.replace(tmp_file, manifest_file)
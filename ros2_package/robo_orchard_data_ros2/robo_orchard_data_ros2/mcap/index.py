@@ -0,0 +1,502 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import argparse
+import array
+import glob
+import json
+import os
+import shutil
+import struct
+from typing import Any, BinaryIO, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+
+from robo_orchard_data_ros2.mcap.format import (
+    MAGIC,
+    RECORD_PREFIX_SIZE,
+    Channel,
+    Chunk,
+    ChunkIndex,
+    Footer,
+    McapFormatError,
+    Message,
+    MessageIndex,
+    Opcode,
+    Schema,
+    iter_chunk_records,
+    read_record_headers,
+)
+
+__all__ = [
+    "INDEX_DTYPE",
+    "SidecarIndex",
+    "get_index_dir",
+    "build_index",
+    "find_mcap_files",
+    "main",
+]
+
+# One entry per message, sorted by log time. `chunk_offset` is the file
+# offset of the chunk holding the message, or of the message record itself
+# if it is not chunked. `record_offset` is the offset of the message record
+# in the uncompressed chunk.
+INDEX_DTYPE = np.dtype(
+    [
+        ("log_time", "<i8"),
+        ("chunk_offset", "<u8"),
+        ("record_offset", "<u8"),
+    ]
+)
+
+INDEX_VERSION = 1
+INDEX_MANIFEST_FILE = "index.json"
+
+
+def get_index_dir(mcap_path: str) -> str:
+    """Gets the sidecar index directory of an MCAP file."""
+    return mcap_path + ".index"
+
+
+class _Entries:
+    """Growable per-channel columns of index entries."""
+
+    def __init__(self):
+        self.log_time = array.array("q")
+        self.chunk_offset = array.array("Q")
+        self.record_offset = array.array("Q")
+
+    def append(self, log_time: int, chunk_offset: int, record_offset: int):
+        self.log_time.append(log_time)
+        self.chunk_offset.append(chunk_offset)
+        self.record_offset.append(record_offset)
+
+    def to_array(self) -> np.ndarray:
+        ret = np.empty(len(self.log_time), dtype=INDEX_DTYPE)
+        ret["log_time"] = np.frombuffer(self.log_time, dtype=np.int64)
+        ret["chunk_offset"] = np.frombuffer(self.chunk_offset, dtype=np.uint64)
+        ret["record_offset"] = np.frombuffer(
+            self.record_offset, dtype=np.uint64
+        )
+        return ret[np.argsort(ret["log_time"], kind="stable")]
+
+
+def _read_summary(
+    fp: BinaryIO, file_size: int
+) -> Optional[Tuple[Dict[int, Schema], Dict[int, Channel], List[ChunkIndex]]]:
+    """Reads the schemas, channels and chunk indexes of the summary.
+
+    Returns:
+        The summary records, or None if the file has no usable summary.
+    """
+    footer_offset = file_size - len(MAGIC) - RECORD_PREFIX_SIZE - 20
+    if footer_offset < len(MAGIC):
+        return None
+    fp.seek(footer_offset)
+    tail = fp.read(file_size - footer_offset)
+    if tail[-len(MAGIC) :] != MAGIC or tail[0] != Opcode.FOOTER:
+        return None
+    footer = Footer.parse(tail[RECORD_PREFIX_SIZE : -len(MAGIC)])
+    if footer.summary_start == 0:
+        return None
+
+    schemas, channels, chunk_indexes = dict(), dict(), []
+    for header in read_record_headers(
+        fp, footer_offset, offset=footer.summary_start
+    ):
+        if header.opcode not in (
+            Opcode.SCHEMA,
+            Opcode.CHANNEL,
+            Opcode.CHUNK_INDEX,
+        ):
+            continue
+        fp.seek(header.content_offset)
+        content = fp.read(header.length)
+        if header.opcode == Opcode.SCHEMA:
+            schema = Schema.parse(content)
+            schemas[schema.id] = schema
+        elif header.opcode == Opcode.CHANNEL:
+            channel = Channel.parse(content)
+            channels[channel.id] = channel
+        else:
+            chunk_indexes.append(ChunkIndex.parse(content))
+    if not channels:
+        return None
+    return schemas, channels, chunk_indexes
+
+
+def _read_chunk(fp: BinaryIO, offset: int) -> bytes:
+    fp.seek(offset)
+    opcode, length = struct.unpack("<BQ", fp.read(RECORD_PREFIX_SIZE))
+    if opcode != Opcode.CHUNK:
+        raise McapFormatError(f"no chunk at offset {offset}")
+    return Chunk.parse(fp.read(length)).decompress()
+
+
+def _index_chunk_data(
+    data: bytes, chunk_offset: int, entries: Dict[int, _Entries]
+):
+    for offset, opcode, record in iter_chunk_records(data):
+        if opcode == Opcode.MESSAGE:
+            msg = Message.parse(record)
+            entries.setdefault(msg.channel_id, _Entries()).append(
+                msg.log_time, chunk_offset, offset
+            )
+
+
+def _index_from_summary(
+    fp: BinaryIO,
+    chunk_indexes: List[ChunkIndex],
+    entries: Dict[int, _Entries],
+):
+    """Indexes the messages from the message index records.
+
+    Only the message index records following each chunk are read. Chunks
+    without message indexes are decompressed instead.
+    """
+    for chunk_index in chunk_indexes:
+        if not chunk_index.message_index_offsets:
+            _index_chunk_data(
+                _read_chunk(fp, chunk_index.chunk_start_offset),
+                chunk_index.chunk_start_offset,
+                entries,
+            )
+            continue
+        fp.seek(chunk_index.chunk_start_offset + chunk_index.chunk_length)
+        data = fp.read(chunk_index.message_index_length)
+        for _, opcode, record in iter_chunk_records(data):
+            if opcode != Opcode.MESSAGE_INDEX:
+                continue
+            index = MessageIndex.parse(record)
+            channel_entries = entries.setdefault(index.channel_id, _Entries())
+            for log_time, offset in index.records:
+                channel_entries.append(
+                    log_time, chunk_index.chunk_start_offset, offset
+                )
+
+
+def _index_from_scan(
+    fp: BinaryIO,
+    file_size: int,
+    schemas: Dict[int, Schema],
+    channels: Dict[int, Channel],
+    entries: Dict[int, _Entries],
+):
+    """Indexes the messages by streaming the data section."""
+    for header in read_record_headers(fp, file_size):
+        if header.opcode in (Opcode.DATA_END, Opcode.FOOTER):
+            break
+        if header.opcode not in (
+            Opcode.SCHEMA,
+            Opcode.CHANNEL,
+            Opcode.MESSAGE,
+            Opcode.CHUNK,
+        ):
+            continue
+        fp.seek(header.content_offset)
+        content = fp.read(header.length)
+        if header.opcode == Opcode.SCHEMA:
+            schema = Schema.parse(content)
+            schemas[schema.id] = schema
+        elif header.opcode == Opcode.CHANNEL:
+            channel = Channel.parse(content)
+            channels[channel.id] = channel
+        elif header.opcode == Opcode.MESSAGE:
+            msg = Message.parse(content)
+            entries.setdefault(msg.channel_id, _Entries()).append(
+                msg.log_time, header.offset, 0
+            )
+        else:
+            data = Chunk.parse(content).decompress()
+            for _, opcode, record in iter_chunk_records(data):
+                if opcode == Opcode.SCHEMA:
+                    schema = Schema.parse(record)
+                    schemas[schema.id] = schema
+                elif opcode == Opcode.CHANNEL:
+                    channel = Channel.parse(record)
+                    channels[channel.id] = channel
+            _index_chunk_data(data, header.offset, entries)
+
+
+def _file_signature(mcap_path: str) -> Dict[str, int]:
+    stat = os.stat(mcap_path)
+    return {"mcap_size": stat.st_size, "mcap_mtime_ns": stat.st_mtime_ns}
+
+
+def build_index(mcap_path: str, force: bool = False) -> Optional[str]:
+    """Writes the sidecar time index of an MCAP file.
+
+    The index directory holds one `.npy` array of :data:`INDEX_DTYPE` per
+    topic, which can be memory mapped and binary searched by log time,
+    and an `index.json` manifest mapping the topics to the arrays.
+
+    The message index records of the MCAP summary are used when present,
+    so that building the index of a finalized file does not read the
+    message data. Files without a summary are streamed once.
+
+    Args:
+        mcap_path (str): The MCAP file.
+        force (bool): Rebuild even if an up-to-date index exists.
+            Defaults to False.
+
+    Returns:
+        Optional[str]: The index directory, or None if it was up to date.
+    """
+    index_dir = get_index_dir(mcap_path)
+    signature = _file_signature(mcap_path)
+    manifest_file = os.path.join(index_dir, INDEX_MANIFEST_FILE)
+    if not force and os.path.exists(manifest_file):
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+        if (
+            manifest.get("version") == INDEX_VERSION
+            and manifest.get("mcap_size") == signature["mcap_size"]
+            and manifest.get("mcap_mtime_ns") == signature["mcap_mtime_ns"]
+        ):
+            return None
+
+    entries: Dict[int, _Entries] = dict()
+    with open(mcap_path, "rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise McapFormatError(f"{mcap_path} is not an MCAP file")
+        summary = _read_summary(fp, signature["mcap_size"])
+        if summary is not None:
+            schemas, channels, chunk_indexes = summary
+            _index_from_summary(fp, chunk_indexes, entries)
+        else:
+            schemas, channels = dict(), dict()
+            _index_from_scan(
+                fp, signature["mcap_size"], schemas, channels, entries
+            )
+
+    # write into a temporary directory, then swap, so that readers never
+    # see a partial index
+    tmp_dir = index_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    topics: Dict[str, Dict[str, Any]] = dict()
+    for channel_id, channel in sorted(channels.items()):
+        array_file = f"channel_{channel_id:05d}.npy"
+        index = (
+            entries[channel_id].to_array()
+            if channel_id in entries
+            else np.empty(0, dtype=INDEX_DTYPE)
+        )
+        np.save(os.path.join(tmp_dir, array_file), index)
+        schema = schemas.get(channel.schema_id)
+        topics[channel.topic] = {
+            "file": array_file,
+            "type": "" if schema is None else schema.name,
+            "message_encoding": channel.message_encoding,
+            "message_count": len(index),
+            "start_time_ns": int(index["log_time"][0]) if len(index) else None,
+            "end_time_ns": int(index["log_time"][-1]) if len(index) else None,
+        }
+    with open(os.path.join(tmp_dir, INDEX_MANIFEST_FILE), "w") as fw:
+        json.dump(
+            {
+                "version": INDEX_VERSION,
+                "mcap": os.path.basename(mcap_path),
+                **signature,
+                "topics": topics,
+            },
+            fw,
+            indent=4,
+        )
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.replace(tmp_dir, index_dir)
+    return index_dir
+
+
+class SidecarIndex:
+    """Reader of the sidecar time index of an MCAP file.
+
+    The per-topic arrays are memory mapped on first use, so opening an
+    index only reads its manifest.
+
+    Example:
+        >>> index = SidecarIndex("episode/episode_0.mcap")
+        >>> idx = index.find("/camera/color/image_raw", t_ns)
+        >>> log_time, data = index.read_message("/camera/color/image_raw", idx)
+
+    This class is not thread-safe.
+
+    Attributes:
+        mcap_path (str): The indexed MCAP file.
+        topics (Dict[str, Dict[str, Any]]): Per topic, the message type,
+            the message count and the time range.
+    """
+
+    def __init__(self, mcap_path: str):
+        """Constructor.
+
+        Args:
+            mcap_path (str): The MCAP file, whose index has been built by
+                :func:`build_index`.
+
+        Raises:
+            FileNotFoundError: If the index does not exist.
+        """
+        self.mcap_path = mcap_path
+        self.index_dir = get_index_dir(mcap_path)
+        with open(os.path.join(self.index_dir, INDEX_MANIFEST_FILE)) as f:
+            self._manifest = json.load(f)
+        self.topics: Dict[str, Dict[str, Any]] = self._manifest["topics"]
+        self._arrays: Dict[str, np.ndarray] = dict()
+        self._fp: Optional[BinaryIO] = None
+        # the last decompressed chunk, for sequential reads
+        self._chunk_cache: Tuple[int, Optional[bytes]] = (-1, None)
+
+    @property
+    def is_stale(self) -> bool:
+        """Whether the MCAP file changed after the index was built."""
+        signature = _file_signature(self.mcap_path)
+        return any(
+            self._manifest.get(key) != value
+            for key, value in signature.items()
+        )
+
+    def get(self, topic: str) -> np.ndarray:
+        """Gets the memory mapped index of a topic, sorted by log time."""
+        ret = self._arrays.get(topic)
+        if ret is None:
+            ret = np.load(
+                os.path.join(self.index_dir, self.topics[topic]["file"]),
+                mmap_mode="r",
+            )
+            self._arrays[topic] = ret
+        return ret
+
+    def find(
+        self,
+        topic: str,
+        timestamp_ns: int,
+        side: Literal["before", "after", "nearest"] = "nearest",
+    ) -> Optional[int]:
+        """Finds the message of a topic closest to a timestamp.
+
+        Args:
+            topic (str): The topic name.
+            timestamp_ns (int): The log time in nanoseconds.
+            side (Literal["before", "after", "nearest"]): "before" finds
+                the last message at or before the timestamp, "after" the
+                first one at or after it. Defaults to "nearest".
+
+        Returns:
+            Optional[int]: The entry index, or None if there is no such
+            message.
+        """
+        log_time = self.get(topic)["log_time"]
+        if len(log_time) == 0:
+            return None
+        idx = int(np.searchsorted(log_time, timestamp_ns, side="left"))
+        exact = idx < len(log_time) and log_time[idx] == timestamp_ns
+        if side == "after" or exact:
+            return idx if idx < len(log_time) else None
+        if side == "before":
+            return idx - 1 if idx > 0 else None
+        if idx == 0:
+            return 0
+        if idx == len(log_time):
+            return idx - 1
+        before, after = log_time[idx - 1], log_time[idx]
+        return (
+            idx - 1 if timestamp_ns - before <= after - timestamp_ns else idx
+        )
+
+    def read_message(self, topic: str, idx: int) -> Tuple[int, bytes]:
+        """Reads a message through its index entry.
+
+        Args:
+            topic (str): The topic name.
+            idx (int): The entry index.
+
+        Returns:
+            Tuple[int, bytes]: The log time and the serialized message.
+        """
+        entry = self.get(topic)[idx]
+        chunk_offset = int(entry["chunk_offset"])
+        if self._fp is None:
+            self._fp = open(self.mcap_path, "rb")
+        if self._chunk_cache[0] == chunk_offset:
+            data = self._chunk_cache[1]
+        else:
+            self._fp.seek(chunk_offset)
+            opcode, length = struct.unpack(
+                "<BQ", self._fp.read(RECORD_PREFIX_SIZE)
+            )
+            if opcode == Opcode.MESSAGE:
+                msg = Message.parse(self._fp.read(length))
+                return msg.log_time, bytes(msg.data)
+            data = _read_chunk(self._fp, chunk_offset)
+            self._chunk_cache = (chunk_offset, data)
+        record_offset = int(entry["record_offset"])
+        opcode, length = struct.unpack_from("<BQ", data, record_offset)
+        start = record_offset + RECORD_PREFIX_SIZE
+        msg = Message.parse(memoryview(data)[start : start + length])
+        return msg.log_time, bytes(msg.data)
+
+    def close(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        self._chunk_cache = (-1, None)
+        self._arrays = dict()
+
+
+def find_mcap_files(paths: List[str]) -> List[str]:
+    """Expands files and directories into the MCAP files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                glob.glob(os.path.join(path, "**", "*.mcap"), recursive=True)
+            )
+        else:
+            files.append(path)
+    # nested bag directories are found twice
+    return list(dict.fromkeys(files))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Build the sidecar time index (<file>.mcap.index) of "
+        "MCAP files, for memory-mapped seeking by topic and log time."
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="MCAP files or directories to search."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild indexes which are up to date.",
+    )
+    opts = parser.parse_args(args)
+
+    for path in find_mcap_files(opts.paths):
+        try:
+            index_dir = build_index(path, force=opts.force)
+        except (McapFormatError, OSError) as e:
+            print(f"Failed to index {path}: {e}")
+            continue
+        if index_dir is None:
+            print(f"{path}: index is up to date")
+        else:
+            print(f"{path}: indexed into {index_dir}")
+
+
+if __name__ == "__main__":
+    main()
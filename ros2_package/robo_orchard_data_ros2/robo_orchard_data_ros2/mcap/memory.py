@@ -0,0 +1,336 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import enum
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from robo_orchard_data_ros2.mcap.config import MemoryConfig, RecordConfig
+
+__all__ = [
+    "Admission",
+    "SpilledMessage",
+    "SpillFile",
+    "MemoryGovernor",
+    "forecast_peak_rss",
+]
+
+
+class Admission(enum.Enum):
+    """The decision of the governor for an incoming message."""
+
+    ADMIT = "admit"
+    """Keep the message in memory."""
+    SPILL = "spill"
+    """Move the serialized message to the spill file."""
+    DROP = "drop"
+    """Discard the message."""
+
+
+class SpilledMessage(NamedTuple):
+    """Handle of a serialized message in the spill file.
+
+    Attributes:
+        offset (int): The offset in the spill file.
+        length (int): The size of the message in bytes.
+    """
+
+    offset: int
+    length: int
+
+
+class SpillFile:
+    """Append-only temporary file holding spilled messages.
+
+    Messages are appended and read back once by the writers. When every
+    spilled message has been read, the file is truncated, so that it only
+    grows while the recorder is behind.
+
+    This class is thread-safe.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._file = tempfile.TemporaryFile(
+            prefix="mcap_spill_", dir=directory
+        )
+        self._lock = threading.Lock()
+        self._end = 0
+        self._pending = 0
+        self.total_bytes = 0
+        self.total_count = 0
+        self.peak_bytes = 0
+
+    def write(self, data: bytes) -> SpilledMessage:
+        with self._lock:
+            handle = SpilledMessage(self._end, len(data))
+            os.pwrite(self._file.fileno(), data, self._end)
+            self._end += len(data)
+            self._pending += 1
+            self.total_bytes += len(data)
+            self.total_count += 1
+            self.peak_bytes = max(self.peak_bytes, self._end)
+            return handle
+
+    def read(self, handle: SpilledMessage) -> bytes:
+        data = os.pread(self._file.fileno(), handle.length, handle.offset)
+        with self._lock:
+            self._pending -= 1
+            if self._pending == 0:
+                self._file.truncate(0)
+                self._end = 0
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+class MemoryGovernor:
+    """Byte-budget accountant of the in-flight messages of the recorder.
+
+    Every message handed over to the writers is accounted from the
+    subscription callback until it is written into the bag, including the
+    time spent in the writer queue and the reorder buffer. When admitting
+    a message would exceed the budget, the configured policy applies:
+
+    - "block": Wait until the writers free enough memory.
+    - "drop_low_priority": Messages of topics below the highest priority
+      are dropped as soon as the usage exceeds `low_priority_watermark`
+      of the budget, which keeps headroom for the highest priority
+      topics. These wait as with "block".
+    - "spill": Serialized messages are moved to an append-only temporary
+      file and read back by the writers.
+
+    A single message larger than the budget is admitted when nothing else
+    is in flight, so that it cannot block forever. Before a producer
+    blocks, `on_pressure` is called to release memory which is held
+    without new messages, e.g. by the reorder buffers, which would
+    otherwise only release it when a newer message is pushed.
+
+    This class is thread-safe.
+
+    Attributes:
+        max_bytes (int | None): The byte budget. None means unlimited.
+        in_use (int): The bytes in flight.
+        peak (int): The maximum bytes in flight.
+        dropped (Dict[str, int]): The number of dropped messages per topic.
+        spill_file (SpillFile | None): The spill file, if policy is "spill".
+    """
+
+    def __init__(
+        self,
+        config: MemoryConfig,
+        on_pressure: Optional[Callable[[], None]] = None,
+    ):
+        """Constructor.
+
+        Args:
+            config (MemoryConfig): The configuration of the governor.
+            on_pressure (Optional[Callable[[], None]]): Called without the
+                lock of the governor before a producer blocks, to write
+                out the held messages. Defaults to None.
+        """
+        self.config = config
+        self.on_pressure = on_pressure
+        self.max_bytes = config.max_bytes
+        self.in_use = 0
+        self.peak = 0
+        self.dropped: Dict[str, int] = defaultdict(int)
+        self.max_priority = 0
+        self.spill_file: Optional[SpillFile] = (
+            SpillFile(config.spill_dir) if config.policy == "spill" else None
+        )
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def register_priority(self, priority: int):
+        """Registers the priority of a subscribed topic."""
+        with self._cond:
+            self.max_priority = max(self.max_priority, priority)
+
+    def _fits(self, nbytes: int, limit: float) -> bool:
+        return self.in_use == 0 or self.in_use + nbytes <= limit
+
+    def _wait_for(self, nbytes: int):
+        while not self._closed and not self._fits(nbytes, self.max_bytes):
+            self._cond.wait()
+
+    def acquire(self, topic: str, nbytes: int, priority: int = 0) -> Admission:
+        """Asks for memory of an incoming message.
+
+        Args:
+            topic (str): The writting topic name.
+            nbytes (int): The (estimated) size of the message.
+            priority (int): The priority of the topic.
+
+        Returns:
+            Admission: ADMIT if the bytes are accounted and should be
+            released with :meth:`release` once written, SPILL if the
+            message should be spilled with :meth:`spill`, which accounts
+            nothing, or DROP.
+        """
+        with self._cond:
+            must_wait = False
+            if self.max_bytes is not None and not self._closed:
+                policy = self.config.policy
+                if policy == "spill":
+                    if not self._fits(nbytes, self.max_bytes):
+                        return Admission.SPILL
+                elif policy == "drop_low_priority" and (
+                    priority < self.max_priority
+                ):
+                    limit = self.max_bytes * self.config.low_priority_watermark
+                    if not self._fits(nbytes, limit):
+                        self.dropped[topic] += 1
+                        return Admission.DROP
+                else:
+                    must_wait = not self._fits(nbytes, self.max_bytes)
+            if not must_wait:
+                return self._admit(nbytes)
+        # the hook writes messages, which releases memory and takes the
+        # locks of the writers, so it must not run under the lock
+        if self.on_pressure is not None:
+            self.on_pressure()
+        with self._cond:
+            self._wait_for(nbytes)
+            return self._admit(nbytes)
+
+    def _admit(self, nbytes: int) -> Admission:
+        self.in_use += nbytes
+        self.peak = max(self.peak, self.in_use)
+        return Admission.ADMIT
+
+    def release(self, nbytes: int):
+        """Releases the memory of a written or discarded message."""
+        if nbytes == 0:
+            return
+        with self._cond:
+            self.in_use -= nbytes
+            self._cond.notify_all()
+
+    def spill(self, data: bytes) -> SpilledMessage:
+        """Moves a serialized message to the spill file."""
+        return self.spill_file.write(data)
+
+    def unspill(self, handle: SpilledMessage) -> bytes:
+        """Reads a spilled message back."""
+        return self.spill_file.read(handle)
+
+    def get_stats(self) -> Dict[str, object]:
+        """Gets the memory usage statistics.
+
+        Returns:
+            Dict[str, object]: The budget, the bytes in flight, the peak,
+            the dropped messages per topic and the spilled bytes.
+        """
+        return {
+            "policy": self.config.policy,
+            "max_bytes": self.max_bytes,
+            "in_use_bytes": self.in_use,
+            "peak_bytes": self.peak,
+            "dropped": dict(self.dropped),
+            "spilled_count": (
+                0 if self.spill_file is None else self.spill_file.total_count
+            ),
+            "spilled_bytes": (
+                0 if self.spill_file is None else self.spill_file.total_bytes
+            ),
+            "spill_file_peak_bytes": (
+                0 if self.spill_file is None else self.spill_file.peak_bytes
+            ),
+        }
+
+    def close(self):
+        """Releases blocked producers. The spill file is kept for reads."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def forecast_peak_rss(config: RecordConfig, baseline: int) -> Dict[str, Any]:
+    """Forecasts the peak RSS of the recorder from its configuration.
+
+    The forecast adds up the worst case of each buffer:
+
+    - the subscription queues, `qos_profile.depth` messages of
+      `expected_message_size` for each topic of `topic_spec`,
+    - the in-flight messages, bounded by `memory.max_bytes`, or else by
+      `writer_queue_size` messages of the largest expected size per
+      writer queue,
+    - the rosbag2 cache of each writer group, which is double buffered,
+    - the static message cache,
+    - the pre-roll ring buffer.
+
+    Args:
+        config (RecordConfig): The recorder configuration.
+        baseline (int): The RSS of the process before recording, in bytes.
+
+    Returns:
+        Dict[str, Any]: The forecast and its components in bytes. A
+        component is None if it is unbounded. `unknown_topics` lists the
+        topics without `expected_message_size`, which are not included.
+    """
+    subscription_queues = 0
+    unknown_topics = []
+    max_message_size = 0
+    for topic, spec in config.topic_spec.items():
+        if spec.expected_message_size is None:
+            unknown_topics.append(topic)
+            continue
+        subscription_queues += (
+            spec.qos_profile.depth * spec.expected_message_size
+        )
+        max_message_size = max(max_message_size, spec.expected_message_size)
+
+    num_groups = 1 + len(config.writer_groups)
+    if config.memory.max_bytes is not None:
+        in_flight = config.memory.max_bytes
+    elif config.writer_queue_size > 0:
+        in_flight = num_groups * config.writer_queue_size * max_message_size
+    else:
+        in_flight = None
+    rosbag2_cache = (
+        2
+        * num_groups
+        * config.crash_safety.get_max_cache_size(config.max_cache_size)
+    )
+    static_cache = (
+        config.static_cache_max_bytes
+        if config.static_cache_max_bytes > 0
+        else None
+    )
+
+    preroll = config.preroll.max_bytes if config.preroll.enabled else 0
+
+    components = {
+        "baseline": baseline,
+        "subscription_queues": subscription_queues,
+        "in_flight": in_flight,
+        "rosbag2_cache": rosbag2_cache,
+        "static_cache": static_cache,
+        "preroll": preroll,
+    }
+    return {
+        "peak_rss": (
+            None
+            if any(v is None for v in components.values())
+            else sum(components.values())
+        ),
+        **components,
+        "unknown_topics": unknown_topics,
+    }
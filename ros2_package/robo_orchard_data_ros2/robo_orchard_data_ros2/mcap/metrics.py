@@ -0,0 +1,339 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+__all__ = [
+    "LatencyHistogram",
+    "TopicMetrics",
+    "RecorderMetrics",
+    "MetricsServer",
+    "render_prometheus",
+]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram, as in Prometheus.
+
+    Attributes:
+        bounds (List[float]): The sorted upper bounds of the buckets, in
+            seconds. An implicit `+Inf` bucket follows the last bound.
+        counts (List[int]): The number of observations per bucket, not
+            cumulative. The last item is the `+Inf` bucket.
+        sum (float): The sum of observed values, in seconds.
+        count (int): The number of observations.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def copy(self) -> "LatencyHistogram":
+        hist = LatencyHistogram(self.bounds)
+        hist.counts = list(self.counts)
+        hist.sum = self.sum
+        hist.count = self.count
+        return hist
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimates a quantile by linear interpolation inside a bucket.
+
+        Args:
+            q (float): The quantile in `[0, 1]`.
+
+        Returns:
+            Optional[float]: The estimated value in seconds, or None if
+            nothing has been observed. Values in the `+Inf` bucket are
+            reported as the last bound.
+        """
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for idx, cnt in enumerate(self.counts):
+            if cnt == 0 or cumulative + cnt < rank:
+                cumulative += cnt
+                continue
+            if idx == len(self.bounds):
+                return self.bounds[-1] if self.bounds else None
+            lower = 0.0 if idx == 0 else self.bounds[idx - 1]
+            upper = self.bounds[idx]
+            return lower + (upper - lower) * (rank - cumulative) / cnt
+        return self.bounds[-1] if self.bounds else None
+
+
+class TopicMetrics:
+    """Counters of one writting topic.
+
+    The receive counters are only updated by the subscription callback of
+    the topic, which its mutually exclusive callback group serializes, so
+    they take no lock. The write counters and the rejections, which are
+    also updated by the writer and encoder threads, take the lock of the
+    topic.
+
+    Attributes:
+        received (int): The number of messages received while recording.
+        written (int): The number of messages written into the bag.
+        bytes (int): The serialized size of written messages.
+        rejected (Dict[str, int]): The number of messages discarded by the
+            recorder before queueing, per reason.
+        latency (LatencyHistogram): The receive-to-write latencies.
+        last_receive_time (float | None): The monotonic time of the last
+            received message, in seconds.
+        lock (threading.Lock): Guards the write counters and rejections.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.lock = threading.Lock()
+        self.last_receive_time: float | None = None
+        self.received = 0
+        self.written = 0
+        self.bytes = 0
+        self.rejected: Dict[str, int] = defaultdict(int)
+        self.latency = LatencyHistogram(bounds)
+
+    def copy(self) -> "TopicMetrics":
+        metrics = TopicMetrics(self.latency.bounds)
+        metrics.last_receive_time = self.last_receive_time
+        metrics.received = self.received
+        with self.lock:
+            metrics.written = self.written
+            metrics.bytes = self.bytes
+            metrics.rejected = defaultdict(int, self.rejected)
+            metrics.latency = self.latency.copy()
+        return metrics
+
+
+class RecorderMetrics:
+    """Thread-safe per-topic metrics of the recorder.
+
+    No lock is shared by the topics on the hot path. Receiving a message
+    takes no lock, and writing or rejecting one only takes the lock of
+    its topic. Readers work on a snapshot, so that the exporters never
+    block the writers for long. The recorder-wide lock only guards the
+    registration of topics.
+    """
+
+    def __init__(self, latency_buckets: Sequence[float]):
+        self.latency_buckets = sorted(latency_buckets)
+        self._topics: Dict[str, TopicMetrics] = dict()
+        self._lock = threading.Lock()
+
+    def _get(self, topic: str) -> TopicMetrics:
+        metrics = self._topics.get(topic)
+        if metrics is None:
+            with self._lock:
+                metrics = self._topics.setdefault(
+                    topic, TopicMetrics(self.latency_buckets)
+                )
+        return metrics
+
+    def add_topic(self, topic: str):
+        """Registers a topic, so that it is reported before any message."""
+        self._get(topic)
+
+    def on_receive(self, topic: str):
+        """Records a received message.
+
+        This method should only be called by the subscription callback of
+        the topic.
+        """
+        metrics = self._get(topic)
+        metrics.received += 1
+        metrics.last_receive_time = time.monotonic()
+
+    def on_reject(self, topic: str, reason: str):
+        metrics = self._get(topic)
+        with metrics.lock:
+            metrics.rejected[reason] += 1
+
+    def on_write(
+        self, topic: str, nbytes: int, latency: Optional[float] = None
+    ):
+        """Records a written message.
+
+        Args:
+            topic (str): The writting topic name.
+            nbytes (int): The serialized size.
+            latency (Optional[float]): The receive-to-write latency in
+                seconds, or None if the message was not received in the
+                recording state, e.g. re-emitted static messages.
+        """
+        metrics = self._get(topic)
+        with metrics.lock:
+            metrics.written += 1
+            metrics.bytes += nbytes
+            if latency is not None:
+                metrics.latency.observe(latency)
+
+    def snapshot(self) -> Dict[str, TopicMetrics]:
+        """Gets a copy of all topic metrics, consistent per topic."""
+        return {
+            topic: metrics.copy()
+            for topic, metrics in list(self._topics.items())
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+
+
+def render_prometheus(
+    snapshot: Mapping[str, TopicMetrics],
+    dropped: Mapping[str, int],
+    late: Mapping[str, int],
+    gauges: Mapping[str, float],
+    prefix: str = "mcap_recorder",
+) -> str:
+    """Renders the metrics in the Prometheus text exposition format.
+
+    Args:
+        snapshot (Mapping[str, TopicMetrics]): The per-topic metrics.
+        dropped (Mapping[str, int]): The messages dropped by the full
+            writer queue, per topic.
+        late (Mapping[str, int]): The messages written behind the reorder
+            window, per topic.
+        gauges (Mapping[str, float]): Recorder-wide gauges, e.g. the
+            writer queue depth.
+        prefix (str): The metric name prefix.
+
+    Returns:
+        str: The exposition text.
+    """
+    lines: List[str] = []
+
+    def _counter(name: str, help: str, values: Mapping[str, float]):
+        lines.append(f"# HELP {prefix}_{name} {help}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for labels, value in values.items():
+            lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+
+    topics = sorted(snapshot)
+    _counter(
+        "messages_received_total",
+        "Messages received while recording.",
+        {_labels(topic=t): snapshot[t].received for t in topics},
+    )
+    _counter(
+        "messages_written_total",
+        "Messages written into the bag.",
+        {_labels(topic=t): snapshot[t].written for t in topics},
+    )
+    _counter(
+        "bytes_written_total",
+        "Serialized bytes written into the bag.",
+        {_labels(topic=t): snapshot[t].bytes for t in topics},
+    )
+    dropped_values = {
+        _labels(topic=t, reason="queue_full"): dropped.get(t, 0)
+        for t in topics
+    }
+    for t in topics:
+        for reason, cnt in sorted(snapshot[t].rejected.items()):
+            dropped_values[_labels(topic=t, reason=reason)] = cnt
+    _counter("messages_dropped_total", "Messages dropped.", dropped_values)
+    _counter(
+        "messages_late_total",
+        "Messages written behind the reorder window.",
+        {_labels(topic=t): late.get(t, 0) for t in topics},
+    )
+
+    name = f"{prefix}_write_latency_seconds"
+    lines.append(f"# HELP {name} Latency from receive to write.")
+    lines.append(f"# TYPE {name} histogram")
+    for t in topics:
+        hist = snapshot[t].latency
+        cumulative = 0
+        for bound, cnt in zip(hist.bounds, hist.counts, strict=False):
+            cumulative += cnt
+            lines.append(
+                f"{name}_bucket{{{_labels(topic=t, le=bound)}}} {cumulative}"
+            )
+        lines.append(
+            f"{name}_bucket{{{_labels(topic=t, le='+Inf')}}} {hist.count}"
+        )
+        lines.append(f"{name}_sum{{{_labels(topic=t)}}} {hist.sum}")
+        lines.append(f"{name}_count{{{_labels(topic=t)}}} {hist.count}")
+
+    for gauge, value in gauges.items():
+        lines.append(f"# TYPE {prefix}_{gauge} gauge")
+        lines.append(f"{prefix}_{gauge} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Local HTTP server exposing `/metrics` in a daemon thread."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, host: str, port: int, render: Callable[[], str]):
+        """Constructor.
+
+        Args:
+            host (str): The address to bind.
+            port (int): The port to bind. 0 picks a free port.
+            render (Callable[[], str]): Renders the exposition text.
+        """
+        content_type = self.CONTENT_TYPE
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="mcap_metrics_server",
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,209 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import math
+import threading
+from collections import deque
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+__all__ = ["FrameRateStats", "FrameRateMonitor"]
+
+
+class FrameRateStats(NamedTuple):
+    """Frame statistics over the monitor window.
+
+    Attributes:
+        rate_hz (float): The average frame rate. 0 if the topic timed out.
+        jitter_ms (float): The standard deviation of the inter-arrival
+            intervals.
+        p50_interval_ms (float): The median inter-arrival interval.
+        p99_interval_ms (float): The 99th percentile of the intervals.
+        max_gap_ms (float): The largest interval in the window.
+        num_intervals (int): The number of intervals in the window.
+    """
+
+    rate_hz: float
+    jitter_ms: float
+    p50_interval_ms: float
+    p99_interval_ms: float
+    max_gap_ms: float
+    num_intervals: int
+
+
+class FrameRateMonitor:
+    """Sliding-window frame statistics with constant-time updates.
+
+    The inter-arrival intervals of the last `window_size` frames are kept
+    in a preallocated NumPy ring buffer. The running sums give the rate
+    and the jitter, a monotonic deque gives the maximum gap, and a
+    log-spaced histogram of the window gives the interval percentiles,
+    so that both `update` and `get_stats` cost O(1) amortized, whatever
+    the window size.
+
+    Out-of-order timestamps count as zero intervals.
+
+    This class is thread-safe.
+    """
+
+    NUM_BINS = 512
+    MIN_INTERVAL_NS = 10_000  # 10 us
+    MAX_INTERVAL_NS = 100_000_000_000  # 100 s
+
+    def __init__(
+        self, window_size: int = 10000, timeout_threshold: float = 5 * 1e9
+    ):
+        """Constructor.
+
+        Args:
+            window_size (int): The number of timestamps in the window.
+                Defaults to 10000.
+            timeout_threshold (float): The rate is reported as 0 if the last
+                frame is older than this, in nanoseconds. Defaults to 5 s.
+        """
+        if window_size < 2:
+            raise ValueError(
+                "window_size should be at least 2, but got {}".format(
+                    window_size
+                )
+            )
+        self.window_size = window_size
+        self.timeout_threshold = timeout_threshold
+        self._capacity = window_size - 1
+        self._intervals = np.zeros(self._capacity, dtype=np.int64)
+        self._hist = np.zeros(self.NUM_BINS, dtype=np.int64)
+        self._log_min = math.log(self.MIN_INTERVAL_NS)
+        self._bin_scale = (self.NUM_BINS - 1) / (
+            math.log(self.MAX_INTERVAL_NS) - self._log_min
+        )
+        # geometric center of each bin, in nanoseconds
+        self._bin_centers = np.exp(
+            self._log_min + (np.arange(self.NUM_BINS) - 0.5) / self._bin_scale
+        )
+        self._bin_centers[0] = self.MIN_INTERVAL_NS
+        # (sequence, interval) pairs with decreasing intervals
+        self._max_deque: deque = deque()
+        self._seq = 0
+        self._size = 0
+        self._sum = 0
+        self._sum_sq = 0
+        self._last_timestamp: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """The number of timestamps in the window."""
+        if self._last_timestamp is None:
+            return 0
+        return self._size + 1
+
+    def _bin(self, interval: int) -> int:
+        if interval <= self.MIN_INTERVAL_NS:
+            return 0
+        idx = int((math.log(interval) - self._log_min) * self._bin_scale) + 1
+        return min(idx, self.NUM_BINS - 1)
+
+    def update(self, timestamp_ns: int):
+        """Adds the timestamp of a new frame.
+
+        Args:
+            timestamp_ns (int): The timestamp in nanoseconds.
+        """
+        with self._lock:
+            last = self._last_timestamp
+            if last is None or timestamp_ns > last:
+                self._last_timestamp = timestamp_ns
+            if last is None:
+                return
+            interval = max(int(timestamp_ns - last), 0)
+
+            pos = self._seq % self._capacity
+            if self._size == self._capacity:
+                evicted = int(self._intervals[pos])
+                self._sum -= evicted
+                self._sum_sq -= evicted * evicted
+                self._hist[self._bin(evicted)] -= 1
+            else:
+                self._size += 1
+            self._intervals[pos] = interval
+            self._sum += interval
+            self._sum_sq += interval * interval
+            self._hist[self._bin(interval)] += 1
+
+            max_deque = self._max_deque
+            while max_deque and max_deque[-1][1] <= interval:
+                max_deque.pop()
+            max_deque.append((self._seq, interval))
+            self._seq += 1
+            while max_deque[0][0] < self._seq - self._capacity:
+                max_deque.popleft()
+
+    def _percentile(self, q: float) -> float:
+        cumsum = np.cumsum(self._hist)
+        idx = int(np.searchsorted(cumsum, q * self._size))
+        return float(self._bin_centers[min(idx, self.NUM_BINS - 1)])
+
+    def get_fps(self, current_timestamp_ns: Optional[int] = None) -> float:
+        """Gets the average frame rate over the window.
+
+        Args:
+            current_timestamp_ns (Optional[int]): The current time. If the
+                last frame is older than `timeout_threshold`, the rate is 0.
+
+        Returns:
+            float: The frame rate in Hz.
+        """
+        with self._lock:
+            return self._get_fps(current_timestamp_ns)
+
+    def _get_fps(self, current_timestamp_ns: Optional[int]) -> float:
+        if self._size == 0 or self._sum <= 0:
+            return 0.0
+        if (
+            current_timestamp_ns is not None
+            and current_timestamp_ns - self._last_timestamp
+            > self.timeout_threshold
+        ):
+            return 0.0
+        return self._size / (self._sum * 1e-9)
+
+    def get_stats(
+        self, current_timestamp_ns: Optional[int] = None
+    ) -> FrameRateStats:
+        """Gets the frame statistics over the window.
+
+        Args:
+            current_timestamp_ns (Optional[int]): The current time, used
+                for the timeout of the rate.
+
+        Returns:
+            FrameRateStats: The statistics. Percentiles are resolved to
+            the center of a log-spaced bin, within about 2%.
+        """
+        with self._lock:
+            size = self._size
+            if size == 0:
+                return FrameRateStats(0.0, 0.0, 0.0, 0.0, 0.0, 0)
+            mean = self._sum / size
+            variance = max(self._sum_sq / size - mean * mean, 0.0)
+            return FrameRateStats(
+                rate_hz=self._get_fps(current_timestamp_ns),
+                jitter_ms=math.sqrt(variance) * 1e-6,
+                p50_interval_ms=self._percentile(0.5) * 1e-6,
+                p99_interval_ms=self._percentile(0.99) * 1e-6,
+                max_gap_ms=self._max_deque[0][1] * 1e-6,
+                num_intervals=size,
+            )
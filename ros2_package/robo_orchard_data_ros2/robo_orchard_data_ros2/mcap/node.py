@@ -14,22 +14,79 @@
 # implied. See the License for the specific language governing
 # permissions and limitations under the License.
 
+import enum
 import functools
+import json
 import os
 import re
-from collections import deque
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from queue import Queue
+from typing import Dict, Iterable, List, Set, Tuple
 
+import psutil
 import rclpy
 import rosbag2_py
-from rclpy.callback_groups import ReentrantCallbackGroup
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+from rclpy.callback_groups import (
+    CallbackGroup,
+    MutuallyExclusiveCallbackGroup,
+)
+from rclpy.executors import (
+    Executor,
+    MultiThreadedExecutor,
+    SingleThreadedExecutor,
+)
 from rclpy.node import Node, ParameterDescriptor
 from rclpy.qos import QoSProfile
-from rclpy.serialization import serialize_message
+from rclpy.serialization import deserialize_message, serialize_message
+from sensor_msgs.msg import Image
 from std_msgs.msg import Header
-
-from robo_orchard_data_ros2.mcap.config import RecordConfig, TopicSpec
+from std_srvs.srv import Trigger
+
+from robo_orchard_data_ros2.mcap.bag import BagWriter
+from robo_orchard_data_ros2.mcap.cdr import (
+    find_header_field,
+    get_header_stamp_offset,
+    read_stamp_ns,
+)
+from robo_orchard_data_ros2.mcap.config import (
+    RecordConfig,
+    StorageConfig,
+    TopicSpec,
+)
+from robo_orchard_data_ros2.mcap.discovery import (
+    TopicDiscovery,
+    get_message_class,
+    load_topic_manifest,
+)
+from robo_orchard_data_ros2.mcap.group import (
+    DEFAULT_GROUP,
+    WriterGroup,
+    get_group_uri,
+    write_episode_manifest,
+)
+from robo_orchard_data_ros2.mcap.index import build_index, find_mcap_files
+from robo_orchard_data_ros2.mcap.memory import (
+    Admission,
+    MemoryGovernor,
+    SpilledMessage,
+    forecast_peak_rss,
+)
+from robo_orchard_data_ros2.mcap.metrics import (
+    MetricsServer,
+    RecorderMetrics,
+    render_prometheus,
+)
+from robo_orchard_data_ros2.mcap.monitor import FrameRateMonitor
+from robo_orchard_data_ros2.mcap.preroll import PrerollBuffer, PrerollEntry
+from robo_orchard_data_ros2.mcap.recovery import RECORDING_FILE
+from robo_orchard_data_ros2.mcap.static import StaticMessageCache
+from robo_orchard_data_ros2.mcap.stats import TimestampRange
+from robo_orchard_data_ros2.mcap.throttle import TopicThrottle
+from robo_orchard_data_ros2.mcap.writer import WriteRequest, WriterStage
 
 __all__ = ["McapRecorder"]
 
@@ -40,29 +97,59 @@ class TopicFilterConflictError(Exception):
     pass
 
 
-class FrameRateMonitor:
-    def __init__(self, window_size=30, timeout_threshold: float = 5 * 1e9):
-        self.timestamps = deque(maxlen=window_size)
-        self.timeout_threshold = timeout_threshold
+class RecorderState(enum.Enum):
+    """Lifecycle states of :class:`McapRecorder`.
 
-    def update(self, timestamp_ns: int):
-        self.timestamps.append(timestamp_ns)
+    The recorder moves through the states in the following order::
 
-    def get_fps(self, current_timestamp_ns: int) -> float:
-        if (
-            len(self.timestamps) < 2
-            or current_timestamp_ns - self.timestamps[-1]
-            > self.timeout_threshold
-        ):
-            return 0.0
+        WAITING -> ARMED -> RECORDING <-> PAUSED -> FINALIZING
 
-        time_diff_ns = self.timestamps[-1] - self.timestamps[0]
-        if time_diff_ns <= 0:
-            return 0.0
-        return (len(self.timestamps) - 1) / (time_diff_ns * 1e-9)
+    - WAITING: Waiting for `RecordConfig.wait_for_topics`.
+    - ARMED: All required topics are available, waiting for start. With
+      `RecordConfig.preroll`, the last seconds of messages are buffered
+      and written on start.
+    - RECORDING: Messages are written into the bag.
+    - PAUSED: Messages are discarded, except static topics which are
+      buffered until recording resumes.
+    - FINALIZING: The bag is being closed or has been closed. Terminal,
+      except for a daemon, which is armed again by `~/stop_episode`.
+    """
 
-    def __len__(self) -> int:
-        return len(self.timestamps)
+    WAITING = "waiting"
+    ARMED = "armed"
+    RECORDING = "recording"
+    PAUSED = "paused"
+    FINALIZING = "finalizing"
+
+
+def compile_topic_patterns(
+    patterns: Iterable[str],
+) -> Tuple[Set[str], List[re.Pattern]]:
+    """Splits topic patterns into plain topic names and regexes.
+
+    Args:
+        patterns (Iterable[str]): Topic names or regex patterns. A pattern
+            containing `*` or `.` is treated as a regex.
+
+    Returns:
+        Tuple[Set[str], List[re.Pattern]]: The plain topic names and the
+        compiled regexes.
+    """
+    topics = set()
+    regexes = []
+    for pattern in patterns:
+        if "*" in pattern or "." in pattern:
+            regexes.append(re.compile(pattern))
+        else:
+            topics.add(pattern)
+    return topics, regexes
+
+
+def match_topic(
+    topic: str, topics: Set[str], regexes: List[re.Pattern]
+) -> bool:
+    """Checks whether a topic matches compiled topic patterns."""
+    return topic in topics or any(regex.match(topic) for regex in regexes)
 
 
 class McapRecorder(Node):
@@ -70,59 +157,728 @@ class McapRecorder(Node):
 
     This node subscribes to specified ROS topics, serializes messages,
     and writes them into an MCAP storage format using `rosbag2_py`.
+
+    Subscription callbacks only stamp the messages and hand them over to
+    a :class:`WriterStage`, whose threads serialize and write them, so
+    that disk I/O never blocks the executor. Images of topics with
+    `TopicSpec.codec` go through a second stage of encoder threads first.
+    Topics of `RecordConfig.writer_groups` are written into their own bags
+    by their own writer threads.
+
+    Each topic belongs to a mutually exclusive callback group, so the
+    per-topic state is never updated concurrently even when the node is
+    spun by a multi-threaded executor (see :meth:`create_executor`).
+
+    The recording session follows :class:`RecorderState`, which can be
+    controlled through the `~/start`, `~/pause`, `~/resume`, `~/stop` and
+    `~/status` services (`std_srvs/srv/Trigger`). Transitions happen once
+    and the message callbacks only check the in-memory state.
+
+    With the `daemon` parameter, the node records many episodes while its
+    subscriptions stay warm. No bag is opened at startup. Instead,
+    `~/start_episode` opens a bag at the current `uri` parameter and
+    starts recording, and `~/stop_episode` closes it and arms the
+    recorder again.
     """
 
-    RECORDING_FILE = "__RECORDING__"
+    RECORDING_FILE = RECORDING_FILE
 
     def __init__(
         self,
     ):
         super().__init__("mcap_recorder")
+        self._timestamp_range = TimestampRange()
+        self._frame_rate_monitors = dict()
+        self._last_dropped = dict()
         self._initialize()
         self._insepct_topics = set()
         self._subscribers = dict()
-        self._cnt = 0
         self._hint_freq = 4096
-        self._callback_group = ReentrantCallbackGroup()
-        self._min_timestamp = None
-        self._max_timestamp = None
-        self._frame_rate_monitors = dict()
-        self._msg_cnt = dict()
-        self._static_msgs_buf = Queue()
+        self._timer_callback_group = MutuallyExclusiveCallbackGroup()
+        self._stamp_offsets = dict()
+        self._state_lock = threading.Lock()
+        self._pending_topics = set(self.config.wait_for_topics)
+        self._state = RecorderState.WAITING
+        # cleared while start and resume flush the buffered messages, so
+        # that live messages are not written concurrently with the flush
+        self._flushed = threading.Event()
+        self._flushed.set()
+        # set by stop, unlike the FINALIZING state of stop_episode
+        self._stopped = False
+        # the sidecar indexes are built off the executor threads
+        self._index_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mcap_index"
+        )
+        self._service_callback_group = MutuallyExclusiveCallbackGroup()
+        for name, callback in (
+            ("start", self._start_service),
+            ("pause", self._pause_service),
+            ("resume", self._resume_service),
+            ("stop", self._stop_service),
+            ("status", self._status_service),
+            ("start_episode", self._start_episode_service),
+            ("stop_episode", self._stop_episode_service),
+        ):
+            self.create_service(
+                Trigger,
+                f"~/{name}",
+                callback,
+                callback_group=self._service_callback_group,
+            )
+        if not self._pending_topics:
+            self._arm()
+
+        topic_manifest = load_topic_manifest(self.config.discovery)
+        if topic_manifest:
+            self.subscribe_topics(topic_manifest.items())
 
         if self.config.no_discovery:
-            self.scan_topics()
+            if not topic_manifest:
+                self.scan_topics()
         else:
-            self.create_timer(1.0, self.scan_topics)
+            self._discovery = TopicDiscovery(
+                self,
+                self.subscribe_topics,
+                config=self.config.discovery,
+                callback_group=self._timer_callback_group,
+            )
+            self._discovery.add_known_topics(topic_manifest.keys())
+
+        self.create_timer(
+            1.0, self._monitor, callback_group=self._timer_callback_group
+        )
+        if self.config.crash_safety.fsync_period_sec is not None:
+            self.create_timer(
+                self.config.crash_safety.fsync_period_sec,
+                self._fsync,
+                callback_group=self._timer_callback_group,
+            )
+
+        self._topic_rates = dict()
+        self._last_metrics = None
+        self._last_dropped_metrics = dict()
+        self._diagnostics_pub = None
+        if self.config.metrics.diagnostics_topic is not None:
+            self._diagnostics_pub = self.create_publisher(
+                DiagnosticArray, self.config.metrics.diagnostics_topic, 10
+            )
+        self.create_timer(
+            self.config.metrics.period_sec,
+            self._publish_metrics,
+            callback_group=self._timer_callback_group,
+        )
+        self._metrics_server = None
+        if self.config.metrics.http_port is not None:
+            self._metrics_server = MetricsServer(
+                self.config.metrics.http_host,
+                self.config.metrics.http_port,
+                self.render_metrics,
+            )
+            self.get_logger().info(
+                "Serving metrics at http://{}:{}/metrics".format(
+                    self.config.metrics.http_host, self._metrics_server.port
+                )
+            )
+
+    def create_executor(self) -> Executor:
+        """Creates the executor configured by `RecordConfig.executor`.
+
+        Returns:
+            Executor: The executor, with this node added.
+        """
+        executor_cfg = self.config.executor
+        if executor_cfg.type == "multi_threaded":
+            executor = MultiThreadedExecutor(
+                num_threads=executor_cfg.num_threads
+            )
+        elif executor_cfg.type == "single_threaded":
+            executor = SingleThreadedExecutor()
+        else:
+            raise NotImplementedError(
+                f"Unsupported executor type: {executor_cfg.type}"
+            )
+        executor.add_node(self)
+        return executor
+
+    def get_callback_group(self, topic: str) -> CallbackGroup:
+        """Gets the callback group of a topic.
+
+        Args:
+            topic (str): The name of the topic.
+
+        Returns:
+            CallbackGroup: The shared group configured in
+            `ExecutorConfig.callback_groups`, or a dedicated mutually
+            exclusive group if the topic matches no group.
+        """
+        for name, (topics, regexes) in self._callback_group_filters.items():
+            if match_topic(topic, topics, regexes):
+                if name not in self._callback_groups:
+                    self._callback_groups[name] = (
+                        MutuallyExclusiveCallbackGroup()
+                    )
+                return self._callback_groups[name]
+        return MutuallyExclusiveCallbackGroup()
+
+    @property
+    def state(self) -> RecorderState:
+        return self._state
+
+    def _arm(self):
+        """Transits from WAITING to ARMED, and starts if configured."""
+        with self._state_lock:
+            if self._state is not RecorderState.WAITING:
+                return
+            if self._preroll is not None:
+                self._preroll.open()
+            self._state = RecorderState.ARMED
+        self.get_logger().info("Recorder is armed.")
+        if self.config.auto_start and self._episode_open:
+            self.start()
 
-        self.create_timer(1.0, self._monitor)
+    def start(self) -> bool:
+        """Transits from ARMED to RECORDING.
+
+        The recording flag file is created and the buffered static
+        messages are flushed exactly once, followed by the pre-roll
+        messages. The flag holds the pid of the recorder, so that
+        `mcap_recover` can tell a crashed recording from a running one.
+
+        Live messages received during the flush wait for it to complete,
+        so that every topic is written by a single thread in order.
+
+        Returns:
+            bool: True if the transition happened.
+        """
+        with self._state_lock:
+            if self._state is not RecorderState.ARMED or not (
+                self._episode_open
+            ):
+                return False
+            with open(self.recording_flag, "w") as fw:
+                json.dump(
+                    {
+                        "pid": os.getpid(),
+                        "host": socket.gethostname(),
+                        "create_time": psutil.Process().create_time(),
+                    },
+                    fw,
+                )
+            self._flushed.clear()
+            self._state = RecorderState.RECORDING
+            preroll = (
+                []
+                if self._preroll is None
+                else self._preroll.drain(time.monotonic_ns())
+            )
+        try:
+            self._write_episode_manifest()
+            self.get_logger().info("Begining writing...")
+            self._flush_static_cache()
+            self._flush_preroll(preroll)
+        finally:
+            self._flushed.set()
+        return True
+
+    def pause(self) -> bool:
+        """Transits from RECORDING to PAUSED.
+
+        Returns:
+            bool: True if the transition happened.
+        """
+        with self._state_lock:
+            if self._state is not RecorderState.RECORDING:
+                return False
+            self._state = RecorderState.PAUSED
+        self._flushed.wait()
+        self._drain_reorder_buffer()
+        self.get_logger().info("Recording paused.")
+        return True
+
+    def resume(self) -> bool:
+        """Transits from PAUSED to RECORDING.
+
+        Returns:
+            bool: True if the transition happened.
+        """
+        with self._state_lock:
+            if self._state is not RecorderState.PAUSED:
+                return False
+            self._flushed.clear()
+            self._state = RecorderState.RECORDING
+        self.get_logger().info("Recording resumed.")
+        try:
+            self._flush_static_cache()
+        finally:
+            self._flushed.set()
+        return True
+
+    def stop(self) -> bool:
+        """Transits to FINALIZING and closes the bag.
+
+        Pending messages are drained before the bag is closed, then the
+        recording flag file is removed. The statistics of the episode are
+        logged and its sidecar index is built in background.
+
+        Returns:
+            bool: True if the transition happened, False if the recorder
+            has already been stopped.
+        """
+        with self._state_lock:
+            if self._state is RecorderState.FINALIZING:
+                return False
+            self._state = RecorderState.FINALIZING
+            self._stopped = True
+        self._flushed.wait()
+        if self._preroll is not None:
+            self._preroll.drain(time.monotonic_ns())
+        if self._episode_open:
+            self._finish_episode()
+        return True
+
+    def start_episode(self, uri: str = "") -> bool:
+        """Opens a bag at `uri` and starts recording into it.
+
+        Args:
+            uri (str): The output bag path. Defaults to "", which uses a
+                timestamped directory.
+
+        Returns:
+            bool: True if the recording started, False if the recorder is
+            not armed or an episode is already open.
+
+        Raises:
+            RuntimeError: If the bag cannot be opened, e.g. because `uri`
+                already exists.
+        """
+        with self._state_lock:
+            if self._state is not RecorderState.ARMED or self._episode_open:
+                return False
+        self._open_episode(uri)
+        return self.start()
+
+    def stop_episode(self) -> bool:
+        """Closes the bag of the current episode and arms the recorder.
+
+        Unlike :meth:`stop`, the subscriptions are kept, so that the next
+        episode starts without discovery. The sidecar index is built in
+        background, so that the next episode can start meanwhile.
+
+        Returns:
+            bool: True if an episode has been closed.
+        """
+        with self._state_lock:
+            if self._state not in (
+                RecorderState.RECORDING,
+                RecorderState.PAUSED,
+            ):
+                return False
+            self._state = RecorderState.FINALIZING
+        self._flushed.wait()
+        self._finish_episode()
+        with self._state_lock:
+            if self._preroll is not None:
+                self._preroll.open()
+            self._state = RecorderState.ARMED
+        self.get_logger().info("Recorder is armed.")
+        return True
+
+    def _open_episode(self, uri: str):
+        """Opens the writers of an episode and resets its statistics.
+
+        Args:
+            uri (str): The output bag path. An empty string uses a
+                timestamped directory.
+        """
+        if uri == "":
+            uri = datetime.now().strftime("rosbag2_%Y_%m_%d-%H_%M_%S")
+        self.get_logger().info(f"Recording data to {uri}")
+        # the default group is opened first, because rosbag2 requires its
+        # bag directory not to exist
+        group_args = [
+            (
+                DEFAULT_GROUP,
+                uri,
+                self.config.storage,
+                self.config.num_writer_threads,
+            )
+        ]
+        for name, group_cfg in self.config.writer_groups.items():
+            group_args.append(
+                (
+                    name,
+                    get_group_uri(uri, name, group_cfg.uri_root),
+                    group_cfg.storage or self.config.storage,
+                    group_cfg.num_writer_threads
+                    or self.config.num_writer_threads,
+                )
+            )
+        groups: Dict[str, WriterGroup] = dict()
+        try:
+            for args in group_args:
+                groups[args[0]] = self._create_writer_group(*args)
+        except Exception:
+            for group in groups.values():
+                group.stage.close()
+                group.bag_writer.close()
+            raise
+        for group in groups.values():
+            if group.name != DEFAULT_GROUP:
+                self.get_logger().info(
+                    f"Recording writer group {group.name} to {group.uri}"
+                )
+
+        with self._episode_lock:
+            self.uri = uri
+            self.recording_flag = os.path.join(uri, self.RECORDING_FILE)
+            self._timestamp_range = TimestampRange()
+            self._last_dropped = dict()
+            for data in list(self._frame_rate_monitors.values()):
+                data["monitor"] = FrameRateMonitor(
+                    window_size=data["spec"].frame_rate_monitor.window_size
+                )
+                data.pop("stats", None)
+                data.pop("reported_gap_ms", None)
+            self._memory = self._create_memory_governor()
+            for priority in self._priorities:
+                self._memory.register_priority(priority)
+            self._groups = groups
+            self.bag_writer = groups[DEFAULT_GROUP].bag_writer
+            self._topic_groups = dict()
+            for dst_topic, (src_topic, metadata) in list(
+                self._topic_metadata.items()
+            ):
+                self._create_episode_topic(src_topic, dst_topic, metadata)
+            self._encoder_stage = None
+            if any(
+                spec.codec is not None
+                for spec in (
+                    self.config.default_topic_spec,
+                    *self.config.topic_spec.values(),
+                )
+            ):
+                self._encoder_stage = WriterStage(
+                    fn=self._encode_request,
+                    num_threads=self.config.num_encoder_threads,
+                    max_queue_size=self.config.writer_queue_size,
+                    on_error=self._on_encode_error,
+                    on_drop=self._on_queue_drop,
+                    name="mcap_encoder",
+                    # frames of a topic are encoded in parallel with other
+                    # topics, but handed to the writers in order
+                    keep_topic_order=True,
+                )
+            self._episode_open = True
+
+    def _create_episode_topic(self, src_topic: str, dst_topic: str, metadata):
+        """Registers a topic in the writer group of the current episode.
+
+        The caller should hold `_episode_lock`.
+        """
+        group = self._groups[self.get_writer_group(src_topic)]
+        self._topic_groups[dst_topic] = group
+        group.topics.append(dst_topic)
+        # static messages are written into every group
+        for other in (
+            self._groups.values()
+            if dst_topic in self._static_dst_topics
+            else [group]
+        ):
+            with other.lock:
+                other.bag_writer.create_topic(metadata)
+
+    def _close_episode(self):
+        """Drains the pending messages and closes the bags."""
+        self.get_logger().info("Finalizing recording...")
+        with self._episode_lock:
+            self._episode_open = False
+        # Drain the pending messages before closing the bag.
+        self._memory.close()
+        if self._encoder_stage is not None:
+            self._encoder_stage.close()
+        for group in self._groups.values():
+            group.stage.queue.close()
+        for group in self._groups.values():
+            group.stage.close()
+        self._drain_reorder_buffer()
+        for group in self._groups.values():
+            with group.lock:
+                group.bag_writer.close()
+        self._write_episode_manifest(finished=True)
+        if self._memory.spill_file is not None:
+            self._memory.spill_file.close()
+        if os.path.exists(self.recording_flag):
+            os.remove(self.recording_flag)
+
+    def _finish_episode(self):
+        """Closes the episode, logs its statistics and builds its index."""
+        self._close_episode()
+        self._log_episode_stats()
+        if self.config.sidecar_index:
+            files = find_mcap_files(
+                [
+                    split.uri
+                    for group in self._groups.values()
+                    for split in group.bag_writer.splits
+                ]
+            )
+            self._index_executor.submit(self._build_sidecar_index, files)
+
+    def get_status(self) -> dict:
+        """Gets a summary of the recording session.
+
+        Returns:
+            dict: The state, the uri and the message statistics.
+        """
+        return {
+            "state": self._state.value,
+            "daemon": self.daemon,
+            "episode_open": self._episode_open,
+            "uri": self.uri,
+            "pending_topics": sorted(self._pending_topics),
+            "message_count": self.message_count,
+            "duration_ns": self.duration,
+            "writer_queue_depth": self.writer_queue_depth,
+            "encoder_queue_depth": (
+                0 if self._encoder_stage is None else self._encoder_stage.depth
+            ),
+            "writer_groups": {
+                name: {
+                    "uri": group.uri,
+                    "writer_queue_depth": group.stage.depth,
+                }
+                for name, group in self._groups.items()
+            },
+            "dropped": self.dropped,
+            "late": self.late,
+            "throttled": self.throttled,
+            "memory": self._memory.get_stats(),
+            "preroll": (
+                None if self._preroll is None else self._preroll.get_stats()
+            ),
+            "topics": self.get_topic_metrics(),
+            "frame_rate": {
+                topic: data["stats"]._asdict()
+                for topic, data in self._frame_rate_monitors.items()
+                if "stats" in data
+            },
+        }
+
+    def _trigger_response(
+        self, response: Trigger.Response, success: bool, action: str
+    ) -> Trigger.Response:
+        response.success = success
+        if success:
+            response.message = json.dumps(self.get_status())
+        else:
+            response.message = "Cannot {} while recorder is {}".format(
+                action, self._state.value
+            )
+        return response
+
+    def _start_service(self, request, response):
+        return self._trigger_response(response, self.start(), "start")
+
+    def _pause_service(self, request, response):
+        return self._trigger_response(response, self.pause(), "pause")
+
+    def _resume_service(self, request, response):
+        return self._trigger_response(response, self.resume(), "resume")
+
+    def _stop_service(self, request, response):
+        return self._trigger_response(response, self.stop(), "stop")
+
+    def _status_service(self, request, response):
+        return self._trigger_response(response, True, "query status")
+
+    def _start_episode_service(self, request, response):
+        uri = self.get_parameter("uri").get_parameter_value().string_value
+        try:
+            success = self.start_episode(uri)
+        except Exception as e:
+            self.get_logger().error(f"Failed to open episode {uri}: {e}")
+            response.success = False
+            response.message = f"Failed to open episode {uri}: {e}"
+            return response
+        return self._trigger_response(response, success, "start episode")
+
+    def _stop_episode_service(self, request, response):
+        return self._trigger_response(
+            response, self.stop_episode(), "stop episode"
+        )
+
+    def _fsync(self):
+        if self._state in (RecorderState.RECORDING, RecorderState.PAUSED):
+            for group in self._groups.values():
+                group.bag_writer.fsync()
 
     def _monitor(self):
-        if self.config.wait_for_topics:
+        if self._state is RecorderState.WAITING:
             self.get_logger().warning(
-                "Waiting for topics: {}".format(self.config.wait_for_topics)
+                "Waiting for topics: {}".format(self._pending_topics)
             )
 
-        """Periodic frame rate validation against configured ranges."""
+        dropped = self.dropped
+        for dst_topic, cnt in dropped.items():
+            if cnt > self._last_dropped.get(dst_topic, 0):
+                self.get_logger().warning(
+                    f"Topic [{dst_topic}] dropped "
+                    f"{cnt - self._last_dropped.get(dst_topic, 0)} messages "
+                    "due to full writer queue "
+                    f"(depth = {self.writer_queue_depth})"
+                )
+        self._last_dropped = dropped
+
+        # Periodic frame rate validation against configured ranges. Each
+        # topic is checked on its own.
         for dst_topic, data in self._frame_rate_monitors.items():
             monitor = data["monitor"]
 
             if self.duration < 5 * 1e9 and len(monitor) < 2:
-                return
+                continue
 
-            spec = data["spec"]
-            current_fps = monitor.get_fps(self._max_timestamp)
-            min_fps = spec.frame_rate_monitor.min_hz
-            max_fps = spec.frame_rate_monitor.max_hz
+            cfg = data["spec"].frame_rate_monitor
+            stats = monitor.get_stats(self._timestamp_range.max)
+            data["stats"] = stats
 
             # Log warning if outside expected range
-            if not (min_fps <= current_fps <= max_fps):
+            if not (cfg.min_hz <= stats.rate_hz <= cfg.max_hz):
                 self.get_logger().warning(
                     f"Topic [{dst_topic}] abnormal frame rate: "
-                    f"{current_fps:.2f} Hz "
-                    f"(expected range [{min_fps}, {max_fps}])"
+                    f"{stats.rate_hz:.2f} Hz "
+                    f"(expected range [{cfg.min_hz}, {cfg.max_hz}])"
+                )
+            if (
+                cfg.max_jitter_ms is not None
+                and stats.jitter_ms > cfg.max_jitter_ms
+            ):
+                self.get_logger().warning(
+                    f"Topic [{dst_topic}] abnormal jitter: "
+                    f"{stats.jitter_ms:.2f} ms "
+                    f"(p50 = {stats.p50_interval_ms:.2f} ms, "
+                    f"p99 = {stats.p99_interval_ms:.2f} ms)"
+                )
+            # a gap stays in the window for a while, only report new ones
+            if (
+                cfg.max_gap_ms is not None
+                and stats.max_gap_ms > cfg.max_gap_ms
+                and stats.max_gap_ms != data.get("reported_gap_ms")
+            ):
+                data["reported_gap_ms"] = stats.max_gap_ms
+                self.get_logger().warning(
+                    f"Topic [{dst_topic}] frame gap of "
+                    f"{stats.max_gap_ms:.2f} ms "
+                    f"(expected at most {cfg.max_gap_ms} ms)"
                 )
 
+    def get_topic_metrics(self) -> Dict[str, dict]:
+        """Gets the live per-topic metrics.
+
+        Rates are averaged over the last metrics period.
+
+        Returns:
+            Dict[str, dict]: Per writting topic, the message counters, the
+            rates and the receive-to-write latency percentiles.
+        """
+        snapshot = self.metrics.snapshot()
+        dropped = self.dropped
+        late = self.late
+        now = time.monotonic()
+        topics = dict()
+        for topic, metrics in snapshot.items():
+            p50 = metrics.latency.quantile(0.5)
+            p99 = metrics.latency.quantile(0.99)
+            rate_hz, bandwidth = self._topic_rates.get(topic, (0.0, 0.0))
+            topics[topic] = {
+                "received": metrics.received,
+                "written": metrics.written,
+                "bytes": metrics.bytes,
+                "dropped": dropped.get(topic, 0)
+                + sum(metrics.rejected.values()),
+                "late": late.get(topic, 0),
+                "rate_hz": rate_hz,
+                "bandwidth_bytes_per_sec": bandwidth,
+                "latency_p50_ms": None if p50 is None else p50 * 1e3,
+                "latency_p99_ms": None if p99 is None else p99 * 1e3,
+                "idle_sec": (
+                    None
+                    if metrics.last_receive_time is None
+                    else now - metrics.last_receive_time
+                ),
+            }
+        return topics
+
+    def render_metrics(self) -> str:
+        """Renders the metrics in the Prometheus text format."""
+        return render_prometheus(
+            self.metrics.snapshot(),
+            dropped=self.dropped,
+            late=self.late,
+            gauges={
+                "recording": int(self._state is RecorderState.RECORDING),
+                "writer_queue_depth": self.writer_queue_depth,
+                "encoder_queue_depth": (
+                    0
+                    if self._encoder_stage is None
+                    else self._encoder_stage.depth
+                ),
+                "inflight_bytes": self._memory.in_use,
+                "duration_seconds": self.duration * 1e-9,
+                "messages_total": self.message_count,
+            },
+        )
+
+    def _publish_metrics(self):
+        snapshot = self.metrics.snapshot()
+        now = time.monotonic()
+        if self._last_metrics is not None:
+            last_time, last_snapshot = self._last_metrics
+            elapsed = now - last_time
+            for topic, metrics in snapshot.items():
+                last = last_snapshot.get(topic)
+                received = metrics.received - (
+                    0 if last is None else last.received
+                )
+                nbytes = metrics.bytes - (0 if last is None else last.bytes)
+                self._topic_rates[topic] = (
+                    received / elapsed,
+                    nbytes / elapsed,
+                )
+        self._last_metrics = (now, snapshot)
+
+        if self._diagnostics_pub is None:
+            return
+        dropped = self.dropped
+        is_recording = self._state is RecorderState.RECORDING
+        msg = DiagnosticArray()
+        msg.header.stamp = self.get_clock().now().to_msg()
+        for topic, metrics in self.get_topic_metrics().items():
+            status = DiagnosticStatus()
+            status.name = f"{self.get_name()}: {topic}"
+            status.hardware_id = self.get_fully_qualified_name()
+            status.level = DiagnosticStatus.OK
+            status.message = "OK"
+            last_dropped = self._last_dropped_metrics.get(topic, 0)
+            new_drops = dropped.get(topic, 0) - last_dropped
+            idle_sec = metrics["idle_sec"]
+            if (
+                is_recording
+                and idle_sec is not None
+                and idle_sec > self.config.metrics.starving_timeout_sec
+            ):
+                status.level = DiagnosticStatus.STALE
+                status.message = f"No message for {idle_sec:.1f} s"
+            elif new_drops > 0:
+                status.level = DiagnosticStatus.WARN
+                status.message = f"Dropped {new_drops} messages"
+            status.values = [
+                KeyValue(key=key, value=str(value))
+                for key, value in metrics.items()
+            ]
+            msg.status.append(status)
+        self._last_dropped_metrics = dropped
+        self._diagnostics_pub.publish(msg)
+
     @functools.lru_cache(maxsize=None)  # noqa: B019
     def log_once(self, msg: str, level: str = "info"):
         """Logs a message only once.
@@ -147,6 +903,8 @@ class McapRecorder(Node):
         """Determines whether a topic should be recorded.
 
         The logic follows these rules:
+        0. Never record the private topics of the recorder, like its
+           `~/diagnostics`.
         1. If no filtering is applied, record all topics by default.
         2. If `include_patterns` exist, only record topics that match.
         3. If `exclude_patterns` exist, filter out matching topics.
@@ -162,6 +920,8 @@ class McapRecorder(Node):
             TopicFilterConflictError: If the topic matches both include and
                 exclude filters.
         """
+        if topic.startswith(self.get_fully_qualified_name() + "/"):
+            return False
 
         if not self._has_topic_filter:
             # by default, record all topics
@@ -212,88 +972,46 @@ class McapRecorder(Node):
             topic, self.config.default_topic_spec
         )
 
+    def get_dst_topic(self, topic: str) -> str:
+        """Gets the writting topic name of a topic.
+
+        Args:
+            topic (str): The name of the topic.
+
+        Returns:
+            str: The renamed topic if `TopicSpec.rename_topic` is set,
+            `<topic>/compressed` if `TopicSpec.codec` is set, otherwise the
+            topic itself.
+        """
+        spec = self.get_topic_spec(topic)
+        if spec.rename_topic is not None:
+            return spec.rename_topic
+        if spec.codec is not None:
+            return topic.rstrip("/") + "/compressed"
+        return topic
+
     def scan_topics(self):
         """Topic scan.
 
         Scans available topics and subscribes to those that match the filter
         criteria.
         """
+        self.subscribe_topics(
+            (topic, msg_types[0])
+            for topic, msg_types in self.get_topic_names_and_types()
+        )
 
-        def _get_message_class(msg_type: str):
-            """Dynamically imports the message type.
-
-            Args:
-                msg_type (str): The ROS 2 message type (e.g.,
-                    "std_msgs/msg/String").
+    def subscribe_topics(self, topic_types: Iterable[Tuple[str, str]]):
+        """Subscribes to the new topics that match the filter criteria.
 
-            Returns:
-                type: The message class, or None if the import fails.
-            """
-            try:
-                module_name, class_name = msg_type.rsplit("/", 1)
-                module_name = ".".join(module_name.split("/"))
-                module = __import__(module_name, fromlist=[class_name])
-                return getattr(module, class_name)
-            except Exception as e:
-                self.get_logger().error(f"Failed to import {msg_type}: {e}")
-                return None
-
-        def _subscribe_topic(topic: str, msg_type_class: type, msg_type: str):
-            """Creates a subscription for a given topic.
-
-            Args:
-                topic (str): The topic name.
-                msg_type_class (type): The message type class associated with
-                    the topic.
-                msg_type (str): The message type name.
-            """
-            spec = self.get_topic_spec(topic)
-            dst_topic = (
-                topic if spec.rename_topic is None else spec.rename_topic
-            )
-            qos = QoSProfile(
-                depth=spec.qos_profile.depth,
-                reliability=spec.qos_profile.reliability,
-                durability=spec.qos_profile.durability,
-                history=spec.qos_profile.history,
-            )
-            self._subscribers[topic] = self.create_subscription(
-                msg_type_class,
-                topic,
-                functools.partial(
-                    self._message_callback,
-                    src_topic=topic,
-                    dst_topic=dst_topic,
-                    spec=spec,
-                ),
-                qos,
-                callback_group=self._callback_group,
-            )
-            self.writer.create_topic(
-                rosbag2_py.TopicMetadata(
-                    name=dst_topic,
-                    type=msg_type,
-                    serialization_format="cdr",
-                )
-            )
-            if spec.frame_rate_monitor is not None:
-                self._frame_rate_monitors[dst_topic] = {
-                    "monitor": FrameRateMonitor(
-                        window_size=spec.frame_rate_monitor.window_size
-                    ),
-                    "spec": spec,
-                }
-            self._msg_cnt[dst_topic] = 0
-            if spec.rename_topic is None:
-                self.get_logger().info("Subscribed to topic {}".format(topic))
-            else:
-                self.get_logger().info(
-                    "Subscribed to topic {} and rename to {}".format(
-                        topic, spec.rename_topic
-                    )
-                )
+        Args:
+            topic_types (Iterable[Tuple[str, str]]): The `(topic, msg_type)`
+                pairs, from a graph query or a topic manifest.
+        """
+        if self._stopped:
+            return
 
-        for topic, msg_type in self.get_topic_names_and_types():
+        for topic, msg_type in topic_types:
             # cache topic inspect infos
             if topic in self._insepct_topics:
                 continue
@@ -302,20 +1020,143 @@ class McapRecorder(Node):
             if not self.should_record_topic(topic):
                 self.get_logger().info("Ignore topic {}".format(topic))
                 continue
-            msg_type_class = _get_message_class(msg_type[0])
-            if msg_type_class is not None:
-                _subscribe_topic(topic, msg_type_class, msg_type[0])
-            else:
+            try:
+                msg_type_class = get_message_class(msg_type)
+            except Exception as e:
+                self.get_logger().error(f"Failed to import {msg_type}: {e}")
                 self.get_logger().error(
                     "Ignore topic {} because of cannot import the message class".format(  # noqa: E501
                         topic
                     )
                 )
+                continue
+            self._subscribe_topic(topic, msg_type_class, msg_type)
 
-    def _write_message(
-        self, msg, src_topic: str, dst_topic: str, spec: TopicSpec
+    def _subscribe_topic(
+        self, topic: str, msg_type_class: type, msg_type: str
     ):
-        if (
+        """Creates a subscription for a given topic.
+
+        Args:
+            topic (str): The topic name.
+            msg_type_class (type): The message type class associated with
+                the topic.
+            msg_type (str): The message type name.
+        """
+        spec = self.get_topic_spec(topic)
+        dst_topic = self.get_dst_topic(topic)
+        if spec.codec is not None:
+            if msg_type == "sensor_msgs/msg/Image":
+                self._codecs[dst_topic] = spec.codec.class_type(spec.codec)
+                msg_type = "sensor_msgs/msg/CompressedImage"
+            else:
+                self.get_logger().error(
+                    f"Topic {topic} of type {msg_type} cannot be encoded "
+                    "as an image. Recording it without codec."
+                )
+        qos = QoSProfile(
+            depth=spec.qos_profile.depth,
+            reliability=spec.qos_profile.reliability,
+            durability=spec.qos_profile.durability,
+            history=spec.qos_profile.history,
+        )
+        raw = self.config.raw_subscription and not (
+            dst_topic in self._codecs
+            or self._needs_deserialization(spec, msg_type_class)
+        )
+        if raw and spec.stamp_type == "msg_header_stamp":
+            self._stamp_offsets[topic] = get_header_stamp_offset(
+                msg_type_class
+            )
+        self._subscribers[topic] = self.create_subscription(
+            msg_type_class,
+            topic,
+            functools.partial(
+                self._message_callback,
+                src_topic=topic,
+                dst_topic=dst_topic,
+                spec=spec,
+            ),
+            qos,
+            callback_group=self.get_callback_group(topic),
+            raw=raw,
+        )
+        metadata = rosbag2_py.TopicMetadata(
+            name=dst_topic, type=msg_type, serialization_format="cdr"
+        )
+        with self._episode_lock:
+            self._topic_metadata[dst_topic] = (topic, metadata)
+            if self._episode_open:
+                self._create_episode_topic(topic, dst_topic, metadata)
+        if spec.frame_rate_monitor is not None:
+            self._frame_rate_monitors[dst_topic] = {
+                "monitor": FrameRateMonitor(
+                    window_size=spec.frame_rate_monitor.window_size
+                ),
+                "spec": spec,
+            }
+        self.metrics.add_topic(dst_topic)
+        self._priorities.add(spec.priority)
+        self._memory.register_priority(spec.priority)
+        if spec.throttle is not None:
+            self._throttles[dst_topic] = TopicThrottle(spec.throttle)
+        mode = "raw" if raw else "deserialized"
+        if dst_topic in self._codecs:
+            mode += ", {} encoded".format(spec.codec.class_type.__name__)
+        group = self.get_writer_group(topic)
+        if group != DEFAULT_GROUP:
+            mode += ", writer group {}".format(group)
+        if spec.rename_topic is None:
+            self.get_logger().info(
+                "Subscribed to topic {} ({})".format(topic, mode)
+            )
+        else:
+            self.get_logger().info(
+                "Subscribed to topic {} ({}) and rename to {}".format(
+                    topic, mode, spec.rename_topic
+                )
+            )
+
+    def _needs_deserialization(
+        self, spec: TopicSpec, msg_type_class: type
+    ) -> bool:
+        """Determines whether a topic must be subscribed as Python objects.
+
+        Args:
+            spec (TopicSpec): The topic spec.
+            msg_type_class (type): The message type class of the topic.
+
+        Returns:
+            bool: True if the message content is required before writing.
+        """
+        if spec.throttle is not None and spec.throttle.change_only:
+            return True
+        if spec.stamp_type == "msg_header_stamp":
+            # the header stamp can only be read in place when the header
+            # is the first field
+            header_idx = find_header_field(msg_type_class)
+            if header_idx is not None and header_idx != 0:
+                return True
+        return False
+
+    def get_timestamp(self, msg, src_topic: str, spec: TopicSpec) -> int:
+        """Gets the log time of a message.
+
+        Args:
+            msg: The ROS message, or the serialized CDR buffer.
+            src_topic (str): Original topic name.
+            spec (TopicSpec): The topic spec.
+
+        Returns:
+            int: The timestamp in nanoseconds.
+        """
+        if isinstance(msg, bytes):
+            offset = self._stamp_offsets.get(src_topic)
+            if offset is not None:
+                timestamp = read_stamp_ns(msg, offset)
+            else:
+                timestamp = self.get_clock().now().nanoseconds
+        elif (
             spec.stamp_type == "msg_header_stamp"
             and hasattr(msg, "header")
             and isinstance(msg.header, Header)
@@ -325,58 +1166,374 @@ class McapRecorder(Node):
             )
         else:
             timestamp = self.get_clock().now().nanoseconds
+        return timestamp
+
+    def _write_message(
+        self,
+        msg,
+        src_topic: str,
+        dst_topic: str,
+        spec: TopicSpec,
+        timestamp: int | None = None,
+        receive_time_ns: int | None = None,
+    ):
+        """Hands a message over to the writers.
+
+        Args:
+            msg: The ROS message, or the serialized CDR buffer.
+            src_topic (str): Original topic name.
+            dst_topic (str): The writting topic name.
+            spec (TopicSpec): The topic spec.
+            timestamp (int | None): The log time, if known already, like
+                for pre-roll messages. Defaults to None.
+            receive_time_ns (int | None): The monotonic receive time, if
+                known already. Defaults to None, which means now.
+        """
+        if receive_time_ns is None:
+            receive_time_ns = time.monotonic_ns()
+        self.metrics.on_receive(dst_topic)
+        throttle = self._throttles.get(dst_topic)
+        if throttle is not None:
+            reason = throttle.accept(msg, receive_time_ns)
+            if reason is not None:
+                self.metrics.on_reject(dst_topic, f"throttle_{reason}")
+                return
+        if timestamp is None:
+            timestamp = self.get_timestamp(msg, src_topic, spec)
+        if (
+            self.config.max_timestamp_difference_ns is not None
+            and not self._timestamp_range.is_within(
+                timestamp, self.config.max_timestamp_difference_ns
+            )
+        ):
+            self.get_logger().error(
+                f"Timestamp of message from {src_topic} exceeds "
+                f"maximum gap ({self.config.max_timestamp_difference_ns} ns). "  # noqa: E501
+                "Dropping message.",
+            )
+            self.metrics.on_reject(dst_topic, "timestamp_gap")
+            return
+        self._timestamp_range.update(dst_topic, timestamp)
+
+        if dst_topic in self._frame_rate_monitors:
+            self._frame_rate_monitors[dst_topic]["monitor"].update(timestamp)
 
-        if self.config.max_timestamp_difference_ns is not None:
-            if self._min_timestamp is None:
-                self._min_timestamp = timestamp
+        nbytes = self._estimate_size(msg, dst_topic, spec)
+        admission = self._memory.acquire(dst_topic, nbytes, spec.priority)
+        if admission is Admission.DROP:
+            self.metrics.on_reject(dst_topic, "memory_budget")
+            return
+        if admission is Admission.SPILL:
+            if not isinstance(msg, bytes):
+                msg = serialize_message(msg)
+            msg = self._memory.spill(msg)
+            nbytes = 0
+
+        stage = (
+            self._encoder_stage
+            if dst_topic in self._codecs
+            else self._topic_groups[dst_topic].stage
+        )
+        if not stage.put(
+            WriteRequest(
+                src_topic, dst_topic, msg, timestamp, receive_time_ns, nbytes
+            ),
+            spec.queue_full_action,
+        ):
+            self._release_request_memory(msg, nbytes)
+
+    def _estimate_size(self, msg, dst_topic: str, spec: TopicSpec) -> int:
+        """Estimates the in-memory size of a message for the governor.
+
+        Deserialized messages are accounted with their last measured
+        serialized size, or `TopicSpec.expected_message_size` before the
+        first one is written.
+        """
+        if isinstance(msg, bytes):
+            return len(msg)
+        size = self._message_sizes.get(dst_topic)
+        if size is None:
+            size = spec.expected_message_size or 0
+        return size
+
+    def _release_request_memory(self, msg, nbytes: int):
+        if isinstance(msg, SpilledMessage):
+            # consume the spilled copy, so that the spill file can shrink
+            self._memory.unspill(msg)
+        self._memory.release(nbytes)
+
+    def _on_queue_drop(self, request: WriteRequest):
+        self._release_request_memory(request.msg, request.nbytes)
+
+    def _encode_request(self, request: WriteRequest):
+        """Encodes a queued image and hands it over to the writers.
+
+        This method runs in the encoder threads. The memory accounted for
+        the raw image is released down to the size of the encoded one.
+
+        Args:
+            request (WriteRequest): The queued `sensor_msgs/msg/Image`.
+        """
+        msg = request.msg
+        if isinstance(msg, SpilledMessage):
+            msg = deserialize_message(self._memory.unspill(msg), Image)
+        # the raw size is the in-memory size of the next images
+        self._message_sizes[request.dst_topic] = len(msg.data)
+        data = serialize_message(self._codecs[request.dst_topic].encode(msg))
+        nbytes = min(request.nbytes, len(data))
+        self._memory.release(request.nbytes - nbytes)
+        if not self._topic_groups[request.dst_topic].stage.put(
+            request._replace(msg=data, nbytes=nbytes),
+            self.get_topic_spec(request.src_topic).queue_full_action,
+        ):
+            self._memory.release(nbytes)
+
+    def _on_encode_error(self, request: WriteRequest, e: Exception):
+        self.get_logger().error(
+            f"Failed to encode image of topic {request.src_topic}: {e}"
+        )
+        self.metrics.on_reject(request.dst_topic, "encoding_error")
+        self._memory.release(request.nbytes)
+
+    def _write_request(self, group: WriterGroup, request: WriteRequest):
+        """Serializes a queued message and writes it into the bag.
+
+        This method runs in the writer threads of the group.
+
+        Args:
+            group (WriterGroup): The writer group of the topic.
+            request (WriteRequest): The queued message.
+        """
+        if isinstance(request.msg, bytes):
+            data = request.msg
+        elif isinstance(request.msg, SpilledMessage):
+            data = self._memory.unspill(request.msg)
+        else:
+            data = serialize_message(request.msg)
+            self._message_sizes[request.dst_topic] = len(data)
+        request = request._replace(msg=data)
+        with group.lock:
+            if group.reorder_buffer is None:
+                ready = [request]
             else:
-                if (
-                    timestamp
-                    < self._min_timestamp
-                    - self.config.max_timestamp_difference_ns
-                ):
-                    self.get_logger().error(
-                        f"Timestamp of message from {src_topic} exceeds "
-                        f"maximum gap ({self.config.max_timestamp_difference_ns} ns). "  # noqa: E501
-                        "Dropping message.",
+                ready = [
+                    item
+                    for _, item, _ in group.reorder_buffer.push(
+                        request.dst_topic, request, request.timestamp
                     )
-                    return
-                self._min_timestamp = min(timestamp, self._min_timestamp)
+                ]
+            self._write_to_bag(group, ready)
+        if len(self._groups) > 1 and any(
+            item.dst_topic in self._static_dst_topics for item in ready
+        ):
+            # copy the new static messages into the other groups
+            self._flush_static_cache()
 
-            if self._max_timestamp is None:
-                self._max_timestamp = timestamp
-            else:
-                if (
-                    self._max_timestamp
-                    + self.config.max_timestamp_difference_ns
-                    < timestamp
-                ):
-                    self.get_logger().error(
-                        f"Timestamp of message from {src_topic} exceeds "
-                        "maximum gap "
-                        f"({self.config.max_timestamp_difference_ns} ns). "
-                        "Dropping message.",
+    def _write_to_bag(self, group: WriterGroup, requests: List[WriteRequest]):
+        """Writes serialized messages into the bag of a group.
+
+        The caller should hold the lock of the group.
+
+        Args:
+            group (WriterGroup): The writer group.
+            requests (List[WriteRequest]): The messages, of which `msg` is
+                the serialized CDR buffer.
+        """
+        for request in requests:
+            dst_topic = request.dst_topic
+            group.bag_writer.write(dst_topic, request.msg, request.timestamp)
+            self._memory.release(request.nbytes)
+            self._on_written(
+                group,
+                dst_topic,
+                len(request.msg),
+                (time.monotonic_ns() - request.receive_time_ns) * 1e-9
+                if request.receive_time_ns > 0
+                else None,
+            )
+            if group.message_count % self._hint_freq == 0:
+                self.get_logger().info(
+                    "Recording {}-th message of group {}, writer queue "
+                    "depth = {}".format(
+                        group.message_count,
+                        group.name,
+                        self.writer_queue_depth,
                     )
-                    return
-                self._max_timestamp = max(timestamp, self._max_timestamp)
+                )
 
-        self.writer.write(dst_topic, serialize_message(msg), timestamp)
+    def _on_written(
+        self,
+        group: WriterGroup,
+        topic: str,
+        size: int,
+        latency: float | None = None,
+    ):
+        """Counts a written message.
 
-        self._cnt += 1
+        The caller should hold the lock of the group, so that the counters
+        are not shared with the other groups.
+        """
+        group.message_count += 1
+        group.message_counts[topic] += 1
+        self.metrics.on_write(topic, size, latency)
 
-        if dst_topic in self._frame_rate_monitors:
-            self._frame_rate_monitors[dst_topic]["monitor"].update(timestamp)
+    @property
+    def message_count(self) -> int:
+        """The number of messages written in the current episode."""
+        return sum(group.message_count for group in self._groups.values())
+
+    @property
+    def message_counts(self) -> Dict[str, int]:
+        """The number of messages written per topic in the episode."""
+        counts = {topic: 0 for topic in list(self._topic_metadata)}
+        for group in self._groups.values():
+            for topic, cnt in list(group.message_counts.items()):
+                counts[topic] = counts.get(topic, 0) + cnt
+        return counts
+
+    def _create_memory_governor(self) -> MemoryGovernor:
+        # the reorder buffers only release messages when newer ones are
+        # pushed, so the blocked producers would wait for them forever
+        return MemoryGovernor(
+            self.config.memory,
+            on_pressure=(
+                None
+                if self.config.reorder_window_ns is None
+                else self._drain_reorder_buffer
+            ),
+        )
 
-        self._msg_cnt[dst_topic] += 1
+    def _drain_reorder_buffer(self):
+        for group in self._groups.values():
+            if group.reorder_buffer is None:
+                continue
+            with group.lock:
+                self._write_to_bag(
+                    group,
+                    [item for _, item, _ in group.reorder_buffer.drain()],
+                )
 
-        if self._cnt % self._hint_freq == 0:
-            self.get_logger().info("Recording {}-th message".format(self._cnt))
+    def get_writer_group(self, topic: str) -> str:
+        """Gets the writer group of a topic.
 
-    def _flush_caches(self):
-        # flush static messages, like /tf_static
-        while not self._static_msgs_buf.empty():
-            msg, src_topic, dst_topic, spec = self._static_msgs_buf.get()
-            self._write_message(msg, src_topic, dst_topic, spec)
+        Args:
+            topic (str): The name of the topic.
+
+        Returns:
+            str: The name of the first group of `RecordConfig.writer_groups`
+            matching the topic, or the name of the default group.
+        """
+        for name, (topics, regexes) in self._group_filters.items():
+            if match_topic(topic, topics, regexes):
+                return name
+        return DEFAULT_GROUP
+
+    @property
+    def writer_queue_depth(self) -> int:
+        """The number of messages waiting in the writer queues."""
+        return sum(group.stage.depth for group in self._groups.values())
+
+    @property
+    def dropped(self) -> Dict[str, int]:
+        """The number of messages dropped by the full queues per topic."""
+        stages = [group.stage for group in self._groups.values()]
+        if self._encoder_stage is not None:
+            stages.append(self._encoder_stage)
+        dropped = dict()
+        for stage in stages:
+            for topic, cnt in stage.dropped.items():
+                dropped[topic] = dropped.get(topic, 0) + cnt
+        return dropped
+
+    @property
+    def throttled(self) -> Dict[str, Dict[str, int]]:
+        """The number of throttled messages per topic and filter."""
+        return {
+            topic: dict(throttle.dropped)
+            for topic, throttle in self._throttles.items()
+        }
+
+    @property
+    def late(self) -> Dict[str, int]:
+        """The number of messages written behind the reorder window."""
+        late = dict()
+        for group in self._groups.values():
+            if group.reorder_buffer is not None:
+                late.update(group.reorder_buffer.late)
+        return late
+
+    def _on_write_error(self, request: WriteRequest, e: Exception):
+        self.get_logger().error(
+            f"Failed to write message of topic {request.src_topic}: {e}"
+        )
+        # the message is lost, do not leak its memory budget
+        self._memory.release(request.nbytes)
+
+    def _flush_static_cache(self):
+        # flush static messages received while not recording, like
+        # /tf_static, or written into another group
+        for group in self._groups.values():
+            with group.lock:
+                for msg in group.bag_writer.sync_static():
+                    self._on_written(group, msg.topic, len(msg.data))
+
+    def _cache_static_message(
+        self, msg, src_topic: str, dst_topic: str, spec: TopicSpec
+    ):
+        if isinstance(msg, bytes):
+            data = msg
+        else:
+            data = serialize_message(msg)
+        timestamp = self.get_timestamp(msg, src_topic, spec)
+        if self._static_cache.add(dst_topic, data, timestamp) is None:
+            self.get_logger().error(
+                f"Static message of topic {src_topic} exceeds the static "
+                "cache budget. Dropping message."
+            )
+
+    def _buffer_preroll(
+        self, msg, src_topic: str, dst_topic: str, spec: TopicSpec
+    ):
+        receive_time_ns = time.monotonic_ns()
+        timestamp = self.get_timestamp(msg, src_topic, spec)
+        if not isinstance(msg, bytes) and dst_topic not in self._message_sizes:
+            # nothing is written while armed, so measure the first message
+            # of the topic for the byte budget of the ring
+            self._message_sizes[dst_topic] = len(serialize_message(msg))
+        if not self._preroll.push(
+            PrerollEntry(
+                src_topic,
+                msg,
+                timestamp,
+                receive_time_ns,
+                self._estimate_size(msg, dst_topic, spec),
+            )
+        ):
+            # the ring has been drained meanwhile by start
+            self._flushed.wait()
+            self._write_message(
+                msg, src_topic, dst_topic, spec, timestamp, receive_time_ns
+            )
+
+    def _flush_preroll(self, entries: List[PrerollEntry]):
+        if not entries:
+            return
+        for entry in entries:
+            self._write_message(
+                entry.msg,
+                entry.src_topic,
+                self.get_dst_topic(entry.src_topic),
+                self.get_topic_spec(entry.src_topic),
+                entry.timestamp,
+                entry.receive_time_ns,
+            )
+        self.get_logger().info(
+            "Flushed {} pre-roll messages ({:.2f} s)".format(
+                len(entries),
+                (entries[-1].receive_time_ns - entries[0].receive_time_ns)
+                * 1e-9,
+            )
+        )
 
     def _message_callback(
         self, msg, src_topic: str, dst_topic: str, spec: TopicSpec
@@ -384,30 +1541,36 @@ class McapRecorder(Node):
         """Handles incoming messages and writes them to the MCAP file.
 
         Args:
-            msg: The ROS message.
+            msg: The ROS message, or the serialized CDR buffer if the topic
+                is subscribed in raw mode.
             src_topic (str): Original topic name.
             dst_topic (str): The writting topic name.
             spec (TopicSpec): The topic spec.
         """
-        if self.config.wait_for_topics:
-            # store static messages, because these messages will be
-            # published once
-            if src_topic in self.config.static_topics:
-                self._static_msgs_buf.put((msg, src_topic, dst_topic, spec))
-
-            if src_topic in self.config.wait_for_topics:
-                self.config.wait_for_topics.remove(src_topic)
-
+        state = self._state
+        if state is RecorderState.RECORDING:
+            if not self._flushed.is_set():
+                # the buffered messages come first
+                self._flushed.wait()
+            self._write_message(msg, src_topic, dst_topic, spec)
             return
 
-        self.log_once("Begining writing...")
+        if state is RecorderState.FINALIZING:
+            return
 
-        # write flag
-        with open(self.recording_flag, "w"):
-            pass
+        # store static messages, because these messages will be
+        # published once
+        if src_topic in self.config.static_topics:
+            self._cache_static_message(msg, src_topic, dst_topic, spec)
+        elif state is RecorderState.ARMED and self._preroll is not None:
+            self._buffer_preroll(msg, src_topic, dst_topic, spec)
 
-        self._flush_caches()
-        self._write_message(msg, src_topic, dst_topic, spec)
+        if state is RecorderState.WAITING:
+            with self._state_lock:
+                self._pending_topics.discard(src_topic)
+                is_ready = not self._pending_topics
+            if is_ready:
+                self._arm()
 
     def _initialize(self):
         """Recoder Initialization.
@@ -444,44 +1607,73 @@ class McapRecorder(Node):
                 description="Output bag path, which is a directory"
             ),
         )
-        uri: str = self.get_parameter("uri").get_parameter_value().string_value
-        if uri == "":
-            uri = datetime.now().strftime("rosbag2_%Y_%m_%d-%H_%M_%S")
-        self.get_logger().info(f"Recording data to {uri}")
-
-        self.uri = uri
-        self.recording_flag = os.path.join(self.uri, self.RECORDING_FILE)
-        self.writer = rosbag2_py.SequentialWriter()
-        self.writer.open(
-            rosbag2_py.StorageOptions(
-                uri=self.uri,
-                storage_id="mcap",
-                max_cache_size=self.config.max_cache_size,
-            ),
-            rosbag2_py.ConverterOptions(
-                input_serialization_format="cdr",
-                output_serialization_format="cdr",
+        self.declare_parameter(
+            "daemon",
+            False,
+            descriptor=ParameterDescriptor(
+                description="Keep running across episodes, which are "
+                "opened and closed by the ~/start_episode and "
+                "~/stop_episode services"
             ),
         )
+        self.daemon: bool = (
+            self.get_parameter("daemon").get_parameter_value().bool_value
+        )
 
-        self.include_topics = set()
-        self.include_regex = []
-        self.exclude_topics = set()
-        self.exclude_regex = []
-
-        if self.config.include_patterns:
-            for pattern in self.config.include_patterns:
-                if "*" in pattern or "." in pattern:
-                    self.include_regex.append(re.compile(pattern))
-                else:
-                    self.include_topics.add(pattern)
+        self.uri = None
+        self.recording_flag = None
+        self._episode_lock = threading.Lock()
+        self._episode_open = False
+        self._static_cache = StaticMessageCache(
+            max_bytes=self.config.static_cache_max_bytes
+        )
+        self._static_dst_topics = {
+            self.get_dst_topic(topic) for topic in self.config.static_topics
+        }
+        self.metrics = RecorderMetrics(self.config.metrics.latency_buckets_sec)
+        self._message_sizes = dict()
+        self._throttles = dict()
+        self._codecs = dict()
+        self._priorities = set()
+        self._memory = self._create_memory_governor()
+        for name in self.config.writer_groups:
+            if name in ("", DEFAULT_GROUP) or os.sep in name:
+                raise ValueError(f"Invalid writer group name: {name!r}")
+        self._group_filters = {
+            name: compile_topic_patterns(group_cfg.topics)
+            for name, group_cfg in self.config.writer_groups.items()
+        }
+        # the subscribed topics, to be registered in every episode
+        self._topic_metadata: Dict[
+            str, Tuple[str, rosbag2_py.TopicMetadata]
+        ] = dict()
+        self._groups: Dict[str, WriterGroup] = dict()
+        self._topic_groups: Dict[str, WriterGroup] = dict()
+        self.bag_writer = None
+        self._encoder_stage = None
+        self._preroll = None
+        if self.config.preroll.enabled:
+            self._preroll = PrerollBuffer(
+                window_ns=int(self.config.preroll.duration_sec * 1e9),
+                max_bytes=self.config.preroll.max_bytes,
+            )
+        if not self.daemon:
+            self._open_episode(
+                self.get_parameter("uri").get_parameter_value().string_value
+            )
+        self._log_memory_forecast()
 
-        if self.config.exclude_patterns:
-            for pattern in self.config.exclude_patterns:
-                if "*" in pattern or "." in pattern:
-                    self.exclude_regex.append(re.compile(pattern))
-                else:
-                    self.exclude_topics.add(pattern)
+        self.include_topics, self.include_regex = compile_topic_patterns(
+            self.config.include_patterns or []
+        )
+        self.exclude_topics, self.exclude_regex = compile_topic_patterns(
+            self.config.exclude_patterns or []
+        )
+        self._callback_groups = dict()
+        self._callback_group_filters = {
+            name: compile_topic_patterns(patterns)
+            for name, patterns in self.config.executor.callback_groups.items()
+        }
 
         self._has_topic_filter = (
             self.include_topics
@@ -490,22 +1682,98 @@ class McapRecorder(Node):
             or self.exclude_regex
         )
 
+    def _create_writer_group(
+        self, name: str, uri: str, storage: StorageConfig, num_threads: int
+    ) -> WriterGroup:
+        marker_topic = self.config.split.episode_marker_topic
+        return WriterGroup(
+            name,
+            BagWriter(
+                uri=uri,
+                split=self.config.split,
+                static_topics=self._static_dst_topics,
+                static_cache=self._static_cache,
+                marker_topic=(
+                    None
+                    if marker_topic is None
+                    else self.get_dst_topic(marker_topic)
+                ),
+                storage=self.config.crash_safety.get_storage(storage),
+                max_cache_size=self.config.crash_safety.get_max_cache_size(
+                    self.config.max_cache_size
+                ),
+            ),
+            write_fn=self._write_request,
+            num_threads=num_threads,
+            max_queue_size=self.config.writer_queue_size,
+            reorder_window_ns=self.config.reorder_window_ns,
+            on_error=self._on_write_error,
+            on_drop=self._on_queue_drop,
+        )
+
+    def _write_episode_manifest(self, finished: bool = False):
+        """Writes the episode manifest if writer groups are configured."""
+        if not self.config.writer_groups:
+            return
+        try:
+            write_episode_manifest(
+                self.uri,
+                list(self._groups.values()),
+                start_time_ns=self._timestamp_range.min,
+                end_time_ns=self._timestamp_range.max,
+                finished=finished,
+            )
+        except OSError as e:
+            self.get_logger().error(
+                f"Failed to write the episode manifest: {e}"
+            )
+
+    def _log_memory_forecast(self):
+        forecast = forecast_peak_rss(
+            self.config, baseline=psutil.Process().memory_info().rss
+        )
+
+        def _mb(value) -> str:
+            return "unbounded" if value is None else f"{value / 1e6:.1f} MB"
+
+        self.get_logger().info(
+            "Peak RSS forecast: {} (baseline {}, subscription queues {}, "
+            "in-flight messages {}, rosbag2 cache {}, static cache {}, "
+            "pre-roll {})".format(
+                _mb(forecast["peak_rss"]),
+                _mb(forecast["baseline"]),
+                _mb(forecast["subscription_queues"]),
+                _mb(forecast["in_flight"]),
+                _mb(forecast["rosbag2_cache"]),
+                _mb(forecast["static_cache"]),
+                _mb(forecast["preroll"]),
+            )
+        )
+        if forecast["unknown_topics"]:
+            self.get_logger().info(
+                "Topics without expected_message_size are not forecast: "
+                "{}".format(forecast["unknown_topics"])
+            )
+
     def _on_shutdown(self):
         """Performs cleanup tasks when the node is shutting down.
 
         This includes closing the rosbag writer, removing the recording flag,
-        and logging final statistics about the recording session.
+        and logging final statistics about the recording session. It waits
+        for the sidecar indexes being built.
         """
-        # The destructor of self.writer handles the file closing.
-        # Explicitly deleting it ensures it's done in a predictable order.
-        del self.writer
-        if os.path.exists(self.recording_flag):
-            os.remove(self.recording_flag)
-        self.get_logger().info(f"Recorded {self._cnt} messages in total.")
+        self.stop()
+        self._index_executor.shutdown(wait=True)
+
+    def _log_episode_stats(self):
+        """Logs the final statistics of the closed episode."""
+        self.get_logger().info(
+            f"Recorded {self.message_count} messages in total."
+        )
         if self.duration == 0:
             msg = (
                 "Empty MCAP file detected. Currently wait for topics: "
-                f"{self.config.wait_for_topics}\n"
+                f"{self._pending_topics}\n"
                 "Possible causes:\n"
                 "1. No matching topics subscribed (current filter: include = "
                 f"{self.config.include_patterns} || "
@@ -522,27 +1790,117 @@ class McapRecorder(Node):
             self.get_logger().info(
                 f"Recording duration: {duration_sec:.2f} seconds."
             )
-            for topic, msg_cnt in self._msg_cnt.items():
+            dropped = self.dropped
+            late = self.late
+            throttled = self.throttled
+            for topic, msg_cnt in self.message_counts.items():
                 self.get_logger().info(
-                    "topic {}: count = {}, average frame rate = {:.2f} Hz".format(  # noqa: E501
+                    "topic {}: count = {}, dropped = {}, throttled = {}, late = {}, average frame rate = {:.2f} Hz".format(  # noqa: E501
                         topic,
                         msg_cnt,
+                        dropped.get(topic, 0),
+                        sum(throttled.get(topic, {}).values()),
+                        late.get(topic, 0),
                         msg_cnt / duration_sec,
                     )
                 )
+                if throttled.get(topic):
+                    self.get_logger().info(
+                        "topic {}: throttled by {}".format(
+                            topic, throttled[topic]
+                        )
+                    )
+            for group in self._groups.values():
+                self.get_logger().info(
+                    "Peak writer queue depth of group {}: {}".format(
+                        group.name, group.stage.queue.peak_depth
+                    )
+                )
+            if self._encoder_stage is not None:
+                self.get_logger().info(
+                    "Peak encoder queue depth: {}".format(
+                        self._encoder_stage.queue.peak_depth
+                    )
+                )
+            memory_stats = self._memory.get_stats()
+            self.get_logger().info(
+                "In-flight memory [{}]: peak {:.2f} MB, dropped {}, "
+                "spilled {} messages ({:.2f} MB)".format(
+                    memory_stats["policy"],
+                    memory_stats["peak_bytes"] / 1e6,
+                    sum(memory_stats["dropped"].values()),
+                    memory_stats["spilled_count"],
+                    memory_stats["spilled_bytes"] / 1e6,
+                )
+            )
+            if self.config.reorder_window_ns is not None:
+                self.get_logger().info(
+                    "Reorder window {:.1f} ms: {} late messages, peak "
+                    "depth {}".format(
+                        self.config.reorder_window_ns * 1e-6,
+                        sum(late.values()),
+                        max(
+                            group.reorder_buffer.peak_depth
+                            for group in self._groups.values()
+                        ),
+                    )
+                )
+            for group in self._groups.values():
+                self._log_storage_stats(group)
+
+    def _log_storage_stats(self, group: WriterGroup):
+        storage_stats = group.bag_writer.get_storage_stats()
+        self.get_logger().info(
+            "Storage [{}] of group {}: wrote {:.2f} MB in {:.2f} s "
+            "({:.2f} MB/s), file size {:.2f} MB (compression ratio "
+            "{:.2f})".format(
+                storage_stats["storage"],
+                group.name,
+                storage_stats["serialized_bytes"] / 1e6,
+                storage_stats["wall_time_sec"],
+                storage_stats["throughput_bytes_per_sec"] / 1e6,
+                storage_stats["file_bytes"] / 1e6,
+                storage_stats["compression_ratio"],
+            )
+        )
+        if len(group.bag_writer.splits) > 1:
+            for split in group.bag_writer.splits:
+                self.get_logger().info(
+                    "split {}: {} messages, {:.2f} seconds, {}".format(
+                        split.index,
+                        split.message_count,
+                        split.duration_ns * 1e-9,
+                        split.uri,
+                    )
+                )
+
+    def _build_sidecar_index(self, files: List[str]):
+        """Builds the sidecar time index of the written MCAP files."""
+        start = time.monotonic()
+        for path in files:
+            try:
+                build_index(path)
+            except Exception as e:
+                self.get_logger().error(
+                    f"Failed to build the sidecar index of {path}: {e}"
+                )
+        self.get_logger().info(
+            "Built the sidecar index of {} files in {:.2f} s".format(
+                len(files), time.monotonic() - start
+            )
+        )
 
     @property
     def duration(self) -> int:
-        if self._max_timestamp is None or self._min_timestamp is None:
-            return 0
-        else:
-            return self._max_timestamp - self._min_timestamp
+        return self._timestamp_range.duration
 
     def destroy_node(self):
         self.get_logger().info(
             "Shutting down McapRecorder, performing cleanup..."
         )
         self._on_shutdown()
+        if self._metrics_server is not None:
+            self._metrics_server.close()
         super().destroy_node()
 
 
@@ -550,10 +1908,12 @@ def main(args=None):
     rclpy.init(args=args)
 
     node = McapRecorder()
+    executor = node.create_executor()
 
     try:
-        rclpy.spin(node)
+        executor.spin()
     finally:
+        executor.shutdown()
         node.destroy_node()
         rclpy.shutdown()
 
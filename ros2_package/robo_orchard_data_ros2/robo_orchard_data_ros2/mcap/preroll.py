@@ -0,0 +1,145 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import threading
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional
+
+__all__ = ["PrerollEntry", "PrerollBuffer"]
+
+
+class PrerollEntry(NamedTuple):
+    """A message received before recording started.
+
+    Attributes:
+        src_topic (str): Original topic name.
+        msg (Any): The ROS message, or the serialized CDR buffer.
+        timestamp (int): The log time of the message, in nanoseconds.
+        receive_time_ns (int): The monotonic time when the message was
+            received, in nanoseconds.
+        nbytes (int): The (estimated) size of the message.
+    """
+
+    src_topic: str
+    msg: Any
+    timestamp: int
+    receive_time_ns: int
+    nbytes: int
+
+
+class PrerollBuffer:
+    """Ring of the messages received in the last seconds before recording.
+
+    The oldest messages are evicted once they are older than the window,
+    or when the ring exceeds its byte budget. :meth:`drain` closes the
+    ring, so that producers racing with the start of the recording can
+    tell that their message has to be written directly.
+
+    This class is thread-safe.
+
+    Attributes:
+        window_ns (int | None): The maximum age of a message, in
+            nanoseconds of receive time. None means no age limit.
+        max_bytes (int): The byte budget of the ring.
+        nbytes (int): The bytes in the ring.
+        evicted (int): The number of evicted messages.
+    """
+
+    def __init__(self, window_ns: Optional[int], max_bytes: int):
+        self.window_ns = window_ns
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.evicted = 0
+        self._items: deque[PrerollEntry] = deque()
+        self._lock = threading.Lock()
+        self._closed = True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def open(self):
+        """Starts buffering, discarding the previous content."""
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+            self._closed = False
+
+    def _evict(self, now_ns: int):
+        while self._items and (
+            self.nbytes > self.max_bytes
+            or (
+                self.window_ns is not None
+                and now_ns - self._items[0].receive_time_ns > self.window_ns
+            )
+        ):
+            item = self._items.popleft()
+            self.nbytes -= item.nbytes
+            self.evicted += 1
+
+    def push(self, entry: PrerollEntry) -> bool:
+        """Adds a message to the ring.
+
+        Args:
+            entry (PrerollEntry): The message.
+
+        Returns:
+            bool: False if the ring is closed, in which case the message
+            should be written directly.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            self._items.append(entry)
+            self.nbytes += entry.nbytes
+            self._evict(entry.receive_time_ns)
+            return True
+
+    def drain(self, now_ns: int) -> List[PrerollEntry]:
+        """Closes the ring and takes the messages in the window.
+
+        Args:
+            now_ns (int): The current monotonic time in nanoseconds.
+
+        Returns:
+            List[PrerollEntry]: The messages in arrival order.
+        """
+        with self._lock:
+            self._evict(now_ns)
+            items = list(self._items)
+            self._items.clear()
+            self.nbytes = 0
+            self._closed = True
+            return items
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gets the depth, the size and the evicted count of the ring."""
+        with self._lock:
+            span_ns = (
+                self._items[-1].receive_time_ns
+                - self._items[0].receive_time_ns
+                if self._items
+                else 0
+            )
+            return {
+                "depth": len(self._items),
+                "bytes": self.nbytes,
+                "span_sec": span_ns * 1e-9,
+                "evicted": self.evicted,
+            }
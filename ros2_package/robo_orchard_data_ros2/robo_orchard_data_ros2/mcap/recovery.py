@@ -0,0 +1,709 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import argparse
+import glob
+import json
+import os
+import socket
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import psutil
+
+from robo_orchard_data_ros2.mcap.format import (
+    MAGIC,
+    RECORD_PREFIX_SIZE,
+    Attachment,
+    AttachmentIndex,
+    Channel,
+    Chunk,
+    ChunkIndex,
+    DataEnd,
+    Footer,
+    McapFormatError,
+    Message,
+    MessageIndex,
+    Metadata,
+    MetadataIndex,
+    Opcode,
+    Schema,
+    Statistics,
+    SummaryOffset,
+    encode_record,
+    iter_chunk_records,
+    read_record_headers,
+)
+
+__all__ = [
+    "RECORDING_FILE",
+    "EPISODE_MANIFEST_FILE",
+    "McapRecovery",
+    "recover_mcap",
+    "recover_episode",
+    "get_group_roots",
+    "find_interrupted_episodes",
+    "main",
+]
+
+RECORDING_FILE = "__RECORDING__"
+ROSBAG2_METADATA_FILE = "metadata.yaml"
+SPLIT_MANIFEST_FILE = "splits.json"
+EPISODE_MANIFEST_FILE = "episode_manifest.json"
+
+_FOOTER_SIZE = RECORD_PREFIX_SIZE + 20
+
+
+class McapRecovery:
+    """Result of the scan and the repair of one MCAP file.
+
+    Attributes:
+        path (str): The file path.
+        status (str): "complete" if the file had a valid summary,
+            "recovered" if the summary was rebuilt (or would be, in a dry
+            run), "unrecoverable" if not even the header is readable.
+        original_size (int): The file size before the repair.
+        recovered_size (int): The file size after the repair.
+        valid_end (int): The end of the last complete data record.
+        message_count (int): The number of recovered messages.
+        message_bytes (int): The serialized size of recovered messages.
+        chunk_count (int): The number of recovered chunks.
+        start_time_ns (int | None): The minimum log time.
+        end_time_ns (int | None): The maximum log time.
+        schemas (Dict[int, Schema]): The schemas by id.
+        channels (Dict[int, Channel]): The channels by id.
+        channel_message_counts (Dict[int, int]): Messages per channel id.
+        message_indexes (bytes): The message indexes rebuilt for the last
+            chunk, written after it, when the original ones are cut.
+        error (str | None): Why the scan stopped before the end of the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.status = "unrecoverable"
+        self.original_size = 0
+        self.recovered_size = 0
+        self.valid_end = 0
+        self.message_count = 0
+        self.message_bytes = 0
+        self.chunk_count = 0
+        self.start_time_ns: int | None = None
+        self.end_time_ns: int | None = None
+        self.schemas: Dict[int, Schema] = dict()
+        self.channels: Dict[int, Channel] = dict()
+        self.channel_message_counts: Dict[int, int] = dict()
+        self.chunk_indexes: List[ChunkIndex] = []
+        self.attachment_indexes: List[AttachmentIndex] = []
+        self.metadata_indexes: List[MetadataIndex] = []
+        self.message_indexes = b""
+        self.error: str | None = None
+
+    @property
+    def truncated_bytes(self) -> int:
+        """The bytes of incomplete records dropped by the repair."""
+        if self.status != "recovered":
+            return 0
+        return max(self.original_size - self.valid_end, 0)
+
+    def _add_message(self, msg: Message):
+        self.message_count += 1
+        self.message_bytes += len(msg.data)
+        self.channel_message_counts[msg.channel_id] = (
+            self.channel_message_counts.get(msg.channel_id, 0) + 1
+        )
+        if self.start_time_ns is None or msg.log_time < self.start_time_ns:
+            self.start_time_ns = msg.log_time
+        if self.end_time_ns is None or msg.log_time > self.end_time_ns:
+            self.end_time_ns = msg.log_time
+
+    def get_topics(self) -> Dict[str, Dict[str, Any]]:
+        """Gets the message type, encoding and count of each topic."""
+        topics = dict()
+        for channel_id, channel in self.channels.items():
+            schema = self.schemas.get(channel.schema_id)
+            topics[channel.topic] = {
+                "type": "" if schema is None else schema.name,
+                "serialization_format": channel.message_encoding,
+                "offered_qos_profiles": channel.metadata.get(
+                    "offered_qos_profiles", ""
+                ),
+                "message_count": self.channel_message_counts.get(
+                    channel_id, 0
+                ),
+            }
+        return topics
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "status": self.status,
+            "original_size": self.original_size,
+            "recovered_size": self.recovered_size,
+            "truncated_bytes": self.truncated_bytes,
+            "message_count": self.message_count,
+            "chunk_count": self.chunk_count,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "error": self.error,
+        }
+
+
+def _has_valid_footer(fp, file_size: int, data_end: int) -> bool:
+    if file_size < data_end + _FOOTER_SIZE + len(MAGIC):
+        return False
+    fp.seek(file_size - len(MAGIC) - _FOOTER_SIZE)
+    tail = fp.read(_FOOTER_SIZE + len(MAGIC))
+    opcode, length = struct.unpack_from("<BQ", tail)
+    return (
+        opcode == Opcode.FOOTER
+        and length == _FOOTER_SIZE - RECORD_PREFIX_SIZE
+        and tail[-len(MAGIC) :] == MAGIC
+    )
+
+
+def _scan(fp, result: McapRecovery) -> Optional[int]:
+    """Walks the data section up to its last complete record.
+
+    Each chunk is decompressed once to collect its schemas, channels and
+    message statistics, so that memory stays bounded by the chunk size.
+
+    Returns:
+        Optional[int]: The offset of the DataEnd record, if reached.
+    """
+    # chunk index waiting for the message indexes following the chunk
+    pending: Optional[Dict[str, Any]] = None
+
+    def _close_pending(last: bool):
+        nonlocal pending
+        if pending is None:
+            return
+        if not pending["index"].keys() <= pending["offsets"].keys():
+            pending["offsets"] = dict()
+            pending["length"] = 0
+            if last:
+                # the message indexes of the last chunk are cut, rebuild
+                # them right after the chunk
+                result.valid_end = pending["chunk"].end
+                offset = result.valid_end
+                indexes = bytearray()
+                for channel_id, records in sorted(pending["index"].items()):
+                    pending["offsets"][channel_id] = offset + len(indexes)
+                    indexes += encode_record(MessageIndex(channel_id, records))
+                pending["length"] = len(indexes)
+                result.message_indexes = bytes(indexes)
+        result.chunk_indexes.append(
+            ChunkIndex(
+                message_start_time=pending["start"],
+                message_end_time=pending["end"],
+                chunk_start_offset=pending["chunk"].offset,
+                chunk_length=pending["chunk"].end - pending["chunk"].offset,
+                message_index_offsets=pending["offsets"],
+                message_index_length=pending["length"],
+                compression=pending["compression"],
+                compressed_size=pending["compressed_size"],
+                uncompressed_size=pending["uncompressed_size"],
+            )
+        )
+        pending = None
+
+    for header in read_record_headers(fp, result.original_size):
+        opcode = header.opcode
+        if opcode == Opcode.MESSAGE_INDEX and pending is not None:
+            fp.seek(header.content_offset)
+            (channel_id,) = struct.unpack("<H", fp.read(2))
+            pending["offsets"][channel_id] = header.offset
+            pending["length"] += header.end - header.offset
+            result.valid_end = header.end
+            continue
+        _close_pending(last=opcode in (Opcode.DATA_END, Opcode.FOOTER))
+        if opcode in (Opcode.DATA_END, Opcode.FOOTER):
+            return header.offset
+
+        fp.seek(header.content_offset)
+        content = fp.read(header.length)
+        try:
+            if opcode == Opcode.SCHEMA:
+                schema = Schema.parse(content)
+                result.schemas[schema.id] = schema
+            elif opcode == Opcode.CHANNEL:
+                channel = Channel.parse(content)
+                result.channels[channel.id] = channel
+            elif opcode == Opcode.MESSAGE:
+                result._add_message(Message.parse(content))
+            elif opcode == Opcode.CHUNK:
+                pending = _scan_chunk(header, content, result)
+            elif opcode == Opcode.ATTACHMENT:
+                attachment = Attachment.parse(content)
+                result.attachment_indexes.append(
+                    AttachmentIndex(
+                        offset=header.offset,
+                        length=header.end - header.offset,
+                        log_time=attachment.log_time,
+                        create_time=attachment.create_time,
+                        data_size=attachment.data_size,
+                        name=attachment.name,
+                        media_type=attachment.media_type,
+                    )
+                )
+            elif opcode == Opcode.METADATA:
+                result.metadata_indexes.append(
+                    MetadataIndex(
+                        offset=header.offset,
+                        length=header.end - header.offset,
+                        name=Metadata.parse(content).name,
+                    )
+                )
+        except McapFormatError as e:
+            result.error = f"{e} at offset {header.offset}"
+            break
+        result.valid_end = header.end
+    else:
+        if result.valid_end < result.original_size:
+            result.error = f"incomplete record at offset {result.valid_end}"
+    _close_pending(last=True)
+    return None
+
+
+def _scan_chunk(header, content: bytes, result: McapRecovery):
+    chunk = Chunk.parse(content)
+    data = chunk.decompress()
+    # parse everything before merging, so that a corrupted chunk is
+    # dropped as a whole
+    schemas, channels, messages = [], [], []
+    # (log time, offset in the uncompressed data) per channel id
+    index: Dict[int, List[Tuple[int, int]]] = dict()
+    for offset, opcode, record in iter_chunk_records(data):
+        if opcode == Opcode.SCHEMA:
+            schemas.append(Schema.parse(record))
+        elif opcode == Opcode.CHANNEL:
+            channels.append(Channel.parse(record))
+        elif opcode == Opcode.MESSAGE:
+            msg = Message.parse(record)
+            messages.append(msg)
+            index.setdefault(msg.channel_id, []).append((msg.log_time, offset))
+    for schema in schemas:
+        result.schemas[schema.id] = schema
+    for channel in channels:
+        result.channels[channel.id] = channel
+    for msg in messages:
+        result._add_message(msg)
+    result.chunk_count += 1
+    return {
+        "chunk": header,
+        "start": chunk.message_start_time,
+        "end": chunk.message_end_time,
+        "compression": chunk.compression,
+        "compressed_size": len(chunk.records),
+        "uncompressed_size": chunk.uncompressed_size,
+        "index": index,
+        "offsets": dict(),
+        "length": 0,
+    }
+
+
+def _build_summary(result: McapRecovery, summary_start: int) -> bytes:
+    """Encodes the summary section, the summary offsets and the footer."""
+    groups = [
+        (Opcode.SCHEMA, [v for _, v in sorted(result.schemas.items())]),
+        (Opcode.CHANNEL, [v for _, v in sorted(result.channels.items())]),
+        (
+            Opcode.STATISTICS,
+            [
+                Statistics(
+                    message_count=result.message_count,
+                    schema_count=len(result.schemas),
+                    channel_count=len(result.channels),
+                    attachment_count=len(result.attachment_indexes),
+                    metadata_count=len(result.metadata_indexes),
+                    chunk_count=len(result.chunk_indexes),
+                    message_start_time=result.start_time_ns or 0,
+                    message_end_time=result.end_time_ns or 0,
+                    channel_message_counts=result.channel_message_counts,
+                )
+            ],
+        ),
+        (Opcode.CHUNK_INDEX, result.chunk_indexes),
+        (Opcode.ATTACHMENT_INDEX, result.attachment_indexes),
+        (Opcode.METADATA_INDEX, result.metadata_indexes),
+    ]
+    summary = bytearray()
+    offsets = []
+    for opcode, records in groups:
+        if not records:
+            continue
+        group_start = summary_start + len(summary)
+        for record in records:
+            summary += encode_record(record)
+        offsets.append(
+            SummaryOffset(
+                opcode, group_start, summary_start + len(summary) - group_start
+            )
+        )
+    summary_offset_start = summary_start + len(summary)
+    for offset in offsets:
+        summary += encode_record(offset)
+
+    footer = encode_record(Footer(summary_start, summary_offset_start, 0))
+    # the CRC covers the summary and the footer up to the CRC field
+    crc = zlib.crc32(footer[:-4], zlib.crc32(summary))
+    footer = encode_record(Footer(summary_start, summary_offset_start, crc))
+    return bytes(summary) + footer + MAGIC
+
+
+def recover_mcap(path: str, dry_run: bool = False) -> McapRecovery:
+    """Repairs an MCAP file whose writer was killed, in place.
+
+    The file is streamed record by record up to the last complete one.
+    Incomplete trailing records are truncated, then the message indexes
+    of the last chunk if they are cut, the DataEnd record, the summary
+    section (schemas, channels, statistics and chunk, attachment and
+    metadata indexes) and the footer are appended. Only one chunk is
+    held in memory at a time.
+
+    Args:
+        path (str): The MCAP file.
+        dry_run (bool): If True, only scan the file. Defaults to False.
+
+    Returns:
+        McapRecovery: The scan result. Files with a valid summary are left
+        untouched.
+    """
+    result = McapRecovery(path)
+    result.original_size = os.path.getsize(path)
+    with open(path, "rb" if dry_run else "r+b") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            result.error = "missing MCAP magic"
+            return result
+        result.valid_end = len(MAGIC)
+        data_end = _scan(fp, result)
+        if data_end is not None and _has_valid_footer(
+            fp, result.original_size, data_end
+        ):
+            result.status = "complete"
+            result.valid_end = data_end
+            result.recovered_size = result.original_size
+            return result
+
+        result.status = "recovered"
+        # the data section CRC is unknown without a second pass, and 0
+        # means unavailable
+        tail = result.message_indexes + encode_record(DataEnd(0))
+        tail += _build_summary(result, result.valid_end + len(tail))
+        result.recovered_size = result.valid_end + len(tail)
+        if dry_run:
+            return result
+        fp.truncate(result.valid_end)
+        fp.seek(result.valid_end)
+        fp.write(tail)
+        fp.flush()
+        os.fsync(fp.fileno())
+    return result
+
+
+def _yaml_str(value: str) -> str:
+    # json strings are valid YAML double-quoted scalars
+    return json.dumps(value)
+
+
+def write_rosbag2_metadata(bag_dir: str, results: List[McapRecovery]):
+    """Writes the rosbag2 `metadata.yaml` which is written on close only.
+
+    Args:
+        bag_dir (str): The bag directory.
+        results (List[McapRecovery]): The recovered files of the bag.
+    """
+    topics: Dict[str, Dict[str, Any]] = dict()
+    for result in results:
+        for topic, info in result.get_topics().items():
+            if topic in topics:
+                topics[topic]["message_count"] += info["message_count"]
+            else:
+                topics[topic] = dict(info)
+    starts = [r.start_time_ns for r in results if r.start_time_ns is not None]
+    ends = [r.end_time_ns for r in results if r.end_time_ns is not None]
+    start = min(starts) if starts else 0
+    end = max(ends) if ends else 0
+
+    lines = [
+        "rosbag2_bagfile_information:",
+        "  version: 5",
+        "  storage_identifier: mcap",
+        "  duration:",
+        f"    nanoseconds: {end - start}",
+        "  starting_time:",
+        f"    nanoseconds_since_epoch: {start}",
+        f"  message_count: {sum(r.message_count for r in results)}",
+        "  topics_with_message_count:",
+    ]
+    for topic, info in sorted(topics.items()):
+        lines += [
+            "    - topic_metadata:",
+            f"        name: {_yaml_str(topic)}",
+            f"        type: {_yaml_str(info['type'])}",
+            "        serialization_format: "
+            f"{_yaml_str(info['serialization_format'])}",
+            "        offered_qos_profiles: "
+            f"{_yaml_str(info['offered_qos_profiles'])}",
+            f"      message_count: {info['message_count']}",
+        ]
+    lines += [
+        '  compression_format: ""',
+        '  compression_mode: ""',
+        "  relative_file_paths:",
+    ]
+    for result in results:
+        lines.append(f"    - {_yaml_str(os.path.basename(result.path))}")
+    lines.append("  files:")
+    for result in results:
+        file_start = result.start_time_ns or 0
+        lines += [
+            f"    - path: {_yaml_str(os.path.basename(result.path))}",
+            "      starting_time:",
+            f"        nanoseconds_since_epoch: {file_start}",
+            "      duration:",
+            "        nanoseconds: "
+            f"{(result.end_time_ns or file_start) - file_start}",
+            f"      message_count: {result.message_count}",
+        ]
+    tmp_file = os.path.join(bag_dir, ROSBAG2_METADATA_FILE + ".tmp")
+    with open(tmp_file, "w") as fw:
+        fw.write("\n".join(lines) + "\n")
+    os.replace(tmp_file, os.path.join(bag_dir, ROSBAG2_METADATA_FILE))
+
+
+def _update_split_manifest(root: str, bags: Dict[str, List[McapRecovery]]):
+    """Adds the splits missing in the manifest, e.g. the last one."""
+    manifest_file = os.path.join(root, SPLIT_MANIFEST_FILE)
+    manifest = {"splits": []}
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+    known = {split["uri"] for split in manifest["splits"]}
+    for bag_dir, results in sorted(bags.items()):
+        uri = os.path.relpath(bag_dir, root)
+        if uri in known:
+            continue
+        starts = [
+            r.start_time_ns for r in results if r.start_time_ns is not None
+        ]
+        ends = [r.end_time_ns for r in results if r.end_time_ns is not None]
+        manifest["splits"].append(
+            {
+                "index": len(manifest["splits"]),
+                "uri": uri,
+                "files": sorted(
+                    os.path.relpath(r.path, root) for r in results
+                ),
+                "start_time_ns": min(starts) if starts else None,
+                "end_time_ns": max(ends) if ends else None,
+                "message_count": sum(r.message_count for r in results),
+                "size_bytes": sum(r.message_bytes for r in results),
+                "recovered": True,
+            }
+        )
+    tmp_file = manifest_file + ".tmp"
+    with open(tmp_file, "w") as fw:
+        json.dump(manifest, fw, indent=4)
+    os.replace(tmp_file, manifest_file)
+
+
+def is_recording_alive(root: str) -> bool:
+    """Checks whether the recorder owning a recording flag still runs.
+
+    The flag file holds the pid and the host of the recorder. Flags
+    written on another host, or without content, are considered stale.
+    """
+    try:
+        with open(os.path.join(root, RECORDING_FILE), "r") as f:
+            owner = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if not isinstance(owner, dict) or owner.get("host") != (
+        socket.gethostname()
+    ):
+        return False
+    pid = owner.get("pid")
+    if not isinstance(pid, int) or not psutil.pid_exists(pid):
+        return False
+    try:
+        create_time = psutil.Process(pid).create_time()
+    except psutil.Error:
+        return False
+    # a recycled pid belongs to a process created later
+    return abs(create_time - owner.get("create_time", create_time)) < 1.0
+
+
+def get_group_roots(root: str) -> List[str]:
+    """Gets the bag roots of the writer groups of a recording.
+
+    Args:
+        root (str): The output uri of the recorder.
+
+    Returns:
+        List[str]: The output uri, followed by the bag directories of the
+        writer groups listed in the episode manifest, if any.
+    """
+    roots = [root]
+    manifest_file = os.path.join(root, EPISODE_MANIFEST_FILE)
+    try:
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return roots
+    for group in manifest.get("groups", []):
+        group_root = os.path.normpath(os.path.join(root, group["uri"]))
+        if group_root != os.path.normpath(root):
+            roots.append(group_root)
+    return roots
+
+
+def _recover_bags(
+    root: str, dry_run: bool, excludes: List[str]
+) -> Dict[str, List[McapRecovery]]:
+    bags: Dict[str, List[McapRecovery]] = dict()
+    for path in sorted(
+        glob.glob(os.path.join(root, "**", "*.mcap"), recursive=True)
+    ):
+        if any(path.startswith(exclude) for exclude in excludes):
+            continue
+        bags.setdefault(os.path.dirname(path), []).append(
+            recover_mcap(path, dry_run=dry_run)
+        )
+    if dry_run:
+        return bags
+
+    for bag_dir, results in bags.items():
+        if not os.path.exists(os.path.join(bag_dir, ROSBAG2_METADATA_FILE)):
+            write_rosbag2_metadata(bag_dir, results)
+    if any(
+        os.path.normpath(bag_dir) != os.path.normpath(root) for bag_dir in bags
+    ):
+        _update_split_manifest(root, bags)
+    return bags
+
+
+def recover_episode(
+    root: str, dry_run: bool = False
+) -> Dict[str, List[McapRecovery]]:
+    """Recovers all MCAP files of an interrupted recording.
+
+    The rosbag2 `metadata.yaml` of each bag directory is rebuilt when it
+    is missing, the splits missing in `splits.json` are added, and the
+    recording flag is removed. The bags of writer groups listed in the
+    episode manifest are recovered as well, including those outside
+    `root`.
+
+    Args:
+        root (str): The output uri of the recorder, which holds the
+            recording flag.
+        dry_run (bool): If True, only scan the files. Defaults to False.
+
+    Returns:
+        Dict[str, List[McapRecovery]]: The results per bag directory.
+    """
+    group_roots = [os.path.normpath(p) for p in get_group_roots(root)]
+    bags: Dict[str, List[McapRecovery]] = dict()
+    for group_root in group_roots:
+        # nested groups have their own split manifest
+        bags.update(
+            _recover_bags(
+                group_root,
+                dry_run,
+                excludes=[
+                    other + os.sep
+                    for other in group_roots
+                    if other.startswith(group_root + os.sep)
+                ],
+            )
+        )
+    if dry_run:
+        return bags
+
+    flag = os.path.join(root, RECORDING_FILE)
+    if all(
+        r.status != "unrecoverable"
+        for results in bags.values()
+        for r in results
+    ) and os.path.exists(flag):
+        os.remove(flag)
+    return bags
+
+
+def find_interrupted_episodes(roots: List[str]) -> Iterator[str]:
+    """Finds the recordings left with a recording flag under roots."""
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            if RECORDING_FILE in filenames:
+                yield dirpath
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Repair MCAP recordings interrupted by a crash. The "
+        "given directories are searched for leftover recording flags "
+        f"({RECORDING_FILE}), and the MCAP files of each recording get "
+        "their summary and index rebuilt in place."
+    )
+    parser.add_argument("roots", nargs="+", help="Directories to search.")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would be recovered.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also recover recordings whose recorder is still running.",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the report as json."
+    )
+    opts = parser.parse_args(args)
+
+    report = []
+    for root in find_interrupted_episodes(opts.roots):
+        if not opts.force and is_recording_alive(root):
+            print(f"Skip {root}: the recorder is still running")
+            continue
+        bags = recover_episode(root, dry_run=opts.dry_run)
+        results = [r for results in bags.values() for r in results]
+        report.append(
+            {"episode": root, "files": [r.to_dict() for r in results]}
+        )
+        if opts.json:
+            continue
+        print(f"{root}:")
+        for r in results:
+            print(
+                "  {} [{}]: {} messages, {} chunks, dropped {} trailing "
+                "bytes{}".format(
+                    os.path.relpath(r.path, root),
+                    r.status,
+                    r.message_count,
+                    r.chunk_count,
+                    r.truncated_bytes,
+                    "" if r.error is None else f" ({r.error})",
+                )
+            )
+    if opts.json:
+        print(json.dumps(report, indent=4))
+    elif not report:
+        print("No interrupted recording found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import heapq
+import itertools
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+__all__ = ["ReorderBuffer"]
+
+
+class ReorderBuffer:
+    """Bounded-latency buffer which emits messages in timestamp order.
+
+    Messages are held in a min-heap until the newest timestamp seen is
+    more than `window_ns` ahead of them, i.e. the watermark
+    `max_timestamp - window_ns` has passed them. A message arriving behind
+    the last emitted timestamp is late: it is counted and emitted right
+    away, so no data is lost, but the output is no longer sorted around it.
+
+    Messages with equal timestamps are emitted in arrival order.
+
+    This class is not thread-safe.
+
+    Attributes:
+        window_ns (int): The reorder window in nanoseconds.
+        late (Dict[str, int]): The number of late messages per topic.
+        peak_depth (int): The maximum number of held messages.
+    """
+
+    def __init__(self, window_ns: int):
+        if window_ns < 0:
+            raise ValueError(
+                "window_ns should be non-negative, but got {}".format(
+                    window_ns
+                )
+            )
+        self.window_ns = window_ns
+        self.late: Dict[str, int] = defaultdict(int)
+        self.peak_depth = 0
+        self._heap: List[Tuple[int, int, str, Any]] = []
+        self._seq = itertools.count()
+        self._max_timestamp: Optional[int] = None
+        self._emitted_timestamp: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _pop(self) -> Tuple[str, Any, int]:
+        timestamp, _, topic, item = heapq.heappop(self._heap)
+        self._emitted_timestamp = timestamp
+        return topic, item, timestamp
+
+    def push(
+        self, topic: str, item: Any, timestamp: int
+    ) -> List[Tuple[str, Any, int]]:
+        """Adds a message and returns the messages ready to be written.
+
+        Args:
+            topic (str): The writting topic name.
+            item (Any): The message payload.
+            timestamp (int): The log time in nanoseconds.
+
+        Returns:
+            List[Tuple[str, Any, int]]: The `(topic, item, timestamp)` of
+            the released messages, in timestamp order except for late
+            messages.
+        """
+        if (
+            self._emitted_timestamp is not None
+            and timestamp < self._emitted_timestamp
+        ):
+            self.late[topic] += 1
+            return [(topic, item, timestamp)]
+
+        heapq.heappush(self._heap, (timestamp, next(self._seq), topic, item))
+        self.peak_depth = max(self.peak_depth, len(self._heap))
+        if self._max_timestamp is None or timestamp > self._max_timestamp:
+            self._max_timestamp = timestamp
+
+        watermark = self._max_timestamp - self.window_ns
+        ready = []
+        while self._heap and self._heap[0][0] <= watermark:
+            ready.append(self._pop())
+        return ready
+
+    def drain(self) -> List[Tuple[str, Any, int]]:
+        """Releases all held messages in timestamp order.
+
+        Returns:
+            List[Tuple[str, Any, int]]: The `(topic, item, timestamp)` of
+            the held messages.
+        """
+        ready = []
+        while self._heap:
+            ready.append(self._pop())
+        return ready
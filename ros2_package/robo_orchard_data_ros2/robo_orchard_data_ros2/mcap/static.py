@@ -0,0 +1,107 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+__all__ = ["StaticMessage", "StaticMessageCache"]
+
+
+StaticKey = Tuple[str, bytes]
+
+
+class StaticMessage(NamedTuple):
+    """A serialized message of a static topic.
+
+    Attributes:
+        topic (str): The writting topic name.
+        data (bytes): The serialized CDR message.
+        timestamp (int): The original log time, in nanoseconds.
+    """
+
+    topic: str
+    data: bytes
+    timestamp: int
+
+
+class StaticMessageCache:
+    """Byte-bounded cache of static topic messages, like `/tf_static`.
+
+    Static topics are usually published once with `Transient Local`
+    durability, so their messages are kept to be written into every
+    output file. Messages are deduplicated by topic and content hash, so
+    a publisher re-sending the same content does not grow the cache. When
+    the byte budget is exceeded, the oldest messages are evicted first.
+
+    This class is thread-safe.
+
+    Attributes:
+        max_bytes (int): The byte budget. A value of 0 means unlimited.
+        nbytes (int): The total size of cached messages.
+        evicted (int): The number of messages evicted or rejected because
+            of the byte budget.
+    """
+
+    def __init__(self, max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.evicted = 0
+        self._msgs: OrderedDict[StaticKey, StaticMessage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._msgs)
+
+    @staticmethod
+    def make_key(topic: str, data: bytes) -> StaticKey:
+        return topic, hashlib.blake2b(data, digest_size=16).digest()
+
+    def add(
+        self, topic: str, data: bytes, timestamp: int
+    ) -> Optional[StaticKey]:
+        """Adds a message into the cache.
+
+        Args:
+            topic (str): The writting topic name.
+            data (bytes): The serialized CDR message.
+            timestamp (int): The log time, in nanoseconds.
+
+        Returns:
+            Optional[StaticKey]: The key of the message, or None if the
+            message is larger than the byte budget.
+        """
+        key = self.make_key(topic, data)
+        with self._lock:
+            if key in self._msgs:
+                # keep the original timestamp of the first occurrence
+                return key
+            if self.max_bytes > 0 and len(data) > self.max_bytes:
+                self.evicted += 1
+                return None
+            self._msgs[key] = StaticMessage(topic, data, timestamp)
+            self.nbytes += len(data)
+            while self.max_bytes > 0 and self.nbytes > self.max_bytes:
+                _, evicted = self._msgs.popitem(last=False)
+                self.nbytes -= len(evicted.data)
+                self.evicted += 1
+            return key
+
+    def items(self) -> List[Tuple[StaticKey, StaticMessage]]:
+        """Gets a snapshot of the cached messages in insertion order."""
+        with self._lock:
+            return list(self._msgs.items())
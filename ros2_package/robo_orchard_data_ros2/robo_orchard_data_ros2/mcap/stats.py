@@ -0,0 +1,101 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import threading
+from typing import Dict, Optional, Tuple
+
+__all__ = ["TimestampRange"]
+
+
+class TimestampRange:
+    """Thread-safe range of the recorded timestamps.
+
+    Every topic keeps its own range, which is only written by the
+    callback of the topic, so updates take no lock. Readers merge the
+    ranges of all topics. The lock is only taken to add the first
+    timestamp of a topic, which replaces the mapping of ranges by a copy,
+    so that readers can iterate over it concurrently.
+    """
+
+    def __init__(self):
+        self._ranges: Dict[str, Tuple[int, int]] = dict()
+        self._lock = threading.Lock()
+
+    def _merge(self) -> Optional[Tuple[int, int]]:
+        ranges = list(self._ranges.values())
+        if not ranges:
+            return None
+        return (
+            min(rng[0] for rng in ranges),
+            max(rng[1] for rng in ranges),
+        )
+
+    @property
+    def min(self) -> Optional[int]:
+        rng = self._merge()
+        return None if rng is None else rng[0]
+
+    @property
+    def max(self) -> Optional[int]:
+        rng = self._merge()
+        return None if rng is None else rng[1]
+
+    @property
+    def duration(self) -> int:
+        """The duration of the range in nanoseconds."""
+        rng = self._merge()
+        return 0 if rng is None else rng[1] - rng[0]
+
+    def is_within(self, timestamp: int, max_difference: int) -> bool:
+        """Checks whether a timestamp is close enough to the range.
+
+        Args:
+            timestamp (int): The timestamp in nanoseconds.
+            max_difference (int): The maximum allowed distance to the
+                range, in nanoseconds.
+
+        Returns:
+            bool: True if the range is empty or the timestamp lies within
+            `[min - max_difference, max + max_difference]`.
+        """
+        rng = self._merge()
+        if rng is None:
+            return True
+        return rng[0] - max_difference <= timestamp <= rng[1] + max_difference
+
+    def update(self, topic: str, timestamp: int):
+        """Extends the range of a topic to include the timestamp.
+
+        Must only be called by the owner of the topic, i.e. the callback
+        which writes the topic.
+
+        Args:
+            topic (str): The topic of the timestamp.
+            timestamp (int): The timestamp in nanoseconds.
+        """
+        rng = self._ranges.get(topic)
+        if rng is None:
+            with self._lock:
+                ranges = dict(self._ranges)
+                ranges[topic] = (timestamp, timestamp)
+                self._ranges = ranges
+        elif not rng[0] <= timestamp <= rng[1]:
+            # replacing the value of an existing key does not resize the
+            # mapping, so concurrent readers are safe
+            self._ranges[topic] = (
+                min(rng[0], timestamp),
+                max(rng[1], timestamp),
+            )
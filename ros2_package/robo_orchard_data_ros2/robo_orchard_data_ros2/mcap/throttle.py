@@ -0,0 +1,178 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from robo_orchard_data_ros2.mcap.config import ThrottleConfig
+
+__all__ = ["flatten_message", "TopicThrottle"]
+
+
+def _is_message(value: Any) -> bool:
+    return hasattr(value, "get_fields_and_field_types")
+
+
+def flatten_message(
+    msg: Any, fields: Optional[List[str]] = None
+) -> Tuple[np.ndarray, Tuple]:
+    """Splits the content of a message into numbers and other values.
+
+    Args:
+        msg: The ROS message.
+        fields (Optional[List[str]]): Dotted paths of the fields to
+            extract, e.g. `["position", "velocity"]`. Defaults to None,
+            which extracts all fields except `header`.
+
+    Returns:
+        Tuple[np.ndarray, Tuple]: The numeric values as a flat float64
+        array, and the non-numeric values (strings, bytes, ...).
+    """
+    numbers: List[np.ndarray] = []
+    others: List[Any] = []
+
+    def _visit(value: Any):
+        if _is_message(value):
+            for name in value.get_fields_and_field_types():
+                _visit(getattr(value, name))
+        elif isinstance(value, (bool, int, float)):
+            numbers.append(np.asarray([value], dtype=np.float64))
+        elif isinstance(value, np.ndarray) and value.dtype.kind in "biuf":
+            numbers.append(value.astype(np.float64).ravel())
+        elif isinstance(value, (list, tuple)) or (
+            hasattr(value, "typecode") and hasattr(value, "tolist")
+        ):
+            # python lists and array.array of rosidl sequences
+            items = list(value)
+            if all(isinstance(v, (bool, int, float)) for v in items):
+                numbers.append(np.asarray(items, dtype=np.float64))
+            else:
+                others.append(len(items))
+                for v in items:
+                    _visit(v)
+        else:
+            others.append(value)
+
+    if fields is None:
+        for name in msg.get_fields_and_field_types():
+            if name != "header":
+                _visit(getattr(msg, name))
+    else:
+        for path in fields:
+            value = msg
+            for name in path.split("."):
+                value = getattr(value, name)
+            _visit(value)
+
+    if numbers:
+        flat = np.concatenate(numbers)
+    else:
+        flat = np.zeros(0, dtype=np.float64)
+    return flat, tuple(others)
+
+
+class TopicThrottle:
+    """Decides which messages of a topic are recorded.
+
+    The filters are applied in order: change-only, keep every N-th, then
+    the maximum rate, so that the rate limit keeps the latest changes.
+    The rate limit schedules one slot per period, which keeps the average
+    rate at `max_hz` for inputs jittering around a multiple of it.
+
+    This class is not thread-safe. Each topic has its own instance, and the
+    callbacks of a topic are mutually exclusive.
+
+    Attributes:
+        dropped (Dict[str, int]): The number of dropped messages per
+            filter: `"unchanged"`, `"keep_every_n"` and `"max_hz"`.
+    """
+
+    def __init__(self, config: ThrottleConfig):
+        self.config = config
+        self.dropped: Dict[str, int] = defaultdict(int)
+        self._period_ns = (
+            None if config.max_hz is None else int(1e9 / config.max_hz)
+        )
+        self._next_slot_ns: Optional[int] = None
+        self._counter = 0
+        self._last_values: Optional[Tuple[np.ndarray, Tuple]] = None
+
+    @property
+    def needs_message(self) -> bool:
+        """Whether the deserialized message is required."""
+        return self.config.change_only
+
+    def _changed(self, values: Tuple[np.ndarray, Tuple]) -> bool:
+        numbers, others = values
+        last = self._last_values
+        return (
+            last is None
+            or last[0].shape != numbers.shape
+            or last[1] != others
+            or (
+                numbers.size > 0
+                and np.max(np.abs(numbers - last[0]))
+                > self.config.change_tolerance
+            )
+        )
+
+    def accept(self, msg: Any, now_ns: int) -> Optional[str]:
+        """Checks a message against the filters.
+
+        Args:
+            msg: The ROS message, or the serialized CDR buffer if
+                `needs_message` is False.
+            now_ns (int): The receive time in nanoseconds.
+
+        Returns:
+            Optional[str]: None if the message is kept, otherwise the name
+            of the filter which dropped it.
+        """
+        values = None
+        if self.config.change_only:
+            values = flatten_message(msg, self.config.change_fields)
+            # compare with the last recorded message, so that slow drifts
+            # are recorded once they exceed the tolerance
+            if not self._changed(values):
+                return self._drop("unchanged")
+
+        if self.config.keep_every_n is not None:
+            keep = self._counter % self.config.keep_every_n == 0
+            self._counter += 1
+            if not keep:
+                return self._drop("keep_every_n")
+
+        if self._period_ns is not None:
+            if self._next_slot_ns is not None and now_ns < self._next_slot_ns:
+                return self._drop("max_hz")
+            if (
+                self._next_slot_ns is None
+                or now_ns - self._next_slot_ns >= self._period_ns
+            ):
+                # first message, or the input was slower than the limit
+                self._next_slot_ns = now_ns + self._period_ns
+            else:
+                self._next_slot_ns += self._period_ns
+
+        if values is not None:
+            self._last_values = values
+        return None
+
+    def _drop(self, reason: str) -> str:
+        self.dropped[reason] += 1
+        return reason
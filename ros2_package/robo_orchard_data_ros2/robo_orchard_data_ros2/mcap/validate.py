@@ -0,0 +1,526 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from robo_orchard_data_ros2.mcap.config import (
+    FrameRateMonitor,
+    RecordConfig,
+    TopicSpec,
+)
+from robo_orchard_data_ros2.mcap.format import (
+    MAGIC,
+    Channel,
+    Chunk,
+    McapFormatError,
+    Opcode,
+    iter_chunk_records,
+    read_record_headers,
+)
+from robo_orchard_data_ros2.mcap.recovery import (
+    SPLIT_MANIFEST_FILE,
+    get_group_roots,
+)
+
+__all__ = [
+    "EPISODE_META_FILE",
+    "TopicStats",
+    "scan_mcap_file",
+    "get_monitor_configs",
+    "validate_episode",
+    "update_episode_meta",
+    "main",
+]
+
+EPISODE_META_FILE = "episode_meta.json"
+VALIDATION_VERSION = 1
+
+# channel id (u16), sequence (u32) and log time (u64) of a message record,
+# unpacked without slicing the message data
+_MESSAGE_PREFIX = struct.Struct("<HIQ")
+
+
+class TopicStats:
+    """Streaming statistics of the log times of a topic.
+
+    The log times are fed in file order, i.e. in the order the messages
+    were written. Out-of-order log times count as monotonicity violations
+    and as zero intervals, like in :class:`FrameRateMonitor`.
+
+    Attributes:
+        message_count (int): The number of messages.
+        start_time_ns (int | None): The minimum log time.
+        end_time_ns (int | None): The maximum log time.
+        first_time_ns (int | None): The log time of the first message.
+        last_time_ns (int | None): The log time of the last message.
+        max_gap_ns (int): The largest interval between two messages.
+        max_gap_time_ns (int | None): The log time at the end of the
+            largest interval.
+        non_monotonic (int): The number of messages older than the
+            previous one.
+        interval_sum (int): The sum of the intervals, in nanoseconds.
+        interval_sum_sq (int): The sum of the squared intervals.
+    """
+
+    def __init__(self):
+        self.message_count = 0
+        self.start_time_ns: Optional[int] = None
+        self.end_time_ns: Optional[int] = None
+        self.first_time_ns: Optional[int] = None
+        self.last_time_ns: Optional[int] = None
+        self.max_gap_ns = 0
+        self.max_gap_time_ns: Optional[int] = None
+        self.non_monotonic = 0
+        self.interval_sum = 0
+        self.interval_sum_sq = 0
+
+    def update(self, log_time: int):
+        """Adds the log time of the next message."""
+        self.message_count += 1
+        if self.last_time_ns is None:
+            self.start_time_ns = self.end_time_ns = log_time
+            self.first_time_ns = self.last_time_ns = log_time
+            return
+        interval = log_time - self.last_time_ns
+        if interval < 0:
+            self.non_monotonic += 1
+            interval = 0
+        self.interval_sum += interval
+        self.interval_sum_sq += interval * interval
+        if interval > self.max_gap_ns:
+            self.max_gap_ns = interval
+            self.max_gap_time_ns = log_time
+        self.start_time_ns = min(self.start_time_ns, log_time)
+        self.end_time_ns = max(self.end_time_ns, log_time)
+        self.last_time_ns = log_time
+
+    def extend(self, other: "TopicStats"):
+        """Appends the statistics of the messages written after these.
+
+        Args:
+            other (TopicStats): The statistics of the next file, e.g. the
+                next split of the bag.
+        """
+        if other.message_count == 0:
+            return
+        if self.message_count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        # the interval across the file boundary
+        interval = other.first_time_ns - self.last_time_ns
+        if interval < 0:
+            self.non_monotonic += 1
+            interval = 0
+        self.interval_sum += interval + other.interval_sum
+        self.interval_sum_sq += interval * interval + other.interval_sum_sq
+        if interval > self.max_gap_ns:
+            self.max_gap_ns = interval
+            self.max_gap_time_ns = other.first_time_ns
+        if other.max_gap_ns > self.max_gap_ns:
+            self.max_gap_ns = other.max_gap_ns
+            self.max_gap_time_ns = other.max_gap_time_ns
+        self.message_count += other.message_count
+        self.non_monotonic += other.non_monotonic
+        self.start_time_ns = min(self.start_time_ns, other.start_time_ns)
+        self.end_time_ns = max(self.end_time_ns, other.end_time_ns)
+        self.last_time_ns = other.last_time_ns
+
+    @property
+    def num_intervals(self) -> int:
+        return max(self.message_count - 1, 0)
+
+    @property
+    def duration_ns(self) -> int:
+        if self.message_count == 0:
+            return 0
+        return self.end_time_ns - self.start_time_ns
+
+    @property
+    def rate_hz(self) -> float:
+        """The effective rate over the time range of the topic."""
+        if self.duration_ns <= 0:
+            return 0.0
+        return self.num_intervals / (self.duration_ns * 1e-9)
+
+    @property
+    def jitter_ms(self) -> float:
+        """The standard deviation of the intervals."""
+        n = self.num_intervals
+        if n == 0:
+            return 0.0
+        mean = self.interval_sum / n
+        var = max(self.interval_sum_sq / n - mean * mean, 0.0)
+        return math.sqrt(var) * 1e-6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "message_count": self.message_count,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "duration_sec": self.duration_ns * 1e-9,
+            "rate_hz": self.rate_hz,
+            "jitter_ms": self.jitter_ms,
+            "max_gap_ms": self.max_gap_ns * 1e-6,
+            "max_gap_time_ns": self.max_gap_time_ns,
+            "non_monotonic": self.non_monotonic,
+        }
+
+
+def _scan_records(
+    data,
+    channels: Dict[int, str],
+    stats: Dict[str, TopicStats],
+):
+    for _, opcode, record in iter_chunk_records(data):
+        if opcode == Opcode.MESSAGE:
+            channel_id, _, log_time = _MESSAGE_PREFIX.unpack_from(record)
+            stats[channels[channel_id]].update(log_time)
+        elif opcode == Opcode.CHANNEL:
+            channel = Channel.parse(record)
+            channels[channel.id] = channel.topic
+            stats.setdefault(channel.topic, TopicStats())
+
+
+def scan_mcap_file(
+    path: str,
+) -> Tuple[Dict[str, TopicStats], Optional[str]]:
+    """Streams the messages of an MCAP file once.
+
+    Only the record prefixes and the message headers are decoded, the
+    message data is never deserialized.
+
+    Args:
+        path (str): The MCAP file.
+
+    Returns:
+        Tuple[Dict[str, TopicStats], Optional[str]]: The statistics per
+        topic, and the error which stopped the scan, if any. A file
+        without data end record is reported as truncated.
+    """
+    channels: Dict[int, str] = dict()
+    stats: Dict[str, TopicStats] = dict()
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as fp:
+            if fp.read(len(MAGIC)) != MAGIC:
+                raise McapFormatError("not an MCAP file")
+            complete = False
+            for header in read_record_headers(fp, file_size):
+                if header.opcode in (Opcode.DATA_END, Opcode.FOOTER):
+                    complete = True
+                    break
+                if header.opcode not in (
+                    Opcode.CHANNEL,
+                    Opcode.MESSAGE,
+                    Opcode.CHUNK,
+                ):
+                    continue
+                if header.opcode == Opcode.CHUNK:
+                    fp.seek(header.content_offset)
+                    data = Chunk.parse(fp.read(header.length)).decompress()
+                else:
+                    # a single record, with its prefix
+                    fp.seek(header.offset)
+                    data = fp.read(header.end - header.offset)
+                _scan_records(data, channels, stats)
+    except (McapFormatError, OSError, KeyError, struct.error) as e:
+        return stats, f"{type(e).__name__}: {e}"
+    if not complete:
+        return stats, "truncated: no data end record"
+    return stats, None
+
+
+def _natural_key(path: str) -> List[Any]:
+    return [
+        int(token) if token.isdigit() else token
+        for token in re.split(r"(\d+)", path)
+    ]
+
+
+def _get_bag_files(root: str, excludes: List[str]) -> List[str]:
+    """Gets the MCAP files of a bag directory in recording order."""
+    manifest_file = os.path.join(root, SPLIT_MANIFEST_FILE)
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r") as f:
+            manifest = json.load(f)
+        return [
+            os.path.join(root, f)
+            for split in manifest["splits"]
+            for f in split["files"]
+        ]
+    return sorted(
+        (
+            f
+            for f in glob.glob(
+                os.path.join(root, "**", "*.mcap"), recursive=True
+            )
+            if not any(f.startswith(exclude) for exclude in excludes)
+        ),
+        key=_natural_key,
+    )
+
+
+def _get_dst_topic(topic: str, spec: TopicSpec) -> str:
+    # the same renaming as McapRecorder.get_dst_topic
+    if spec.rename_topic is not None:
+        return spec.rename_topic
+    if spec.codec is not None:
+        return topic.rstrip("/") + "/compressed"
+    return topic
+
+
+def _get_configured_topics(config: RecordConfig) -> Set[str]:
+    """Gets the writting topic names which do not use the default spec.
+
+    These are the topics of `RecordConfig.topic_spec` and the static
+    topics, which are never checked against the default thresholds.
+    """
+    return {
+        _get_dst_topic(
+            topic, config.topic_spec.get(topic, config.default_topic_spec)
+        )
+        for topic in set(config.topic_spec) | set(config.static_topics)
+    }
+
+
+def get_monitor_configs(config: RecordConfig) -> Dict[str, FrameRateMonitor]:
+    """Gets the frame rate thresholds of the written topics.
+
+    Args:
+        config (RecordConfig): The recorder configuration.
+
+    Returns:
+        Dict[str, FrameRateMonitor]: The thresholds per writting topic
+        name, i.e. after renaming. The thresholds of
+        `RecordConfig.default_topic_spec` are under the key "*", which
+        only applies to the topics neither in `RecordConfig.topic_spec`
+        nor in `RecordConfig.static_topics`.
+    """
+    static_topics = set(config.static_topics)
+    ret: Dict[str, FrameRateMonitor] = dict()
+    for topic, spec in config.topic_spec.items():
+        if spec.frame_rate_monitor is None or topic in static_topics:
+            continue
+        ret[_get_dst_topic(topic, spec)] = spec.frame_rate_monitor
+    if config.default_topic_spec.frame_rate_monitor is not None:
+        ret["*"] = config.default_topic_spec.frame_rate_monitor
+    return ret
+
+
+def _check_topic(stats: TopicStats, cfg: FrameRateMonitor) -> List[str]:
+    errors = []
+    if stats.message_count == 0:
+        return ["no message recorded"]
+    if not (cfg.min_hz <= stats.rate_hz <= cfg.max_hz):
+        errors.append(
+            f"rate {stats.rate_hz:.2f} Hz is out of range "
+            f"[{cfg.min_hz}, {cfg.max_hz}]"
+        )
+    if cfg.max_gap_ms is not None and stats.max_gap_ns * 1e-6 > (
+        cfg.max_gap_ms
+    ):
+        errors.append(
+            f"gap {stats.max_gap_ns * 1e-6:.2f} ms exceeds {cfg.max_gap_ms} ms"
+        )
+    if cfg.max_jitter_ms is not None and stats.jitter_ms > cfg.max_jitter_ms:
+        errors.append(
+            f"jitter {stats.jitter_ms:.2f} ms exceeds {cfg.max_jitter_ms} ms"
+        )
+    return errors
+
+
+def validate_episode(
+    uri: str,
+    config: Optional[RecordConfig] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Validates the MCAP files of a recorded episode.
+
+    The files are scanned in parallel by a process pool, then the
+    statistics of the splits of each writer group are chained in
+    recording order. A topic written into several groups, like a static
+    topic, is reported from the first group.
+
+    Args:
+        uri (str): The output uri of the recorder.
+        config (Optional[RecordConfig]): The recorder configuration, whose
+            frame rate monitors give the thresholds. Defaults to None,
+            which only computes the statistics.
+        max_workers (Optional[int]): The number of worker processes.
+            Defaults to None, which means the number of CPU cores.
+
+    Returns:
+        Dict[str, Any]: The report, with the per-topic statistics and
+        errors, the per-file scan errors, and whether the episode is
+        valid.
+    """
+    start = time.monotonic()
+    group_roots = [os.path.normpath(p) for p in get_group_roots(uri)]
+    group_files = [
+        _get_bag_files(
+            group_root,
+            excludes=[
+                other + os.sep
+                for other in group_roots
+                if other.startswith(group_root + os.sep)
+            ],
+        )
+        for group_root in group_roots
+    ]
+    files = [f for paths in group_files for f in paths]
+    if files:
+        with ProcessPoolExecutor(
+            max_workers=min(len(files), max_workers or os.cpu_count() or 1)
+        ) as executor:
+            results = dict(
+                zip(files, executor.map(scan_mcap_file, files), strict=True)
+            )
+    else:
+        results = dict()
+
+    topics: Dict[str, TopicStats] = dict()
+    for paths in group_files:
+        group_topics: Dict[str, TopicStats] = dict()
+        for path in paths:
+            for topic, stats in results[path][0].items():
+                group_topics.setdefault(topic, TopicStats()).extend(stats)
+        for topic, stats in group_topics.items():
+            topics.setdefault(topic, stats)
+
+    monitors = dict() if config is None else get_monitor_configs(config)
+    configured = set() if config is None else _get_configured_topics(config)
+    errors = []
+    if not files:
+        errors.append("no MCAP file found")
+    topic_reports: Dict[str, Dict[str, Any]] = dict()
+    for topic in sorted(set(topics) | (set(monitors) - {"*"})):
+        stats = topics.get(topic, TopicStats())
+        cfg = monitors.get(topic)
+        if cfg is None and topic not in configured:
+            cfg = monitors.get("*")
+        topic_errors = [] if cfg is None else _check_topic(stats, cfg)
+        topic_reports[topic] = {**stats.to_dict(), "errors": topic_errors}
+        errors += [f"{topic}: {error}" for error in topic_errors]
+    file_reports = []
+    for path in files:
+        error = results[path][1]
+        file_reports.append(
+            {"path": os.path.relpath(path, uri), "error": error}
+        )
+        if error is not None:
+            errors.append(f"{os.path.relpath(path, uri)}: {error}")
+    return {
+        "version": VALIDATION_VERSION,
+        "valid": not errors,
+        "validate_time": time.time(),
+        "elapsed_sec": time.monotonic() - start,
+        "errors": errors,
+        "files": file_reports,
+        "topics": topic_reports,
+    }
+
+
+def update_episode_meta(uri: str, report: Dict[str, Any]):
+    """Writes the validation report into `episode_meta.json`.
+
+    The other keys of the file are kept.
+
+    Args:
+        uri (str): The output uri of the recorder.
+        report (Dict[str, Any]): The report of :func:`validate_episode`.
+    """
+    meta_file = os.path.join(uri, EPISODE_META_FILE)
+    meta: Dict[str, Any] = dict()
+    if os.path.exists(meta_file):
+        with open(meta_file, "r") as f:
+            meta = json.load(f)
+    meta["validation"] = report
+    tmp_file = meta_file + ".tmp"
+    with open(tmp_file, "w") as fw:
+        json.dump(meta, fw, indent=4)
+    os.replace(tmp_file, meta_file)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Validate recorded episodes: per-topic message "
+        "counts, rates, gaps and log time monotonicity are computed by "
+        "streaming the MCAP files once, checked against the frame rate "
+        f"monitors of the recorder config, and written into "
+        f"{EPISODE_META_FILE}. Exits with 2 if an episode is invalid."
+    )
+    parser.add_argument("uris", nargs="+", help="Episode directories.")
+    parser.add_argument(
+        "--config", default="", help="The recorder config file."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="The number of worker processes.",
+    )
+    parser.add_argument(
+        "--no-write",
+        action="store_true",
+        help=f"Do not write the report into {EPISODE_META_FILE}.",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the reports as json."
+    )
+    opts = parser.parse_args(args)
+
+    config = None
+    if opts.config:
+        with open(opts.config, "r") as f:
+            config = RecordConfig.model_validate_json(f.read())
+
+    reports = dict()
+    for uri in opts.uris:
+        report = validate_episode(uri, config, max_workers=opts.workers)
+        reports[uri] = report
+        if not opts.no_write:
+            update_episode_meta(uri, report)
+        if opts.json:
+            continue
+        print(
+            "{} [{}]: {} topics, {} files in {:.2f} s".format(
+                uri,
+                "valid" if report["valid"] else "invalid",
+                len(report["topics"]),
+                len(report["files"]),
+                report["elapsed_sec"],
+            )
+        )
+        for error in report["errors"]:
+            print(f"  {error}")
+    if opts.json:
+        print(json.dumps(reports, indent=4))
+    if not all(report["valid"] for report in reports.values()):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
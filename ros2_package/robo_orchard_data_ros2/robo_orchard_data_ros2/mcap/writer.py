@@ -0,0 +1,332 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import threading
+from collections import defaultdict, deque
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+__all__ = ["WriteRequest", "WriteQueue", "WriterStage"]
+
+
+QueueFullAction = Literal["block", "drop_first", "drop_last"]
+
+
+class WriteRequest(NamedTuple):
+    """A message waiting to be written into the bag.
+
+    Attributes:
+        src_topic (str): Original topic name.
+        dst_topic (str): The writting topic name.
+        msg (Any): The ROS message.
+        timestamp (int): The log time of the message, in nanoseconds.
+        receive_time_ns (int): The monotonic time when the message was
+            received, in nanoseconds. Defaults to 0 (unknown).
+        nbytes (int): The bytes accounted by the memory governor.
+            Defaults to 0.
+    """
+
+    src_topic: str
+    dst_topic: str
+    msg: Any
+    timestamp: int
+    receive_time_ns: int = 0
+    nbytes: int = 0
+
+
+class WriteQueue:
+    """Bounded hand-off queue between subscription callbacks and writers.
+
+    The queue is shared by all topics, while the action taken when it is
+    full is decided per message, so that a lossy camera topic and a
+    lossless joint state topic can live in the same queue.
+
+    With `keep_topic_order`, a topic is handed to one consumer at a time:
+    its next message is only got once the previous one is marked done by
+    :meth:`task_done`. Consumers working in parallel then finish the
+    messages of a topic in order, while different topics still run in
+    parallel.
+
+    Attributes:
+        max_size (int): The maximum number of queued messages. A value
+            of 0 means unlimited.
+        peak_depth (int): The maximum depth observed since creation.
+        dropped (Dict[str, int]): The number of dropped messages per
+            writting topic.
+        on_drop (Optional[Callable[[WriteRequest], None]]): Called with
+            queued messages discarded by "drop_first".
+        keep_topic_order (bool): Whether to hand a topic to one consumer
+            at a time.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 0,
+        on_drop: Optional[Callable[[WriteRequest], None]] = None,
+        keep_topic_order: bool = False,
+    ):
+        self.max_size = max_size
+        self.on_drop = on_drop
+        self.keep_topic_order = keep_topic_order
+        self._busy_topics: Set[str] = set()
+        self.peak_depth = 0
+        self.dropped: Dict[str, int] = defaultdict(int)
+        self._items: deque[WriteRequest] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _is_full(self) -> bool:
+        return self.max_size > 0 and len(self._items) >= self.max_size
+
+    def _drop_first(self, dst_topic: str) -> bool:
+        """Discards the oldest queued message of the given topic.
+
+        Returns:
+            bool: True if a message has been discarded.
+        """
+        for idx, item in enumerate(self._items):
+            if item.dst_topic == dst_topic:
+                del self._items[idx]
+                self.dropped[dst_topic] += 1
+                if self.on_drop is not None:
+                    self.on_drop(item)
+                return True
+        return False
+
+    def put(
+        self, item: WriteRequest, action: QueueFullAction = "block"
+    ) -> bool:
+        """Puts a message into the queue.
+
+        Args:
+            item (WriteRequest): The message to be written.
+            action (Literal["block", "drop_first", "drop_last"]): Action
+                to take when the queue is full.
+                Options are:
+                - "block": Wait until a writer frees a slot.
+                - "drop_first": Discard the oldest queued message of the
+                  same topic. Falls back to "drop_last" if the queue holds
+                  no message of this topic.
+                - "drop_last": Discard the incoming message.
+
+        Returns:
+            bool: True if the message has been queued.
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            if self._is_full():
+                if action == "block":
+                    while self._is_full() and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return False
+                elif action == "drop_first":
+                    if not self._drop_first(item.dst_topic):
+                        self.dropped[item.dst_topic] += 1
+                        return False
+                elif action == "drop_last":
+                    self.dropped[item.dst_topic] += 1
+                    return False
+                else:
+                    raise ValueError(
+                        "Unsupported queue full action: {}".format(action)
+                    )
+
+            self._items.append(item)
+            self.peak_depth = max(self.peak_depth, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[WriteRequest]:
+        """Gets the oldest message from the queue.
+
+        Args:
+            timeout (Optional[float]): The maximum time to wait, in seconds.
+                If None, waits until a message is available or the queue
+                is closed.
+
+        Returns:
+            Optional[WriteRequest]: The message, or None if the queue is
+            empty after the timeout or has been closed and drained. With
+            `keep_topic_order`, messages of topics held by other
+            consumers are not available.
+        """
+        with self._cond:
+            idx = self._next_index()
+            if idx is None and not self._closed:
+                self._cond.wait(timeout)
+                idx = self._next_index()
+            if idx is None:
+                return None
+            item = self._items[idx]
+            del self._items[idx]
+            if self.keep_topic_order:
+                self._busy_topics.add(item.dst_topic)
+            self._cond.notify_all()
+            return item
+
+    def _next_index(self) -> Optional[int]:
+        if not self.keep_topic_order:
+            return 0 if self._items else None
+        for idx, item in enumerate(self._items):
+            if item.dst_topic not in self._busy_topics:
+                return idx
+        return None
+
+    def task_done(self, item: WriteRequest):
+        """Marks a message got from the queue as done.
+
+        With `keep_topic_order`, the next message of its topic becomes
+        available.
+        """
+        if not self.keep_topic_order:
+            return
+        with self._cond:
+            self._busy_topics.discard(item.dst_topic)
+            self._cond.notify_all()
+
+    def close(self):
+        """Closes the queue.
+
+        Pending messages can still be consumed, but new messages are
+        rejected and blocked producers are released.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class WriterStage:
+    """Thread pool draining a :class:`WriteQueue`.
+
+    Subscription callbacks only push messages into the queue, while the
+    serialization and the disk I/O happen in the writer threads, so that
+    a slow disk never stalls the executor.
+
+    Attributes:
+        queue (WriteQueue): The hand-off queue.
+        num_threads (int): The number of writer threads.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[WriteRequest], None],
+        num_threads: int = 1,
+        max_queue_size: int = 0,
+        on_error: Optional[Callable[[WriteRequest, Exception], None]] = None,
+        on_drop: Optional[Callable[[WriteRequest], None]] = None,
+        name: str = "mcap_writer",
+        keep_topic_order: bool = False,
+    ):
+        """Constructor.
+
+        Args:
+            fn (Callable[[WriteRequest], None]): The function to write a
+                message. It is called concurrently when `num_threads > 1`.
+            num_threads (int): The number of writer threads. Defaults to 1.
+            max_queue_size (int): The maximum size of the hand-off queue.
+                Defaults to 0 (unlimited queue size).
+            on_error (Optional[Callable[[WriteRequest, Exception], None]]):
+                Called when `fn` raises. Defaults to None, which means the
+                error is silently ignored.
+            on_drop (Optional[Callable[[WriteRequest], None]]): Called with
+                queued messages discarded to make room for newer ones.
+                Defaults to None.
+            name (str): The name prefix of the threads. Defaults to
+                "mcap_writer".
+            keep_topic_order (bool): Whether the messages of a topic are
+                processed one at a time, in queue order, even when
+                `num_threads > 1`. Defaults to False.
+        """
+        if num_threads < 1:
+            raise ValueError(
+                "num_threads should be positive, but got {}".format(
+                    num_threads
+                )
+            )
+        self.fn = fn
+        self.num_threads = num_threads
+        self.on_error = on_error
+        self.queue = WriteQueue(
+            max_size=max_queue_size,
+            on_drop=on_drop,
+            keep_topic_order=keep_topic_order,
+        )
+        self._threads: List[threading.Thread] = []
+        for idx in range(num_threads):
+            thread = threading.Thread(
+                target=self._run, name=f"{name}_{idx}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                if self.queue.closed:
+                    return
+                continue
+            try:
+                self.fn(item)
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(item, e)
+            finally:
+                self.queue.task_done(item)
+
+    def put(
+        self, item: WriteRequest, action: QueueFullAction = "block"
+    ) -> bool:
+        """Queues a message for writing. See :meth:`WriteQueue.put`."""
+        return self.queue.put(item, action)
+
+    @property
+    def depth(self) -> int:
+        """The number of messages waiting to be written."""
+        return len(self.queue)
+
+    @property
+    def dropped(self) -> Dict[str, int]:
+        """The number of dropped messages per writting topic."""
+        return dict(self.queue.dropped)
+
+    def close(self, timeout: Optional[float] = None):
+        """Stops accepting messages and waits for the queue to drain.
+
+        Args:
+            timeout (Optional[float]): The maximum time to wait for each
+                writer thread, in seconds. Defaults to None (wait forever).
+        """
+        self.queue.close()
+        for thread in self._threads:
+            thread.join(timeout)
@@ -124,8 +124,14 @@ setup(
     entry_points={
         "console_scripts": [
             "mcap_recorder = robo_orchard_data_ros2.mcap.node:main",
+            "mcap_topic_manifest = robo_orchard_data_ros2.mcap.discovery:main",  # noqa: E501
+            "mcap_recover = robo_orchard_data_ros2.mcap.recovery:main",
+            "mcap_index = robo_orchard_data_ros2.mcap.index:main",
+            "mcap_validate = robo_orchard_data_ros2.mcap.validate:main",
             "tf_publisher = robo_orchard_data_ros2.tf.node:main",
             "image_encoder = robo_orchard_data_ros2.codec.image.encoder_node:main",  # noqa: E501
+            "synthetic_publisher = robo_orchard_data_ros2.benchmark.publisher:main",  # noqa: E501
+            "mcap_benchmark = robo_orchard_data_ros2.benchmark.harness:main",
         ],
     },
 )
@@ -0,0 +1,153 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import json
+import os
+import time
+
+from robo_orchard_recorder_app.catalog import EpisodeCatalog, EpisodeRecord
+
+
+def _make_episode(workspace, user, task, index, validation=None):
+    uri = os.path.join(
+        workspace,
+        "2025_01_01-00_00_00",
+        "data",
+        user,
+        task,
+        f"episode_2025_01_01-00_00_{index:02d}",
+    )
+    os.makedirs(uri)
+    with open(os.path.join(uri, "episode_0.mcap"), "wb") as fw:
+        fw.write(b"\0" * 10)
+    meta = {"user_name": user, "task_name": task}
+    if validation is not None:
+        meta["validation"] = validation
+    with open(os.path.join(uri, "episode_meta.json"), "w") as fw:
+        json.dump(meta, fw)
+    return uri
+
+
+def test_sync_and_paginate(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    uris = [_make_episode(workspace, "alice", "pick", i) for i in range(5)]
+    uris += [_make_episode(workspace, "bob", "place", i) for i in range(5, 8)]
+    catalog = EpisodeCatalog(str(tmp_path / "episodes.db"))
+    assert catalog.sync(workspace) == (8, 0, 0)
+    assert catalog.sync(workspace) == (0, 0, 0)
+    assert catalog.count(user_name="alice") == 5
+    assert catalog.distinct("user_name") == ["alice", "bob"]
+
+    pages, after = [], None
+    while True:
+        page = catalog.query(user_name="alice", after=after, limit=2)
+        if not page:
+            break
+        pages.append([record.uri for record in page])
+        after = (page[-1].create_time, page[-1].uri)
+    assert pages == [uris[4:2:-1], uris[2:0:-1], uris[0:1]]
+
+    record = catalog.get(uris[0])
+    assert record.task_name == "pick"
+    assert record.size_bytes == 10
+    assert record.status == "unvalidated"
+
+
+def test_update_and_remove(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    validation = {
+        "valid": False,
+        "errors": ["/camera: no messages"],
+        "topics": {
+            "/joint_states": {
+                "message_count": 3,
+                "start_time_ns": 0,
+                "end_time_ns": 2_000_000_000,
+            }
+        },
+    }
+    uri = _make_episode(workspace, "alice", "pick", 0, validation)
+    catalog = EpisodeCatalog(str(tmp_path / "episodes.db"))
+
+    catalog.update_from_disk(uri, status="finalizing")
+    assert catalog.query(status="finalizing")[0].uri == uri
+
+    record = catalog.update_from_disk(uri)
+    assert record.status == "invalid"
+    assert record.duration_sec == 2.0
+    assert record.topic_counts == {"/joint_states": 3}
+    assert catalog.get(uri).errors == ["/camera: no messages"]
+    assert catalog.query(search="00_00_00")[0].uri == uri
+    assert catalog.query(search="missing") == []
+
+    catalog.remove(uri)
+    assert catalog.get(uri) is None
+
+
+def test_stats_follow_updates(tmp_path):
+    catalog = EpisodeCatalog(str(tmp_path / "episodes.db"))
+    for i, (user, task) in enumerate(
+        [("alice", "pick"), ("alice", "place"), ("bob", "pick")]
+    ):
+        catalog.upsert(
+            EpisodeRecord(
+                uri=f"/ws/episode_{i}",
+                name=f"episode_{i}",
+                user_name=user,
+                task_name=task,
+                status="valid",
+                duration_sec=1800.0,
+                size_bytes=100,
+            )
+        )
+    by_task = catalog.stats(group_by=["task_name"])
+    assert [(s.task_name, s.episodes, s.hours) for s in by_task] == [
+        ("pick", 2, 1.0),
+        ("place", 1, 0.5),
+    ]
+
+    record = catalog.get("/ws/episode_2")
+    catalog.upsert(record.model_copy(update={"status": "invalid"}))
+    catalog.remove("/ws/episode_1")
+    by_status = catalog.stats(group_by=["user_name", "status"])
+    assert [(s.user_name, s.status, s.episodes) for s in by_status] == [
+        ("alice", "valid", 1),
+        ("bob", "invalid", 1),
+    ]
+    (total,) = catalog.stats(group_by=[])
+    assert (total.episodes, total.size_bytes) == (2, 200)
+    (failed,) = catalog.stats(group_by=[], status=["failed"])
+    assert failed.episodes == 0
+    assert catalog.count(max_duration_sec=3600) == 2
+
+
+def test_sync_reads_unfinished_episodes_again(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    uris = [_make_episode(workspace, "alice", "pick", i) for i in range(3)]
+    catalog = EpisodeCatalog(str(tmp_path / "episodes.db"))
+    assert catalog.sync(workspace) == (3, 0, 0)
+    # left by an app restarted while recording and finalizing
+    catalog.update_from_disk(uris[0], status="recording")
+    catalog.update_from_disk(uris[1], status="finalizing")
+    assert catalog.sync(workspace) == (0, 2, 0)
+    assert catalog.count(status="unvalidated") == 3
+
+    # validated by another app instance
+    with open(os.path.join(uris[2], "episode_meta.json"), "w") as fw:
+        json.dump({"validation": {"valid": True, "topics": {}}}, fw)
+    os.utime(uris[2], (time.time() + 10, time.time() + 10))
+    assert catalog.sync(workspace) == (0, 1, 0)
+    assert catalog.get(uris[2]).status == "valid"
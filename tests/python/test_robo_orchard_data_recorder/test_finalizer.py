@@ -0,0 +1,96 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import threading
+import time
+
+from robo_orchard_recorder_app.finalizer import EpisodeFinalizer
+
+
+def _wait_until(predicate, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_finalize_steps_in_order():
+    finalizer = EpisodeFinalizer()
+    calls = []
+    job = finalizer.submit(
+        "episode_0",
+        [
+            ("close", lambda: calls.append("close")),
+            ("meta", lambda: calls.append("meta")),
+        ],
+    )
+    finalizer.shutdown()
+    assert calls == ["close", "meta"]
+    assert job.done and not job.failed
+    assert job.progress == 1.0
+    assert job.status == {"close": "done", "meta": "done"}
+
+
+def test_failed_step_skips_remaining_steps():
+    finalizer = EpisodeFinalizer()
+
+    def _fail():
+        raise RuntimeError("disk full")
+
+    job = finalizer.submit(
+        "episode_0", [("close", _fail), ("meta", lambda: None)]
+    )
+    finalizer.shutdown()
+    assert job.failed
+    assert job.error == "close: disk full"
+    assert job.status == {"close": "failed", "meta": "skipped"}
+    assert not job.wait_for_step("close")
+
+
+def test_next_episode_while_finalizing():
+    finalizer = EpisodeFinalizer()
+    release = threading.Event()
+    slow = finalizer.submit("episode_0", [("close", release.wait)])
+    fast = finalizer.submit("episode_1", [("close", lambda: None)])
+    assert fast.wait_for_step("close", timeout=10)
+    # the job is marked done after its last step
+    assert _wait_until(lambda: fast.done)
+    assert not slow.done
+    assert finalizer.num_pending == 1
+    release.set()
+    assert slow.wait_for_step("close", timeout=10)
+    finalizer.shutdown()
+    finalizer.clear_finished()
+    assert finalizer.get_jobs() == []
+
+
+def test_on_done_is_called_after_steps():
+    finalizer = EpisodeFinalizer()
+    finished = []
+
+    def fail():
+        raise RuntimeError("broken")
+
+    job = finalizer.submit(
+        "episode_0",
+        [("close", fail)],
+        on_done=lambda job: finished.append(dict(job.status)),
+    )
+    finalizer.shutdown()
+    assert finished == [{"close": "failed"}]
+    assert job.done and job.error == "close: broken"
@@ -0,0 +1,152 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import json
+import os
+import time
+
+import pytest
+from robo_orchard_recorder_app.catalog import EpisodeCatalog
+from robo_orchard_recorder_app.trash import EpisodeTrash
+
+
+def _make_episode(workspace, name, size=10, group_root=None):
+    uri = os.path.join(workspace, "session", "data", "user", "task", name)
+    os.makedirs(uri)
+    with open(os.path.join(uri, "episode_0.mcap"), "wb") as fw:
+        fw.write(b"\0" * size)
+    if group_root is not None:
+        group_uri = os.path.join(group_root, name, "camera")
+        os.makedirs(group_uri)
+        with open(os.path.join(group_uri, "camera_0.mcap"), "wb") as fw:
+            fw.write(b"\0" * size)
+        with open(os.path.join(uri, "episode_manifest.json"), "w") as fw:
+            json.dump({"finished": True, "groups": [{"uri": group_uri}]}, fw)
+    return uri
+
+
+def test_move_and_restore(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    group_root = str(tmp_path / "disk2")
+    uri = _make_episode(workspace, "episode_0", group_root=group_root)
+    group_uri = os.path.join(group_root, "episode_0", "camera")
+    trash = EpisodeTrash(os.path.join(workspace, ".trash"), workspace)
+
+    entry = trash.move(uri)
+    assert not os.path.exists(uri) and not os.path.exists(group_uri)
+    assert entry.size_bytes > 20
+    assert trash.size_bytes == entry.size_bytes
+
+    # the entries survive a restart of the app
+    trash = EpisodeTrash(os.path.join(workspace, ".trash"), workspace)
+    assert [e.name for e in trash.entries()] == [entry.name]
+    assert trash.restore(entry.name) == uri
+    assert os.path.exists(os.path.join(uri, "episode_0.mcap"))
+    assert os.path.exists(os.path.join(group_uri, "camera_0.mcap"))
+    assert trash.entries() == []
+    assert os.listdir(os.path.join(workspace, ".trash")) == []
+    with pytest.raises(KeyError):
+        trash.restore(entry.name)
+
+
+def test_purge(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    group_root = str(tmp_path / "disk2")
+    trash = EpisodeTrash(
+        os.path.join(workspace, ".trash"), workspace, retention_sec=0
+    )
+    trash.move(_make_episode(workspace, "episode_0", group_root=group_root))
+    assert trash.purge() == 1
+    assert trash.entries() == []
+    assert os.listdir(os.path.join(workspace, ".trash")) == []
+    assert os.listdir(os.path.join(group_root, "episode_0")) == []
+
+
+def test_background_purge(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    trash = EpisodeTrash(
+        os.path.join(workspace, ".trash"), workspace, retention_sec=0
+    )
+    trash.move(_make_episode(workspace, "episode_0"))
+    trash.start()
+    trash.request_purge()
+    deadline = time.monotonic() + 10
+    while os.listdir(os.path.join(workspace, ".trash")):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    trash.stop()
+    assert trash.entries() == []
+
+
+def test_failed_move_is_undone(tmp_path, monkeypatch):
+    workspace = str(tmp_path / "workspace")
+    group_root = str(tmp_path / "disk2")
+    uri = _make_episode(workspace, "episode_0", group_root=group_root)
+    trash = EpisodeTrash(os.path.join(workspace, ".trash"), workspace)
+    rename = os.rename
+    calls = []
+
+    def _rename(src, dst):
+        calls.append(src)
+        # the group on the other disk cannot be moved
+        if len(calls) == 2:
+            raise PermissionError(f"cannot rename {src}")
+        rename(src, dst)
+
+    monkeypatch.setattr(os, "rename", _rename)
+    with pytest.raises(PermissionError):
+        trash.move(uri)
+    assert os.path.exists(os.path.join(uri, "episode_0.mcap"))
+    assert trash.entries() == []
+    assert os.listdir(os.path.join(workspace, ".trash")) == []
+
+
+def test_quota_purges_oldest_entries(tmp_path):
+    workspace = str(tmp_path / "workspace")
+    catalog = EpisodeCatalog(str(tmp_path / "episodes.db"))
+    trash = EpisodeTrash(
+        os.path.join(workspace, ".trash"),
+        workspace,
+        quota_bytes=2500,
+        catalog=catalog,
+    )
+    uris = [
+        _make_episode(workspace, f"episode_{i}", size=1000) for i in range(3)
+    ]
+    for uri in uris:
+        catalog.update_from_disk(uri)
+    for uri in uris[:2]:
+        trash.move(uri)
+        catalog.remove(uri)
+    # only the background thread purges
+    with pytest.raises(RuntimeError, match="retry"):
+        trash.check_space(timeout=0.1)
+    assert len(trash.entries()) == 2
+
+    trash.start()
+    try:
+        trash.check_space()
+        assert [os.path.basename(e.uri) for e in trash.entries()] == [
+            "episode_1"
+        ]
+        trash.request_purge(purge_all=True, timeout=None)
+        catalog.update_from_disk(
+            _make_episode(workspace, "episode_3", size=2000)
+        )
+        with pytest.raises(RuntimeError, match="quota"):
+            trash.check_space()
+    finally:
+        trash.stop()
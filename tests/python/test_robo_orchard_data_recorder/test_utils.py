@@ -0,0 +1,98 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import json
+import os
+
+import pytest
+from robo_orchard_recorder_app.utils import (
+    check_episode,
+    find_mcap_files,
+    get_group_uris,
+)
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fw:
+        fw.write(b"\0")
+
+
+def _write_splits(uri, num_splits):
+    files = [
+        f"part_{idx:04d}/part_{idx:04d}_0.mcap" for idx in range(num_splits)
+    ]
+    for path in files:
+        _touch(os.path.join(uri, path))
+    splits = [
+        {"index": idx, "uri": os.path.dirname(path), "files": [path]}
+        for idx, path in enumerate(files)
+    ]
+    with open(os.path.join(uri, "splits.json"), "w") as fw:
+        json.dump({"splits": splits}, fw)
+    return [os.path.join(uri, f) for f in files]
+
+
+def test_find_files_of_plain_bag(tmp_path):
+    uri = str(tmp_path / "episode")
+    for idx in (1, 0):
+        _touch(os.path.join(uri, f"episode_{idx}.mcap"))
+    assert find_mcap_files(uri) == [
+        os.path.join(uri, f"episode_{idx}.mcap") for idx in (0, 1)
+    ]
+
+
+def test_find_files_of_split_bag(tmp_path):
+    uri = str(tmp_path / "episode")
+    files = _write_splits(uri, 3)
+    # the files are read from the manifest, not from the directory
+    _touch(os.path.join(uri, "stale", "stale_0.mcap"))
+    assert find_mcap_files(uri) == files
+
+
+def test_find_files_of_writer_groups(tmp_path):
+    uri = str(tmp_path / "episode")
+    _touch(os.path.join(uri, "episode_0.mcap"))
+    # a nested group and a group on another disk
+    nested_uri = os.path.join(uri, "joints")
+    nested_files = _write_splits(nested_uri, 2)
+    external_uri = str(tmp_path / "fast_disk" / "episode" / "cameras")
+    _touch(os.path.join(external_uri, "cameras_0.mcap"))
+    manifest = {
+        "finished": False,
+        "groups": [
+            {"name": "default", "uri": "."},
+            {"name": "joints", "uri": "joints"},
+            {"name": "cameras", "uri": external_uri},
+        ],
+    }
+    manifest_file = os.path.join(uri, "episode_manifest.json")
+    with open(manifest_file, "w") as fw:
+        json.dump(manifest, fw)
+
+    assert get_group_uris(uri) == [uri, nested_uri, external_uri]
+    # the files of the nested group are not listed twice
+    assert find_mcap_files(uri) == [
+        os.path.join(uri, "episode_0.mcap"),
+        *nested_files,
+        os.path.join(external_uri, "cameras_0.mcap"),
+    ]
+    with pytest.raises(RuntimeError, match="not closed"):
+        check_episode(uri)
+    manifest["finished"] = True
+    with open(manifest_file, "w") as fw:
+        json.dump(manifest, fw)
+    check_episode(uri)
@@ -0,0 +1,85 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+if importlib.util.find_spec("robo_orchard_data_ros2") is None:
+    # the ROS 2 package is built by colcon, import it from the source tree
+    sys.path.insert(
+        0,
+        os.path.join(
+            os.path.dirname(__file__),
+            "../../../ros2_package/robo_orchard_data_ros2",
+        ),
+    )
+
+TOPICS = ("/joint_states", "/camera/image")
+
+
+@pytest.fixture
+def mcap_topics():
+    """The topics of the files written by :func:`write_mcap`."""
+    return TOPICS
+
+
+@pytest.fixture
+def write_mcap(tmp_path):
+    """Writes an MCAP file with the reference writer of the `mcap` package.
+
+    The messages alternate between :data:`TOPICS`, with log times of
+    `index * 1000` and one-byte payloads of `index % 256` repeated 40
+    times, so that small chunks hold a few messages each.
+    """
+    mcap_writer = pytest.importorskip("mcap.writer")
+
+    def _write(
+        name: str = "episode_0.mcap",
+        num_messages: int = 60,
+        chunk_size: int = 512,
+        compression: str = "zstd",
+    ) -> str:
+        path = str(tmp_path / name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fw:
+            writer = mcap_writer.Writer(
+                fw,
+                chunk_size=chunk_size,
+                compression=mcap_writer.CompressionType[compression.upper()],
+            )
+            writer.start(profile="ros2", library="test")
+            schema_id = writer.register_schema(
+                "std_msgs/msg/String", "ros2msg", b"string data"
+            )
+            channel_ids = [
+                writer.register_channel(topic, "cdr", schema_id)
+                for topic in TOPICS
+            ]
+            for idx in range(num_messages):
+                writer.add_message(
+                    channel_ids[idx % len(TOPICS)],
+                    log_time=idx * 1000,
+                    data=bytes([idx % 256]) * 40,
+                    publish_time=idx * 1000,
+                    sequence=idx,
+                )
+            writer.finish()
+        return path
+
+    return _write
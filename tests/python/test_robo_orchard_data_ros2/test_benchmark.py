@@ -0,0 +1,80 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import os
+
+import pytest
+from robo_orchard_data_ros2.benchmark.config import (
+    BenchmarkConfig,
+    SyntheticPublisherConfig,
+    SyntheticTopicConfig,
+)
+
+EXAMPLE_CFG = os.path.join(
+    os.path.dirname(__file__),
+    "../../../example/benchmark/benchmark_cfg.json",
+)
+
+
+def test_topic_names():
+    single = SyntheticTopicConfig(name="/js", kind="joint_state", rate_hz=1)
+    assert single.topics == ["/js"]
+    group = SyntheticTopicConfig(
+        name="/cam", kind="compressed_image", rate_hz=1, count=3
+    )
+    assert group.topics == ["/cam_0", "/cam_1", "/cam_2"]
+    assert group.msg_type == "sensor_msgs/msg/CompressedImage"
+
+
+def test_publisher_topic_types():
+    assert SyntheticPublisherConfig().topic_types == {
+        "/camera/image_raw_0": "sensor_msgs/msg/Image",
+        "/camera/image_raw_1": "sensor_msgs/msg/Image",
+        "/joint_states": "sensor_msgs/msg/JointState",
+    }
+
+
+def test_example_config():
+    with open(EXAMPLE_CFG, "r") as fr:
+        config = BenchmarkConfig.model_validate_json(fr.read())
+    assert len(config.publisher.topic_types) == 7
+    assert [variant.name for variant in config.variants] == [
+        "default",
+        "raw_subscription",
+        "raw_4_writers_fastest_write",
+    ]
+    fastest = config.variants[-1].record_config
+    assert fastest.raw_subscription
+    assert fastest.num_writer_threads == 4
+
+
+def test_summarize():
+    pytest.importorskip("rosbag2_py")
+    from robo_orchard_data_ros2.benchmark.harness import _summarize
+
+    bag_stats = {
+        "/a": {"count": 8, "bytes": 800, "latency_ns": [1_000_000] * 8},
+        "/b": {"count": 0, "bytes": 0, "latency_ns": []},
+    }
+    summary = _summarize({"/a": 10, "/b": 0}, bag_stats, duration_sec=2.0)
+    assert summary["published"] == 10
+    assert summary["recorded"] == 8
+    assert summary["drop_rate"] == pytest.approx(0.2)
+    assert summary["throughput_msgs_per_sec"] == pytest.approx(4.0)
+    assert summary["latency_ms"]["max"] == pytest.approx(1.0)
+    assert summary["topics"]["/a"]["drop_rate"] == pytest.approx(0.2)
+    assert summary["topics"]["/b"]["drop_rate"] == 0.0
+    assert summary["topics"]["/b"]["latency_ms"]["max"] is None
@@ -0,0 +1,136 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import json
+import os
+
+import pytest
+
+rosbag2_py = pytest.importorskip("rosbag2_py")
+
+from mcap.reader import make_reader  # noqa: E402
+from robo_orchard_data_ros2.mcap.bag import BagWriter  # noqa: E402
+from robo_orchard_data_ros2.mcap.config import SplitConfig  # noqa: E402
+from robo_orchard_data_ros2.mcap.static import (  # noqa: E402
+    StaticMessageCache,
+)
+
+
+def _open(uri: str, **kwargs) -> BagWriter:
+    writer = BagWriter(uri, **kwargs)
+    for topic in ("/a", "/marker", "/tf_static"):
+        writer.create_topic(
+            rosbag2_py.TopicMetadata(
+                name=topic,
+                type="std_msgs/msg/String",
+                serialization_format="cdr",
+            )
+        )
+    return writer
+
+
+def _read_manifest(uri: str) -> dict:
+    with open(os.path.join(uri, BagWriter.MANIFEST_FILE), "r") as fr:
+        return json.load(fr)
+
+
+def test_split_by_size(tmp_path):
+    uri = str(tmp_path / "episode")
+    writer = _open(uri, split=SplitConfig(max_file_size=250))
+    for idx in range(10):
+        writer.write("/a", b"\0" * 100, idx * 1000)
+    writer.close()
+
+    splits = _read_manifest(uri)["splits"]
+    assert [s["message_count"] for s in splits] == [3, 3, 3, 1]
+    assert [s["uri"] for s in splits] == [
+        f"part_{idx:04d}" for idx in range(4)
+    ]
+    assert splits[1]["start_time_ns"] == 3000
+    assert splits[1]["end_time_ns"] == 5000
+    for split in splits:
+        assert split["files"]
+        for path in split["files"]:
+            assert os.path.exists(os.path.join(uri, path))
+
+
+def test_static_messages_in_every_split(tmp_path):
+    uri = str(tmp_path / "episode")
+    writer = _open(
+        uri,
+        split=SplitConfig(max_duration_sec=1.5e-6),
+        static_topics={"/tf_static"},
+    )
+    writer.write("/tf_static", b"tf", 0)
+    for idx in range(1, 4):
+        writer.write("/a", b"a", idx * 1000)
+    writer.close()
+
+    splits = _read_manifest(uri)["splits"]
+    # the static message is re-emitted at the head of every split, out
+    # of its time range
+    assert [s["message_count"] for s in splits] == [2, 3]
+    assert [s["start_time_ns"] for s in splits] == [0, 2000]
+    assert [s["end_time_ns"] for s in splits] == [1000, 3000]
+    for split in splits:
+        (path,) = split["files"]
+        with open(os.path.join(uri, path), "rb") as fp:
+            topics = [
+                channel.topic
+                for _, channel, _ in make_reader(fp).iter_messages()
+            ]
+        assert topics[0] == "/tf_static"
+
+
+def test_sync_cached_static_messages(tmp_path):
+    cache = StaticMessageCache()
+    writer = _open(
+        str(tmp_path / "bag"), static_topics={"/tf_static"}, static_cache=cache
+    )
+    # received while not recording
+    cache.add("/tf_static", b"tf", 0)
+    assert [msg.data for msg in writer.sync_static()] == [b"tf"]
+    assert writer.sync_static() == []
+    # written while recording, and cached for the next splits
+    writer.write("/tf_static", b"tf2", 5)
+    assert len(cache) == 2
+    assert writer.sync_static() == []
+    assert writer.current.message_count == 2
+    writer.close()
+
+
+def test_split_on_marker(tmp_path):
+    uri = str(tmp_path / "episode")
+    writer = _open(
+        uri,
+        split=SplitConfig(episode_marker_topic="/marker"),
+        marker_topic="/marker",
+    )
+    for idx, topic in enumerate(["/a", "/marker", "/a", "/a", "/marker"]):
+        writer.write(topic, b"x", idx)
+    writer.close()
+    splits = _read_manifest(uri)["splits"]
+    assert [s["message_count"] for s in splits] == [1, 3, 1]
+
+
+def test_no_split(tmp_path):
+    uri = str(tmp_path / "bag")
+    writer = _open(uri)
+    writer.write("/a", b"a", 0)
+    writer.close()
+    assert not os.path.exists(os.path.join(uri, BagWriter.MANIFEST_FILE))
+    assert len(writer.splits) == 1
+    assert writer.current.uri == uri
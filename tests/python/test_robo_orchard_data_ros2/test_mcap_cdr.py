@@ -0,0 +1,73 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import struct
+
+import pytest
+from robo_orchard_data_ros2.mcap.cdr import (
+    CDR_HEADER_SIZE,
+    find_header_field,
+    get_header_stamp_offset,
+    read_stamp_ns,
+)
+
+
+class _Stamped:
+    @classmethod
+    def get_fields_and_field_types(cls):
+        return {"header": "std_msgs/Header", "data": "string"}
+
+
+class _LateHeader:
+    @classmethod
+    def get_fields_and_field_types(cls):
+        return {"id": "int32", "header": "std_msgs/Header"}
+
+
+class _NoHeader:
+    @classmethod
+    def get_fields_and_field_types(cls):
+        return {"header": "string"}
+
+
+def test_header_stamp_offset():
+    assert find_header_field(_Stamped) == 0
+    assert get_header_stamp_offset(_Stamped) == CDR_HEADER_SIZE
+    # the offset of a later header depends on the preceding fields
+    assert find_header_field(_LateHeader) == 1
+    assert get_header_stamp_offset(_LateHeader) is None
+    assert find_header_field(_NoHeader) is None
+    assert find_header_field(object) is None
+
+
+@pytest.mark.parametrize(
+    "encapsulation, fmt", [(b"\x00\x01\x00\x00", "<iI"), (b"\x00\x00", ">iI")]
+)
+def test_read_stamp(encapsulation, fmt):
+    data = encapsulation.ljust(CDR_HEADER_SIZE, b"\x00") + struct.pack(
+        fmt, 12, 345
+    )
+    assert read_stamp_ns(data) == 12_000_000_345
+
+
+def test_read_stamp_of_serialized_message():
+    serialization = pytest.importorskip("rclpy.serialization")
+    std_msgs = pytest.importorskip("std_msgs.msg")
+    msg = std_msgs.Header(frame_id="base")
+    msg.stamp.sec = 7
+    msg.stamp.nanosec = 8
+    data = serialization.serialize_message(msg)
+    assert read_stamp_ns(data) == 7_000_000_008
@@ -0,0 +1,113 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import json
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip("rclpy")
+
+from robo_orchard_data_ros2.mcap.config import DiscoveryConfig  # noqa: E402
+from robo_orchard_data_ros2.mcap.discovery import (  # noqa: E402
+    TopicDiscovery,
+    get_message_class,
+    load_topic_manifest,
+)
+
+
+class _GraphNode:
+    """Stands in for the node whose graph is queried."""
+
+    def __init__(self):
+        self.topics = []
+
+    def create_subscription(self, *args, **kwargs):
+        return None
+
+    def create_timer(self, *args, **kwargs):
+        return None
+
+    def get_topic_names_and_types(self):
+        return list(self.topics)
+
+
+def test_manifest_precedence(tmp_path):
+    manifest_file = tmp_path / "topics.json"
+    manifest_file.write_text(
+        json.dumps({"/a": "std_msgs/msg/String", "/b": "std_msgs/msg/Int32"})
+    )
+    config = DiscoveryConfig(
+        manifest_file=str(manifest_file),
+        topic_types={"/b": "std_msgs/msg/Int64"},
+    )
+    assert load_topic_manifest(config) == {
+        "/a": "std_msgs/msg/String",
+        "/b": "std_msgs/msg/Int64",
+    }
+    assert load_topic_manifest(DiscoveryConfig()) == {}
+    with pytest.raises(FileNotFoundError):
+        load_topic_manifest(
+            DiscoveryConfig(manifest_file=str(tmp_path / "missing.json"))
+        )
+
+
+def test_message_class_is_cached():
+    assert get_message_class("collections/OrderedDict") is OrderedDict
+    hits = get_message_class.cache_info().hits
+    get_message_class("collections/OrderedDict")
+    assert get_message_class.cache_info().hits == hits + 1
+
+
+def test_scan_reports_new_topics():
+    node = _GraphNode()
+    found = []
+    discovery = TopicDiscovery(node, found.append)
+    discovery.add_known_topics(["/manifest"])
+    node.topics = [
+        ("/manifest", ["std_msgs/msg/String"]),
+        ("/a", ["std_msgs/msg/String"]),
+    ]
+    discovery.scan()
+    node.topics.append(("/b", ["std_msgs/msg/Int32"]))
+    discovery.scan()
+    discovery.scan()
+    assert found == [
+        [("/a", "std_msgs/msg/String")],
+        [("/b", "std_msgs/msg/Int32")],
+    ]
+
+
+def test_graph_change_triggers_scans():
+    node = _GraphNode()
+    discovery = TopicDiscovery(
+        node,
+        lambda topics: None,
+        DiscoveryConfig(
+            fallback_period_sec=3600,
+            settle_time_sec=3600,
+            min_scan_interval_sec=0,
+        ),
+    )
+    discovery.scan()
+    assert discovery.scan_count == 1
+    # no scan before the fallback period without a graph change
+    discovery._on_timer()
+    assert discovery.scan_count == 1
+    discovery.notify()
+    discovery._on_timer()
+    discovery._on_timer()
+    assert discovery.scan_count == 3
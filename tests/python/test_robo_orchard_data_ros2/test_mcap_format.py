@@ -0,0 +1,119 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import os
+
+import pytest
+from robo_orchard_data_ros2.mcap.format import (
+    MAGIC,
+    Channel,
+    Chunk,
+    ChunkIndex,
+    McapFormatError,
+    Message,
+    MessageIndex,
+    Opcode,
+    Schema,
+    encode_record,
+    iter_chunk_records,
+    read_record_headers,
+)
+
+
+def _read_records(path):
+    with open(path, "rb") as fp:
+        assert fp.read(len(MAGIC)) == MAGIC
+        for header in read_record_headers(fp, os.path.getsize(path)):
+            fp.seek(header.offset)
+            yield header, fp.read(header.end - header.offset)
+
+
+@pytest.mark.parametrize("compression", ["none", "lz4", "zstd"])
+def test_read_chunked_messages(write_mcap, compression, mcap_topics):
+    path = write_mcap(compression=compression)
+    schemas, channels, messages = dict(), dict(), []
+    opcodes = []
+    for header, raw in _read_records(path):
+        opcodes.append(header.opcode)
+        if header.opcode != Opcode.CHUNK:
+            continue
+        data = Chunk.parse(raw[9:]).decompress()
+        for _, opcode, record in iter_chunk_records(data):
+            if opcode == Opcode.SCHEMA:
+                schema = Schema.parse(record)
+                schemas[schema.id] = schema
+            elif opcode == Opcode.CHANNEL:
+                channel = Channel.parse(record)
+                channels[channel.id] = channel
+            elif opcode == Opcode.MESSAGE:
+                messages.append(Message.parse(record))
+
+    assert opcodes[-1] == Opcode.FOOTER
+    assert Opcode.DATA_END in opcodes
+    assert Opcode.MESSAGE_INDEX in opcodes
+    assert opcodes.count(Opcode.CHUNK) > 1
+    assert [s.name for s in schemas.values()] == ["std_msgs/msg/String"]
+    assert sorted(c.topic for c in channels.values()) == sorted(mcap_topics)
+    assert len(messages) == 60
+    for idx, msg in enumerate(messages):
+        assert (
+            channels[msg.channel_id].topic
+            == mcap_topics[idx % len(mcap_topics)]
+        )
+        assert msg.sequence == idx
+        assert msg.log_time == msg.publish_time == idx * 1000
+        assert bytes(msg.data) == bytes([idx]) * 40
+
+
+def test_index_records_round_trip(write_mcap):
+    path = write_mcap()
+    num_message_indexes = num_chunk_indexes = 0
+    for header, raw in _read_records(path):
+        if header.opcode == Opcode.MESSAGE_INDEX:
+            assert encode_record(MessageIndex.parse(raw[9:])) == raw
+            num_message_indexes += 1
+        elif header.opcode == Opcode.CHUNK_INDEX:
+            assert encode_record(ChunkIndex.parse(raw[9:])) == raw
+            num_chunk_indexes += 1
+    assert num_message_indexes > 0
+    assert num_chunk_indexes > 0
+
+
+def test_schema_and_channel_round_trip(write_mcap):
+    path = write_mcap(compression="none")
+    for header, raw in _read_records(path):
+        if header.opcode == Opcode.SCHEMA:
+            assert encode_record(Schema.parse(raw[9:])) == raw
+        elif header.opcode == Opcode.CHANNEL:
+            assert encode_record(Channel.parse(raw[9:])) == raw
+
+
+def test_corrupted_chunk_raises(write_mcap):
+    path = write_mcap(compression="none")
+    for header, raw in _read_records(path):
+        if header.opcode == Opcode.CHUNK:
+            chunk = Chunk.parse(raw[9:])
+            break
+    records = bytearray(chunk.records)
+    records[-1] ^= 0xFF
+    with pytest.raises(McapFormatError):
+        chunk._replace(records=memoryview(bytes(records))).decompress()
+
+
+def test_truncated_chunk_records_raise():
+    record = encode_record(MessageIndex(channel_id=1, records=[(1, 2)]))
+    with pytest.raises(McapFormatError):
+        list(iter_chunk_records(record[:-1]))
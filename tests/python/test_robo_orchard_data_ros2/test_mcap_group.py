@@ -0,0 +1,100 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import json
+import os
+
+import pytest
+
+rosbag2_py = pytest.importorskip("rosbag2_py")
+
+from robo_orchard_data_ros2.mcap.bag import BagWriter  # noqa: E402
+from robo_orchard_data_ros2.mcap.group import (  # noqa: E402
+    DEFAULT_GROUP,
+    WriterGroup,
+    get_group_uri,
+    write_episode_manifest,
+)
+from robo_orchard_data_ros2.mcap.recovery import (  # noqa: E402
+    EPISODE_MANIFEST_FILE,
+    get_group_roots,
+)
+
+
+def _make_group(name: str, uri: str, topic: str) -> WriterGroup:
+    # the test writes into the bags directly
+    group = WriterGroup(name, BagWriter(uri), lambda group, request: None)
+    group.bag_writer.create_topic(
+        rosbag2_py.TopicMetadata(
+            name=topic,
+            type="std_msgs/msg/String",
+            serialization_format="cdr",
+        )
+    )
+    group.topics.append(topic)
+    return group
+
+
+def test_group_uri(tmp_path):
+    uri = str(tmp_path / "episode")
+    assert get_group_uri(uri, "cameras", None) == os.path.join(uri, "cameras")
+    assert get_group_uri(uri + "/", "cameras", "/fast") == os.path.join(
+        "/fast", "episode", "cameras"
+    )
+
+
+def test_episode_manifest(tmp_path):
+    uri = str(tmp_path / "episode")
+    external_uri = get_group_uri(uri, "cameras", str(tmp_path / "fast"))
+    groups = [
+        _make_group(DEFAULT_GROUP, uri, "/joints"),
+        _make_group("tactile", get_group_uri(uri, "tactile", None), "/t"),
+        _make_group("cameras", external_uri, "/image"),
+    ]
+    for idx, group in enumerate(groups):
+        group.bag_writer.write(group.topics[0], b"\0", idx * 1000)
+    write_episode_manifest(uri, groups, start_time_ns=0)
+    with open(os.path.join(uri, EPISODE_MANIFEST_FILE), "r") as fr:
+        manifest = json.load(fr)
+    assert not manifest["finished"]
+
+    for group in groups:
+        group.stage.close()
+        group.bag_writer.close()
+    write_episode_manifest(
+        uri, groups, start_time_ns=0, end_time_ns=2000, finished=True
+    )
+    with open(os.path.join(uri, EPISODE_MANIFEST_FILE), "r") as fr:
+        manifest = json.load(fr)
+    assert manifest["finished"]
+    assert manifest["end_time_ns"] == 2000
+    # nested groups are relative to the episode, others are absolute
+    assert [g["uri"] for g in manifest["groups"]] == [
+        ".",
+        "tactile",
+        os.path.abspath(external_uri),
+    ]
+    assert [g["topics"] for g in manifest["groups"]] == [
+        ["/joints"],
+        ["/t"],
+        ["/image"],
+    ]
+    assert [g["message_count"] for g in manifest["groups"]] == [1, 1, 1]
+    assert get_group_roots(uri) == [
+        uri,
+        os.path.join(uri, "tactile"),
+        external_uri,
+    ]
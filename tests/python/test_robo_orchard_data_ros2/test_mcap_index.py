@@ -0,0 +1,98 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import io
+import os
+
+import pytest
+from robo_orchard_data_ros2.mcap.index import SidecarIndex, build_index
+from robo_orchard_data_ros2.mcap.recovery import recover_mcap
+
+mcap_reader = pytest.importorskip("mcap.reader")
+
+
+def _read_topics(path: str):
+    with open(path, "rb") as f:
+        reader = mcap_reader.make_reader(io.BytesIO(f.read()))
+        messages = dict()
+        for _, channel, msg in reader.iter_messages():
+            messages.setdefault(channel.topic, []).append(
+                (msg.log_time, msg.data)
+            )
+    return messages
+
+
+def _check_index(path: str, expected):
+    index = SidecarIndex(path)
+    try:
+        assert not index.is_stale
+        assert set(index.topics) == set(expected)
+        for topic, messages in expected.items():
+            assert index.topics[topic]["message_count"] == len(messages)
+            assert index.get(topic)["log_time"].tolist() == [
+                t for t, _ in messages
+            ]
+            for idx, message in enumerate(messages):
+                assert index.read_message(topic, idx) == message
+    finally:
+        index.close()
+
+
+@pytest.mark.parametrize("compression", ["none", "zstd"])
+def test_build_from_summary(write_mcap, compression):
+    path = write_mcap(compression=compression)
+    assert build_index(path) is not None
+    _check_index(path, _read_topics(path))
+    # up to date
+    assert build_index(path) is None
+
+
+def test_build_from_scan_and_recovered(write_mcap, tmp_path):
+    src = write_mcap()
+    path = str(tmp_path / "cut.mcap")
+    with open(src, "rb") as fr, open(path, "wb") as fw:
+        fw.write(fr.read(os.path.getsize(src) * 2 // 3))
+
+    # no summary: the file is scanned
+    build_index(path)
+    index = SidecarIndex(path)
+    scanned = {topic: index.get(topic).copy() for topic in index.topics}
+    index.close()
+
+    recover_mcap(path)
+    assert SidecarIndex(path).is_stale
+    build_index(path)
+    expected = _read_topics(path)
+    _check_index(path, expected)
+    for topic, messages in expected.items():
+        assert scanned[topic]["log_time"].tolist() == [t for t, _ in messages]
+
+
+def test_find(write_mcap, mcap_topics):
+    path = write_mcap()
+    build_index(path)
+    index = SidecarIndex(path)
+    # the messages of the first topic are logged at 0, 2000, 4000, ...
+    topic = mcap_topics[0]
+    assert index.find(topic, 2000) == 1
+    assert index.find(topic, 2900) == 1
+    assert index.find(topic, 3100) == 2
+    assert index.find(topic, 2900, side="after") == 2
+    assert index.find(topic, 3100, side="before") == 1
+    assert index.find(topic, -1, side="before") is None
+    assert index.find(topic, 10**9, side="after") is None
+    assert index.find(topic, 10**9) == 29
+    index.close()
@@ -0,0 +1,113 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import urllib.error
+import urllib.request
+
+import pytest
+from robo_orchard_data_ros2.mcap.metrics import (
+    LatencyHistogram,
+    MetricsServer,
+    RecorderMetrics,
+    render_prometheus,
+)
+
+
+def test_histogram_quantile():
+    hist = LatencyHistogram([0.5, 0.1, 0.2])
+    assert hist.bounds == [0.1, 0.2, 0.5]
+    assert hist.quantile(0.5) is None
+    for value in (0.05, 0.05, 0.15, 0.15):
+        hist.observe(value)
+    assert hist.counts == [2, 2, 0, 0]
+    assert hist.quantile(0.5) == pytest.approx(0.1)
+    assert hist.quantile(0.75) == pytest.approx(0.15)
+    # values above the last bound are reported as the last bound
+    for _ in range(4):
+        hist.observe(1.0)
+    assert hist.quantile(1.0) == pytest.approx(0.5)
+
+
+def test_snapshot_is_a_copy():
+    metrics = RecorderMetrics([0.1])
+    metrics.add_topic("/idle")
+    metrics.on_receive("/a")
+    metrics.on_write("/a", 10, latency=0.05)
+    metrics.on_write("/a", 20)
+    metrics.on_reject("/a", "throttled")
+    snapshot = metrics.snapshot()
+    metrics.on_write("/a", 30, latency=0.05)
+
+    assert sorted(snapshot) == ["/a", "/idle"]
+    topic = snapshot["/a"]
+    assert (topic.received, topic.written, topic.bytes) == (1, 2, 30)
+    assert topic.rejected == {"throttled": 1}
+    assert topic.latency.count == 1
+    assert topic.last_receive_time is not None
+    assert snapshot["/idle"].written == 0
+
+
+def test_render_prometheus():
+    metrics = RecorderMetrics([0.1, 0.2])
+    metrics.on_receive('/a"b')
+    metrics.on_write('/a"b', 10, latency=0.15)
+    metrics.on_reject('/a"b', "throttled")
+    text = render_prometheus(
+        metrics.snapshot(),
+        dropped={'/a"b': 3},
+        late={},
+        gauges={"queue_depth": 5},
+    )
+    lines = text.splitlines()
+    assert "# TYPE mcap_recorder_messages_written_total counter" in lines
+    assert 'mcap_recorder_messages_written_total{topic="/a\\"b"} 1' in lines
+    assert (
+        'mcap_recorder_messages_dropped_total{topic="/a\\"b",'
+        'reason="queue_full"} 3'
+    ) in lines
+    assert (
+        'mcap_recorder_messages_dropped_total{topic="/a\\"b",'
+        'reason="throttled"} 1'
+    ) in lines
+    assert 'mcap_recorder_messages_late_total{topic="/a\\"b"} 0' in lines
+    # the buckets are cumulative
+    assert (
+        'mcap_recorder_write_latency_seconds_bucket{topic="/a\\"b",le="0.1"} 0'
+    ) in lines
+    assert (
+        'mcap_recorder_write_latency_seconds_bucket{topic="/a\\"b",le="0.2"} 1'
+    ) in lines
+    assert (
+        'mcap_recorder_write_latency_seconds_bucket{topic="/a\\"b",'
+        'le="+Inf"} 1'
+    ) in lines
+    assert "mcap_recorder_queue_depth 5" in lines
+    assert text.endswith("\n")
+
+
+def test_metrics_server():
+    server = MetricsServer("127.0.0.1", 0, lambda: "metric 1\n")
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(url + "/metrics?x=1", timeout=5) as rsp:
+            assert rsp.status == 200
+            assert rsp.headers["Content-Type"] == MetricsServer.CONTENT_TYPE
+            assert rsp.read() == b"metric 1\n"
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            urllib.request.urlopen(url + "/other", timeout=5)
+        assert exc_info.value.code == 404
+    finally:
+        server.close()
@@ -0,0 +1,106 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import numpy as np
+import pytest
+from robo_orchard_data_ros2.mcap.monitor import FrameRateMonitor
+
+MS = 1_000_000
+
+
+def _feed(monitor: FrameRateMonitor, intervals_ns) -> int:
+    timestamp = 0
+    monitor.update(timestamp)
+    for interval in intervals_ns:
+        timestamp += int(interval)
+        monitor.update(timestamp)
+    return timestamp
+
+
+def test_window_size_check():
+    with pytest.raises(ValueError):
+        FrameRateMonitor(window_size=1)
+
+
+def test_empty_stats():
+    monitor = FrameRateMonitor()
+    assert len(monitor) == 0
+    assert monitor.get_fps() == 0.0
+    assert monitor.get_stats().num_intervals == 0
+    monitor.update(0)
+    assert len(monitor) == 1
+    assert monitor.get_stats().num_intervals == 0
+
+
+def test_rate_and_jitter():
+    monitor = FrameRateMonitor(window_size=100)
+    # alternate 10 ms and 30 ms, i.e. 20 ms on average
+    intervals = [10 * MS, 30 * MS] * 100
+    last = _feed(monitor, intervals)
+    stats = monitor.get_stats(last)
+    assert len(monitor) == 100
+    assert stats.num_intervals == 99
+    assert stats.rate_hz == pytest.approx(1e9 / np.mean(intervals[-99:]))
+    assert stats.jitter_ms == pytest.approx(np.std(intervals[-99:]) / MS)
+
+
+def test_max_gap_leaves_the_window():
+    monitor = FrameRateMonitor(window_size=11)
+    timestamp = _feed(monitor, [10 * MS] * 5 + [500 * MS] + [10 * MS] * 5)
+    assert monitor.get_stats().max_gap_ms == pytest.approx(500)
+    # the gap slides out of the window of 10 intervals
+    for _ in range(4):
+        timestamp += 20 * MS
+        monitor.update(timestamp)
+        assert monitor.get_stats().max_gap_ms == pytest.approx(500)
+    timestamp += 20 * MS
+    monitor.update(timestamp)
+    assert monitor.get_stats().max_gap_ms == pytest.approx(20)
+
+
+def test_percentiles():
+    rng = np.random.default_rng(0)
+    intervals = rng.lognormal(np.log(33 * MS), 0.3, size=5000)
+    monitor = FrameRateMonitor(window_size=5001)
+    _feed(monitor, intervals)
+    stats = monitor.get_stats()
+    # integer nanoseconds, as stored by the monitor
+    intervals = intervals.astype(np.int64)
+    assert stats.p50_interval_ms == pytest.approx(
+        np.percentile(intervals, 50) / MS, rel=0.02
+    )
+    assert stats.p99_interval_ms == pytest.approx(
+        np.percentile(intervals, 99) / MS, rel=0.02
+    )
+    assert stats.max_gap_ms == pytest.approx(intervals.max() / MS)
+
+
+def test_out_of_order_timestamps():
+    monitor = FrameRateMonitor()
+    for timestamp in (0, 10 * MS, 5 * MS, 20 * MS):
+        monitor.update(timestamp)
+    stats = monitor.get_stats()
+    # the late frame is a zero interval, the next one follows the latest
+    assert stats.num_intervals == 3
+    assert stats.max_gap_ms == pytest.approx(10)
+
+
+def test_timeout():
+    monitor = FrameRateMonitor(timeout_threshold=1e9)
+    last = _feed(monitor, [10 * MS] * 10)
+    assert monitor.get_fps(last + int(0.5e9)) == pytest.approx(100)
+    assert monitor.get_fps(last + int(2e9)) == 0.0
+    assert monitor.get_stats(last + int(2e9)).rate_hz == 0.0
@@ -0,0 +1,190 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import glob
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+rclpy = pytest.importorskip("rclpy")
+pytest.importorskip("rosbag2_py")
+
+from mcap.reader import make_reader  # noqa: E402
+from rclpy.serialization import serialize_message  # noqa: E402
+from robo_orchard_data_ros2.mcap.node import (  # noqa: E402
+    McapRecorder,
+    RecorderState,
+)
+from std_msgs.msg import String  # noqa: E402
+from std_srvs.srv import Trigger  # noqa: E402
+
+TOPIC = "/chatter"
+STATIC_TOPIC = "/tf_static"
+
+
+@pytest.fixture
+def make_recorder(tmp_path):
+    nodes = []
+
+    def _make(config=None, **params) -> McapRecorder:
+        config_file = tmp_path / "record_config.json"
+        config_file.write_text(
+            json.dumps(
+                {
+                    "no_discovery": True,
+                    "raw_subscription": True,
+                    **(config or {}),
+                }
+            )
+        )
+        args = ["--ros-args", "-p", f"config_file:={config_file}"]
+        for key, value in params.items():
+            args += ["-p", f"{key}:={value}"]
+        rclpy.init(args=args)
+        node = McapRecorder()
+        node._subscribe_topic(TOPIC, String, "std_msgs/msg/String")
+        nodes.append(node)
+        return node
+
+    yield _make
+    for node in nodes:
+        node.destroy_node()
+        rclpy.shutdown()
+
+
+def publish(
+    node: McapRecorder, num_messages: int, first: int = 0, topic=TOPIC
+):
+    for idx in range(first, first + num_messages):
+        node._message_callback(
+            serialize_message(String(data=str(idx))),
+            src_topic=topic,
+            dst_topic=topic,
+            spec=node.get_topic_spec(topic),
+        )
+
+
+def count_messages(uri: str) -> Counter:
+    counts = Counter()
+    for path in glob.glob(os.path.join(uri, "**", "*.mcap"), recursive=True):
+        with open(path, "rb") as fp:
+            for _, channel, _ in make_reader(fp).iter_messages():
+                counts[channel.topic] += 1
+    return counts
+
+
+def test_state_machine(make_recorder, tmp_path):
+    uri = str(tmp_path / "episode")
+    node = make_recorder({"auto_start": False}, uri=uri)
+    assert node.state is RecorderState.ARMED
+    publish(node, 2)
+
+    assert node.start()
+    assert not node.start()
+    assert node.state is RecorderState.RECORDING
+    assert os.path.exists(node.recording_flag)
+    publish(node, 3)
+
+    assert node.pause()
+    assert not node.pause()
+    publish(node, 4)
+    assert node.resume()
+    publish(node, 1)
+
+    assert node.stop()
+    assert not node.stop()
+    assert node.state is RecorderState.FINALIZING
+    assert not os.path.exists(node.recording_flag)
+    # nothing is recorded while armed or paused
+    assert count_messages(uri)[TOPIC] == 4
+
+
+def read_messages(uri: str) -> list:
+    """Reads the message payloads in file order."""
+    (path,) = glob.glob(os.path.join(uri, "*.mcap"))
+    with open(path, "rb") as fp:
+        return [
+            message.data
+            for _, _, message in make_reader(fp).iter_messages(
+                log_time_order=False
+            )
+        ]
+
+
+def test_preroll_is_written_first(make_recorder, tmp_path, monkeypatch):
+    uri = str(tmp_path / "episode")
+    node = make_recorder(
+        {"auto_start": False, "preroll": {"duration_sec": 60}}, uri=uri
+    )
+    publish(node, 3)
+    flush_preroll = node._flush_preroll
+
+    def _slow_flush_preroll(entries):
+        time.sleep(0.2)
+        flush_preroll(entries)
+
+    monkeypatch.setattr(node, "_flush_preroll", _slow_flush_preroll)
+    thread = threading.Thread(target=node.start)
+    thread.start()
+    while node.state is not RecorderState.RECORDING:
+        time.sleep(1e-3)
+    # a live message waits for the pre-roll to be flushed
+    publish(node, 1, first=3)
+    thread.join()
+    assert node.stop()
+    expected = [serialize_message(String(data=str(i))) for i in range(4)]
+    assert read_messages(uri) == expected
+
+
+def test_control_services(make_recorder, tmp_path):
+    node = make_recorder({"auto_start": False}, uri=str(tmp_path / "episode"))
+    response = node._pause_service(Trigger.Request(), Trigger.Response())
+    assert not response.success
+    assert "armed" in response.message
+
+    response = node._start_service(Trigger.Request(), Trigger.Response())
+    assert response.success
+    assert json.loads(response.message)["state"] == "recording"
+    response = node._stop_service(Trigger.Request(), Trigger.Response())
+    assert response.success
+    assert node.state is RecorderState.FINALIZING
+
+
+def test_daemon_episodes(make_recorder, tmp_path):
+    node = make_recorder({"static_topics": [STATIC_TOPIC]}, daemon=True)
+    node._subscribe_topic(STATIC_TOPIC, String, "std_msgs/msg/String")
+    assert node.state is RecorderState.ARMED
+    # received once while armed, like a transient local publisher
+    publish(node, 1, topic=STATIC_TOPIC)
+
+    uris = [str(tmp_path / f"episode_{idx}") for idx in range(2)]
+    for idx, uri in enumerate(uris):
+        assert node.start_episode(uri)
+        assert not node.start_episode(uri)
+        publish(node, idx + 1)
+        assert node.stop_episode()
+        assert not node.stop_episode()
+        assert node.state is RecorderState.ARMED
+    # the static message is written into every episode
+    for idx, uri in enumerate(uris):
+        assert count_messages(uri) == {STATIC_TOPIC: 1, TOPIC: idx + 1}
+    with pytest.raises(RuntimeError):
+        node.start_episode(uris[0])
+    assert node.state is RecorderState.ARMED
@@ -0,0 +1,64 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from robo_orchard_data_ros2.mcap.preroll import PrerollBuffer, PrerollEntry
+
+
+def _entry(receive_time_ns: int, nbytes: int = 10) -> PrerollEntry:
+    return PrerollEntry("/a", None, receive_time_ns, receive_time_ns, nbytes)
+
+
+def test_closed_until_opened():
+    buffer = PrerollBuffer(window_ns=None, max_bytes=100)
+    assert buffer.closed
+    assert not buffer.push(_entry(0))
+    buffer.open()
+    assert buffer.push(_entry(0))
+    assert buffer.drain(0) == [_entry(0)]
+    # closed by the drain, the next message is written directly
+    assert buffer.closed
+    assert not buffer.push(_entry(1))
+
+
+def test_evicts_older_than_window():
+    buffer = PrerollBuffer(window_ns=100, max_bytes=1000)
+    buffer.open()
+    for t in range(0, 300, 50):
+        buffer.push(_entry(t))
+    assert [e.timestamp for e in buffer.drain(300)] == [200, 250]
+    assert buffer.evicted == 4
+    assert buffer.nbytes == 0
+
+
+def test_evicts_over_budget():
+    buffer = PrerollBuffer(window_ns=None, max_bytes=25)
+    buffer.open()
+    for t in range(5):
+        buffer.push(_entry(t))
+    stats = buffer.get_stats()
+    assert stats["depth"] == 2
+    assert stats["bytes"] == 20
+    assert stats["evicted"] == 3
+    assert [e.timestamp for e in buffer.drain(5)] == [3, 4]
+
+
+def test_open_discards_previous_content():
+    buffer = PrerollBuffer(window_ns=None, max_bytes=100)
+    buffer.open()
+    buffer.push(_entry(0))
+    buffer.open()
+    assert len(buffer) == 0
+    assert buffer.nbytes == 0
@@ -0,0 +1,200 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import io
+import os
+
+import pytest
+from robo_orchard_data_ros2.mcap.format import (
+    MAGIC,
+    Opcode,
+    read_record_headers,
+)
+from robo_orchard_data_ros2.mcap.recovery import (
+    RECORDING_FILE,
+    recover_episode,
+    recover_mcap,
+)
+
+mcap_reader = pytest.importorskip("mcap.reader")
+mcap_records = pytest.importorskip("mcap.records")
+mcap_stream_reader = pytest.importorskip("mcap.stream_reader")
+
+
+def _truncate(src: str, dst: str, size: int) -> str:
+    with open(src, "rb") as fr, open(dst, "wb") as fw:
+        fw.write(fr.read(size))
+    return dst
+
+
+def _cut_offsets(path: str):
+    """Offsets cutting the last chunk, its message indexes and the tail."""
+    with open(path, "rb") as fp:
+        headers = list(read_record_headers(fp, os.path.getsize(path)))
+    chunks = [h for h in headers if h.opcode == Opcode.CHUNK]
+    last = chunks[-1]
+    indexes = [
+        h
+        for h in headers
+        if h.opcode == Opcode.MESSAGE_INDEX and h.offset >= last.end
+    ]
+    data_end = next(h for h in headers if h.opcode == Opcode.DATA_END)
+    return {
+        "magic": len(MAGIC),
+        "in_first_chunk": chunks[0].offset + chunks[0].length // 2,
+        "in_last_chunk": last.offset + last.length // 2,
+        "after_last_chunk": last.end,
+        "in_message_index": indexes[0].offset + 5,
+        "between_message_indexes": indexes[0].end,
+        "before_data_end": data_end.offset,
+        "in_summary": data_end.end + 20,
+    }
+
+
+def _read_back(path: str):
+    """Reads a file with the reference reader through its summary."""
+    with open(path, "rb") as f:
+        data = f.read()
+    reader = mcap_reader.make_reader(io.BytesIO(data))
+    summary = reader.get_summary()
+    assert summary is not None
+    messages = [
+        (channel.topic, msg.log_time, msg.data)
+        for _, channel, msg in reader.iter_messages(log_time_order=False)
+    ]
+    return data, summary, messages
+
+
+def _check_message_indexes(data: bytes, summary):
+    """Checks that each chunk index points at its message indexes."""
+    count = 0
+    for chunk_index in summary.chunk_indexes:
+        assert chunk_index.message_index_offsets
+        length = 0
+        for channel_id, offset in chunk_index.message_index_offsets.items():
+            record = next(
+                iter(
+                    mcap_stream_reader.StreamReader(
+                        io.BytesIO(data[offset:]), skip_magic=True
+                    ).records
+                )
+            )
+            assert isinstance(record, mcap_records.MessageIndex)
+            assert record.channel_id == channel_id
+            count += len(record.records)
+            length += 9 + 2 + 4 + 16 * len(record.records)
+        assert length == chunk_index.message_index_length
+    return count
+
+
+def test_complete_file_untouched(write_mcap):
+    path = write_mcap()
+    with open(path, "rb") as f:
+        before = f.read()
+    result = recover_mcap(path)
+    assert result.status == "complete"
+    assert result.truncated_bytes == 0
+    assert result.message_count == 60
+    with open(path, "rb") as f:
+        assert f.read() == before
+
+
+@pytest.mark.parametrize("compression", ["none", "lz4", "zstd"])
+@pytest.mark.parametrize(
+    "cut",
+    [
+        "magic",
+        "in_first_chunk",
+        "in_last_chunk",
+        "after_last_chunk",
+        "in_message_index",
+        "between_message_indexes",
+        "before_data_end",
+        "in_summary",
+    ],
+)
+def test_recover_truncated(write_mcap, tmp_path, compression, cut):
+    src = write_mcap(compression=compression)
+    _, _, expected = _read_back(src)
+    path = _truncate(src, str(tmp_path / "cut.mcap"), _cut_offsets(src)[cut])
+
+    result = recover_mcap(path)
+    assert result.status == "recovered"
+    assert os.path.getsize(path) == result.recovered_size
+    data, summary, messages = _read_back(path)
+    # the complete chunks are kept, in order
+    assert messages == expected[: len(messages)]
+    assert len(messages) == result.message_count
+    assert summary.statistics.message_count == result.message_count
+    assert len(summary.chunk_indexes) == result.chunk_count
+    assert _check_message_indexes(data, summary) == result.message_count
+    if cut in ("after_last_chunk", "in_message_index", "before_data_end"):
+        assert len(messages) == len(expected)
+
+    # the repaired file is complete
+    assert recover_mcap(path).status == "complete"
+
+
+def test_recover_every_offset(write_mcap, tmp_path):
+    src = write_mcap(num_messages=20, chunk_size=256)
+    size = os.path.getsize(src)
+    previous = 0
+    for offset in range(len(MAGIC), size, 13):
+        path = _truncate(src, str(tmp_path / f"{offset}.mcap"), offset)
+        result = recover_mcap(path)
+        assert result.status in ("recovered", "complete")
+        data, summary, messages = _read_back(path)
+        assert len(messages) == result.message_count >= previous
+        assert _check_message_indexes(data, summary) == len(messages)
+        previous = len(messages)
+    assert previous == 20
+
+
+def test_dry_run(write_mcap, tmp_path):
+    src = write_mcap()
+    path = _truncate(
+        src, str(tmp_path / "cut.mcap"), os.path.getsize(src) // 2
+    )
+    with open(path, "rb") as f:
+        before = f.read()
+    result = recover_mcap(path, dry_run=True)
+    assert result.status == "recovered"
+    assert result.truncated_bytes > 0
+    with open(path, "rb") as f:
+        assert f.read() == before
+
+
+def test_missing_magic(tmp_path):
+    path = str(tmp_path / "empty.mcap")
+    with open(path, "wb") as fw:
+        fw.write(b"not an mcap file")
+    assert recover_mcap(path).status == "unrecoverable"
+
+
+def test_recover_episode(write_mcap, tmp_path):
+    src = write_mcap()
+    root = tmp_path / "episode"
+    root.mkdir()
+    _truncate(src, str(root / "episode_0.mcap"), os.path.getsize(src) // 2)
+    (root / RECORDING_FILE).write_text("")
+
+    bags = recover_episode(str(root))
+    (result,) = bags[str(root)]
+    assert result.status == "recovered"
+    assert not (root / RECORDING_FILE).exists()
+    metadata = (root / "metadata.yaml").read_text()
+    assert f"message_count: {result.message_count}" in metadata
+    assert '"episode_0.mcap"' in metadata
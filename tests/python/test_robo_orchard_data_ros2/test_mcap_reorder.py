@@ -0,0 +1,68 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import random
+
+import pytest
+from robo_orchard_data_ros2.mcap.reorder import ReorderBuffer
+
+
+def test_emits_in_timestamp_order():
+    buffer = ReorderBuffer(window_ns=100)
+    timestamps = list(range(0, 10000, 10))
+    # arrivals jitter by less than the window
+    arrivals = sorted(timestamps, key=lambda t: t + random.randint(0, 90))
+    released = []
+    for timestamp in arrivals:
+        for _, item, t in buffer.push("/a", timestamp, timestamp):
+            assert item == t
+            released.append(t)
+        assert len(buffer) <= 20
+    released += [t for _, _, t in buffer.drain()]
+    assert released == timestamps
+    assert not buffer.late
+    assert len(buffer) == 0
+
+
+def test_release_after_window():
+    buffer = ReorderBuffer(window_ns=100)
+    assert buffer.push("/a", "x", 1000) == []
+    assert buffer.push("/b", "y", 1050) == []
+    assert buffer.push("/a", "z", 1100) == [("/a", "x", 1000)]
+    assert buffer.peak_depth == 3
+    assert buffer.drain() == [("/b", "y", 1050), ("/a", "z", 1100)]
+
+
+def test_equal_timestamps_keep_arrival_order():
+    buffer = ReorderBuffer(window_ns=10)
+    buffer.push("/a", 1, 5)
+    buffer.push("/b", 2, 5)
+    released = buffer.push("/a", 3, 15)
+    assert [item for _, item, _ in released] == [1, 2]
+
+
+def test_late_messages_are_emitted():
+    buffer = ReorderBuffer(window_ns=10)
+    buffer.push("/a", None, 100)
+    assert buffer.push("/a", None, 200) == [("/a", None, 100)]
+    # behind the last emitted message
+    assert buffer.push("/b", "late", 50) == [("/b", "late", 50)]
+    assert buffer.late == {"/b": 1}
+
+
+def test_negative_window():
+    with pytest.raises(ValueError):
+        ReorderBuffer(window_ns=-1)
@@ -0,0 +1,43 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+from robo_orchard_data_ros2.mcap.static import StaticMessageCache
+
+
+def test_deduplicates_content():
+    cache = StaticMessageCache()
+    key = cache.add("/tf_static", b"tf", 10)
+    # the same content keeps the first timestamp
+    assert cache.add("/tf_static", b"tf", 20) == key
+    assert cache.add("/robot_description", b"tf", 30) != key
+    assert cache.add("/tf_static", b"tf2", 40) is not None
+    assert len(cache) == 3
+    assert cache.nbytes == 7
+    assert [msg.timestamp for _, msg in cache.items()] == [10, 30, 40]
+
+
+def test_byte_budget():
+    cache = StaticMessageCache(max_bytes=10)
+    cache.add("/a", b"\0" * 4, 0)
+    cache.add("/b", b"\0" * 4, 1)
+    # the oldest message is evicted to make room
+    cache.add("/c", b"\0" * 4, 2)
+    assert [msg.topic for _, msg in cache.items()] == ["/b", "/c"]
+    assert cache.nbytes == 8
+    # a message larger than the budget is rejected
+    assert cache.add("/d", b"\0" * 11, 3) is None
+    assert cache.evicted == 2
+    assert len(cache) == 2
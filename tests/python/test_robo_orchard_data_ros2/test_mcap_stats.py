@@ -0,0 +1,60 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import threading
+
+from robo_orchard_data_ros2.mcap.stats import TimestampRange
+
+
+def test_empty_range():
+    rng = TimestampRange()
+    assert rng.min is None
+    assert rng.max is None
+    assert rng.duration == 0
+    assert rng.is_within(123, 0)
+
+
+def test_ranges_of_topics_are_merged():
+    rng = TimestampRange()
+    rng.update("/a", 100)
+    rng.update("/a", 50)
+    rng.update("/b", 300)
+    assert rng.min == 50
+    assert rng.max == 300
+    assert rng.duration == 250
+    assert rng.is_within(350, 50)
+    assert not rng.is_within(351, 50)
+    assert not rng.is_within(0, 49)
+
+
+def test_concurrent_owners():
+    rng = TimestampRange()
+
+    def _update(topic: str, offset: int):
+        for timestamp in range(1000):
+            rng.update(topic, timestamp + offset)
+            assert rng.min is not None
+
+    threads = [
+        threading.Thread(target=_update, args=(f"/topic_{idx}", idx * 10))
+        for idx in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert rng.min == 0
+    assert rng.max == 999 + 70
@@ -0,0 +1,68 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import os
+
+import pytest
+from robo_orchard_data_ros2.mcap.config import StorageConfig
+
+
+def test_default_options():
+    storage = StorageConfig()
+    assert storage.to_writer_options() == {}
+    assert storage.name == "default"
+
+
+def test_preset_options():
+    storage = StorageConfig(preset="balanced")
+    assert storage.to_writer_options() == {
+        "compression": "Zstd",
+        "compressionLevel": "Fastest",
+        "chunkSize": 4 * 1024 * 1024,
+    }
+    assert storage.name == "balanced"
+    assert StorageConfig(preset="fastest_write").to_writer_options() == {
+        "compression": "None",
+        "chunkSize": 4 * 1024 * 1024,
+    }
+
+
+def test_options_override_preset():
+    storage = StorageConfig(
+        preset="smallest", compression="lz4", force_compression=True
+    )
+    assert storage.to_writer_options() == {
+        "compression": "Lz4",
+        "compressionLevel": "Slow",
+        "chunkSize": 8 * 1024 * 1024,
+        "forceCompression": True,
+    }
+    assert StorageConfig(chunk_size=1024).name == "custom"
+
+
+def test_storage_config_file(tmp_path):
+    pytest.importorskip("rosbag2_py")
+    from robo_orchard_data_ros2.mcap.bag import BagWriter
+
+    writer = BagWriter(
+        str(tmp_path / "bag"),
+        storage=StorageConfig(compression="zstd", force_compression=True),
+    )
+    config_uri = writer.storage_kwargs["storage_config_uri"]
+    with open(config_uri, "r") as fr:
+        assert fr.read() == "compression: Zstd\nforceCompression: true\n"
+    writer.close()
+    assert not os.path.exists(config_uri)
@@ -0,0 +1,92 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import numpy as np
+from robo_orchard_data_ros2.mcap.config import ThrottleConfig
+from robo_orchard_data_ros2.mcap.throttle import (
+    TopicThrottle,
+    flatten_message,
+)
+
+
+class _JointState:
+    """Stand-in of a generated ROS message type."""
+
+    def __init__(self, name, position, header=0):
+        self.header = header
+        self.name = name
+        self.position = position
+
+    def get_fields_and_field_types(self):
+        return {
+            "header": "std_msgs/Header",
+            "name": "sequence<string>",
+            "position": "sequence<double>",
+        }
+
+
+def test_flatten_message():
+    msg = _JointState(["j0", "j1"], np.array([0.5, 1.5]))
+    numbers, others = flatten_message(msg)
+    assert numbers.tolist() == [0.5, 1.5]
+    # the length of the non-numeric sequence and its items
+    assert others == (2, "j0", "j1")
+    numbers, others = flatten_message(msg, fields=["position"])
+    assert numbers.tolist() == [0.5, 1.5]
+    assert others == ()
+
+
+def test_max_hz():
+    throttle = TopicThrottle(ThrottleConfig(max_hz=10))
+    # 100 Hz input with jitter
+    kept = [
+        now_ns
+        for now_ns in range(0, 2 * 10**9, 10**7)
+        if throttle.accept(None, now_ns + (now_ns // 10**7 % 3) * 10**6)
+        is None
+    ]
+    assert len(kept) == 20
+    assert throttle.dropped["max_hz"] == 180
+
+
+def test_keep_every_n():
+    throttle = TopicThrottle(ThrottleConfig(keep_every_n=3))
+    results = [throttle.accept(None, t) for t in range(7)]
+    assert [r is None for r in results] == [
+        True,
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+    assert throttle.dropped == {"keep_every_n": 4}
+
+
+def test_change_only():
+    throttle = TopicThrottle(
+        ThrottleConfig(change_only=True, change_tolerance=0.1)
+    )
+    assert throttle.needs_message
+    positions = [0.0, 0.05, 0.08, 0.15, 0.15]
+    results = [
+        throttle.accept(_JointState(["j0"], np.array([p]), header=t), t)
+        for t, p in enumerate(positions)
+    ]
+    # compared with the last recorded message, not the previous one
+    assert results == [None, "unchanged", "unchanged", None, "unchanged"]
+    assert throttle.accept(_JointState(["j1"], np.array([0.15])), 5) is None
@@ -0,0 +1,94 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import os
+
+from robo_orchard_data_ros2.mcap.config import (
+    FrameRateMonitor,
+    RecordConfig,
+    TopicSpec,
+)
+from robo_orchard_data_ros2.mcap.validate import (
+    TopicStats,
+    scan_mcap_file,
+    validate_episode,
+)
+
+
+def test_topic_stats():
+    stats = TopicStats()
+    for log_time in [0, 100, 300, 200, 400]:
+        stats.update(log_time)
+    assert stats.message_count == 5
+    assert stats.start_time_ns == 0
+    assert stats.end_time_ns == 400
+    assert stats.non_monotonic == 1
+    assert stats.max_gap_ns == 200
+    assert stats.max_gap_time_ns == 300
+
+
+def test_scan_complete_file(write_mcap, mcap_topics):
+    stats, error = scan_mcap_file(write_mcap())
+    assert error is None
+    assert set(stats) == set(mcap_topics)
+    for idx, topic in enumerate(mcap_topics):
+        assert stats[topic].message_count == 30
+        assert stats[topic].first_time_ns == idx * 1000
+        assert stats[topic].max_gap_ns == 2000
+        assert stats[topic].non_monotonic == 0
+
+
+def test_scan_truncated_file(write_mcap):
+    path = write_mcap()
+    with open(path, "r+b") as fp:
+        fp.truncate(os.path.getsize(path) // 2)
+    stats, error = scan_mcap_file(path)
+    assert error.startswith("truncated")
+    assert 0 < sum(s.message_count for s in stats.values()) < 60
+
+
+def test_validate_episode(write_mcap, tmp_path, mcap_topics):
+    write_mcap("episode/episode_0.mcap")
+    report = validate_episode(str(tmp_path / "episode"), max_workers=1)
+    assert report["valid"]
+    assert report["topics"][mcap_topics[0]]["message_count"] == 30
+
+    path = write_mcap("episode/episode_1.mcap")
+    with open(path, "r+b") as fp:
+        fp.truncate(os.path.getsize(path) // 2)
+    report = validate_episode(str(tmp_path / "episode"), max_workers=1)
+    assert not report["valid"]
+    assert report["files"][1]["error"].startswith("truncated")
+
+
+def test_default_monitor_skips_configured_topics(
+    write_mcap, tmp_path, mcap_topics
+):
+    static_topic, spec_topic = mcap_topics
+    write_mcap("episode/episode_0.mcap")
+    # the default thresholds fail every topic they apply to
+    default_spec = TopicSpec(frame_rate_monitor=FrameRateMonitor(min_hz=1e12))
+    config = RecordConfig(
+        default_topic_spec=default_spec, static_topics=[static_topic]
+    )
+    report = validate_episode(str(tmp_path / "episode"), config, 1)
+    assert report["topics"][static_topic]["errors"] == []
+    assert report["topics"][spec_topic]["errors"]
+
+    # a spec'd topic without monitor is not checked
+    config.topic_spec[spec_topic] = TopicSpec()
+    report = validate_episode(str(tmp_path / "episode"), config, 1)
+    assert report["valid"]
@@ -0,0 +1,151 @@
+# Project RoboOrchard
+#
+# Copyright (c) 2024-2025 Horizon Robotics. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+import random
+import threading
+import time
+
+import pytest
+from robo_orchard_data_ros2.mcap.writer import (
+    WriteQueue,
+    WriteRequest,
+    WriterStage,
+)
+
+
+def _request(topic: str, timestamp: int) -> WriteRequest:
+    return WriteRequest(topic, topic, None, timestamp)
+
+
+def test_queue_full_actions():
+    dropped = []
+    queue = WriteQueue(max_size=2, on_drop=dropped.append)
+    assert queue.put(_request("/a", 0))
+    assert queue.put(_request("/b", 1))
+    # the oldest message of the same topic makes room
+    assert queue.put(_request("/a", 2), action="drop_first")
+    assert dropped == [_request("/a", 0)]
+    # no message of the topic to drop, the incoming one is dropped
+    assert not queue.put(_request("/c", 3), action="drop_first")
+    assert not queue.put(_request("/a", 4), action="drop_last")
+    assert queue.dropped == {"/a": 2, "/c": 1}
+    assert queue.peak_depth == 2
+    assert [queue.get().timestamp for _ in range(2)] == [1, 2]
+    assert queue.get(timeout=0.01) is None
+
+
+def test_queue_blocks_until_free():
+    queue = WriteQueue(max_size=1)
+    queue.put(_request("/a", 0))
+    done = threading.Event()
+
+    def _put():
+        queue.put(_request("/a", 1))
+        done.set()
+
+    thread = threading.Thread(target=_put)
+    thread.start()
+    assert not done.wait(0.05)
+    assert queue.get().timestamp == 0
+    assert done.wait(1.0)
+    thread.join()
+    queue.close()
+    assert not queue.put(_request("/a", 2))
+    # closed queues are still drained
+    assert queue.get().timestamp == 1
+    assert queue.get() is None
+
+
+def test_queue_keep_topic_order():
+    queue = WriteQueue(keep_topic_order=True)
+    for timestamp, topic in enumerate(["/a", "/a", "/b"]):
+        queue.put(_request(topic, timestamp))
+    first = queue.get()
+    # "/a" is held by the first consumer
+    assert queue.get().dst_topic == "/b"
+    assert queue.get(timeout=0.01) is None
+    queue.task_done(first)
+    assert queue.get().timestamp == 1
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_stage_writes_all_requests(num_threads):
+    written = []
+    lock = threading.Lock()
+
+    def _write(request: WriteRequest):
+        time.sleep(random.random() * 1e-4)
+        with lock:
+            written.append(request.timestamp)
+
+    stage = WriterStage(_write, num_threads=num_threads, max_queue_size=8)
+    for timestamp in range(200):
+        stage.put(_request(f"/topic_{timestamp % 3}", timestamp))
+    stage.close()
+    assert sorted(written) == list(range(200))
+    if num_threads == 1:
+        assert written == list(range(200))
+
+
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_stage_writes_topics_in_order(num_threads):
+    written = []
+    lock = threading.Lock()
+
+    def _write(request: WriteRequest):
+        time.sleep(random.random() * 1e-3)
+        with lock:
+            written.append(request)
+
+    stage = WriterStage(
+        _write,
+        num_threads=num_threads,
+        max_queue_size=8,
+        keep_topic_order=True,
+    )
+    for timestamp in range(200):
+        stage.put(_request(f"/topic_{timestamp % 3}", timestamp))
+    stage.close()
+    assert len(written) == 200
+    for idx in range(3):
+        timestamps = [
+            r.timestamp for r in written if r.dst_topic == f"/topic_{idx}"
+        ]
+        assert timestamps == sorted(timestamps)
+
+
+def test_stage_reports_errors():
+    errors = []
+
+    def _write(request: WriteRequest):
+        if request.timestamp % 2:
+            raise RuntimeError("disk full")
+
+    stage = WriterStage(
+        _write,
+        num_threads=2,
+        on_error=lambda request, e: errors.append((request.timestamp, e)),
+    )
+    for timestamp in range(10):
+        stage.put(_request("/a", timestamp))
+    stage.close()
+    assert sorted(t for t, _ in errors) == [1, 3, 5, 7, 9]
+    assert stage.depth == 0
+
+
+def test_stage_rejects_no_thread():
+    with pytest.raises(ValueError):
+        WriterStage(lambda request: None, num_threads=0)